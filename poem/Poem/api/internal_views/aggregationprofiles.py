@@ -1,7 +1,8 @@
 import json
 
 from Poem.api import serializers
-from Poem.api.internal_views.utils import sync_webapi
+from Poem.api.internal_views.utils import sync_webapi_if_stale, \
+    force_refresh
 from Poem.api.views import NotFound
 from Poem.helpers.history_helpers import create_profile_history
 from Poem.poem import models as poem_models
@@ -203,9 +204,10 @@ class ListAggregations(APIView):
             )
 
     def get(self, request, aggregation_name=None):
-        sync_webapi(
+        sync_webapi_if_stale(
             settings.WEBAPI_AGGREGATION, poem_models.Aggregation,
-            request.tenant.name
+            request.tenant.name,
+            force=force_refresh(request)
         )
 
         if aggregation_name:
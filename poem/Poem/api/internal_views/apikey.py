@@ -172,6 +172,9 @@ class ListAPIKeys(APIView):
                 obj.revoked = request.data['revoked']
                 obj.save()
 
+                if isinstance(obj, MyAPIKey):
+                    MyAPIKey.objects.forget(obj.pk)
+
                 return Response(status=status.HTTP_201_CREATED)
 
             except MyAPIKey.DoesNotExist:
@@ -264,7 +267,11 @@ class ListAPIKeys(APIView):
 
                 try:
                     apikey = model.objects.get(name=name)
+                    pk = apikey.pk
                     apikey.delete()
+
+                    if model == MyAPIKey:
+                        MyAPIKey.objects.forget(pk)
                     return Response(status=status.HTTP_204_NO_CONTENT)
 
                 except model.DoesNotExist:
@@ -0,0 +1,209 @@
+from Poem.api.internal_views.metrics import update_metrics_versions
+from Poem.api.internal_views.metrictemplates import delete_metrics_in_tenant
+from Poem.api.internal_views.utils import sync_tags_webapi
+from Poem.helpers.job_helpers import register_job, enqueue_job, \
+    job_kinds, job_data, after_step
+from Poem.helpers.metrics_helpers import update_metric_in_schema, \
+    update_metrics_from_templates
+from Poem.poem import models as poem_models
+from Poem.poem_super_admin import models as admin_models
+from Poem.tenants.models import Tenant
+from django_tenants.utils import get_public_schema_name
+from rest_framework import status
+from rest_framework.authentication import SessionAuthentication
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .utils import error_response
+
+
+def _schemas_using_metric(name, **kwargs):
+    return admin_models.TenantMetricUsage.objects.schemas_using_metrics([name])
+
+
+def _update_metric(schema, metrictemplate, name, probekey, user=''):
+    return update_metric_in_schema(
+        mt_id=metrictemplate, name=name, pk_id=probekey, schema=schema,
+        user=user
+    )
+
+
+def _schemas_using_metrics(metrictemplates):
+    return admin_models.TenantMetricUsage.objects.schemas_using_metrics(
+        metrictemplates
+    )
+
+
+def _delete_metrics(schema, metrictemplates):
+    return delete_metrics_in_tenant(
+        Tenant.objects.get(schema_name=schema), metrictemplates
+    )
+
+
+def _delete_metric_templates(metrictemplates):
+    admin_models.MetricTemplate.objects.filter(
+        name__in=metrictemplates
+    ).delete()
+    after_step(sync_tags_webapi)
+
+    return []
+
+
+def _schemas_using_templates(metrictemplates, **kwargs):
+    return admin_models.TenantMetricUsage.objects.schemas_using_metrics(
+        list(
+            admin_models.MetricTemplate.objects.filter(
+                pk__in=metrictemplates
+            ).values_list('name', flat=True)
+        )
+    )
+
+
+def _update_metrics_from_templates(schema, metrictemplates, user=''):
+    update_metrics_from_templates(metrictemplates, user=user)
+
+    return []
+
+
+def _schemas_using_probekeys(probekeys, **kwargs):
+    return admin_models.TenantMetricUsage.objects.schemas_using_probekeys(
+        probekeys
+    )
+
+
+def _rename_probe(schema, probekeys, name, version):
+    metrics = poem_models.Metric.objects.filter(probekey__in=probekeys)
+
+    for metric in metrics:
+        metric.probeversion = f'{name} ({version})'
+        metric.save()
+
+    poem_models.set_history_probekey(metrics, [name, version])
+
+    return []
+
+
+def _tenant_schema(tenant, **kwargs):
+    return [tenant]
+
+
+register_job(
+    'update_metrics', _update_metric, _schemas_using_metric
+)
+register_job(
+    'delete_metric_templates', _delete_metrics, _schemas_using_metrics,
+    finish=_delete_metric_templates
+)
+register_job(
+    'update_metrics_from_templates', _update_metrics_from_templates,
+    _schemas_using_templates
+)
+register_job('rename_probe', _rename_probe, _schemas_using_probekeys)
+register_job(
+    'update_metrics_versions', update_metrics_versions, _tenant_schema
+)
+
+
+class ListJobs(APIView):
+    """
+    Operations spanning multiple tenants, run in the background by
+    poem_worker command. Jobs are enqueued with POST and their progress is
+    followed with GET.
+    """
+    authentication_classes = (SessionAuthentication,)
+
+    def _check_schema(self, request):
+        if request.tenant.schema_name != get_public_schema_name():
+            return error_response(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail='Jobs are available only in SuperPOEM.'
+            )
+
+        return None
+
+    def get(self, request, job_id=None):
+        error = self._check_schema(request)
+        if error:
+            return error
+
+        if job_id:
+            try:
+                job = admin_models.Job.objects.get(pk=job_id)
+
+            except admin_models.Job.DoesNotExist:
+                return error_response(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail='Job not found.'
+                )
+
+            return Response(job_data(job, steps=True))
+
+        jobs = admin_models.Job.objects.all().order_by('-created', '-id')
+        kind = request.query_params.get('kind')
+        if kind:
+            jobs = jobs.filter(kind=kind)
+
+        return Response([job_data(job) for job in jobs])
+
+    def post(self, request):
+        error = self._check_schema(request)
+        if error:
+            return error
+
+        if not request.user.is_superuser:
+            return error_response(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail='You do not have permission to run jobs.'
+            )
+
+        kind = request.data.get('kind', '')
+        if kind not in job_kinds():
+            return error_response(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail='Unknown job kind: {}.'.format(kind)
+            )
+
+        try:
+            job = enqueue_job(
+                kind, dict(request.data.get('params', dict())),
+                user=request.user.username, key=request.data.get('key')
+            )
+
+        except TypeError:
+            return error_response(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail='Wrong parameters for job {}.'.format(kind)
+            )
+
+        return Response(job_data(job), status=status.HTTP_202_ACCEPTED)
+
+    def put(self, request, job_id):
+        error = self._check_schema(request)
+        if error:
+            return error
+
+        if not request.user.is_superuser:
+            return error_response(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail='You do not have permission to run jobs.'
+            )
+
+        try:
+            retried = admin_models.Job.objects.retry(job_id)
+
+        except admin_models.Job.DoesNotExist:
+            return error_response(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail='Job not found.'
+            )
+
+        if not retried:
+            return error_response(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail='Job has no failed steps.'
+            )
+
+        return Response(
+            job_data(admin_models.Job.objects.get(pk=job_id)),
+            status=status.HTTP_202_ACCEPTED
+        )
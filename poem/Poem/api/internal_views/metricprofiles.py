@@ -1,5 +1,6 @@
 from Poem.api import serializers
-from Poem.api.internal_views.utils import sync_webapi
+from Poem.api.internal_views.utils import sync_webapi_if_stale, \
+    force_refresh
 from Poem.api.views import NotFound
 from Poem.helpers.history_helpers import create_profile_history
 from Poem.helpers.metrics_helpers import sync_metrics
@@ -146,9 +147,10 @@ class ListMetricProfiles(APIView):
                 )
 
     def get(self, request, profile_name=None):
-        sync_webapi(
+        sync_webapi_if_stale(
             settings.WEBAPI_METRIC, poem_models.MetricProfiles,
-            request.tenant.name
+            request.tenant.name,
+            force=force_refresh(request)
         )
 
         if profile_name:
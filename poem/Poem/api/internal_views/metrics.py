@@ -6,19 +6,22 @@ from Poem.api.internal_views.utils import one_value_inline, two_value_inline, \
     inline_metric_for_db
 from Poem.api.views import NotFound, ListMetricOverrides
 from Poem.helpers.history_helpers import create_history
+from Poem.helpers.job_helpers import after_step, enqueue_job
 from Poem.helpers.metrics_helpers import import_metrics, \
-    update_metric_in_schema, get_metrics_in_profiles, \
-    delete_metrics_from_profile
+    get_metrics_in_profiles, delete_metrics_from_profile, \
+    plan_metrics_versions, apply_metrics_versions
 from Poem.poem import models as poem_models
 from Poem.poem_super_admin import models as admin_models
+from Poem.tenants.models import Tenant
 from django.contrib.contenttypes.models import ContentType
 from django.db import IntegrityError
+from django.db.models import Q
 from rest_framework import status
 from rest_framework.authentication import SessionAuthentication
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from .utils import error_response
+from .utils import error_response, job_response
 
 
 class ListAllMetrics(APIView):
@@ -51,22 +54,20 @@ class ListMetric(APIView):
         else:
             metrics = poem_models.Metric.objects.all()
 
+        metrics = list(metrics.select_related('group'))
+        probekeys = set(metric.probekey_id for metric in metrics)
+        histories = dict(
+            ((mt.name, mt.probekey_id), mt) for mt in
+            admin_models.MetricTemplateHistory.objects.filter(
+                name__in=[metric.name for metric in metrics]
+            ).filter(
+                Q(probekey__in=probekeys - {None}) | Q(probekey__isnull=True)
+            ).select_related('mtype').prefetch_related('tags')
+        )
+
         results = []
         for metric in metrics:
-            if metric.probeversion:
-                metric_probe = metric.probeversion.split(" (")
-                probe_name = metric_probe[0]
-                probe_version = metric_probe[1][:-1]
-
-                mt = admin_models.MetricTemplateHistory.objects.get(
-                    name=metric.name, probekey__name=probe_name,
-                    probekey__package__version=probe_version
-                )
-
-            else:
-                mt = admin_models.MetricTemplateHistory.objects.get(
-                    name=metric.name
-                )
+            mt = histories[(metric.name, metric.probekey_id)]
 
             config = two_value_inline(metric.config)
             parent = one_value_inline(mt.parent)
@@ -148,17 +149,18 @@ class ListMetric(APIView):
                         metric.config = inline_metric_for_db(
                             request.data['config']
                         )
-                        metric.probeversion = request.data["probeversion"]
-
-                        metric_probe = request.data["probeversion"].split(" (")
-                        probe_name = metric_probe[0].strip()
-                        probe_version = metric_probe[1][:-1].strip()
-
-                        mt = admin_models.MetricTemplateHistory.objects.get(
-                            name=metric.name, probekey__name=probe_name,
-                            probekey__package__version=probe_version
+                        probe = admin_models.parse_probeversion(
+                            request.data["probeversion"]
                         )
 
+                        mt = admin_models.MetricTemplateHistory.objects.\
+                            select_related("probekey__package").get(
+                                name=metric.name, probekey__name=probe[0],
+                                probekey__package__version=probe[1]
+                            )
+                        metric.probekey = mt.probekey
+                        metric.probeversion = mt.probekey.__str__()
+
                     else:
                         mt = admin_models.MetricTemplateHistory.objects.get(
                             name=metric.name
@@ -367,186 +369,229 @@ class ImportMetrics(APIView):
             )
 
 
-class UpdateMetricsVersions(APIView):
-    """
-    We allow tenant users to pick package version they wish to install, and
-    update metrics accordingly.
-    """
-    authentication_classes = (SessionAuthentication,)
+def _handle_metrics(
+        name, version, user, schema, dry_run=False, metrics=None, plan_id=None
+):
+    try:
+        package = admin_models.Package.objects.get(
+            name=name, version=version
+        )
 
-    def _handle_metrics(
-            self, name, version, user, schema, dry_run=False, metrics=None
-    ):
-        try:
-            package = admin_models.Package.objects.get(
-                name=name, version=version
-            )
+        plan = plan_metrics_versions(package)
+
+        if plan_id and plan_id != plan.id:
+            msg = {
+                'detail': 'Metrics have changed since the update was '
+                          'reviewed. Please review it again.'
+            }
+            return msg, status.HTTP_409_CONFLICT, []
+
+        # warning for metrics if there is no metric template history for
+        # metric templates of that name
+        warning_no_tbh = plan.warning
+        # metrics deleted because they are not available in the given
+        # package
+        deleted_not_in_package = [metric[0] for metric in plan.delete]
+        # updated metrics
+        updated = [metric[0] for metric in plan.update]
+        profile_warning = []
+        if dry_run:
+            for metric in deleted_not_in_package:
+                value = metrics.get(metric, [])
+                if len(value) == 1:
+                    profile_warning.append(
+                        'Metric {} is part of {} metric profile.'.format(
+                            metric, value[0]
+                        )
+                    )
 
-            # warning for metrics if there is no metric template history for
-            # metric templates of that name
-            warning_no_tbh = []
-            # metrics deleted because they are not available in the given
-            # package
-            deleted_not_in_package = []
-            # updated metrics
-            updated = []
-            profile_warning = []
-            for metric in poem_models.Metric.objects.all():
-                if metric.probeversion:
-                    metric_probe = metric.probeversion.split(" (")
-                    probe_name = metric_probe[0].strip()
-                    probe_version = metric_probe[1][:-1].strip()
-                    probekey = admin_models.ProbeHistory.objects.filter(
-                        name=probe_name,
-                        package__version=probe_version
+                elif len(value) > 1:
+                    profile_warning.append(
+                        'Metric {} is part of {} metric profiles.'.format(
+                            metric, ', '.join(value)
+                        )
                     )
-                    if len(probekey) == 1 and \
-                            probekey[0].package.name == package.name:
-                        mts_history = \
-                            admin_models.MetricTemplateHistory.objects.filter(
-                                name=metric.name,
-                                probekey__package__name=package.name
+
+        else:
+            if plan.update:
+                apply_metrics_versions(plan, user=user)
+
+            if plan.delete:
+                poem_models.Metric.objects.filter(
+                    id__in=[metric[1] for metric in plan.delete]
+                ).delete()
+
+        msg = dict()
+        if deleted_not_in_package:
+            if len(deleted_not_in_package) == 1:
+                subj = 'Metric {}'.format(deleted_not_in_package[0])
+                verb = 'has'
+                obj = 'its probe is'
+            else:
+                subj = 'Metrics {}'.format(
+                    ', '.join(deleted_not_in_package)
+                )
+                verb = 'have'
+                obj = 'their probes are'
+
+            if dry_run:
+                delete_msg = '{} will be deleted, since {} not part of ' \
+                             'the chosen package.'.format(subj, obj)
+
+                if profile_warning:
+                    if len(profile_warning) == 1:
+                        delete_msg += \
+                            ' WARNING: {} ARE YOU SURE YOU WANT TO ' \
+                            'DELETE IT?'.format(
+                                profile_warning[0]
                             )
-                        if len(mts_history) > 0:
-                            mts = admin_models.MetricTemplateHistory.objects.filter(
-                                object_id=mts_history[0].object_id
+
+                    else:
+                        delete_msg += \
+                            ' {} ARE YOU SURE YOU WANT TO ' \
+                            'DELETE THEM?'.format(
+                                ' '.join(profile_warning)
                             )
-                            metrictemplate = None
-                            for mt in mts:
-                                if mt.probekey.package == package:
-                                    metrictemplate = mt
-                                    break
-
-                            if metrictemplate:
-                                if not dry_run:
-                                    update_metric_in_schema(
-                                        mt_id=metrictemplate.id,
-                                        name=metric.name,
-                                        pk_id=probekey[0].id,
-                                        schema=schema,
-                                        update_from_history=True,
-                                        user=user
-                                    )
-                                updated.append(metric.name)
-
-                            else:
-                                if dry_run:
-                                    for key, value in metrics.items():
-                                        if metric.name == key:
-                                            if len(value) == 1:
-                                                profile_warning.append(
-                                                    'Metric {} is part of {} '
-                                                    'metric profile.'.format(
-                                                        metric.name, value[0]
-                                                    )
-                                                )
-
-                                            else:
-                                                profile_warning.append(
-                                                    'Metric {} is part of {} '
-                                                    'metric profiles.'.format(
-                                                        metric.name, ', '.join(
-                                                            value
-                                                        )
-                                                    )
-                                                )
-
-                                else:
-                                    metric.delete()
-
-                                deleted_not_in_package.append(metric.name)
 
-                        else:
-                            warning_no_tbh.append(metric.name)
-
-            msg = dict()
-            if deleted_not_in_package:
-                if len(deleted_not_in_package) == 1:
-                    subj = 'Metric {}'.format(deleted_not_in_package[0])
-                    verb = 'has'
-                    obj = 'its probe is'
+            else:
+                delete_msg = '{} {} been deleted, since {} not part of ' \
+                             'the chosen package.'.format(subj, verb, obj)
+
+            msg.update({'deleted': delete_msg})
+
+        if warning_no_tbh:
+            if len(warning_no_tbh) == 1:
+                subj = 'instance of {} has'.format(warning_no_tbh[0])
+
+            else:
+                subj = 'instances of {} have'.format(
+                    ', '.join(warning_no_tbh)
+                )
+
+            msg.update(
+                {
+                    'warning': 'Metric template history {} not been found. '
+                               'Please contact Administrator.'.format(subj)
+                }
+            )
+
+        if updated:
+            if len(updated) == 1:
+                if dry_run:
+                    subj = 'Metric {} will be'.format(updated[0])
+
                 else:
-                    subj = 'Metrics {}'.format(
-                        ', '.join(deleted_not_in_package)
+                    subj = 'Metric {} has been successfully'.format(
+                        updated[0]
                     )
-                    verb = 'have'
-                    obj = 'their probes are'
 
+            else:
                 if dry_run:
-                    delete_msg = '{} will be deleted, since {} not part of ' \
-                                 'the chosen package.'.format(subj, obj)
+                    subj = 'Metrics {} will be'.format(', '.join(updated))
 
-                    if profile_warning:
-                        if len(profile_warning) == 1:
-                            delete_msg += \
-                                ' WARNING: {} ARE YOU SURE YOU WANT TO ' \
-                                'DELETE IT?'.format(
-                                    profile_warning[0]
-                                )
+                else:
+                    subj = 'Metrics {} have been successfully'.format(
+                        ', '.join(updated)
+                    )
 
-                        else:
-                            delete_msg += \
-                                ' {} ARE YOU SURE YOU WANT TO ' \
-                                'DELETE THEM?'.format(
-                                    ' '.join(profile_warning)
-                                )
+            msg.update({'updated': '{} updated.'.format(subj)})
 
-                else:
-                    delete_msg = '{} {} been deleted, since {} not part of ' \
-                                 'the chosen package.'.format(subj, verb, obj)
+        if dry_run:
+            msg.update({'plan': plan.id})
+            return msg, status.HTTP_200_OK
 
-                msg.update({'deleted': delete_msg})
+        else:
+            return msg, status.HTTP_201_CREATED, deleted_not_in_package
 
-            if warning_no_tbh:
-                if len(warning_no_tbh) == 1:
-                    subj = 'instance of {} has'.format(warning_no_tbh[0])
+    except admin_models.Package.DoesNotExist:
+        msg = {'detail': 'Package not found.'}
+        if dry_run:
+            return msg, status.HTTP_404_NOT_FOUND
 
-                else:
-                    subj = 'instances of {} have'.format(
-                        ', '.join(warning_no_tbh)
-                    )
+        else:
+            return msg, status.HTTP_404_NOT_FOUND, []
 
-                msg.update(
-                    {
-                        'warning': 'Metric template history {} not been found. '
-                                   'Please contact Administrator.'.format(subj)
-                    }
-                )
 
-            if updated:
-                if len(updated) == 1:
-                    if dry_run:
-                        subj = 'Metric {} will be'.format(updated[0])
+def _delete_metrics_from_profiles(tenant, deleted):
+    warn_msg = []
+    try:
+        metrics_in_profiles = get_metrics_in_profiles(tenant)
 
-                    else:
-                        subj = 'Metric {} has been successfully'.format(
-                            updated[0]
-                        )
+    except Exception:
+        warn_msg.append(
+            'Unable to get data on metrics and metric profiles. Please remove '
+            'deleted metrics from metric profiles manually.'
+        )
 
+    else:
+        profiles = dict()
+        for metric in deleted:
+            for key, value in metrics_in_profiles.items():
+                if key == metric:
+                    for p in value:
+                        if p in profiles:
+                            profiles.update({p: profiles[p] + [key]})
+                        else:
+                            profiles.update({p: [key]})
+
+        for key, value in profiles.items():
+            try:
+                delete_metrics_from_profile(key, value, tenant.name)
+
+            except Exception:
+                if len(value) > 1:
+                    message = 'Error trying to remove metrics {} from ' \
+                              'profile {}.'.format(', '.join(value), key)
+                    pronoun = 'them'
                 else:
-                    if dry_run:
-                        subj = 'Metrics {} will be'.format(', '.join(updated))
+                    message = 'Error trying to remove metric {} from ' \
+                              'profile {}.'.format(value[0], key)
+                    pronoun = 'it'
 
-                    else:
-                        subj = 'Metrics {} have been successfully'.format(
-                            ', '.join(updated)
-                        )
+                warn_msg.append(
+                    message + ' Please remove {} manually.'.format(pronoun)
+                )
 
-                msg.update({'updated': '{} updated.'.format(subj)})
+    return warn_msg
 
-            if dry_run:
-                return msg, status.HTTP_200_OK
 
-            else:
-                return msg, status.HTTP_201_CREATED, deleted_not_in_package
+def update_metrics_versions(
+        schema, tenant, name, version, plan=None, user=''
+):
+    """
+    Switches metrics of the tenant to the given version of package, run by
+    update_metrics_versions job. If plan id is given, changes are applied
+    only if the plan has not changed since it was reviewed. Deleted metrics
+    are removed from metric profiles once the changes are committed.
+    Returns list of messages.
+    """
+    msg, status_code, deleted = _handle_metrics(
+        name=name, version=version, schema=schema, user=user, plan_id=plan
+    )
+    if status_code != status.HTTP_201_CREATED:
+        raise ValueError(msg['detail'])
 
-        except admin_models.Package.DoesNotExist:
-            msg = {'detail': 'Package not found.'}
-            if dry_run:
-                return msg, status.HTTP_404_NOT_FOUND
+    messages = [
+        msg[key] for key in ['updated', 'deleted', 'warning'] if key in msg
+    ]
+    if deleted:
+        messages.extend(after_step(
+            _delete_metrics_from_profiles,
+            Tenant.objects.get(schema_name=schema), deleted
+        ))
+
+    return messages
 
-            else:
-                return msg, status.HTTP_404_NOT_FOUND, []
+
+class UpdateMetricsVersions(APIView):
+    """
+    We allow tenant users to pick package version they wish to install, and
+    update metrics accordingly. GET returns the planned changes together
+    with id of the plan, which has to be sent back with PUT; changes are
+    applied only if the plan has not changed in the meantime. Changes are
+    applied by a background job, PUT returns 202 together with the job.
+    """
+    authentication_classes = (SessionAuthentication,)
 
     def get(self, request, pkg):
         version = pkg.split('-')[-1]
@@ -574,7 +619,7 @@ class UpdateMetricsVersions(APIView):
             msg = str(e)
             return Response({'detail': msg}, status=status.HTTP_404_NOT_FOUND)
 
-        msg, status_code = self._handle_metrics(
+        msg, status_code = _handle_metrics(
             name=name, version=version, user=request.user.username,
             schema=request.tenant.schema_name, dry_run=True,
             metrics=metrics_in_profiles
@@ -584,71 +629,41 @@ class UpdateMetricsVersions(APIView):
 
     def put(self, request):
         if request.user.is_superuser:
-            msg, status_code, deleted = self._handle_metrics(
-                name=request.data['name'], version=request.data['version'],
-                schema=request.tenant.schema_name, user=request.user.username
-            )
+            try:
+                package = admin_models.Package.objects.get(
+                    name=request.data['name'], version=request.data['version']
+                )
 
-            warn_msg = []
-            if deleted:
-                try:
-                    metrics_in_profiles = get_metrics_in_profiles(
-                        request.tenant
-                    )
+            except admin_models.Package.DoesNotExist:
+                return error_response(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail='Package not found.'
+                )
 
-                except Exception:
-                    warn_msg.append(
-                        'Unable to get data on metrics and metric profiles. '
-                        'Please remove deleted metrics from metric profiles '
-                        'manually.'
-                    )
+            plan_id = request.data.get('plan')
+            if not plan_id:
+                return error_response(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail='Metrics update has not been reviewed. Please '
+                           'review it first.'
+                )
 
-                else:
-                    profiles = dict()
-                    for metric in deleted:
-                        for key, value in metrics_in_profiles.items():
-                            if key == metric:
-                                for p in value:
-                                    if p in profiles:
-                                        profiles.update(
-                                            {p: profiles[p] + [key]}
-                                        )
-                                    else:
-                                        profiles.update({p: [key]})
-
-                    if profiles:
-                        for key, value in profiles.items():
-                            try:
-                                delete_metrics_from_profile(
-                                    key, value, request.tenant.name
-                                )
-
-                            except Exception:
-                                if len(value) > 1:
-                                    message = \
-                                        'Error trying to remove metrics {} ' \
-                                        'from profile {}.'.format(
-                                            ', '.join(value), key
-                                        )
-                                    pronoun = 'them'
-                                else:
-                                    message = \
-                                        'Error trying to remove metric {} ' \
-                                        'from profile {}.'.format(value[0], key)
-                                    pronoun = 'it'
-
-                                warn_msg.append(
-                                    message +
-                                    ' Please remove {} manually.'.format(
-                                        pronoun
-                                    )
-                                )
-                                continue
-
-            if warn_msg:
-                msg['deleted'] += ' WARNING: ' + ' '.join(warn_msg)
-
-            return Response(msg, status=status_code)
+            if plan_id != plan_metrics_versions(package).id:
+                return error_response(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail='Metrics have changed since the update was '
+                           'reviewed. Please review it again.'
+                )
+
+            job = enqueue_job(
+                'update_metrics_versions', dict(
+                    tenant=request.tenant.schema_name, name=package.name,
+                    version=package.version, plan=plan_id,
+                    user=request.user.username
+                ), user=request.user.username
+            )
+
+            return job_response(job)
 
         else:
             return error_response(
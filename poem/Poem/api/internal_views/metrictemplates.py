@@ -2,11 +2,12 @@ import json
 
 from Poem.api import serializers
 from Poem.api.internal_views.utils import one_value_inline, two_value_inline, \
-    inline_metric_for_db, sync_tags_webapi, WebApiException
+    inline_metric_for_db, sync_tags_webapi, WebApiException, job_response
 from Poem.api.views import NotFound
 from Poem.helpers.history_helpers import create_history, update_comment
-from Poem.helpers.metrics_helpers import update_metrics, \
-    get_metrics_in_profiles, delete_metrics_from_profile
+from Poem.helpers.job_helpers import after_step, enqueue_job
+from Poem.helpers.metrics_helpers import get_metrics_in_profiles, \
+    delete_metrics_from_profile
 from Poem.poem.models import Metric, TenantHistory
 from Poem.poem_super_admin import models as admin_models
 from Poem.tenants.models import Tenant
@@ -22,6 +23,11 @@ from .utils import error_response
 
 
 class ListMetricTemplates(APIView):
+    """
+    Metric templates are changed in public schema right away, while metrics
+    of the tenants using a changed metric template are updated by a
+    background job; such requests return 202 together with the job.
+    """
     authentication_classes = (SessionAuthentication,)
 
     def get(self, request, name=None):
@@ -283,6 +289,7 @@ class ListMetricTemplates(APIView):
                 else:
                     new_probekey = None
 
+                job = None
                 if request.data['mtype'] == 'Active' and \
                         old_probekey != new_probekey:
                     metrictemplate.name = request.data['name']
@@ -403,6 +410,9 @@ class ListMetricTemplates(APIView):
                     admin_models.MetricTemplateHistory.objects.filter(
                         name=old_name, probekey=old_probekey
                     ).update(**new_data)
+                    admin_models.ConfigGeneration.objects.bump(
+                        get_public_schema_name()
+                    )
 
                     history = admin_models.MetricTemplateHistory.objects.get(
                         name=request.data['name'], probekey=new_probekey
@@ -416,24 +426,27 @@ class ListMetricTemplates(APIView):
                         for tag in tags_to_add:
                             history.tags.add(tag)
 
-                    msgs = update_metrics(mt, old_name, old_probekey)
-
-                    if msgs:
-                        return error_response(
-                            detail='\n'.join(msgs),
-                            status_code=status.HTTP_418_IM_A_TEAPOT
-                        )
+                    job = _update_tenant_metric(
+                        mt, old_name, old_probekey, request.user
+                    )
 
+                warn_msg = ''
                 try:
                     sync_tags_webapi()
 
-                    return Response(status=status.HTTP_201_CREATED)
-
                 except WebApiException as error:
+                    warn_msg = str(error)
+
+                if job:
+                    return job_response(job, warn_msg)
+
+                elif warn_msg:
                     return error_response(
-                        status_code=status.HTTP_201_CREATED, detail=str(error)
+                        status_code=status.HTTP_201_CREATED, detail=warn_msg
                     )
 
+                return Response(status=status.HTTP_201_CREATED)
+
             except admin_models.MetricTemplate.DoesNotExist:
                 return error_response(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -471,10 +484,6 @@ class ListMetricTemplates(APIView):
             )
 
     def delete(self, request, name=None):
-        schemas = list(
-            Tenant.objects.all().values_list('schema_name', flat=True)
-        )
-        schemas.remove(get_public_schema_name())
         metric_ct = ContentType.objects.get_for_model(Metric)
         template_ct = ContentType.objects.get_for_model(
             admin_models.MetricTemplate
@@ -485,13 +494,14 @@ class ListMetricTemplates(APIView):
             if name:
                 try:
                     mt = admin_models.MetricTemplate.objects.get(name=name)
+                    admin_models.History.objects.filter(
+                        object_id=mt.id, content_type=template_ct
+                    ).delete()
+                    schemas = admin_models.TenantMetricUsage.objects.\
+                        schemas_using_metrics([name])
                     for schema in schemas:
                         with schema_context(schema):
                             try:
-                                admin_models.History.objects.filter(
-                                    object_id=mt.id,
-                                    content_type=template_ct
-                                ).delete()
                                 m = Metric.objects.get(name=name)
                                 TenantHistory.objects.filter(
                                     object_id=m.id,
@@ -595,7 +605,79 @@ class ListMetricTemplatesForProbeVersion(APIView):
             )
 
 
+def _delete_metrics_from_profiles(tenant, profiles):
+    warning_message = []
+    for key, value in profiles.items():
+        try:
+            delete_metrics_from_profile(key, value, tenant.name)
+
+        except Exception as e:
+            if len(value) > 1:
+                noun = 'Metrics {}'.format(', '.join(value))
+            else:
+                noun = 'Metric {}'.format(value[0])
+
+            warning_message.append(
+                '{}: {} not deleted from profile {}: {}'.format(
+                    tenant.schema_name, noun, key, str(e)
+                )
+            )
+
+    return warning_message
+
+
+def delete_metrics_in_tenant(tenant, metrictemplates):
+    """
+    Deletes metrics with the given names, together with their history, from
+    the current schema of the given tenant, and removes them from its
+    metric profiles; when run as a job step, profiles are changed only
+    after the step is committed. Returns list of warning messages.
+    """
+    warning_message = []
+    try:
+        mip = get_metrics_in_profiles(tenant)
+    except Exception as e:
+        warning_message.append(
+            '{}: Metrics are not removed from metric profiles. '
+            'Unable to get metric profiles: {}'.format(
+                tenant.schema_name, str(e)
+            )
+        )
+        return warning_message
+
+    inter = set(metrictemplates).intersection(set(list(mip.keys())))
+    profiles = dict()
+    for metric in metrictemplates:
+        try:
+            instance = Metric.objects.get(name=metric)
+            TenantHistory.objects.filter(object_id=instance.id).delete()
+            instance.delete()
+
+        except Metric.DoesNotExist:
+            continue
+
+        for key, value in mip.items():
+            if metric in inter and key == metric:
+                for p in value:
+                    if p in profiles:
+                        profiles.update({p: profiles[p] + [key]})
+                    else:
+                        profiles.update({p: [key]})
+
+    if profiles:
+        warning_message.extend(
+            after_step(_delete_metrics_from_profiles, tenant, profiles)
+        )
+
+    return warning_message
+
+
 class BulkDeleteMetricTemplates(APIView):
+    """
+    Metric templates used by tenants are deleted by a background job, once
+    their metrics are deleted from the tenants; such requests return 202
+    together with the job.
+    """
     authentication_classes = (SessionAuthentication,)
 
     def post(self, request):
@@ -603,70 +685,25 @@ class BulkDeleteMetricTemplates(APIView):
                 request.user.is_superuser:
             metrictemplates = dict(request.data)['metrictemplates']
 
-            tenants = Tenant.objects.all()
-            tenants = [
-                tenant for tenant in tenants if
-                tenant.schema_name != get_public_schema_name()
-            ]
-
-            warning_message = []
-            for tenant in tenants:
-                with schema_context(tenant.schema_name):
-                    try:
-                        mip = get_metrics_in_profiles(tenant)
-                    except Exception as e:
-                        warning_message.append(
-                            '{}: Metrics are not removed from metric profiles. '
-                            'Unable to get metric profiles: {}'.format(
-                                tenant.schema_name, str(e)
-                            )
-                        )
-                        continue
-
-                    inter = set(metrictemplates).intersection(
-                        set(list(mip.keys()))
-                    )
-                    profiles = dict()
-                    for metric in metrictemplates:
-                        try:
-                            instance = Metric.objects.get(name=metric)
-                            TenantHistory.objects.filter(
-                                object_id=instance.id
-                            ).delete()
-                            instance.delete()
-
-                        except Metric.DoesNotExist:
-                            continue
-
-                        for key, value in mip.items():
-                            if metric in inter and key == metric:
-                                for p in value:
-                                    if p in profiles:
-                                        profiles.update(
-                                            {p: profiles[p] + [key]}
-                                        )
-                                    else:
-                                        profiles.update({p: [key]})
+            if len(metrictemplates) > 1:
+                msg = 'Metric templates {}'.format(', '.join(metrictemplates))
 
-                    if profiles:
-                        for key, value in profiles.items():
-                            try:
-                                delete_metrics_from_profile(
-                                    key, value, tenant.name
-                                )
+            else:
+                msg = 'Metric template {}'.format(metrictemplates[0])
 
-                            except Exception as e:
-                                if len(value) > 1:
-                                    noun = 'Metrics {}'.format(', '.join(value))
-                                else:
-                                    noun = 'Metric {}'.format(value[0])
+            if admin_models.TenantMetricUsage.objects.schemas_using_metrics(
+                    metrictemplates
+            ):
+                job = enqueue_job(
+                    'delete_metric_templates',
+                    dict(metrictemplates=metrictemplates),
+                    user=request.user.username
+                )
 
-                                warning_message.append(
-                                    '{}: {} not deleted from '
-                                    'profile {}: {}'.format(
-                                        tenant.schema_name, noun, key, str(e)
-                                    )
-                                )
+                return job_response(
+                    job, '{} will be deleted once tenant metrics are '
+                         'deleted.'.format(msg)
+                )
 
             response_message = dict()
             mt = admin_models.MetricTemplate.objects.filter(
@@ -675,29 +712,15 @@ class BulkDeleteMetricTemplates(APIView):
 
             mt.delete()
 
-            if len(metrictemplates) > 1:
-                msg = 'Metric templates {}'.format(', '.join(metrictemplates))
-
-            else:
-                msg = 'Metric template {}'.format(metrictemplates[0])
-
             response_message.update({
                 'info': '{} successfully deleted.'.format(msg)
             })
 
-            if warning_message:
-                response_message.update({'warning': '; '.join(warning_message)})
-
             try:
                 sync_tags_webapi()
 
             except WebApiException as error:
-                response_message.update({
-                    "warning":
-                        f"{'; '.join(warning_message)}\n{str(error)}".strip(
-                            "\n"
-                        )
-                })
+                response_message.update({'warning': str(error)})
 
             return Response(
                 data=response_message, status=status.HTTP_200_OK
@@ -732,7 +755,77 @@ class ListPublicMetricTemplateTypes(ListMetricTemplateTypes):
     permission_classes = ()
 
 
+def _latest_histories(metrictemplates):
+    return list(
+        admin_models.MetricTemplateHistory.objects.filter(
+            object_id__in=metrictemplates
+        ).order_by("object_id", "-date_created").distinct("object_id")
+    )
+
+
+def _add_metric_tag(tag, metrictemplates):
+    """
+    Adds tag to the given metric templates and their latest histories, with
+    a constant number of queries.
+    """
+    if metrictemplates:
+        tag.metrictemplate_set.add(*metrictemplates)
+        tag.metrictemplatehistory_set.add(*_latest_histories(metrictemplates))
+
+
+def _remove_metric_tag(tag, metrictemplates):
+    """
+    Removes tag from the given metric templates and their latest histories,
+    with a constant number of queries.
+    """
+    if metrictemplates:
+        tag.metrictemplate_set.remove(*metrictemplates)
+        tag.metrictemplatehistory_set.remove(
+            *_latest_histories(metrictemplates)
+        )
+
+
+def _update_tenant_metric(metrictemplate, name, probekey, user):
+    """
+    Enqueues job updating metric with the given name (and probekey) in the
+    tenants using it from the given metric template. Returns the job, or
+    None if no tenant is using the metric.
+    """
+    if not admin_models.TenantMetricUsage.objects.schemas_using_metrics(
+            [name]
+    ):
+        return None
+
+    return enqueue_job(
+        'update_metrics', dict(
+            metrictemplate=metrictemplate.id, name=name,
+            probekey=probekey.id if probekey else None, user=user.username
+        ), user=user.username
+    )
+
+
+def _update_tenant_metrics(metrictemplates, user):
+    """
+    Enqueues job updating tenant metrics from the given metric templates
+    after their tags have changed. Returns the job, or None if there are no
+    metric templates.
+    """
+    if not metrictemplates:
+        return None
+
+    return enqueue_job(
+        'update_metrics_from_templates',
+        dict(metrictemplates=sorted(mt.id for mt in metrictemplates)),
+        user=user.username
+    )
+
+
 class ListMetricTags(APIView):
+    """
+    Metric tags are changed in public schema right away, while metrics of
+    the tenants using the affected metric templates are updated by a
+    background job; such requests return 202 together with the job.
+    """
     authentication_classes = (SessionAuthentication,)
 
     def get(self, request, name=None):
@@ -786,25 +879,19 @@ class ListMetricTags(APIView):
                     )
 
                     missing_metrics = set()
+                    job = None
                     try:
-                        metric_names = dict(request.data)["metrics"]
-                        for metric_name in metric_names:
-                            try:
-                                mt = \
-                                    admin_models.MetricTemplate.objects.get(
-                                        name=metric_name
-                                    )
-                                mt_history = \
-                                    admin_models.MetricTemplateHistory.objects.filter(
-                                        object_id=mt
-                                    ).order_by("-date_created")[0]
-                                mt.tags.add(tag)
-                                mt_history.tags.add(tag)
-
-                                update_metrics(mt, mt.name, mt.probekey)
-
-                            except admin_models.MetricTemplate.DoesNotExist:
-                                missing_metrics.add(metric_name)
+                        metric_names = set(dict(request.data)["metrics"])
+                        mts = list(
+                            admin_models.MetricTemplate.objects.filter(
+                                name__in=metric_names
+                            )
+                        )
+                        missing_metrics = metric_names.difference(
+                            mt.name for mt in mts
+                        )
+                        _add_metric_tag(tag, mts)
+                        job = _update_tenant_metrics(mts, request.user)
 
                     except KeyError:
                         pass
@@ -828,7 +915,10 @@ class ListMetricTags(APIView):
                                 ", ".join(sorted(list(missing_metrics)))
                             )
 
-                    if warn_msg:
+                    if job:
+                        return job_response(job, warn_msg.strip("\n"))
+
+                    elif warn_msg:
                         return Response(
                             {"detail": warn_msg.strip("\n")},
                             status=status.HTTP_201_CREATED
@@ -868,59 +958,48 @@ class ListMetricTags(APIView):
                         tag.name = request.data["name"]
                         tag.save()
 
-                        old_mts = admin_models.MetricTemplate.objects.filter(
-                            tags__name=tag.name
-                        )
-                        old_metrics = set(
-                            old_mts.values_list("name", flat=True)
+                        old_mts = list(
+                            admin_models.MetricTemplate.objects.filter(
+                                tags__name=tag.name
+                            )
                         )
+                        old_metrics = set(mt.name for mt in old_mts)
 
+                        # templates whose metrics are updated in tenants,
+                        # all of them in a single pass over the schemas
+                        changed = set()
                         if old_tag_name != tag.name:
-                            for mt in old_mts:
-                                update_metrics(mt, mt.name, mt.probekey)
+                            changed.update(old_mts)
 
                         missing_metrics = set()
                         try:
                             new_metrics = set(dict(request.data)["metrics"])
 
-                            for metric_name in old_metrics.difference(
-                                    new_metrics
-                            ):
-                                try:
-                                    mt = admin_models.MetricTemplate.objects.get(
-                                        name=metric_name
+                            removed = [
+                                mt for mt in old_mts
+                                if mt.name not in new_metrics
+                            ]
+                            added = list(
+                                admin_models.MetricTemplate.objects.filter(
+                                    name__in=new_metrics.difference(
+                                        old_metrics
                                     )
-                                    mt.tags.remove(tag)
-
-                                    mt_hist = admin_models.MetricTemplateHistory.objects.filter(
-                                        object_id=mt
-                                    ).order_by("-date_created")[0]
-                                    mt_hist.tags.remove(tag)
-                                    update_metrics(mt, mt.name, mt.probekey)
-
-                                except admin_models.MetricTemplate.DoesNotExist:
-                                    missing_metrics.add(metric_name)
-
-                            for metric_name in new_metrics.difference(
-                                    old_metrics
-                            ):
-                                try:
-                                    mt = admin_models.MetricTemplate.objects.get(
-                                        name=metric_name
-                                    )
-                                    mt.tags.add(tag)
-                                    mt_hist = admin_models.MetricTemplateHistory.objects.filter(
-                                        object_id=mt
-                                    ).order_by("-date_created")[0]
-                                    mt_hist.tags.add(tag)
-                                    update_metrics(mt, mt.name, mt.probekey)
+                                )
+                            )
+                            missing_metrics = new_metrics.difference(
+                                old_metrics
+                            ).difference(mt.name for mt in added)
 
-                                except admin_models.MetricTemplate.DoesNotExist:
-                                    missing_metrics.add(metric_name)
+                            _remove_metric_tag(tag, removed)
+                            _add_metric_tag(tag, added)
+                            changed.update(removed)
+                            changed.update(added)
 
                         except KeyError:
                             pass
 
+                        job = _update_tenant_metrics(changed, request.user)
+
                         warn_msg = ""
                         try:
                             sync_tags_webapi()
@@ -944,7 +1023,10 @@ class ListMetricTags(APIView):
                                         )
                                     )
 
-                        if warn_msg:
+                        if job:
+                            return job_response(job, warn_msg.strip("\n"))
+
+                        elif warn_msg:
                             return Response(
                                 {"detail": warn_msg.strip("\n")},
                                 status=status.HTTP_201_CREATED
@@ -988,24 +1070,32 @@ class ListMetricTags(APIView):
                 request.user.is_superuser:
             try:
 
-                mts = admin_models.MetricTemplate.objects.filter(
-                    tags__name=name
+                mts = list(
+                    admin_models.MetricTemplate.objects.filter(
+                        tags__name=name
+                    )
                 )
 
                 tag = admin_models.MetricTags.objects.get(name=name)
 
-                for mt in mts:
-                    mt.tags.remove(tag)
-                    update_metrics(mt, mt.name, mt.probekey)
+                tag.metrictemplate_set.remove(*mts)
+                job = _update_tenant_metrics(mts, request.user)
 
                 tag.delete()
 
+                warn_msg = ""
                 try:
                     sync_tags_webapi()
 
                 except WebApiException as error:
+                    warn_msg = str(error)
+
+                if job:
+                    return job_response(job, warn_msg)
+
+                elif warn_msg:
                     return Response(
-                        {"detail": str(error)},
+                        {"detail": warn_msg},
                         status=status.HTTP_204_NO_CONTENT
                     )
 
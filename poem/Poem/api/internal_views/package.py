@@ -11,7 +11,7 @@ from rest_framework.authentication import SessionAuthentication
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from .utils import error_response
+from .utils import error_response, job_response
 
 
 def get_package_version(nameversion):
@@ -69,16 +69,11 @@ class ListPackages(APIView):
 
         else:
             if connection.schema_name != get_public_schema_name():
-                packages = set()
-                for metric in poem_models.Metric.objects.all():
-                    if metric.probeversion:
-                        metric_probe = metric.probeversion.split("(")
-                        probe_name = metric_probe[0].strip()
-                        probe_version = metric_probe[1][:-1].strip()
-                        probe = admin_models.ProbeHistory.objects.get(
-                            name=probe_name, package__version=probe_version
-                        )
-                        packages.add(probe.package)
+                packages = admin_models.Package.objects.filter(
+                    id__in=poem_models.Metric.objects.filter(
+                        probekey__isnull=False
+                    ).values('probekey__package')
+                ).prefetch_related('repos__tag')
 
             else:
                 packages = admin_models.Package.objects.all()
@@ -225,6 +220,11 @@ class ListPackages(APIView):
                         ph.version = package.version
                         ph.save()
 
+                # metrics of the tenants are switched to the new version by
+                # the job enqueued when the package was saved
+                if getattr(package, 'job', None):
+                    return job_response(package.job)
+
                 return Response(status=status.HTTP_201_CREATED)
 
             except IntegrityError:
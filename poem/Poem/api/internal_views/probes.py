@@ -1,11 +1,10 @@
 import datetime
-import json
 
 from Poem.api.views import NotFound
 from Poem.helpers.history_helpers import create_history, update_comment
+from Poem.helpers.job_helpers import enqueue_job
 from Poem.poem import models as poem_models
 from Poem.poem_super_admin import models as admin_models
-from Poem.tenants.models import Tenant
 from django.db import IntegrityError
 from django_tenants.utils import schema_context, get_public_schema_name
 from rest_framework import status
@@ -13,7 +12,7 @@ from rest_framework.authentication import SessionAuthentication
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from .utils import error_response
+from .utils import error_response, job_response
 
 
 class ListProbes(APIView):
@@ -77,11 +76,6 @@ class ListProbes(APIView):
             return Response(results)
 
     def put(self, request):
-        schemas = list(
-            Tenant.objects.all().values_list('schema_name', flat=True)
-        )
-        schemas.remove(get_public_schema_name())
-
         if request.tenant.schema_name == get_public_schema_name() and \
                 request.user.is_superuser:
             try:
@@ -129,6 +123,7 @@ class ListProbes(APIView):
                     history = admin_models.ProbeHistory.objects.filter(
                         name=old_name, package__version=old_version
                     )
+                    probekeys = list(history.values_list('id', flat=True))
                     new_data = {
                         'name': request.data['name'],
                         'package': package,
@@ -151,41 +146,19 @@ class ListProbes(APIView):
                         )
                     })
                     history.update(**new_data)
+                    admin_models.ConfigGeneration.objects.bump(
+                        get_public_schema_name()
+                    )
 
                     # update Metric history in case probe name has changed:
                     if request.data['name'] != old_name:
-                        for schema in schemas:
-                            with schema_context(schema):
-                                metrics = poem_models.Metric.objects.filter(
-                                    probeversion=f"{old_name} ({old_version})"
-                                )
-
-                                for metric in metrics:
-                                    metric.probeversion = \
-                                        f"{request.data['name']} " \
-                                        f"({old_version})"
-                                    metric.save()
-
-                                    vers = \
-                                        poem_models.TenantHistory.objects.filter(
-                                            object_id=metric.id
-                                        )
-
-                                    for ver in vers:
-                                        serialized_data = json.loads(
-                                            ver.serialized_data
-                                        )
-
-                                        serialized_data[0]['fields'][
-                                            'probekey'
-                                        ] = \
-                                            [request.data['name'],
-                                             package.version]
-
-                                        ver.serialized_data = json.dumps(
-                                            serialized_data
-                                        )
-                                        ver.save()
+                        return job_response(enqueue_job(
+                            'rename_probe', dict(
+                                probekeys=probekeys,
+                                name=request.data['name'],
+                                version=old_version
+                            ), user=request.user.username
+                        ))
 
                 return Response(status=status.HTTP_201_CREATED)
 
@@ -299,10 +272,6 @@ class ListProbes(APIView):
             )
 
     def delete(self, request, name=None):
-        schemas = list(
-            Tenant.objects.all().values_list('schema_name', flat=True)
-        )
-        schemas.remove(get_public_schema_name())
         if request.tenant.schema_name == get_public_schema_name() and \
                 request.user.is_superuser:
             if name:
@@ -315,13 +284,30 @@ class ListProbes(APIView):
                         )
                     )
                     if len(mt) == 0:
-                        for schema in schemas:
-                            # need to iterate through schemas because of foreign
-                            # key in Metric model
+                        probekeys = list(
+                            admin_models.ProbeHistory.objects.filter(
+                                object_id=probe
+                            ).values_list('id', flat=True)
+                        )
+                        # metrics reference probe history across schemas,
+                        # so their keys are not cleared by cascade; probe
+                        # version is cleared too, so that it does not point
+                        # to the deleted probe
+                        for schema in admin_models.TenantMetricUsage.objects.\
+                                schemas_using_probekeys(probekeys):
                             with schema_context(schema):
-                                admin_models.ProbeHistory.objects.filter(
-                                    object_id=probe
-                                ).delete()
+                                metrics = poem_models.Metric.objects.filter(
+                                    probekey__in=probekeys
+                                )
+                                names = list(
+                                    metrics.values_list('name', flat=True)
+                                )
+                                metrics.update(
+                                    probekey=None, probeversion=None
+                                )
+                                poem_models.MetricChange.objects.log_many(
+                                    names, poem_models.MetricChange.UPDATED
+                                )
                         probe.delete()
                         return Response(status=status.HTTP_204_NO_CONTENT)
                     else:
@@ -1,6 +1,7 @@
 from Poem.api import serializers
 from Poem.api.internal_views.users import get_groups_for_user
-from Poem.api.internal_views.utils import sync_webapi
+from Poem.api.internal_views.utils import sync_webapi_if_stale, \
+    force_refresh
 from Poem.api.views import NotFound
 from Poem.poem import models as poem_models
 from Poem.users.models import CustUser
@@ -80,8 +81,9 @@ class ListReports(APIView):
             )
 
     def get(self, request, report_name=None):
-        sync_webapi(
-            settings.WEBAPI_REPORTS, poem_models.Reports, request.tenant.name
+        sync_webapi_if_stale(
+            settings.WEBAPI_REPORTS, poem_models.Reports, request.tenant.name,
+            force=force_refresh(request)
         )
 
         if report_name:
@@ -1,11 +1,13 @@
 import datetime
 
 from django.contrib.contenttypes.models import ContentType
+from django.db.models.fields.json import KeyTransform
 
 import json
 
 from Poem.api.internal_views.utils import one_value_inline, two_value_inline
 from Poem.api.views import NotFound
+from Poem.helpers.history_helpers import history_fields
 from Poem.helpers.versioned_comments import new_comment
 from Poem.poem import models as poem_models
 
@@ -42,21 +44,32 @@ class ListTenantVersions(APIView):
 
                 raise NotFound(status=404, detail=msg)
 
-            vers = poem_models.TenantHistory.objects.filter(
-                object_id=obj.id,
-                content_type=ct
-            ).order_by('date_created')
+            # only fields of the serialized object are fetched from jsonb;
+            # versions are listed newest first, in order of the index, while
+            # patches of delta versions apply in order versions were created
+            vers = list(
+                poem_models.TenantHistory.objects.filter(
+                    object_id=obj.id,
+                    content_type=ct
+                ).defer('serialized_data').annotate(
+                    fields=KeyTransform(
+                        'fields', KeyTransform('0', 'serialized_data')
+                    )
+                ).order_by('-date_created', '-id')
+            )
 
-            if vers.count() == 0:
+            if len(vers) == 0:
                 raise NotFound(status=404, detail='Version not found.')
 
             else:
                 results = []
-                for ver in vers:
+                versions = history_fields(
+                    [(ver.delta, ver.fields) for ver in reversed(vers)]
+                )[::-1]
+                for ver, fields0 in zip(vers, versions):
                     version = datetime.datetime.strftime(
                         ver.date_created, '%Y%m%d-%H%M%S'
                     )
-                    fields0 = json.loads(ver.serialized_data)[0]['fields']
 
                     if isinstance(obj, poem_models.Metric):
                         if fields0['probekey']:
@@ -184,7 +197,6 @@ class ListTenantVersions(APIView):
                         version=version
                     ))
 
-                results = sorted(results, key=lambda k: k['id'], reverse=True)
                 return Response(results)
 
         else:
@@ -1,6 +1,7 @@
 import datetime
 
-from Poem.api.internal_views.utils import get_tenant_resources
+from Poem.api.internal_views.utils import get_tenants_resources
+from Poem.helpers.fanout_helpers import metric_adoption, probe_adoption
 from Poem.helpers.tenant_helpers import CombinedTenant
 from Poem.tenants.models import Tenant
 from django_tenants.utils import get_public_schema_name, get_tenant_domain_model
@@ -34,6 +35,15 @@ class ListTenants(APIView):
         else:
             tenants = Tenant.objects.all()
 
+        resources = get_tenants_resources(
+            [tenant.schema_name for tenant in tenants]
+        )
+        domains = dict()
+        for tenant_id, domain in get_tenant_domain_model().objects.filter(
+                tenant__in=tenants
+        ).order_by('-is_primary').values_list('tenant', 'domain'):
+            domains.setdefault(tenant_id, domain)
+
         for tenant in tenants:
             if tenant.schema_name == get_public_schema_name():
                 tenant_name = 'SuperPOEM Tenant'
@@ -43,34 +53,37 @@ class ListTenants(APIView):
                 tenant_name = tenant.name
                 metric_key = 'metrics'
 
-            try:
-                domain = get_tenant_domain_model().objects.get(tenant=tenant)
-
-                data = get_tenant_resources(tenant.schema_name)
-
-                result = dict(
-                    name=tenant_name,
-                    schema_name=tenant.schema_name,
-                    domain_url=domain.domain,
-                    created_on=datetime.date.strftime(
-                        tenant.created_on, '%Y-%m-%d'
-                    ),
-                    nr_metrics=data[metric_key],
-                    nr_probes=data['probes'],
-                    combined=tenant.combined
+            if tenant.id not in domains:
+                return error_response(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail='Domain for tenant {} not found.'.format(
+                        tenant_name
+                    )
                 )
 
-                if tenant.combined:
-                    combined = CombinedTenant(tenant)
-                    result.update({"combined_from": combined.tenants()})
+            data = resources[tenant.schema_name]
+            last_change = data.get('last_change')
+
+            result = dict(
+                name=tenant_name,
+                schema_name=tenant.schema_name,
+                domain_url=domains[tenant.id],
+                created_on=datetime.date.strftime(
+                    tenant.created_on, '%Y-%m-%d'
+                ),
+                nr_metrics=data[metric_key],
+                nr_probes=data['probes'],
+                last_change=datetime.datetime.strftime(
+                    last_change, '%Y-%m-%d %H:%M:%S'
+                ) if last_change else None,
+                combined=tenant.combined
+            )
 
-                results.append(result)
+            if tenant.combined:
+                combined = CombinedTenant(tenant)
+                result.update({"combined_from": combined.tenants()})
 
-            except get_tenant_domain_model().DoesNotExist:
-                return error_response(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail='Domain for tenant {} not found.'.format(tenant_name)
-                )
+            results.append(result)
 
         if name:
             results = results[0]
@@ -118,3 +131,51 @@ class ListTenants(APIView):
 class ListPublicTenants(ListTenants):
     authentication_classes = ()
     permission_classes = ()
+
+
+class ListAdoption(APIView):
+    """
+    Use of metrics or probes across all the tenants, read from all the
+    tenant schemas with a single query.
+    """
+    authentication_classes = (SessionAuthentication,)
+
+    def get(self, request, obj):
+        if request.tenant.schema_name != get_public_schema_name():
+            return error_response(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail='Adoption across tenants is available only in '
+                       'SuperPOEM.'
+            )
+
+        names = request.query_params.getlist('name') or None
+        tenants = dict(
+            Tenant.objects.all().values_list('schema_name', 'name')
+        )
+
+        if obj == 'metrics':
+            results = [
+                dict(
+                    name=name,
+                    probeversion=probeversion if probeversion else '',
+                    tenants=[tenants.get(schema, schema) for schema in schemas]
+                ) for name, probeversion, schemas in metric_adoption(names)
+            ]
+
+        elif obj == 'probes':
+            results = [
+                dict(
+                    probeversion=probeversion,
+                    nr_metrics=nr_metrics,
+                    tenants=[tenants.get(schema, schema) for schema in schemas]
+                ) for probeversion, nr_metrics, schemas in
+                probe_adoption(names)
+            ]
+
+        else:
+            return error_response(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail='Adoption can be listed only for metrics or probes.'
+            )
+
+        return Response(results)
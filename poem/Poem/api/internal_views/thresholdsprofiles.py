@@ -1,5 +1,6 @@
 from Poem.api import serializers
-from Poem.api.internal_views.utils import sync_webapi
+from Poem.api.internal_views.utils import sync_webapi_if_stale, \
+    force_refresh
 from Poem.api.views import NotFound
 from Poem.helpers.history_helpers import create_profile_history
 from Poem.poem import models as poem_models
@@ -17,9 +18,10 @@ class ListThresholdsProfiles(APIView):
     authentication_classes = (SessionAuthentication,)
 
     def get(self, request, name=None):
-        sync_webapi(
+        sync_webapi_if_stale(
             settings.WEBAPI_THRESHOLDS, poem_models.ThresholdsProfiles,
-            request.tenant.name
+            request.tenant.name,
+            force=force_refresh(request)
         )
 
         if name:
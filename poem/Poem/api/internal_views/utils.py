@@ -1,20 +1,44 @@
 import json
+import logging
+import threading
+import time
 
 import requests
 from Poem.helpers.history_helpers import create_profile_history
+from Poem.helpers.job_helpers import job_data
+from Poem.helpers.webapi_helpers import webapi_get, webapi_put
 from Poem.poem import models as poem_models
 from Poem.poem_super_admin import models as admin_models
+from Poem.poem_super_admin.dbmodels.fields import to_pairs
 from Poem.poem_super_admin.models import WebAPIKey
 from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Count
 from django_tenants.utils import schema_context, get_public_schema_name
+from rest_framework import status
 from rest_framework.response import Response
 
+logger = logging.getLogger('POEM')
+
 
 def error_response(status_code=None, detail=''):
     return Response({'detail': detail}, status=status_code)
 
 
+def job_response(job, detail=''):
+    """
+    Response to request whose work in tenant schemas is left to the given
+    background job, which can be followed through the jobs API.
+    """
+    data = job_data(job)
+    if detail:
+        data['detail'] = detail
+
+    return Response(data, status=status.HTTP_202_ACCEPTED)
+
+
 def one_value_inline(input_data):
     if input_data:
         return json.loads(input_data)[0]
@@ -23,23 +47,12 @@ def one_value_inline(input_data):
 
 
 def two_value_inline(input_data):
-    results = []
-
-    if input_data:
-        data = json.loads(input_data)
-
-        for item in data:
-            if len(item.split(' ')) == 1:
-                results.append({
-                    'key': item.split(' ')[0],
-                    'value': ''
-                })
-            else:
-                val = ' '.join(item.split(' ')[1:])
-                results.append(({'key': item.split(' ')[0],
-                                 'value': val}))
-
-    return results
+    # values of inline fields are lists of [key, value] pairs, while older
+    # history versions keep them as JSON encoded "key value" strings
+    return [
+        {'key': pair[0], 'value': pair[1] if len(pair) > 1 else ''}
+        for pair in to_pairs(input_data)
+    ]
 
 
 def inline_metric_for_db(data):
@@ -57,106 +70,187 @@ def inline_metric_for_db(data):
 
 
 def two_value_inline_dict(input_data):
-    results = dict()
+    return dict(
+        (pair[0], pair[1] if len(pair) > 1 else '')
+        for pair in to_pairs(input_data)
+    )
 
-    if input_data:
-        data = json.loads(input_data)
 
-        for item in data:
-            if len(item.split(' ')) == 1:
-                results.update({item.split(' ')[0]: ''})
-            else:
-                val = ' '.join(item.split(' ')[1:])
-                results.update(({item.split(' ')[0]: val}))
+def _webapi_entry_fields(item):
+    if item.get('info', False):
+        return item['info']['name'], item['info'].get('description', '')
 
-    return results
+    else:
+        return item['name'], item.get('description', '')
+
+
+def _webapi_entry_history(instance, item):
+    if isinstance(instance, poem_models.MetricProfiles):
+        services = []
+        for service in item['services']:
+            for metric in service['metrics']:
+                services.append(
+                    dict(service=service['service'], metric=metric)
+                )
+        create_profile_history(
+            instance, services, 'poem', item.get('description', '')
+        )
+
+    elif isinstance(instance, poem_models.Aggregation):
+        aggr_data = {
+            'endpoint_group': item['endpoint_group'],
+            'metric_operation': item['metric_operation'],
+            'profile_operation': item['profile_operation'],
+            'metric_profile': item['metric_profile']['name'],
+            'groups': item['groups']
+        }
+        create_profile_history(instance, aggr_data, 'poem')
+
+    elif isinstance(instance, poem_models.ThresholdsProfiles):
+        create_profile_history(instance, {'rules': item['rules']}, 'poem')
 
 
 def sync_webapi(api, model, tenant):
+    """
+    Reconciles local table of the model with the data from WEB-API: new
+    entries are bulk created, only entries whose name or description changed
+    are bulk updated, and entries deleted on WEB-API are deleted together
+    with their history in a single query. Everything is done in one
+    transaction.
+    """
     token = WebAPIKey.objects.get(name=f"WEB-API-{tenant}")
 
     headers = {'Accept': 'application/json', 'x-api-key': token.token}
-    response = requests.get(api, headers=headers, timeout=180)
+    response = webapi_get(api, headers=headers)
     response.raise_for_status()
-    data = response.json()['data']
+    data = dict((p['id'], p) for p in response.json()['data'])
 
-    data_api = set([p['id'] for p in data])
-    data_db = set(model.objects.all().values_list('apiid', flat=True))
-    entries_not_indb = data_api.difference(data_db)
-    entries_indb = data_api.intersection(data_db)
+    with transaction.atomic():
+        entries_db = dict(
+            (instance.apiid, instance) for instance in model.objects.all()
+        )
 
-    new_entries = []
-    for p in data:
-        if p['id'] in entries_not_indb:
-            if p.get('info', False):
+        new_entries = []
+        for apiid, item in data.items():
+            if apiid not in entries_db:
+                name, description = _webapi_entry_fields(item)
                 new_entries.append(
-                    dict(name=p['info']['name'], description=p['info'].get(
-                        'description', ''
-                    ), apiid=p['id'], groupname='')
+                    model(
+                        name=name, description=description, apiid=apiid,
+                        groupname=''
+                    )
                 )
-            else:
-                new_entries.append(
-                    dict(name=p['name'], description=p.get('description', ''),
-                         apiid=p['id'], groupname='')
+
+        for instance in model.objects.bulk_create(new_entries):
+            _webapi_entry_history(instance, data[instance.apiid])
+
+        deleted_ids = [
+            instance.id for apiid, instance in entries_db.items() if
+            apiid not in data
+        ]
+        if deleted_ids:
+            poem_models.TenantHistory.objects.filter(
+                object_id__in=deleted_ids,
+                content_type=ContentType.objects.get_for_model(model)
+            ).delete()
+            model.objects.filter(id__in=deleted_ids).delete()
+
+        changed_entries = []
+        for apiid, instance in entries_db.items():
+            if apiid in data:
+                name, description = _webapi_entry_fields(data[apiid])
+                if instance.name != name or \
+                        instance.description != description:
+                    instance.name = name
+                    instance.description = description
+                    changed_entries.append(instance)
+
+        if changed_entries:
+            model.objects.bulk_update(
+                changed_entries, ['name', 'description']
+            )
+
+
+def webapi_sync_ttl(model, tenant):
+    """
+    Number of seconds the local copy of the given model is considered fresh
+    for the given tenant.
+    """
+    resource = model._meta.model_name
+    ttls = settings.WEBAPI_SYNC_TTL
+    tenant_ttls = ttls.get(tenant.lower(), dict())
+    default_ttls = ttls.get('default', dict())
+
+    for value in [
+        tenant_ttls.get(resource), tenant_ttls.get('ttl'),
+        default_ttls.get(resource), default_ttls.get('ttl')
+    ]:
+        if value is not None:
+            return value
+
+    return 300
+
+
+def _sync_key(model, tenant):
+    return f'webapi:sync:{tenant}:{model._meta.model_name}'
+
+
+def _sync_and_mark(api, model, tenant):
+    sync_webapi(api, model, tenant)
+    cache.set(_sync_key(model, tenant), time.time(), None)
+
+
+def sync_webapi_in_background(api, model, tenant):
+    """
+    Synchronizes the model with WEB-API in a separate thread, unless another
+    synchronization of the same model and tenant is already running.
+    """
+    lock_key = f'{_sync_key(model, tenant)}:running'
+    if not cache.add(lock_key, True, settings.WEBAPI_READ_TIMEOUT):
+        return
+
+    schema_name = connection.schema_name
+
+    def run():
+        with schema_context(schema_name):
+            try:
+                _sync_and_mark(api, model, tenant)
+
+            except Exception as e:
+                logger.warning(
+                    '%s: Error syncing %s with WEB-API: %s' % (
+                        tenant, model._meta.model_name, str(e)
+                    )
                 )
 
-    if new_entries:
-        for entry in new_entries:
-            instance = model.objects.create(**entry)
-
-            if isinstance(instance, poem_models.MetricProfiles):
-                services = []
-                description = ""
-                for item in data:
-                    if item['id'] == instance.apiid:
-                        for service in item['services']:
-                            for metric in service['metrics']:
-                                services.append(
-                                    dict(
-                                        service=service['service'],
-                                        metric=metric
-                                    )
-                                )
-                        description = item.get('description', '')
-                create_profile_history(instance, services, 'poem', description)
-
-            if isinstance(instance, poem_models.Aggregation):
-                for item in data:
-                    if item['id'] == instance.apiid:
-                        aggr_data = {
-                            'endpoint_group': item['endpoint_group'],
-                            'metric_operation': item['metric_operation'],
-                            'profile_operation': item['profile_operation'],
-                            'metric_profile': item['metric_profile']['name'],
-                            'groups': item['groups']
-                        }
-                create_profile_history(instance, aggr_data, 'poem')
-
-            if isinstance(instance, poem_models.ThresholdsProfiles):
-                for item in data:
-                    if item['id'] == instance.apiid:
-                        tp_data = {'rules': item['rules']}
-                create_profile_history(instance, tp_data, 'poem')
-
-    entries_deleted_onapi = data_db.difference(data_api)
-    for p in entries_deleted_onapi:
-        instance = model.objects.get(apiid=p)
-        poem_models.TenantHistory.objects.filter(
-            object_id=instance.id,
-            content_type=ContentType.objects.get_for_model(model)
-        ).delete()
-        instance.delete()
-
-    for p in data:
-        if p['id'] in entries_indb:
-            instance = model.objects.get(apiid=p['id'])
-            if p.get('info', False):
-                instance.name = p['info']['name']
-                instance.description = p['info'].get('description', '')
-            else:
-                instance.name = p['name']
-                instance.description = p.get('description', '')
-            instance.save()
+            finally:
+                cache.delete(lock_key)
+
+        connection.close()
+
+    threading.Thread(target=run, daemon=True).start()
+
+
+def sync_webapi_if_stale(api, model, tenant, force=False):
+    """
+    Synchronizes the model with WEB-API only if the local copy is older than
+    its TTL. Stale data is refreshed in the background, so the caller reads
+    the local table right away; data is synchronized in place if forced, or
+    if the model has never been synchronized for the tenant.
+    """
+    synced = cache.get(_sync_key(model, tenant))
+    if force or synced is None:
+        _sync_and_mark(api, model, tenant)
+        return
+
+    if time.time() - synced > webapi_sync_ttl(model, tenant):
+        sync_webapi_in_background(api, model, tenant)
+
+
+def force_refresh(request):
+    return request.query_params.get('refresh', '').lower() in [
+        '1', 'true', 'yes'
+    ]
 
 
 class WebApiException(Exception):
@@ -177,7 +271,7 @@ def sync_tags_webapi():
         data2send.append({"name": mt.name, "tags": tags})
 
     try:
-        response = requests.put(
+        response = webapi_put(
             settings.WEBAPI_METRICSTAGS,
             headers={"x-api-key": token.token, "Accept": "application/json"},
             data=json.dumps(sorted(data2send, key=lambda d: d["name"]))
@@ -205,19 +299,37 @@ def sync_tags_webapi():
         raise WebApiException(error)
 
 
-def get_tenant_resources(schema_name):
-    with schema_context(schema_name):
+def get_tenants_resources(schema_names):
+    """
+    Returns number of metrics (metric templates for public schema) and
+    probes for each of the given schemas, and time of the last change of
+    tenants' metrics. Numbers for tenant schemas are read from materialized
+    tenant stats in a single query.
+    """
+    resources = dict()
+    stats = dict(
+        (stat.schema_name, stat) for stat in
+        admin_models.TenantStats.objects.filter(schema_name__in=schema_names)
+    )
+
+    for schema_name in schema_names:
         if schema_name == get_public_schema_name():
-            metrics = admin_models.MetricTemplate.objects.all()
-            probes = [metric.probekey for metric in metrics if metric.probekey]
-            met_key = 'metric_templates'
+            resources[schema_name] = \
+                admin_models.MetricTemplate.objects.aggregate(
+                    metric_templates=Count('id'),
+                    probes=Count('probekey', distinct=True)
+                )
+
         else:
-            metrics = poem_models.Metric.objects.all()
-            probes = [
-                metric.probeversion for metric in metrics if metric.probeversion
-            ]
-            met_key = 'metrics'
-        n_met = metrics.count()
-        n_probe = len(set(probes))
-
-        return {met_key: n_met, 'probes': n_probe}
+            stat = stats.get(schema_name)
+            resources[schema_name] = {
+                'metrics': stat.metrics if stat else 0,
+                'probes': stat.probes if stat else 0,
+                'last_change': stat.last_change if stat else None
+            }
+
+    return resources
+
+
+def get_tenant_resources(schema_name):
+    return get_tenants_resources([schema_name])[schema_name]
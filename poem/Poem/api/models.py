@@ -1,3 +1,9 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
 from django.db import models
 
 from rest_framework_api_key.crypto import KeyGenerator
@@ -18,6 +24,62 @@ class MyKeyGenerator(KeyGenerator):
         return key, prefix, hashed_key
 
 
+class VerifiedKeysCache:
+    """
+    Bounded in-process cache of API keys which have passed the (deliberately
+    slow) hasher check. Entries are keyed by SHA-256 digest of the key's
+    primary key, hashed key and the token sent in the request, so keys with
+    regenerated hash never match, and they expire after the given timeout.
+    """
+    def __init__(self, max_size, timeout):
+        self.max_size = max_size
+        self.timeout = timeout
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def digest(api_key, key):
+        return hashlib.sha256(
+            '{}:{}:{}'.format(api_key.pk, api_key.hashed_key, key).encode()
+        ).hexdigest()
+
+    def contains(self, digest):
+        with self._lock:
+            entry = self._entries.get(digest, None)
+            if not entry:
+                return False
+
+            if entry[1] < time.monotonic():
+                del self._entries[digest]
+                return False
+
+            self._entries.move_to_end(digest)
+            return True
+
+    def add(self, digest, pk):
+        with self._lock:
+            self._entries[digest] = (pk, time.monotonic() + self.timeout)
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, pk):
+        with self._lock:
+            for digest in [
+                d for d, entry in self._entries.items() if entry[0] == pk
+            ]:
+                del self._entries[digest]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+verified_keys = VerifiedKeysCache(
+    max_size=settings.APIKEY_CACHE_SIZE, timeout=settings.APIKEY_CACHE_TIMEOUT
+)
+
+
 class MyAPIKeyManager(BaseAPIKeyManager):
     """
     Calling MyAPIKey.objects.create_key() should create a key with given token
@@ -51,14 +113,29 @@ class MyAPIKeyManager(BaseAPIKeyManager):
         except self.model.DoesNotExist:
             return False
 
-        if not api_key.is_valid(test_key):
+        if api_key.has_expired:
             return False
 
-        if api_key.has_expired:
+        # key is fetched from the database on every request, so revoked and
+        # deleted keys are rejected regardless of the cache
+        digest = verified_keys.digest(api_key, test_key)
+        if verified_keys.contains(digest):
+            return True
+
+        if not api_key.is_valid(test_key):
             return False
 
+        verified_keys.add(digest, api_key.pk)
+
         return True
 
+    def forget(self, pk):
+        """
+        Removes the key with the given primary key from the cache of
+        verified keys.
+        """
+        verified_keys.invalidate(pk)
+
 
 class MyAPIKey(AbstractAPIKey):
     objects = MyAPIKeyManager()
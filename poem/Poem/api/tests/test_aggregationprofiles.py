@@ -163,7 +163,7 @@ class ListAggregationsAPIViewTests(TenantTestCase):
             content_type=self.ct
         )
 
-    @patch('Poem.api.internal_views.aggregationprofiles.sync_webapi',
+    @patch('Poem.api.internal_views.aggregationprofiles.sync_webapi_if_stale',
            side_effect=mocked_func)
     def test_get_all_aggregations(self, func):
         request = self.factory.get(self.url)
@@ -194,7 +194,7 @@ class ListAggregationsAPIViewTests(TenantTestCase):
             ]
         )
 
-    @patch('Poem.api.internal_views.aggregationprofiles.sync_webapi',
+    @patch('Poem.api.internal_views.aggregationprofiles.sync_webapi_if_stale',
            side_effect=mocked_func)
     def test_get_aggregation_by_name(self, func):
         request = self.factory.get(self.url + 'TEST_PROFILE')
@@ -211,7 +211,7 @@ class ListAggregationsAPIViewTests(TenantTestCase):
             ])
         )
 
-    @patch('Poem.api.internal_views.aggregationprofiles.sync_webapi',
+    @patch('Poem.api.internal_views.aggregationprofiles.sync_webapi_if_stale',
            side_effect=mocked_func)
     def test_get_aggregation_if_wrong_name(self, func):
         request = self.factory.get(self.url + 'nonexisting')
@@ -2,7 +2,7 @@ import datetime
 from unittest.mock import patch
 
 from Poem.api import views_internal as views
-from Poem.api.models import MyAPIKey
+from Poem.api.models import MyAPIKey, VerifiedKeysCache, verified_keys
 from Poem.poem import models as poem_models
 from Poem.poem_super_admin.models import WebAPIKey
 from Poem.tenants.models import Tenant
@@ -13,6 +13,7 @@ from django_tenants.utils import get_public_schema_name, schema_context, \
     get_tenant_domain_model
 from rest_framework import status
 from rest_framework.test import force_authenticate
+from rest_framework_api_key.models import AbstractAPIKey
 
 from .utils_test import encode_data
 
@@ -1632,3 +1633,88 @@ class ListAPIKeysAPIViewTests(TenantTestCase):
             'You do not have permission to delete API keys'
         )
         self.assertEqual(len(WebAPIKey.objects.all()), 8)
+
+
+class VerifiedAPIKeysCacheTests(TenantTestCase):
+    def setUp(self):
+        self.factory = TenantRequestFactory(self.tenant)
+        self.view = views.ListAPIKeys.as_view()
+        self.url = '/api/v2/internal/apikeys/'
+        self.superuser = CustUser.objects.create_user(
+            username='testuser', is_superuser=True
+        )
+        MyAPIKey.objects.create_key(name='EGI')
+        self.key = MyAPIKey.objects.get(name='EGI')
+        verified_keys.clear()
+
+    def tearDown(self):
+        verified_keys.clear()
+
+    def test_hash_checked_only_once(self):
+        with patch.object(
+                MyAPIKey, 'is_valid', autospec=True,
+                side_effect=AbstractAPIKey.is_valid
+        ) as mock_valid:
+            self.assertTrue(MyAPIKey.objects.is_valid(self.key.token))
+            self.assertTrue(MyAPIKey.objects.is_valid(self.key.token))
+            self.assertTrue(MyAPIKey.objects.is_valid(self.key.token))
+        self.assertEqual(mock_valid.call_count, 1)
+
+    def test_wrong_token(self):
+        self.assertFalse(MyAPIKey.objects.is_valid('wrong_token'))
+        self.assertTrue(MyAPIKey.objects.is_valid(self.key.token))
+        self.assertFalse(MyAPIKey.objects.is_valid('wrong_token'))
+
+    def test_key_revoked(self):
+        self.assertTrue(MyAPIKey.objects.is_valid(self.key.token))
+        data = {
+            'id': self.key.id,
+            'name': 'EGI',
+            'revoked': True,
+            'used_by': 'poem'
+        }
+        content, content_type = encode_data(data)
+        request = self.factory.put(self.url, content, content_type=content_type)
+        request.tenant = self.tenant
+        force_authenticate(request, user=self.superuser)
+        response = self.view(request)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertFalse(
+            verified_keys.contains(
+                verified_keys.digest(
+                    self.key, '{}.{}'.format(self.key.prefix, self.key.token)
+                )
+            )
+        )
+        self.assertFalse(MyAPIKey.objects.is_valid(self.key.token))
+
+    def test_key_deleted(self):
+        self.assertTrue(MyAPIKey.objects.is_valid(self.key.token))
+        request = self.factory.delete(self.url + 'poem_EGI')
+        request.tenant = self.tenant
+        force_authenticate(request, user=self.superuser)
+        response = self.view(request, 'poem_EGI')
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(
+            verified_keys.contains(
+                verified_keys.digest(
+                    self.key, '{}.{}'.format(self.key.prefix, self.key.token)
+                )
+            )
+        )
+        self.assertFalse(MyAPIKey.objects.is_valid(self.key.token))
+
+    def test_cache_bounded(self):
+        cache = VerifiedKeysCache(max_size=2, timeout=300)
+        cache.add('digest1', 'pk1')
+        cache.add('digest2', 'pk2')
+        self.assertTrue(cache.contains('digest1'))
+        cache.add('digest3', 'pk3')
+        self.assertTrue(cache.contains('digest1'))
+        self.assertFalse(cache.contains('digest2'))
+        self.assertTrue(cache.contains('digest3'))
+
+    def test_cache_entry_expired(self):
+        cache = VerifiedKeysCache(max_size=2, timeout=-1)
+        cache.add('digest1', 'pk1')
+        self.assertFalse(cache.contains('digest1'))
@@ -1,28 +1,42 @@
 import datetime
+import io
 import json
-from unittest.mock import patch, call
+import threading
+import time
+from unittest.mock import ANY, patch, call
 
 import factory
 import requests
+from Poem.helpers.fanout_helpers import fan_out, tenant_schemas, \
+    metric_adoption, probe_adoption
 from Poem.helpers.history_helpers import create_comment, update_comment, \
-    serialize_metric
+    serialize_metric, create_profile_history, history_patch, \
+    apply_history_patch, latest_history_fields
+from Poem.helpers.job_helpers import register_job, enqueue_job, \
+    run_next_step, run_worker, job_progress, after_step
 from Poem.helpers.metrics_helpers import import_metrics, update_metrics, \
     update_metrics_in_profiles, get_metrics_in_profiles, \
-    delete_metrics_from_profile, update_metric_in_schema, sync_metrics
+    delete_metrics_from_profile, update_metric_in_schema, sync_metrics, \
+    rename_metric_in_profiles
 from Poem.helpers.tenant_helpers import CombinedTenant
 from Poem.helpers.versioned_comments import new_comment
+from Poem.helpers.webapi_helpers import get_session, reset_session, \
+    webapi_get, webapi_put, webapi_stats, reset_webapi_stats
 from Poem.poem import models as poem_models
 from Poem.poem_super_admin import models as admin_models
+from Poem.poem_super_admin.dbmodels.fields import to_pairs, to_text
 from Poem.poem_super_admin.models import WebAPIKey
 from Poem.tenants.models import Tenant
 from Poem.users.models import CustUser
 from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
 from django.core import serializers
+from django.core.cache import cache
 from django.core.management import call_command
 from django.db import connection
 from django.db.models.signals import pre_save
 from django.test.testcases import TransactionTestCase
+from django.test.utils import CaptureQueriesContext, override_settings
 from django_tenants.test.cases import TenantTestCase
 from django_tenants.utils import get_tenant_model, get_public_schema_name, \
     schema_context, get_tenant_domain_model
@@ -31,7 +45,7 @@ from .utils_test import mocked_func, mocked_web_api_metric_profile, \
     mocked_web_api_metric_profile_put, mocked_web_api_metric_profiles, \
     mocked_web_api_metric_profiles_empty, \
     mocked_web_api_metric_profiles_wrong_token, mocked_web_api_data_feed, \
-    mocked_web_api_data_feed_wrong_token
+    mocked_web_api_data_feed_wrong_token, FakeWebApi
 
 ALLOWED_TEST_DOMAIN = '.test.com'
 
@@ -2262,21 +2276,28 @@ class ImportMetricsTests(TransactionTestCase):
             serialized_data1['probeexecutable'],
             self.metrictemplate3.probeexecutable
         )
-        self.assertEqual(serialized_data1['config'], metric1.config)
+        self.assertEqual(serialized_data1['config'], to_text(metric1.config))
         self.assertEqual(
-            serialized_data1['attribute'], self.metrictemplate3.attribute
+            serialized_data1['attribute'],
+            to_text(self.metrictemplate3.attribute)
         )
         self.assertEqual(
-            serialized_data1['dependancy'], self.metrictemplate3.dependency
+            serialized_data1['dependancy'],
+            to_text(self.metrictemplate3.dependency)
         )
-        self.assertEqual(serialized_data1['flags'], self.metrictemplate3.flags)
-        self.assertEqual(serialized_data1['files'], self.metrictemplate3.files)
         self.assertEqual(
-            serialized_data1['parameter'], self.metrictemplate3.parameter
+            serialized_data1['flags'], to_text(self.metrictemplate3.flags)
+        )
+        self.assertEqual(
+            serialized_data1['files'], to_text(self.metrictemplate3.files)
+        )
+        self.assertEqual(
+            serialized_data1['parameter'],
+            to_text(self.metrictemplate3.parameter)
         )
         self.assertEqual(
             serialized_data1['fileparameter'],
-            self.metrictemplate3.fileparameter
+            to_text(self.metrictemplate3.fileparameter)
         )
         self.assertEqual(history2.count(), 1)
         self.assertEqual(metric2.name, self.metrictemplate6.name)
@@ -2307,21 +2328,28 @@ class ImportMetricsTests(TransactionTestCase):
             serialized_data2['probeexecutable'],
             self.metrictemplate6.probeexecutable
         )
-        self.assertEqual(serialized_data2['config'], metric2.config)
+        self.assertEqual(serialized_data2['config'], to_text(metric2.config))
+        self.assertEqual(
+            serialized_data2['attribute'],
+            to_text(self.metrictemplate6.attribute)
+        )
+        self.assertEqual(
+            serialized_data2['dependancy'],
+            to_text(self.metrictemplate6.dependency)
+        )
         self.assertEqual(
-            serialized_data2['attribute'], self.metrictemplate6.attribute
+            serialized_data2['flags'], to_text(self.metrictemplate6.flags)
         )
         self.assertEqual(
-            serialized_data2['dependancy'], self.metrictemplate6.dependency
+            serialized_data2['files'], to_text(self.metrictemplate6.files)
         )
-        self.assertEqual(serialized_data2['flags'], self.metrictemplate6.flags)
-        self.assertEqual(serialized_data2['files'], self.metrictemplate6.files)
         self.assertEqual(
-            serialized_data2['parameter'], self.metrictemplate6.parameter
+            serialized_data2['parameter'],
+            to_text(self.metrictemplate6.parameter)
         )
         self.assertEqual(
             serialized_data2['fileparameter'],
-            self.metrictemplate6.fileparameter
+            to_text(self.metrictemplate6.fileparameter)
         )
 
     def test_import_passive_metric_successfully(self):
@@ -2360,21 +2388,28 @@ class ImportMetricsTests(TransactionTestCase):
             serialized_data1['probeexecutable'],
             self.metrictemplate7.probeexecutable
         )
-        self.assertEqual(serialized_data1['config'], metric1.config)
+        self.assertEqual(serialized_data1['config'], to_text(metric1.config))
+        self.assertEqual(
+            serialized_data1['attribute'],
+            to_text(self.metrictemplate7.attribute)
+        )
         self.assertEqual(
-            serialized_data1['attribute'], self.metrictemplate7.attribute
+            serialized_data1['dependancy'],
+            to_text(self.metrictemplate7.dependency)
         )
         self.assertEqual(
-            serialized_data1['dependancy'], self.metrictemplate7.dependency
+            serialized_data1['flags'], to_text(self.metrictemplate7.flags)
         )
-        self.assertEqual(serialized_data1['flags'], self.metrictemplate7.flags)
-        self.assertEqual(serialized_data1['files'], self.metrictemplate7.files)
         self.assertEqual(
-            serialized_data1['parameter'], self.metrictemplate7.parameter
+            serialized_data1['files'], to_text(self.metrictemplate7.files)
+        )
+        self.assertEqual(
+            serialized_data1['parameter'],
+            to_text(self.metrictemplate7.parameter)
         )
         self.assertEqual(
             serialized_data1['fileparameter'],
-            self.metrictemplate7.fileparameter
+            to_text(self.metrictemplate7.fileparameter)
         )
 
     def test_import_active_metric_with_warning(self):
@@ -2421,20 +2456,26 @@ class ImportMetricsTests(TransactionTestCase):
             serialized_data1['probeexecutable'],
             self.mt8_history2.probeexecutable
         )
-        self.assertEqual(serialized_data1['config'], metric1.config)
+        self.assertEqual(serialized_data1['config'], to_text(metric1.config))
+        self.assertEqual(
+            serialized_data1['attribute'], to_text(self.mt8_history2.attribute)
+        )
         self.assertEqual(
-            serialized_data1['attribute'], self.mt8_history2.attribute
+            serialized_data1['dependancy'],
+            to_text(self.mt8_history2.dependency)
         )
         self.assertEqual(
-            serialized_data1['dependancy'], self.mt8_history2.dependency
+            serialized_data1['flags'], to_text(self.mt8_history2.flags)
         )
-        self.assertEqual(serialized_data1['flags'], self.mt8_history2.flags)
-        self.assertEqual(serialized_data1['files'], self.mt8_history2.files)
         self.assertEqual(
-            serialized_data1['parameter'], self.mt8_history2.parameter
+            serialized_data1['files'], to_text(self.mt8_history2.files)
         )
         self.assertEqual(
-            serialized_data1['fileparameter'], self.mt8_history2.fileparameter
+            serialized_data1['parameter'], to_text(self.mt8_history2.parameter)
+        )
+        self.assertEqual(
+            serialized_data1['fileparameter'],
+            to_text(self.mt8_history2.fileparameter)
         )
 
     def test_import_active_metric_if_package_already_exists_with_diff_version(
@@ -2482,21 +2523,28 @@ class ImportMetricsTests(TransactionTestCase):
             serialized_data1['probeexecutable'],
             self.metrictemplate10.probeexecutable
         )
-        self.assertEqual(serialized_data1['config'], metric1.config)
+        self.assertEqual(serialized_data1['config'], to_text(metric1.config))
+        self.assertEqual(
+            serialized_data1['attribute'],
+            to_text(self.metrictemplate10.attribute)
+        )
+        self.assertEqual(
+            serialized_data1['dependancy'],
+            to_text(self.metrictemplate10.dependency)
+        )
         self.assertEqual(
-            serialized_data1['attribute'], self.metrictemplate10.attribute
+            serialized_data1['flags'], to_text(self.metrictemplate10.flags)
         )
         self.assertEqual(
-            serialized_data1['dependancy'], self.metrictemplate10.dependency
+            serialized_data1['files'], to_text(self.metrictemplate10.files)
         )
-        self.assertEqual(serialized_data1['flags'], self.metrictemplate10.flags)
-        self.assertEqual(serialized_data1['files'], self.metrictemplate10.files)
         self.assertEqual(
-            serialized_data1['parameter'], self.metrictemplate10.parameter
+            serialized_data1['parameter'],
+            to_text(self.metrictemplate10.parameter)
         )
         self.assertEqual(
             serialized_data1['fileparameter'],
-            self.metrictemplate10.fileparameter
+            to_text(self.metrictemplate10.fileparameter)
         )
         poem_models.Metric.objects.get(name='argo.AMS-Check')
         poem_models.Metric.objects.get(name='org.nagios.CertLifetime')
@@ -2552,20 +2600,26 @@ class ImportMetricsTests(TransactionTestCase):
             serialized_data1['probeexecutable'],
             self.mt1_history2.probeexecutable
         )
-        self.assertEqual(serialized_data1['config'], metric1.config)
+        self.assertEqual(serialized_data1['config'], to_text(metric1.config))
         self.assertEqual(
-            serialized_data1['attribute'], self.mt1_history2.attribute
+            serialized_data1['attribute'], to_text(self.mt1_history2.attribute)
         )
         self.assertEqual(
-            serialized_data1['dependancy'], self.mt1_history2.dependency
+            serialized_data1['dependancy'],
+            to_text(self.mt1_history2.dependency)
         )
-        self.assertEqual(serialized_data1['flags'], self.mt1_history2.flags)
-        self.assertEqual(serialized_data1['files'], self.mt1_history2.files)
         self.assertEqual(
-            serialized_data1['parameter'], self.mt1_history2.parameter
+            serialized_data1['flags'], to_text(self.mt1_history2.flags)
         )
         self.assertEqual(
-            serialized_data1['fileparameter'], self.mt1_history2.fileparameter
+            serialized_data1['files'], to_text(self.mt1_history2.files)
+        )
+        self.assertEqual(
+            serialized_data1['parameter'], to_text(self.mt1_history2.parameter)
+        )
+        self.assertEqual(
+            serialized_data1['fileparameter'],
+            to_text(self.mt1_history2.fileparameter)
         )
         metric2 = poem_models.Metric.objects.get(name='org.nagios.CertLifetime')
         history2 = poem_models.TenantHistory.objects.filter(
@@ -2597,21 +2651,28 @@ class ImportMetricsTests(TransactionTestCase):
             serialized_data2['probeexecutable'],
             self.metrictemplate2.probeexecutable
         )
-        self.assertEqual(serialized_data2['config'], metric2.config)
+        self.assertEqual(serialized_data2['config'], to_text(metric2.config))
+        self.assertEqual(
+            serialized_data2['attribute'],
+            to_text(self.metrictemplate2.attribute)
+        )
+        self.assertEqual(
+            serialized_data2['dependancy'],
+            to_text(self.metrictemplate2.dependency)
+        )
         self.assertEqual(
-            serialized_data2['attribute'], self.metrictemplate2.attribute
+            serialized_data2['flags'], to_text(self.metrictemplate2.flags)
         )
         self.assertEqual(
-            serialized_data2['dependancy'], self.metrictemplate2.dependency
+            serialized_data2['files'], to_text(self.metrictemplate2.files)
         )
-        self.assertEqual(serialized_data2['flags'], self.metrictemplate2.flags)
-        self.assertEqual(serialized_data2['files'], self.metrictemplate2.files)
         self.assertEqual(
-            serialized_data2['parameter'], self.metrictemplate2.parameter
+            serialized_data2['parameter'],
+            to_text(self.metrictemplate2.parameter)
         )
         self.assertEqual(
             serialized_data2['fileparameter'],
-            self.metrictemplate2.fileparameter
+            to_text(self.metrictemplate2.fileparameter)
         )
 
     def test_import_metric_older_version_than_tenants_package(self):
@@ -2651,6 +2712,48 @@ class ImportMetricsTests(TransactionTestCase):
             name="argo.nonexisting.metric"
         )
 
+    def test_import_metrics_in_constant_number_of_queries(self):
+        import_metrics(['argo.AMSPublisher-Check'], self.tenant, self.user)
+
+        with CaptureQueriesContext(connection) as context1:
+            success1, _, _, _ = import_metrics(
+                ['eu.egi.cloud.OpenStack-VM'], self.tenant, self.user
+            )
+
+        with CaptureQueriesContext(connection) as context2:
+            success2, _, _, _ = import_metrics(
+                ['org.nagios.CertLifetime2', 'eu.egi.sec.ARC-CE-result'],
+                self.tenant, self.user
+            )
+
+        self.assertEqual(success1, ['eu.egi.cloud.OpenStack-VM'])
+        self.assertEqual(
+            success2, ['org.nagios.CertLifetime2', 'eu.egi.sec.ARC-CE-result']
+        )
+        self.assertEqual(
+            len(context1.captured_queries), len(context2.captured_queries)
+        )
+        self.assertEqual(poem_models.Metric.objects.all().count(), 10)
+        names = [
+            'argo.AMSPublisher-Check', 'eu.egi.cloud.OpenStack-VM',
+            'org.nagios.CertLifetime2', 'eu.egi.sec.ARC-CE-result'
+        ]
+        for name in names:
+            metric = poem_models.Metric.objects.get(name=name)
+            history = poem_models.TenantHistory.objects.get(
+                object_id=metric.id
+            )
+            self.assertEqual(history.comment, 'Initial version.')
+            self.assertEqual(history.user, 'testuser')
+            self.assertEqual(
+                json.loads(history.serialized_data)[0]['fields']['name'], name
+            )
+        self.assertEqual(
+            admin_models.TenantMetricUsage.objects.filter(
+                schema_name=self.tenant.schema_name, name__in=names
+            ).count(), 4
+        )
+
 
 class UpdateMetricsTests(TenantTestCase):
     def setUp(self):
@@ -2734,7 +2837,10 @@ class UpdateMetricsTests(TenantTestCase):
         )
         mock_update.assert_called_once()
         mock_update.assert_has_calls([
-            call('argo.AMS-Check', 'argo.AMS-Check-new')
+            call(
+                'argo.AMS-Check', 'argo.AMS-Check-new',
+                schemas=[self.tenant.schema_name]
+            )
         ])
         metric = poem_models.Metric.objects.get(name='argo.AMS-Check-new')
         metric_versions = poem_models.TenantHistory.objects.filter(
@@ -2749,9 +2855,11 @@ class UpdateMetricsTests(TenantTestCase):
         self.assertEqual(metric.group.name, 'TEST')
         self.assertEqual(
             metric.config,
-            '["maxCheckAttempts 4", "timeout 60", '
-            '"path /usr/libexec/argo-monitoring/probes/argo", '
-            '"interval 5", "retryInterval 2"]'
+            [
+                ['maxCheckAttempts', '4'], ['timeout', '60'],
+                ['path', '/usr/libexec/argo-monitoring/probes/argo'],
+                ['interval', '5'], ['retryInterval', '2']
+            ]
         )
         self.assertEqual(serialized_data['name'], metric.name)
         self.assertEqual(serialized_data['mtype'], [metrictemplate.mtype.name])
@@ -2773,16 +2881,25 @@ class UpdateMetricsTests(TenantTestCase):
         self.assertEqual(
             serialized_data['probeexecutable'], metrictemplate.probeexecutable
         )
-        self.assertEqual(serialized_data['config'], metric.config)
-        self.assertEqual(serialized_data['attribute'], metrictemplate.attribute)
+        self.assertEqual(serialized_data['config'], to_text(metric.config))
+        self.assertEqual(
+            serialized_data['attribute'], to_text(metrictemplate.attribute)
+        )
+        self.assertEqual(
+            serialized_data['dependancy'], to_text(metrictemplate.dependency)
+        )
+        self.assertEqual(
+            serialized_data['flags'], to_text(metrictemplate.flags)
+        )
         self.assertEqual(
-            serialized_data['dependancy'], metrictemplate.dependency
+            serialized_data['files'], to_text(metrictemplate.files)
         )
-        self.assertEqual(serialized_data['flags'], metrictemplate.flags)
-        self.assertEqual(serialized_data['files'], metrictemplate.files)
-        self.assertEqual(serialized_data['parameter'], metrictemplate.parameter)
         self.assertEqual(
-            serialized_data['fileparameter'], metrictemplate.fileparameter
+            serialized_data['parameter'], to_text(metrictemplate.parameter)
+        )
+        self.assertEqual(
+            serialized_data['fileparameter'],
+            to_text(metrictemplate.fileparameter)
         )
         with schema_context('test2'):
             metric1 = poem_models.Metric.objects.get(name='argo.AMS-Check')
@@ -2799,9 +2916,11 @@ class UpdateMetricsTests(TenantTestCase):
             self.assertEqual(metric1.group.name, 'TEST2')
             self.assertEqual(
                 metric1.config,
-                '["maxCheckAttempts 4", "timeout 60",'
-                ' "path /usr/libexec/argo-monitoring/probes/argo",'
-                ' "interval 5", "retryInterval 2"]'
+                [
+                    ['maxCheckAttempts', '4'], ['timeout', '60'],
+                    ['path', '/usr/libexec/argo-monitoring/probes/argo'],
+                    ['interval', '5'], ['retryInterval', '2']
+                ]
             )
             self.assertEqual(serialized_data1['name'], metric1.name)
             self.assertEqual(serialized_data1['mtype'], ["Active"])
@@ -2825,7 +2944,9 @@ class UpdateMetricsTests(TenantTestCase):
             self.assertEqual(
                 serialized_data1['probeexecutable'], '["ams-probe"]'
             )
-            self.assertEqual(serialized_data1['config'], metric1.config)
+            self.assertEqual(
+                serialized_data1['config'], to_text(metric1.config)
+            )
             self.assertEqual(
                 serialized_data1['attribute'], '["argo.ams_TOKEN --token"]'
             )
@@ -2882,7 +3003,9 @@ class UpdateMetricsTests(TenantTestCase):
         )
         mock_update.assert_called_once()
         mock_update.assert_has_calls([
-            call('org.apel.APEL-Pub', 'org.apel.APEL-Pub-new')
+            call(
+                'org.apel.APEL-Pub', 'org.apel.APEL-Pub-new', schemas=['test']
+            )
         ])
         metric = poem_models.Metric.objects.get(name='org.apel.APEL-Pub-new')
         metric_versions = poem_models.TenantHistory.objects.filter(
@@ -2895,7 +3018,7 @@ class UpdateMetricsTests(TenantTestCase):
         self.assertEqual(metric.name, metrictemplate.name)
         self.assertEqual(metric.probeversion, metrictemplate.probekey)
         self.assertEqual(metric.group.name, 'TEST')
-        self.assertEqual(metric.config, '')
+        self.assertEqual(metric.config, [])
         self.assertEqual(serialized_data['name'], metric.name)
         self.assertEqual(serialized_data['mtype'], [metrictemplate.mtype.name])
         self.assertEqual(serialized_data['tags'], [['test_tag1']])
@@ -2908,16 +3031,25 @@ class UpdateMetricsTests(TenantTestCase):
         self.assertEqual(
             serialized_data['probeexecutable'], metrictemplate.probeexecutable
         )
-        self.assertEqual(serialized_data['config'], metric.config)
-        self.assertEqual(serialized_data['attribute'], metrictemplate.attribute)
+        self.assertEqual(serialized_data['config'], to_text(metric.config))
+        self.assertEqual(
+            serialized_data['attribute'], to_text(metrictemplate.attribute)
+        )
+        self.assertEqual(
+            serialized_data['dependancy'], to_text(metrictemplate.dependency)
+        )
+        self.assertEqual(
+            serialized_data['flags'], to_text(metrictemplate.flags)
+        )
         self.assertEqual(
-            serialized_data['dependancy'], metrictemplate.dependency
+            serialized_data['files'], to_text(metrictemplate.files)
         )
-        self.assertEqual(serialized_data['flags'], metrictemplate.flags)
-        self.assertEqual(serialized_data['files'], metrictemplate.files)
-        self.assertEqual(serialized_data['parameter'], metrictemplate.parameter)
         self.assertEqual(
-            serialized_data['fileparameter'], metrictemplate.fileparameter
+            serialized_data['parameter'], to_text(metrictemplate.parameter)
+        )
+        self.assertEqual(
+            serialized_data['fileparameter'],
+            to_text(metrictemplate.fileparameter)
         )
         with schema_context('test2'):
             metric1 = poem_models.Metric.objects.get(
@@ -2939,7 +3071,9 @@ class UpdateMetricsTests(TenantTestCase):
             self.assertEqual(serialized_data1['group'], ['TEST2'])
             self.assertEqual(serialized_data1['parent'], "")
             self.assertEqual(serialized_data1['probeexecutable'], "")
-            self.assertEqual(serialized_data1['config'], metric1.config)
+            self.assertEqual(
+                serialized_data1['config'], to_text(metric1.config)
+            )
             self.assertEqual(serialized_data1['attribute'], "")
             self.assertEqual(serialized_data1['dependancy'], "")
             self.assertEqual(
@@ -2949,6 +3083,52 @@ class UpdateMetricsTests(TenantTestCase):
             self.assertEqual(serialized_data1['parameter'], "")
             self.assertEqual(serialized_data1['fileparameter'], "")
 
+    @patch('Poem.helpers.metrics_helpers.update_metrics_in_profiles')
+    def test_update_metric_in_schema_renames_in_profiles_after_job_step(
+            self, mock_update
+    ):
+        def rename_in_profiles(*args, **kwargs):
+            # step is saved as done before WEB-API is called
+            self.assertEqual(
+                admin_models.JobStep.objects.get().status,
+                admin_models.JobStep.DONE
+            )
+            return ['Metric not renamed in profiles']
+
+        mock_update.side_effect = rename_in_profiles
+        register_job(
+            'test_update_metric',
+            lambda schema, **params: update_metric_in_schema(
+                schema=schema, **params
+            ),
+            lambda **params: [self.tenant.schema_name]
+        )
+        metrictemplate = admin_models.MetricTemplate.objects.get(
+            name='argo.AMS-Check'
+        )
+        metrictemplate.name = 'argo.AMS-Check-new'
+        metrictemplate.save()
+        job = enqueue_job(
+            'test_update_metric', dict(
+                mt_id=metrictemplate.id, name='argo.AMS-Check',
+                pk_id=self.probeversion1_2.id
+            )
+        )
+        self.assertEqual(run_worker(once=True), 1)
+        mock_update.assert_called_once_with(
+            'argo.AMS-Check', 'argo.AMS-Check-new',
+            schemas=[self.tenant.schema_name]
+        )
+        self.assertTrue(
+            poem_models.Metric.objects.filter(
+                name='argo.AMS-Check-new'
+            ).exists()
+        )
+        self.assertEqual(
+            admin_models.JobStep.objects.get(job=job).result,
+            ['Metric not renamed in profiles']
+        )
+
     @patch('Poem.helpers.metrics_helpers.update_metrics_in_profiles')
     def test_update_active_metrics_from_metrictemplatehistory_instance(
             self, mock_update
@@ -2986,7 +3166,10 @@ class UpdateMetricsTests(TenantTestCase):
         )
         mock_update.assert_called_once()
         mock_update.assert_has_calls([
-            call('argo.AMS-Check', 'argo.AMS-Check-new')
+            call(
+                'argo.AMS-Check', 'argo.AMS-Check-new',
+                schemas=[self.tenant.schema_name]
+            )
         ])
         metric = poem_models.Metric.objects.get(name='argo.AMS-Check-new')
         metric_versions = poem_models.TenantHistory.objects.filter(
@@ -2999,7 +3182,7 @@ class UpdateMetricsTests(TenantTestCase):
         self.assertEqual(metric.name, metrictemplate.name)
         self.assertEqual(metric.probeversion, metrictemplate.probekey.__str__())
         self.assertEqual(metric.group.name, 'TEST')
-        self.assertEqual(metric.config, metrictemplate.config)
+        self.assertEqual(metric.config, to_pairs(metrictemplate.config))
         self.assertEqual(serialized_data['name'], metrictemplate.name)
         self.assertEqual(serialized_data['mtype'], [metrictemplate.mtype.name])
         self.assertEqual(
@@ -3020,16 +3203,25 @@ class UpdateMetricsTests(TenantTestCase):
         self.assertEqual(
             serialized_data['probeexecutable'], metrictemplate.probeexecutable
         )
-        self.assertEqual(serialized_data['config'], metric.config)
-        self.assertEqual(serialized_data['attribute'], metrictemplate.attribute)
+        self.assertEqual(serialized_data['config'], to_text(metric.config))
+        self.assertEqual(
+            serialized_data['attribute'], to_text(metrictemplate.attribute)
+        )
+        self.assertEqual(
+            serialized_data['dependancy'], to_text(metrictemplate.dependency)
+        )
+        self.assertEqual(
+            serialized_data['flags'], to_text(metrictemplate.flags)
+        )
         self.assertEqual(
-            serialized_data['dependancy'], metrictemplate.dependency
+            serialized_data['files'], to_text(metrictemplate.files)
         )
-        self.assertEqual(serialized_data['flags'], metrictemplate.flags)
-        self.assertEqual(serialized_data['files'], metrictemplate.files)
-        self.assertEqual(serialized_data['parameter'], metrictemplate.parameter)
         self.assertEqual(
-            serialized_data['fileparameter'], metrictemplate.fileparameter
+            serialized_data['parameter'], to_text(metrictemplate.parameter)
+        )
+        self.assertEqual(
+            serialized_data['fileparameter'],
+            to_text(metrictemplate.fileparameter)
         )
         with schema_context('test2'):
             metric1 = poem_models.Metric.objects.get(name='argo.AMS-Check')
@@ -3044,7 +3236,7 @@ class UpdateMetricsTests(TenantTestCase):
                 metric1.probeversion, metrictemplate.probekey.__str__()
             )
             self.assertEqual(metric1.group.name, 'TEST2')
-            self.assertEqual(metric.config, metrictemplate.config)
+            self.assertEqual(metric.config, to_pairs(metrictemplate.config))
             self.assertEqual(serialized_data1['name'], metric1.name)
             self.assertEqual(serialized_data1['mtype'], ["Active"])
             self.assertEqual(
@@ -3067,7 +3259,9 @@ class UpdateMetricsTests(TenantTestCase):
             self.assertEqual(
                 serialized_data1['probeexecutable'], '["ams-probe"]'
             )
-            self.assertEqual(serialized_data1['config'], metric1.config)
+            self.assertEqual(
+                serialized_data1['config'], to_text(metric1.config)
+            )
             self.assertEqual(
                 serialized_data1['attribute'], '["argo.ams_TOKEN --token"]'
             )
@@ -3139,9 +3333,11 @@ class UpdateMetricsTests(TenantTestCase):
         self.assertEqual(metric.group.name, 'TEST')
         self.assertEqual(
             metric.config,
-            '["maxCheckAttempts 4", "timeout 60", '
-            '"path /usr/libexec/argo-monitoring/probes/argo", '
-            '"interval 5", "retryInterval 2"]'
+            [
+                ['maxCheckAttempts', '4'], ['timeout', '60'],
+                ['path', '/usr/libexec/argo-monitoring/probes/argo'],
+                ['interval', '5'], ['retryInterval', '2']
+            ]
         )
         self.assertEqual(serialized_data['name'], metric.name)
         self.assertEqual(serialized_data['mtype'], [metrictemplate.mtype.name])
@@ -3163,16 +3359,25 @@ class UpdateMetricsTests(TenantTestCase):
         self.assertEqual(
             serialized_data['probeexecutable'], metrictemplate.probeexecutable
         )
-        self.assertEqual(serialized_data['config'], metric.config)
-        self.assertEqual(serialized_data['attribute'], metrictemplate.attribute)
+        self.assertEqual(serialized_data['config'], to_text(metric.config))
         self.assertEqual(
-            serialized_data['dependancy'], metrictemplate.dependency
+            serialized_data['attribute'], to_text(metrictemplate.attribute)
         )
-        self.assertEqual(serialized_data['flags'], metrictemplate.flags)
-        self.assertEqual(serialized_data['files'], metrictemplate.files)
-        self.assertEqual(serialized_data['parameter'], metrictemplate.parameter)
         self.assertEqual(
-            serialized_data['fileparameter'], metrictemplate.fileparameter
+            serialized_data['dependancy'], to_text(metrictemplate.dependency)
+        )
+        self.assertEqual(
+            serialized_data['flags'], to_text(metrictemplate.flags)
+        )
+        self.assertEqual(
+            serialized_data['files'], to_text(metrictemplate.files)
+        )
+        self.assertEqual(
+            serialized_data['parameter'], to_text(metrictemplate.parameter)
+        )
+        self.assertEqual(
+            serialized_data['fileparameter'],
+            to_text(metrictemplate.fileparameter)
         )
         self.assertFalse(mock_update.called)
         with schema_context('test2'):
@@ -3190,9 +3395,11 @@ class UpdateMetricsTests(TenantTestCase):
             self.assertEqual(metric1.group.name, 'TEST2')
             self.assertEqual(
                 metric1.config,
-                '["maxCheckAttempts 4", "timeout 60", '
-                '"path /usr/libexec/argo-monitoring/probes/argo", '
-                '"interval 5", "retryInterval 2"]'
+                [
+                    ['maxCheckAttempts', '4'], ['timeout', '60'],
+                    ['path', '/usr/libexec/argo-monitoring/probes/argo'],
+                    ['interval', '5'], ['retryInterval', '2']
+                ]
             )
             self.assertEqual(serialized_data1['name'], metric1.name)
             self.assertEqual(serialized_data1['mtype'], ["Active"])
@@ -3216,7 +3423,9 @@ class UpdateMetricsTests(TenantTestCase):
             self.assertEqual(
                 serialized_data1['probeexecutable'], '["ams-probe"]'
             )
-            self.assertEqual(serialized_data1['config'], metric1.config)
+            self.assertEqual(
+                serialized_data1['config'], to_text(metric1.config)
+            )
             self.assertEqual(
                 serialized_data1['attribute'], '["argo.ams_TOKEN --token"]'
             )
@@ -3227,26 +3436,27 @@ class UpdateMetricsTests(TenantTestCase):
             self.assertEqual(serialized_data1['fileparameter'], "")
             self.assertFalse(mock_update.called)
 
-    @patch('Poem.helpers.metrics_helpers.update_metric_in_schema')
+    @patch('Poem.helpers.metrics_helpers.update_metric')
     def test_update_all_metrics_on_metrictemplate_change(self, mock_update):
         mock_update.side_effect = mocked_func
         metrictemplate = admin_models.MetricTemplate.objects.get(
             name='argo.AMS-Check'
         )
+        tags = [tag for tag in metrictemplate.tags.all()]
         update_metrics(metrictemplate, 'argo.AMS-Check', self.probeversion1_2)
         self.assertEqual(mock_update.call_count, 2)
         mock_update.assert_has_calls([
             call(
-                mt_id=metrictemplate.id, name='argo.AMS-Check',
-                pk_id=self.probeversion1_2.id, schema='test', user=''
+                metrictemplate, 'argo.AMS-Check', self.probeversion1_2, tags,
+                user=''
             ),
             call(
-                mt_id=metrictemplate.id, name='argo.AMS-Check',
-                pk_id=self.probeversion1_2.id, schema='test2', user=''
+                metrictemplate, 'argo.AMS-Check', self.probeversion1_2, tags,
+                user=''
             )
         ], any_order=True)
 
-    @patch("Poem.helpers.metrics_helpers.update_metric_in_schema")
+    @patch("Poem.helpers.metrics_helpers.update_metric")
     def test_update_all_passive_metrics_on_metrictemplate_change(
             self, mock_update
     ):
@@ -3254,19 +3464,590 @@ class UpdateMetricsTests(TenantTestCase):
         metrictemplate = admin_models.MetricTemplate.objects.get(
             name="org.apel.APEL-Pub"
         )
+        tags = [tag for tag in metrictemplate.tags.all()]
         update_metrics(metrictemplate, "org.apel.APEL-Pub", None)
         self.assertEqual(mock_update.call_count, 2)
         mock_update.assert_has_calls([
             call(
-                mt_id=metrictemplate.id, name="org.apel.APEL-Pub",
-                pk_id=None, schema="test", user=""
+                metrictemplate, "org.apel.APEL-Pub", None, tags, user=""
             ),
             call(
-                mt_id=metrictemplate.id, name="org.apel.APEL-Pub",
-                pk_id=None, schema="test2", user=""
+                metrictemplate, "org.apel.APEL-Pub", None, tags, user=""
             )
         ], any_order=True)
 
+    @patch('Poem.helpers.metrics_helpers.update_metric')
+    def test_update_metrics_collects_errors_from_schemas(self, mock_update):
+        def update_in_schema(*args, **kwargs):
+            if connection.schema_name == 'test2':
+                raise ValueError('Something went wrong')
+
+            return None
+
+        mock_update.side_effect = update_in_schema
+        metrictemplate = admin_models.MetricTemplate.objects.get(
+            name='argo.AMS-Check'
+        )
+        msgs = update_metrics(
+            metrictemplate, 'argo.AMS-Check', self.probeversion1_2
+        )
+        self.assertEqual(mock_update.call_count, 2)
+        self.assertEqual(
+            msgs, [
+                'Error updating metric argo.AMS-Check in schema test2: '
+                'Something went wrong'
+            ]
+        )
+
+
+class FanOutTests(TenantTestCase):
+    def setUp(self):
+        self.tenant.name = 'TEST'
+        self.tenant.save()
+        mock_db(self.tenant, tenant2=True)
+
+    def test_tenant_schemas(self):
+        self.assertEqual(tenant_schemas(), ['test', 'test2'])
+
+    def test_fan_out(self):
+        def rename(name):
+            metric = poem_models.Metric.objects.get(name='argo.AMS-Check')
+            metric.name = name
+            metric.save()
+
+            return connection.schema_name
+
+        result = fan_out(rename, 'argo.AMS-Check-new')
+        self.assertTrue(result)
+        self.assertEqual(result.results, {'test': 'test', 'test2': 'test2'})
+        self.assertEqual(result.errors, {})
+        for schema in ['test', 'test2']:
+            with schema_context(schema):
+                self.assertTrue(
+                    poem_models.Metric.objects.filter(
+                        name='argo.AMS-Check-new'
+                    ).exists()
+                )
+
+    def test_fan_out_error_in_one_schema(self):
+        def rename(name):
+            metric = poem_models.Metric.objects.get(name='argo.AMS-Check')
+            metric.name = name
+            metric.save()
+            if connection.schema_name == 'test2':
+                raise ValueError('Something went wrong')
+
+            return connection.schema_name
+
+        result = fan_out(rename, 'argo.AMS-Check-new')
+        self.assertFalse(result)
+        self.assertEqual(result.results, {'test': 'test'})
+        self.assertEqual(list(result.errors), ['test2'])
+        self.assertEqual(str(result.errors['test2']), 'Something went wrong')
+        with schema_context('test'):
+            self.assertTrue(
+                poem_models.Metric.objects.filter(
+                    name='argo.AMS-Check-new'
+                ).exists()
+            )
+        with schema_context('test2'):
+            self.assertTrue(
+                poem_models.Metric.objects.filter(
+                    name='argo.AMS-Check'
+                ).exists()
+            )
+            self.assertFalse(
+                poem_models.Metric.objects.filter(
+                    name='argo.AMS-Check-new'
+                ).exists()
+            )
+
+    def test_fan_out_errors_logged_the_same_way_on_any_connection(self):
+        def fail():
+            raise ValueError(f'Failed in {connection.schema_name}')
+
+        with self.assertLogs('POEM', level='ERROR') as sequential:
+            fan_out(fail, schemas=['test', 'test2'], workers=1)
+
+        with patch.object(connection, 'in_atomic_block', False):
+            with self.assertLogs('POEM', level='ERROR') as concurrent:
+                fan_out(fail, schemas=['test', 'test2'], workers=2)
+
+        for logs in [sequential, concurrent]:
+            self.assertEqual(
+                [record.getMessage() for record in logs.records], [
+                    'Error running fail in schema test: Failed in test',
+                    'Error running fail in schema test2: Failed in test2'
+                ]
+            )
+            for record in logs.records:
+                self.assertIsInstance(record.exc_info[1], ValueError)
+
+    def test_fan_out_given_schemas(self):
+        result = fan_out(
+            lambda: connection.schema_name, schemas=['test2'], workers=4
+        )
+        self.assertEqual(result.results, {'test2': 'test2'})
+
+    def test_fan_out_on_multiple_connections(self):
+        def schema_and_thread():
+            return connection.schema_name, threading.current_thread().name
+
+        # outside of atomic block schemas are handled by the worker threads
+        with patch.object(connection, 'in_atomic_block', False):
+            result = fan_out(
+                schema_and_thread, schemas=['test', 'test2'], workers=2
+            )
+
+        self.assertEqual(sorted(result.results), ['test', 'test2'])
+        for schema, (schema_name, thread) in result.results.items():
+            self.assertEqual(schema_name, schema)
+            self.assertTrue(thread.startswith('poem-fanout'))
+
+
+class TenantMetricUsageTests(TenantTestCase):
+    def setUp(self):
+        self.tenant.name = 'TEST'
+        self.tenant.save()
+        mock_db(self.tenant, tenant2=True)
+
+        probeversion1 = admin_models.ProbeHistory.objects.filter(
+            name='ams-probe'
+        )
+        self.probeversion1_2 = probeversion1[1]
+        self.probeversion1_3 = probeversion1[0]
+
+    def test_metric_write_paths_kept_in_index(self):
+        usage = admin_models.TenantMetricUsage.objects
+        self.assertEqual(
+            usage.schemas_using_metrics(['argo.AMS-Check']), ['test', 'test2']
+        )
+        self.assertEqual(
+            usage.schemas_using_metrics(['argo.poem-tools.check']), ['test']
+        )
+        self.assertEqual(
+            usage.schemas_using_probekeys([self.probeversion1_2]),
+            ['test', 'test2']
+        )
+        self.assertEqual(
+            usage.get(
+                schema_name='test2', name='argo.AMS-Check'
+            ).probekey, self.probeversion1_2
+        )
+
+        metric = poem_models.Metric.objects.get(name='argo.AMS-Check')
+        metric.name = 'argo.AMS-Check-new'
+        metric.probeversion = self.probeversion1_3.__str__()
+        metric.save()
+        self.assertEqual(
+            usage.schemas_using_metrics(['argo.AMS-Check']), ['test2']
+        )
+        self.assertEqual(
+            usage.schemas_using_metrics(['argo.AMS-Check-new']), ['test']
+        )
+        self.assertEqual(
+            usage.schemas_using_probekeys([self.probeversion1_3]), ['test']
+        )
+
+        metric.delete()
+        self.assertEqual(
+            usage.schemas_using_metrics(['argo.AMS-Check-new']), []
+        )
+
+        with schema_context('test2'):
+            poem_models.Metric.objects.get(name='argo.AMS-Check').delete()
+
+        self.assertEqual(usage.schemas_using_metrics(['argo.AMS-Check']), [])
+        self.assertEqual(
+            usage.schemas_using_probekeys([self.probeversion1_2]), []
+        )
+
+    def test_tenant_stats_kept_current(self):
+        def count():
+            with schema_context('test2'):
+                return (
+                    poem_models.Metric.objects.count(),
+                    len(set(
+                        poem_models.Metric.objects.exclude(
+                            probeversion=None
+                        ).values_list('probeversion', flat=True)
+                    ))
+                )
+
+        stats = admin_models.TenantStats.objects
+        stat = stats.get(schema_name='test2')
+        self.assertEqual((stat.metrics, stat.probes), count())
+
+        with schema_context('test2'):
+            poem_models.Metric.objects.get(name='argo.AMS-Check').delete()
+
+        stat2 = stats.get(schema_name='test2')
+        self.assertEqual((stat2.metrics, stat2.probes), count())
+        self.assertEqual(stat2.metrics, stat.metrics - 1)
+        self.assertGreater(stat2.last_change, stat.last_change)
+
+        with schema_context('test2'):
+            metric = poem_models.Metric.objects.exclude(
+                probekey=None
+            ).first()
+            metric.probekey = admin_models.ProbeHistory.objects.exclude(
+                id__in=poem_models.Metric.objects.exclude(
+                    probekey=None
+                ).values('probekey')
+            ).first()
+            with CaptureQueriesContext(connection) as context:
+                metric.save()
+
+        stat3 = stats.get(schema_name='test2')
+        self.assertEqual((stat3.metrics, stat3.probes), count())
+        self.assertGreater(stat3.last_change, stat2.last_change)
+        self.assertFalse(
+            [
+                query for query in context.captured_queries
+                if 'COUNT(DISTINCT' in query['sql']
+            ]
+        )
+
+    def test_rebuild_metric_usage(self):
+        usage = admin_models.TenantMetricUsage.objects
+        entries = sorted(usage.values_list(
+            'schema_name', 'metric_id', 'name', 'probekey'
+        ))
+        usage.all().delete()
+        usage.create(schema_name='removed', metric_id=1, name='argo.AMS-Check')
+
+        call_command('poem_rebuild_metric_usage', stdout=io.StringIO())
+
+        self.assertEqual(
+            sorted(usage.values_list(
+                'schema_name', 'metric_id', 'name', 'probekey'
+            )), entries
+        )
+        self.assertEqual(
+            usage.filter(schema_name='test').count(),
+            poem_models.Metric.objects.count()
+        )
+
+    def test_rebuild_metric_usage_for_given_schema(self):
+        usage = admin_models.TenantMetricUsage.objects
+        usage.all().delete()
+
+        call_command(
+            'poem_rebuild_metric_usage', schema=['test2'],
+            stdout=io.StringIO()
+        )
+
+        self.assertEqual(usage.filter(schema_name='test').count(), 0)
+        with schema_context('test2'):
+            self.assertEqual(
+                usage.filter(schema_name='test2').count(),
+                poem_models.Metric.objects.count()
+            )
+
+    @patch('Poem.helpers.metrics_helpers.update_metric')
+    def test_update_metrics_only_in_schemas_using_metric(self, mock_update):
+        metrictemplate = admin_models.MetricTemplate.objects.get(
+            name='argo.poem-tools.check'
+        )
+        schemas = []
+        mock_update.side_effect = \
+            lambda *args, **kwargs: schemas.append(connection.schema_name)
+        update_metrics(metrictemplate, 'argo.poem-tools.check', None)
+        self.assertEqual(schemas, ['test'])
+
+
+class JobQueueTests(TenantTestCase):
+    def setUp(self):
+        self.calls = []
+        self.failing = dict()
+        register_job(
+            'test_job', self._run, self._schemas, finish=self._finish
+        )
+        for name in ['test1', 'test2']:
+            tenant = Tenant(name=name.upper(), schema_name=name)
+            tenant.auto_create_schema = False
+            tenant.save()
+
+    def _schemas(self, schemas, value):
+        return schemas
+
+    def _run(self, schema, schemas, value):
+        self.calls.append((schema, connection.schema_name, value))
+        if self.failing.get(schema):
+            self.failing[schema] -= 1
+            raise ValueError(f'Failed in {schema}')
+
+        return [f'{schema}: {value}']
+
+    def _finish(self, schemas, value):
+        self.calls.append(('finish', connection.schema_name, value))
+        return []
+
+    def test_run_job_in_each_schema(self):
+        job = enqueue_job(
+            'test_job', {'schemas': ['test1', 'test2'], 'value': 'val'},
+            user='poem'
+        )
+        self.assertEqual(job.status, admin_models.Job.QUEUED)
+        self.assertEqual(
+            job_progress(job),
+            {'queued': 3, 'done': 0, 'failed': 0, 'total': 3}
+        )
+        self.assertEqual(run_worker(once=True), 3)
+        self.assertEqual(
+            self.calls, [
+                ('test1', 'test1', 'val'),
+                ('test2', 'test2', 'val'),
+                ('finish', get_public_schema_name(), 'val')
+            ]
+        )
+        job.refresh_from_db()
+        self.assertEqual(job.status, admin_models.Job.DONE)
+        self.assertIsNotNone(job.started)
+        self.assertIsNotNone(job.finished)
+        self.assertEqual(
+            job_progress(job),
+            {'queued': 0, 'done': 3, 'failed': 0, 'total': 3}
+        )
+        self.assertEqual(
+            job.steps.get(schema_name='test1').result, ['test1: val']
+        )
+        self.assertIsNone(run_next_step())
+
+    def test_enqueue_job_with_the_same_key(self):
+        job1 = enqueue_job(
+            'test_job', {'schemas': ['test1'], 'value': 'val'}, key='key'
+        )
+        job2 = enqueue_job(
+            'test_job', {'schemas': ['test1'], 'value': 'val'}, key='key'
+        )
+        self.assertEqual(job1.id, job2.id)
+        self.assertEqual(admin_models.JobStep.objects.count(), 2)
+        run_worker(once=True)
+        job3 = enqueue_job(
+            'test_job', {'schemas': ['test1'], 'value': 'val'}, key='key'
+        )
+        self.assertNotEqual(job1.id, job3.id)
+
+    def test_retry_failed_step(self):
+        self.failing['test2'] = 1
+        with self.settings(JOB_RETRY_DELAY=0, JOB_MAX_ATTEMPTS=3):
+            job = enqueue_job(
+                'test_job', {'schemas': ['test1', 'test2'], 'value': 'val'}
+            )
+            self.assertEqual(run_worker(once=True), 4)
+
+        self.assertEqual(
+            [call[0] for call in self.calls],
+            ['test1', 'test2', 'test2', 'finish']
+        )
+        step = job.steps.get(schema_name='test2')
+        self.assertEqual(step.status, admin_models.JobStep.DONE)
+        self.assertEqual(step.attempts, 2)
+        self.assertEqual(step.error, '')
+        job.refresh_from_db()
+        self.assertEqual(job.status, admin_models.Job.DONE)
+
+    def test_postpone_failed_step(self):
+        self.failing['test1'] = 1
+        with self.settings(JOB_RETRY_DELAY=60, JOB_MAX_ATTEMPTS=3):
+            job = enqueue_job(
+                'test_job', {'schemas': ['test1', 'test2'], 'value': 'val'}
+            )
+            self.assertEqual(run_worker(once=True), 2)
+
+        step = job.steps.get(schema_name='test1')
+        self.assertEqual(step.status, admin_models.JobStep.QUEUED)
+        self.assertEqual(step.attempts, 1)
+        self.assertEqual(step.error, 'Failed in test1')
+        self.assertGreater(step.run_after, job.created)
+        job.refresh_from_db()
+        self.assertEqual(job.status, admin_models.Job.RUNNING)
+
+    def test_failed_step_blocks_later_stages(self):
+        self.failing['test1'] = 2
+        with self.settings(JOB_RETRY_DELAY=0, JOB_MAX_ATTEMPTS=2):
+            job = enqueue_job(
+                'test_job', {'schemas': ['test1', 'test2'], 'value': 'val'}
+            )
+            run_worker(once=True)
+
+        self.assertEqual(
+            [call[0] for call in self.calls], ['test1', 'test1', 'test2']
+        )
+        job.refresh_from_db()
+        self.assertEqual(job.status, admin_models.Job.FAILED)
+        self.assertEqual(
+            job_progress(job),
+            {'queued': 1, 'done': 1, 'failed': 1, 'total': 3}
+        )
+
+        self.assertEqual(admin_models.Job.objects.retry(job.id), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, admin_models.Job.RUNNING)
+        run_worker(once=True)
+        self.assertEqual(
+            [call[0] for call in self.calls],
+            ['test1', 'test1', 'test2', 'test1', 'finish']
+        )
+        job.refresh_from_db()
+        self.assertEqual(job.status, admin_models.Job.DONE)
+
+    def _run_with_call(self, schema, schemas, value):
+        after_step(self._after, schema, value)
+        return [f'{schema}: {value}']
+
+    def _after(self, schema, value):
+        self.calls.append((
+            'after', schema,
+            admin_models.JobStep.objects.get(schema_name=schema).status
+        ))
+        if value == 'fail':
+            raise ValueError(f'Failed after {schema}')
+
+        return [f'after {schema}']
+
+    def test_call_after_step_is_committed(self):
+        register_job('test_call_job', self._run_with_call, self._schemas)
+        job = enqueue_job(
+            'test_call_job', {'schemas': ['test1'], 'value': 'val'}
+        )
+        self.assertEqual(run_worker(once=True), 1)
+        self.assertEqual(self.calls, [('after', 'test1', 'done')])
+        self.assertEqual(
+            job.steps.get().result, ['test1: val', 'after test1']
+        )
+
+    def test_failed_call_after_step_is_reported(self):
+        register_job('test_call_job', self._run_with_call, self._schemas)
+        job = enqueue_job(
+            'test_call_job', {'schemas': ['test1'], 'value': 'fail'}
+        )
+        self.assertEqual(run_worker(once=True), 1)
+        step = job.steps.get()
+        self.assertEqual(step.status, admin_models.JobStep.DONE)
+        self.assertEqual(step.result, ['test1: fail', 'Failed after test1'])
+        job.refresh_from_db()
+        self.assertEqual(job.status, admin_models.Job.DONE)
+
+    def test_call_after_step_outside_of_job(self):
+        self.assertEqual(after_step(lambda value: [value], 'now'), ['now'])
+
+    def test_worker_command(self):
+        enqueue_job('test_job', {'schemas': ['test1'], 'value': 'val'})
+        out = io.StringIO()
+        call_command('poem_worker', '--once', stdout=out)
+        self.assertEqual(out.getvalue(), '2 job steps run\n')
+
+
+class CrossSchemaQueryTests(TenantTestCase):
+    def setUp(self):
+        self.tenant.name = 'TEST'
+        self.tenant.save()
+        mock_db(self.tenant, tenant2=True)
+
+        self.probeversion1_2 = admin_models.ProbeHistory.objects.filter(
+            name='ams-probe'
+        )[1]
+
+    @staticmethod
+    def _metrics_by_looping_schemas(schemas):
+        metrics = dict()
+        for schema in schemas:
+            with schema_context(schema):
+                for name, probeversion in \
+                        poem_models.Metric.objects.values_list(
+                            'name', 'probeversion'
+                        ):
+                    metrics.setdefault((name, probeversion), []).append(
+                        schema
+                    )
+
+        return metrics
+
+    def test_metric_adoption(self):
+        self.assertEqual(
+            list(metric_adoption(['argo.AMS-Check', 'nonexisting'])),
+            [
+                (
+                    'argo.AMS-Check', self.probeversion1_2.__str__(),
+                    ['test', 'test2']
+                )
+            ]
+        )
+        self.assertEqual(
+            list(metric_adoption(['argo.AMS-Check'], schemas=['test2'])),
+            [('argo.AMS-Check', self.probeversion1_2.__str__(), ['test2'])]
+        )
+        self.assertEqual(
+            dict(
+                ((name, probeversion), schemas)
+                for name, probeversion, schemas in metric_adoption()
+            ),
+            self._metrics_by_looping_schemas(['test', 'test2'])
+        )
+
+    def test_probe_adoption(self):
+        expected = dict()
+        for (name, probeversion), schemas in \
+                self._metrics_by_looping_schemas(['test', 'test2']).items():
+            if probeversion and probeversion.startswith('ams-probe ('):
+                nr_metrics, all_schemas = expected.get(
+                    probeversion, (0, set())
+                )
+                expected[probeversion] = (
+                    nr_metrics + len(schemas), all_schemas | set(schemas)
+                )
+
+        result = list(probe_adoption(['ams-probe']))
+        self.assertTrue(result)
+        self.assertEqual(
+            dict(
+                (probeversion, (nr_metrics, set(schemas)))
+                for probeversion, nr_metrics, schemas in result
+            ), expected
+        )
+
+    def test_metric_adoption_across_many_schemas(self):
+        schemas = [f'adoption_{i}' for i in range(100)]
+        with connection.cursor() as cursor:
+            for i, schema in enumerate(schemas):
+                cursor.execute(f'CREATE SCHEMA {schema}')
+                cursor.execute(
+                    f'CREATE TABLE {schema}.poem_metric '
+                    f'(LIKE test.poem_metric INCLUDING ALL)'
+                )
+                cursor.execute(
+                    f'INSERT INTO {schema}.poem_metric '
+                    f'(name, probeversion, config) VALUES '
+                    f"('argo.AMS-Check', 'ams-probe (0.1.{i % 3})', '[]'), "
+                    f"('org.apel.APEL-Pub', NULL, '[]')"
+                )
+
+        with CaptureQueriesContext(connection) as context:
+            start = time.monotonic()
+            result = dict(
+                ((name, probeversion), schemas)
+                for name, probeversion, schemas in metric_adoption(
+                    schemas=schemas
+                )
+            )
+            union_time = time.monotonic() - start
+
+        start = time.monotonic()
+        expected = self._metrics_by_looping_schemas(schemas)
+        loop_time = time.monotonic() - start
+
+        self.assertEqual(result, expected)
+        self.assertEqual(len(result), 4)
+        self.assertEqual(len(result[('org.apel.APEL-Pub', None)]), 100)
+        self.assertEqual(len(context.captured_queries), 1)
+        self.assertLess(union_time, loop_time)
+
+    def test_no_schemas(self):
+        self.assertEqual(list(metric_adoption(schemas=[])), [])
+        self.assertEqual(list(probe_adoption(schemas=[])), [])
+
 
 class MetricsInProfilesTests(TenantTestCase):
     def setUp(self):
@@ -3280,8 +4061,8 @@ class MetricsInProfilesTests(TenantTestCase):
                 domain='public', tenant=tenant, is_primary=True
             )
 
-    @patch('Poem.helpers.metrics_helpers.requests.put')
-    @patch('Poem.helpers.metrics_helpers.requests.get')
+    @patch('Poem.helpers.metrics_helpers.webapi_put')
+    @patch('Poem.helpers.metrics_helpers.webapi_get')
     @patch('Poem.helpers.metrics_helpers.WebAPIKey.objects.get')
     def test_update_metrics_in_profiles(self, mock_key, mock_get, mock_put):
         with self.settings(WEBAPI_METRIC='https://mock.api.url'):
@@ -3294,6 +4075,7 @@ class MetricsInProfilesTests(TenantTestCase):
             mock_put.assert_called_with(
                 'https://mock.api.url/11111111-2222-3333-4444-555555555555',
                 headers={'Accept': 'application/json', 'x-api-key': 'mock_key'},
+                timeout=ANY,
                 data=json.dumps(
                     {
                         "id": "11111111-2222-3333-4444-555555555555",
@@ -3320,7 +4102,7 @@ class MetricsInProfilesTests(TenantTestCase):
             )
             self.assertEqual(msgs, [])
 
-    @patch('Poem.helpers.metrics_helpers.requests.get')
+    @patch('Poem.helpers.metrics_helpers.webapi_get')
     @patch('Poem.helpers.metrics_helpers.WebAPIKey.objects.get')
     def test_update_metrics_in_profiles_wrong_token(self, mock_key, mock_get):
         with self.settings(WEBAPI_METRIC='https://mock.api.url'):
@@ -3349,8 +4131,8 @@ class MetricsInProfilesTests(TenantTestCase):
                 ]
             )
 
-    @patch('Poem.helpers.metrics_helpers.requests.put')
-    @patch('Poem.helpers.metrics_helpers.requests.get')
+    @patch('Poem.helpers.metrics_helpers.webapi_put')
+    @patch('Poem.helpers.metrics_helpers.webapi_get')
     @patch('Poem.helpers.metrics_helpers.WebAPIKey.objects.get')
     def test_update_metrics_in_profiles_if_response_empty(
             self, mock_key, mock_get, mock_put
@@ -3364,8 +4146,8 @@ class MetricsInProfilesTests(TenantTestCase):
             self.assertEqual(msgs, [])
             self.assertFalse(mock_put.called)
 
-    @patch('Poem.helpers.metrics_helpers.requests.put')
-    @patch('Poem.helpers.metrics_helpers.requests.get')
+    @patch('Poem.helpers.metrics_helpers.webapi_put')
+    @patch('Poem.helpers.metrics_helpers.webapi_get')
     @patch('Poem.helpers.metrics_helpers.WebAPIKey.objects.get')
     def test_update_metrics_in_profiles_if_same_name(
             self, mock_key, mock_get, mock_put
@@ -3379,7 +4161,7 @@ class MetricsInProfilesTests(TenantTestCase):
             self.assertEqual(msgs, [])
             self.assertFalse(mock_put.called)
 
-    @patch('Poem.helpers.metrics_helpers.requests.get')
+    @patch('Poem.helpers.metrics_helpers.webapi_get')
     @patch('Poem.helpers.metrics_helpers.WebAPIKey.objects.get')
     def test_get_metrics_in_profiles(self, mock_key, mock_get):
         with self.settings(WEBAPI_METRIC='https://mock.api.url'):
@@ -3391,8 +4173,7 @@ class MetricsInProfilesTests(TenantTestCase):
             mock_get.assert_called_once()
             mock_get.assert_called_with(
                 'https://mock.api.url',
-                headers={'Accept': 'application/json', 'x-api-key': 'mock_key'},
-                timeout=180
+                headers={'Accept': 'application/json', 'x-api-key': 'mock_key'}
             )
             self.assertEqual(
                 metrics,
@@ -3406,7 +4187,7 @@ class MetricsInProfilesTests(TenantTestCase):
                 }
             )
 
-    @patch('Poem.helpers.metrics_helpers.requests.get')
+    @patch('Poem.helpers.metrics_helpers.webapi_get')
     @patch('Poem.helpers.metrics_helpers.WebAPIKey.objects.get')
     def test_get_metrics_in_profiles_wrong_token(self, mock_key, mock_get):
         with self.settings(WEBAPI_METRIC='https://mock.api.url'):
@@ -3429,7 +4210,7 @@ class MetricsInProfilesTests(TenantTestCase):
                 'Error fetching WEB API data: API key not found.'
             )
 
-    @patch('Poem.helpers.metrics_helpers.requests.get')
+    @patch('Poem.helpers.metrics_helpers.webapi_get')
     @patch('Poem.helpers.metrics_helpers.WebAPIKey.objects.get')
     def test_get_metrics_in_profiles_if_response_empty(
             self, mock_key, mock_get
@@ -3442,13 +4223,12 @@ class MetricsInProfilesTests(TenantTestCase):
             metrics = get_metrics_in_profiles(self.tenant)
             mock_get.assert_called_once_with(
                 'https://mock.api.url',
-                headers={'Accept': 'application/json', 'x-api-key': 'mock_key'},
-                timeout=180
+                headers={'Accept': 'application/json', 'x-api-key': 'mock_key'}
             )
             self.assertEqual(metrics, {})
 
-    @patch('Poem.helpers.metrics_helpers.requests.put')
-    @patch('Poem.helpers.metrics_helpers.requests.get')
+    @patch('Poem.helpers.metrics_helpers.webapi_put')
+    @patch('Poem.helpers.metrics_helpers.webapi_get')
     @patch('Poem.helpers.metrics_helpers.poem_models.MetricProfiles.objects.'
            'get')
     @patch('Poem.helpers.metrics_helpers.WebAPIKey.objects.get')
@@ -3471,8 +4251,7 @@ class MetricsInProfilesTests(TenantTestCase):
             )
             mock_get.assert_called_once_with(
                 'https://mock.api.url/11111111-2222-3333-4444-555555555555',
-                headers={'Accept': 'application/json', 'x-api-key': 'mock_key'},
-                timeout=180
+                headers={'Accept': 'application/json', 'x-api-key': 'mock_key'}
             )
             data = {
                 "id": "11111111-2222-3333-4444-555555555555",
@@ -3494,7 +4273,7 @@ class MetricsInProfilesTests(TenantTestCase):
                 data=json.dumps(data)
             )
 
-    @patch('Poem.helpers.metrics_helpers.requests.get')
+    @patch('Poem.helpers.metrics_helpers.webapi_get')
     @patch('Poem.helpers.metrics_helpers.poem_models.MetricProfiles.objects.'
            'get')
     @patch('Poem.helpers.metrics_helpers.WebAPIKey.objects.get')
@@ -3519,8 +4298,7 @@ class MetricsInProfilesTests(TenantTestCase):
             mock_get.assert_called_once_with(
                 'https://mock.api.url/11111111-2222-3333-4444-555555555555',
                 headers={'Accept': 'application/json',
-                         'x-api-key': 'wrong_key'},
-                timeout=180
+                         'x-api-key': 'wrong_key'}
             )
 
     @patch(
@@ -3553,6 +4331,139 @@ class MetricsInProfilesTests(TenantTestCase):
         )
 
 
+class RenameMetricInProfilesTests(TenantTestCase):
+    def setUp(self):
+        reset_session()
+        self.tenants = []
+        for i in range(50):
+            tenant = Tenant(name=f'TENANT{i}', schema_name=f'tenant{i}')
+            tenant.auto_create_schema = False
+            tenant.save()
+            WebAPIKey.objects.create(
+                name=f'WEB-API-TENANT{i}', token=f'token{i}'
+            )
+            self.tenants.append(tenant)
+
+        self.tenant.name = 'TEST'
+        self.tenant.save()
+
+    def tearDown(self):
+        reset_session()
+
+    @staticmethod
+    def _profiles(i):
+        return [
+            {
+                'id': f'{i:08d}-0000-0000-0000-000000000001',
+                'name': f'PROFILE{i}-1',
+                'description': 'First profile',
+                'services': [
+                    {'service': 'service1', 'metrics': ['metric1', 'metric2']}
+                ]
+            },
+            {
+                'id': f'{i:08d}-0000-0000-0000-000000000002',
+                'name': f'PROFILE{i}-2',
+                'description': 'Second profile',
+                'services': [
+                    {'service': 'service2', 'metrics': ['metric3']}
+                ]
+            }
+        ]
+
+    def _fake_webapi(self, webapi):
+        for i in range(50):
+            webapi.tenant_resources[f'token{i}'] = {
+                '/metric_profiles': self._profiles(i)
+            }
+
+    def test_rename_metric_concurrently(self):
+        schemas = [tenant.schema_name for tenant in self.tenants]
+        with FakeWebApi(delay=0.02) as webapi:
+            self._fake_webapi(webapi)
+            with self.settings(WEBAPI_METRIC=webapi.url('/metric_profiles')):
+                start = time.monotonic()
+                results = rename_metric_in_profiles(
+                    'metric1', 'new.metric1', schemas=schemas, workers=10
+                )
+                elapsed = time.monotonic() - start
+
+        self.assertEqual(len(webapi.requests), 100)
+        self.assertEqual(
+            len([r for r in webapi.requests if r[0] == 'PUT']), 50
+        )
+        self.assertLess(elapsed, 50 * 2 * 0.02)
+        for i in range(50):
+            self.assertEqual(
+                results[f'tenant{i}'], {
+                    'tenant': f'TENANT{i}',
+                    'updated': [f'PROFILE{i}-1'],
+                    'error': None
+                }
+            )
+            profiles = webapi.tenant_resources[f'token{i}']['/metric_profiles']
+            self.assertEqual(
+                profiles[0]['services'][0]['metrics'],
+                ['new.metric1', 'metric2']
+            )
+            self.assertEqual(profiles[1], self._profiles(i)[1])
+
+    def test_rename_metric_only_in_given_schemas(self):
+        with FakeWebApi() as webapi:
+            self._fake_webapi(webapi)
+            with self.settings(WEBAPI_METRIC=webapi.url('/metric_profiles')):
+                results = rename_metric_in_profiles(
+                    'metric1', 'new.metric1', schemas=['tenant1', 'tenant7']
+                )
+
+        self.assertEqual(sorted(results), ['tenant1', 'tenant7'])
+        self.assertEqual(len(webapi.requests), 4)
+        self.assertEqual(
+            webapi.tenant_resources['token2']['/metric_profiles'],
+            self._profiles(2)
+        )
+
+    def test_rename_metric_tenant_timeout(self):
+        with FakeWebApi(delay=0.01) as webapi:
+            self._fake_webapi(webapi)
+            with self.settings(WEBAPI_METRIC=webapi.url('/metric_profiles')):
+                msgs = update_metrics_in_profiles(
+                    'metric1', 'new.metric1', schemas=['tenant1']
+                )
+                self.assertEqual(msgs, [])
+                results = rename_metric_in_profiles(
+                    'metric2', 'new.metric2', schemas=['tenant1'], timeout=0
+                )
+
+        self.assertEqual(results['tenant1']['updated'], [])
+        self.assertEqual(
+            results['tenant1']['error'],
+            'Error trying to update metric in metric profiles: Timed out '
+            'after 0 seconds; updated profiles: none.'
+        )
+        self.assertEqual([r[0] for r in webapi.requests], ['GET', 'PUT'])
+
+    def test_rename_metric_missing_key(self):
+        WebAPIKey.objects.filter(name='WEB-API-TENANT3').delete()
+        with FakeWebApi() as webapi:
+            self._fake_webapi(webapi)
+            with self.settings(WEBAPI_METRIC=webapi.url('/metric_profiles')):
+                msgs = update_metrics_in_profiles(
+                    'metric1', 'new.metric1', schemas=['tenant2', 'tenant3']
+                )
+
+        self.assertEqual(
+            msgs, [
+                'TENANT3: No "WEB-API" key in the DB!\n'
+                'Please update metric profiles manually.'
+            ]
+        )
+        self.assertEqual(
+            webapi.tenant_resources['token2']['/metric_profiles'][0][
+                'services'][0]['metrics'], ['new.metric1', 'metric2']
+        )
+
+
 class SyncMetricsTests(TenantTestCase):
     def setUp(self) -> None:
         self.tenant.name = "TENANT"
@@ -3758,6 +4669,129 @@ class SyncMetricsTests(TenantTestCase):
         )
 
 
+class DeltaHistoryTests(TenantTestCase):
+    def setUp(self):
+        self.mp = poem_models.MetricProfiles.objects.create(
+            name='TEST_PROFILE',
+            apiid='00000000-oooo-kkkk-aaaa-aaeekkccnnee',
+            groupname='TEST'
+        )
+        self.ct = ContentType.objects.get_for_model(self.mp)
+        self.instances = [
+            dict(service=f'service-{i}', metric=f'metric-{i}')
+            for i in range(1000)
+        ]
+
+    def _versions(self):
+        return [
+            (ver.delta, json.loads(ver.serialized_data)[0]['fields'])
+            for ver in poem_models.TenantHistory.objects.filter(
+                object_id=self.mp.id, content_type=self.ct
+            ).order_by('id')
+        ]
+
+    def _create_versions(self):
+        fields = []
+        for i in range(5):
+            del self.instances[i * 10]
+            self.instances.append(dict(service='new', metric=f'metric-{i}'))
+            create_profile_history(
+                self.mp, self.instances, 'poem', f'Version {i}.'
+            )
+            fields.append(latest_history_fields(self.mp, self.ct)[0])
+
+        return fields
+
+    def test_history_patch(self):
+        old = {
+            'name': 'TEST_PROFILE', 'description': 'Profile.',
+            'metricinstances': [
+                [item['service'], item['metric']] for item in self.instances
+            ]
+        }
+        new = {
+            'name': 'TEST_PROFILE', 'groupname': 'TEST',
+            'metricinstances': old['metricinstances'][1:] + [['new', 'new']]
+        }
+        patch = history_patch(old, new)
+        self.assertEqual(
+            patch, [
+                '{', {
+                    'groupname': ['=', 'TEST'],
+                    'metricinstances': ['[', [
+                        [0, 1, []], [1000, 1000, [['new', 'new']]]
+                    ]]
+                }, ['description']
+            ]
+        )
+        self.assertEqual(apply_history_patch(old, patch), new)
+        self.assertEqual(old['description'], 'Profile.')
+        self.assertEqual(len(old['metricinstances']), 1000)
+        self.assertIsNone(history_patch(new, new))
+        self.assertEqual(history_patch([1, 2], [3]), ['=', [3]])
+
+    @override_settings(HISTORY_SNAPSHOT_INTERVAL=3)
+    def test_create_profile_history_with_snapshots(self):
+        fields = self._create_versions()
+        versions = self._versions()
+        self.assertEqual(
+            [delta for delta, data in versions],
+            [False, True, True, False, True]
+        )
+        self.assertEqual(versions[3][1], fields[3])
+        self.assertEqual(
+            versions[4][1], [
+                '{', {
+                    'description': ['=', 'Version 4.'],
+                    'metricinstances': ['[', [
+                        [40, 41, []], [1000, 1000, [['new', 'metric-4']]]
+                    ]]
+                }, []
+            ]
+        )
+        self.assertEqual(
+            fields[4]['metricinstances'],
+            [[item['service'], item['metric']] for item in self.instances]
+        )
+        self.assertEqual(fields[4]['description'], 'Version 4.')
+        comment = poem_models.TenantHistory.objects.filter(
+            object_id=self.mp.id
+        ).order_by('-id')[0].comment
+        self.assertEqual(
+            set(json.dumps(item) for item in json.loads(comment)),
+            {
+                '{"changed": {"fields": ["description"]}}',
+                '{"added": {"fields": ["metricinstances"], '
+                '"object": ["new", "metric-4"]}}',
+                '{"deleted": {"fields": ["metricinstances"], '
+                '"object": ["service-44", "metric-44"]}}'
+            }
+        )
+
+    def test_encode_history(self):
+        fields = self._create_versions()
+        snapshots = self._versions()
+        self.assertEqual([delta for delta, data in snapshots], [False] * 5)
+
+        call_command(
+            'poem_encode_history', '--interval', '2',
+            '--schema', self.tenant.schema_name, stdout=io.StringIO()
+        )
+        self.assertEqual(
+            [delta for delta, data in self._versions()],
+            [False, True, False, True, False]
+        )
+        self.assertEqual(
+            latest_history_fields(self.mp, self.ct), (fields[4], 0)
+        )
+
+        call_command(
+            'poem_encode_history', '--interval', '1',
+            '--schema', self.tenant.schema_name, stdout=io.StringIO()
+        )
+        self.assertEqual(self._versions(), snapshots)
+
+
 class CommentsTests(TenantTestCase):
     def test_new_comment_with_objects_change(self):
         comment = '[{"changed": {"fields": ["config"], ' \
@@ -3853,8 +4887,12 @@ class CombinedTenantTests(TenantTestCase):
         self.tenant.name = "TENANT"
         self.tenant.save()
         self.combined_tenant = CombinedTenant(self.tenant)
+        cache.clear()
+
+    def tearDown(self):
+        cache.clear()
 
-    @patch("Poem.helpers.tenant_helpers.requests.get")
+    @patch("Poem.helpers.tenant_helpers.webapi_get")
     @patch("Poem.helpers.tenant_helpers.WebAPIKey.objects.get")
     def test_get_combined_tenants(self, mock_key, mock_get):
         with self.settings(WEBAPI_DATAFEEDS="https://mock.api.url/feeds/data"):
@@ -3870,7 +4908,41 @@ class CombinedTenantTests(TenantTestCase):
             )
             self.assertEqual(tenants, ["TENANT_X", "TENANT_Y"])
 
-    @patch("Poem.helpers.tenant_helpers.requests.get")
+    @patch("Poem.helpers.tenant_helpers.webapi_get")
+    @patch("Poem.helpers.tenant_helpers.WebAPIKey.objects.get")
+    def test_get_combined_tenants_cached(self, mock_key, mock_get):
+        with self.settings(
+                WEBAPI_DATAFEEDS="https://mock.api.url/feeds/data",
+                CACHE_WEBAPI_TIMEOUT=60
+        ):
+            mock_key.return_value = WebAPIKey(
+                name="WEB-API-TENANT", token="t0k3n"
+            )
+            mock_get.side_effect = mocked_web_api_data_feed
+            self.assertEqual(
+                self.combined_tenant.tenants(), ["TENANT_X", "TENANT_Y"]
+            )
+            self.assertEqual(
+                CombinedTenant(self.tenant).tenants(), ["TENANT_X", "TENANT_Y"]
+            )
+            mock_get.assert_called_once()
+
+    @patch("Poem.helpers.tenant_helpers.webapi_get")
+    @patch("Poem.helpers.tenant_helpers.WebAPIKey.objects.get")
+    def test_get_combined_tenants_errors_not_cached(self, mock_key, mock_get):
+        with self.settings(WEBAPI_DATAFEEDS="https://mock.api.url/feeds/data"):
+            mock_key.return_value = WebAPIKey(
+                name="WEB-API-TENANT", token="t0k3n"
+            )
+            mock_get.side_effect = mocked_web_api_data_feed_wrong_token
+            self.assertEqual(self.combined_tenant.tenants(), [])
+            mock_get.side_effect = mocked_web_api_data_feed
+            self.assertEqual(
+                self.combined_tenant.tenants(), ["TENANT_X", "TENANT_Y"]
+            )
+            self.assertEqual(mock_get.call_count, 2)
+
+    @patch("Poem.helpers.tenant_helpers.webapi_get")
     @patch("Poem.helpers.tenant_helpers.WebAPIKey.objects.get")
     def test_get_combined_tenants_webapi_exception(self, mock_key, mock_get):
         with self.settings(WEBAPI_DATAFEEDS="https://mock.api.url/feeds/data"):
@@ -3886,10 +4958,77 @@ class CombinedTenantTests(TenantTestCase):
             )
             self.assertEqual(tenants, [])
 
-    @patch("Poem.helpers.tenant_helpers.requests.get")
+    @patch("Poem.helpers.tenant_helpers.webapi_get")
     def test_get_combined_tenants_key_doesnotexist(self, mock_get):
         with self.settings(WEBAPI_DATAFEEDS="https://mock.api.url/feeds/data"):
             mock_get.side_effect = mocked_web_api_data_feed_wrong_token
             tenants = self.combined_tenant.tenants()
             self.assertFalse(mock_get.called)
             self.assertEqual(tenants, [])
+
+
+class WebApiClientTests(TenantTestCase):
+    def setUp(self):
+        reset_session()
+        reset_webapi_stats()
+
+    def tearDown(self):
+        reset_session()
+        reset_webapi_stats()
+
+    def test_session_shared(self):
+        with self.settings(
+                WEBAPI_RETRIES=2, WEBAPI_RETRY_BACKOFF=0.1, WEBAPI_POOL_SIZE=5
+        ):
+            session = get_session()
+            self.assertIs(session, get_session())
+            adapter = session.get_adapter('https://mock.api.url')
+            self.assertEqual(adapter.max_retries.total, 2)
+            self.assertEqual(adapter.max_retries.backoff_factor, 0.1)
+            self.assertEqual(
+                adapter.max_retries.status_forcelist, (502, 503, 504)
+            )
+            self.assertEqual(adapter._pool_maxsize, 5)
+
+    @patch('Poem.helpers.webapi_helpers.get_session')
+    def test_get(self, mock_session):
+        mock_session.return_value.request.side_effect = \
+            mocked_web_api_metric_profiles
+        with self.settings(WEBAPI_CONNECT_TIMEOUT=5, WEBAPI_READ_TIMEOUT=60):
+            response = webapi_get(
+                'https://mock.api.url', headers={'x-api-key': 'mock_key'}
+            )
+        mock_session.return_value.request.assert_called_once_with(
+            'GET', 'https://mock.api.url', headers={'x-api-key': 'mock_key'},
+            data=None, timeout=(5, 60)
+        )
+        self.assertEqual(response.status_code, 200)
+        stats = webapi_stats()
+        self.assertEqual(stats['GET']['calls'], 1)
+        self.assertEqual(stats['GET']['failed'], 0)
+        self.assertNotIn('PUT', stats)
+
+    @patch('Poem.helpers.webapi_helpers.get_session')
+    def test_put_failed(self, mock_session):
+        mock_session.return_value.request.side_effect = \
+            mocked_web_api_metric_profiles_wrong_token
+        response = webapi_put(
+            'https://mock.api.url', headers={'x-api-key': 'mock_key'},
+            data='{}', timeout=10
+        )
+        mock_session.return_value.request.assert_called_once_with(
+            'PUT', 'https://mock.api.url', headers={'x-api-key': 'mock_key'},
+            data='{}', timeout=10
+        )
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(webapi_stats()['PUT']['calls'], 1)
+        self.assertEqual(webapi_stats()['PUT']['failed'], 1)
+
+    @patch('Poem.helpers.webapi_helpers.get_session')
+    def test_get_connection_error(self, mock_session):
+        mock_session.return_value.request.side_effect = \
+            requests.exceptions.ConnectionError('Connection refused')
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            webapi_get('https://mock.api.url')
+        self.assertEqual(webapi_stats()['GET']['calls'], 1)
+        self.assertEqual(webapi_stats()['GET']['failed'], 1)
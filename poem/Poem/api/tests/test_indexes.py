@@ -0,0 +1,100 @@
+from Poem.poem import models as poem_models
+from Poem.poem_super_admin import models as admin_models
+from django.db import connection
+from django_tenants.test.cases import TenantTestCase
+
+from .utils_test import sequential_scans
+
+
+class HotLookupIndexTests(TenantTestCase):
+    """
+    Lookups done on every metric, probe and package change are checked
+    against a generated dataset large enough for the planner to prefer
+    indexes over sequential scans wherever it can use them.
+    """
+    def setUp(self):
+        packages = admin_models.Package.objects.bulk_create([
+            admin_models.Package(
+                name=f'nagios-plugins-{i // 5}', version=f'0.1.{i % 5}'
+            ) for i in range(1000)
+        ])
+        probes = admin_models.Probe.objects.bulk_create([
+            admin_models.Probe(name=f'probe-{i}', package=packages[i // 2])
+            for i in range(2000)
+        ])
+        probekeys = admin_models.ProbeHistory.objects.bulk_create([
+            admin_models.ProbeHistory(
+                object_id=probe, name=probe.name, package=probe.package
+            ) for probe in probes
+        ])
+        mtype = admin_models.MetricTemplateType.objects.create(name='Active')
+        tags = admin_models.MetricTags.objects.bulk_create([
+            admin_models.MetricTags(name=f'tag-{i}') for i in range(1000)
+        ])
+        mts = admin_models.MetricTemplate.objects.bulk_create([
+            admin_models.MetricTemplate(
+                name=f'metric-{i}', mtype=mtype, probekey=probekey
+            ) for i, probekey in enumerate(probekeys)
+        ])
+        admin_models.MetricTemplate.tags.through.objects.bulk_create([
+            admin_models.MetricTemplate.tags.through(
+                metrictemplate=mt, metrictags=tags[(i + j) % len(tags)]
+            ) for i, mt in enumerate(mts) for j in range(2)
+        ])
+        admin_models.MetricTemplateHistory.objects.bulk_create([
+            admin_models.MetricTemplateHistory(
+                object_id=mt, name=mt.name, mtype=mtype, probekey=mt.probekey
+            ) for mt in mts
+        ])
+        poem_models.Metric.objects.bulk_create([
+            poem_models.Metric(
+                name=mt.name, probekey=mt.probekey,
+                probeversion=f'{mt.probekey.name} '
+                             f'({mt.probekey.package.version})'
+            ) for mt in mts
+        ])
+
+        with connection.cursor() as cursor:
+            for model in [
+                admin_models.Package, admin_models.ProbeHistory,
+                admin_models.MetricTags, admin_models.MetricTemplate,
+                admin_models.MetricTemplate.tags.through,
+                admin_models.MetricTemplateHistory, poem_models.Metric
+            ]:
+                cursor.execute(f'ANALYZE {model._meta.db_table}')
+
+        self.probekey = probekeys[1234]
+
+    def test_hot_lookups_use_indexes(self):
+        lookups = {
+            'metric template history by name and probekey':
+                admin_models.MetricTemplateHistory.objects.filter(
+                    name='metric-1234', probekey=self.probekey
+                ),
+            'metric template history by name and package name':
+                admin_models.MetricTemplateHistory.objects.filter(
+                    name='metric-1234',
+                    probekey__package__name='nagios-plugins-123'
+                ),
+            'probe history by name and package version':
+                admin_models.ProbeHistory.objects.filter(
+                    name='probe-1234', package__version='0.1.2'
+                ),
+            'metric by probe version':
+                poem_models.Metric.objects.filter(
+                    probeversion='probe-1234 (0.1.2)'
+                ),
+            'metrics by package name':
+                poem_models.Metric.objects.filter(
+                    probekey__package__name='nagios-plugins-123'
+                ),
+            'metric templates by tag':
+                admin_models.MetricTemplate.objects.filter(
+                    tags__name='tag-123'
+                )
+        }
+
+        for lookup, queryset in lookups.items():
+            with self.subTest(lookup):
+                self.assertTrue(queryset.exists())
+                self.assertEqual(sequential_scans(queryset), [])
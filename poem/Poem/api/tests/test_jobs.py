@@ -0,0 +1,195 @@
+from unittest.mock import patch
+
+from Poem.api import views_internal as views
+from Poem.helpers.job_helpers import run_worker
+from Poem.poem_super_admin import models as admin_models
+from Poem.tenants.models import Tenant
+from Poem.users.models import CustUser
+from django_tenants.test.cases import TenantTestCase
+from django_tenants.test.client import TenantRequestFactory
+from django_tenants.utils import get_public_schema_name
+from rest_framework import status
+from rest_framework.test import force_authenticate
+
+
+class ListJobsTests(TenantTestCase):
+    def setUp(self) -> None:
+        self.factory = TenantRequestFactory(self.tenant)
+        self.view = views.ListJobs.as_view()
+        self.url = '/api/v2/internal/jobs/'
+        self.user = CustUser.objects.create_user(username='testuser')
+        self.superuser = CustUser.objects.create_user(
+            username='poem', is_superuser=True
+        )
+
+        self.public_tenant = Tenant(
+            name='SuperPOEM Tenant', schema_name=get_public_schema_name()
+        )
+        self.public_tenant.auto_create_schema = False
+        self.public_tenant.save()
+
+        tenant1 = Tenant(name='TEST1', schema_name='test1')
+        tenant1.auto_create_schema = False
+        tenant1.save()
+
+        mtype = admin_models.MetricTemplateType.objects.create(name='Passive')
+        self.mt = admin_models.MetricTemplate.objects.create(
+            name='org.apel.APEL-Pub', mtype=mtype, flags='["OBSESS 1"]'
+        )
+        admin_models.TenantMetricUsage.objects.create(
+            schema_name='test1', metric_id=1, name='org.apel.APEL-Pub'
+        )
+
+    def _post(self, data, user=None):
+        request = self.factory.post(
+            self.url, data, content_type='application/json'
+        )
+        request.tenant = self.public_tenant
+        force_authenticate(request, user=user if user else self.superuser)
+        return self.view(request)
+
+    @patch('Poem.api.internal_views.jobs.sync_tags_webapi')
+    @patch('Poem.api.internal_views.jobs.delete_metrics_in_tenant')
+    def test_enqueue_job(self, mock_delete, mock_sync):
+        mock_delete.return_value = ['test1: warning']
+        response = self._post({
+            'kind': 'delete_metric_templates',
+            'params': {'metrictemplates': ['org.apel.APEL-Pub']}
+        })
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['kind'], 'delete_metric_templates')
+        self.assertEqual(response.data['status'], 'queued')
+        self.assertEqual(response.data['user'], 'poem')
+        self.assertEqual(
+            response.data['progress'],
+            {'queued': 2, 'done': 0, 'failed': 0, 'total': 2}
+        )
+        self.assertFalse(mock_delete.called)
+        self.assertTrue(
+            admin_models.MetricTemplate.objects.filter(
+                name='org.apel.APEL-Pub'
+            ).exists()
+        )
+
+        self.assertEqual(run_worker(once=True), 2)
+        self.assertEqual(mock_delete.call_count, 1)
+        self.assertEqual(
+            mock_delete.call_args[0][0].schema_name, 'test1'
+        )
+        self.assertEqual(mock_delete.call_args[0][1], ['org.apel.APEL-Pub'])
+        mock_sync.assert_called_once()
+        self.assertFalse(
+            admin_models.MetricTemplate.objects.filter(
+                name='org.apel.APEL-Pub'
+            ).exists()
+        )
+
+        request = self.factory.get(self.url + str(response.data['id']))
+        request.tenant = self.public_tenant
+        force_authenticate(request, user=self.user)
+        response = self.view(request, response.data['id'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['status'], 'done')
+        self.assertEqual(
+            [
+                (step['tenant'], step['stage'], step['status'], step['result'])
+                for step in response.data['steps']
+            ], [
+                ('TEST1', 0, 'done', ['test1: warning']),
+                ('SuperPOEM Tenant', 1, 'done', [])
+            ]
+        )
+
+    def test_enqueue_job_of_unknown_kind(self):
+        response = self._post({'kind': 'nonexisting', 'params': {}})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.data['detail'], 'Unknown job kind: nonexisting.'
+        )
+        self.assertEqual(admin_models.Job.objects.count(), 0)
+
+    def test_enqueue_job_with_wrong_params(self):
+        response = self._post({
+            'kind': 'delete_metric_templates', 'params': {'name': 'metric'}
+        })
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.data['detail'],
+            'Wrong parameters for job delete_metric_templates.'
+        )
+        self.assertEqual(admin_models.Job.objects.count(), 0)
+
+    def test_enqueue_job_regular_user(self):
+        response = self._post({
+            'kind': 'delete_metric_templates',
+            'params': {'metrictemplates': ['org.apel.APEL-Pub']}
+        }, user=self.user)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(
+            response.data['detail'], 'You do not have permission to run jobs.'
+        )
+        self.assertEqual(admin_models.Job.objects.count(), 0)
+
+    def test_enqueue_job_in_tenant_schema(self):
+        request = self.factory.post(
+            self.url, {'kind': 'delete_metric_templates', 'params': {}},
+            content_type='application/json'
+        )
+        request.tenant = self.tenant
+        force_authenticate(request, user=self.superuser)
+        response = self.view(request)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(
+            response.data['detail'], 'Jobs are available only in SuperPOEM.'
+        )
+
+    def test_list_jobs(self):
+        job1 = admin_models.Job.objects.enqueue(
+            'update_metrics', {'name': 'metric1'}, ['test1']
+        )
+        job2 = admin_models.Job.objects.enqueue(
+            'delete_metric_templates', {'metrictemplates': ['metric2']}, []
+        )
+        request = self.factory.get(self.url)
+        request.tenant = self.public_tenant
+        force_authenticate(request, user=self.user)
+        response = self.view(request)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(job['id'], job['status']) for job in response.data],
+            [(job2.id, 'done'), (job1.id, 'queued')]
+        )
+        self.assertNotIn('steps', response.data[0])
+
+    def test_get_nonexisting_job(self):
+        request = self.factory.get(self.url + '999')
+        request.tenant = self.public_tenant
+        force_authenticate(request, user=self.user)
+        response = self.view(request, 999)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(response.data['detail'], 'Job not found.')
+
+    def test_retry_job(self):
+        job = admin_models.Job.objects.enqueue(
+            'update_metrics', {'name': 'metric1'}, ['test1']
+        )
+        job.steps.update(status=admin_models.JobStep.FAILED, attempts=3)
+        admin_models.Job.objects.finish(job.id)
+
+        request = self.factory.put(self.url + str(job.id))
+        request.tenant = self.public_tenant
+        force_authenticate(request, user=self.superuser)
+        response = self.view(request, job.id)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['status'], 'queued')
+        self.assertEqual(
+            response.data['progress'],
+            {'queued': 1, 'done': 0, 'failed': 0, 'total': 1}
+        )
+
+        request = self.factory.put(self.url + str(job.id))
+        request.tenant = self.public_tenant
+        force_authenticate(request, user=self.superuser)
+        response = self.view(request, job.id)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['detail'], 'Job has no failed steps.')
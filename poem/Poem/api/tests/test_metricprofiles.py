@@ -98,7 +98,7 @@ class ListMetricProfilesAPIViewTests(TenantTestCase):
             content_type=self.ct
         )
 
-    @patch('Poem.api.internal_views.metricprofiles.sync_webapi')
+    @patch('Poem.api.internal_views.metricprofiles.sync_webapi_if_stale')
     def test_get_all_metric_profiles_superuser(self, func):
         func.side_effect = mocked_func
         request = self.factory.get(self.url)
@@ -123,7 +123,21 @@ class ListMetricProfilesAPIViewTests(TenantTestCase):
             ]
         )
 
-    @patch('Poem.api.internal_views.metricprofiles.sync_webapi')
+    @patch('Poem.api.internal_views.metricprofiles.sync_webapi_if_stale')
+    def test_get_all_metric_profiles_forced_refresh(self, func):
+        func.side_effect = mocked_func
+        request = self.factory.get(self.url, {'refresh': 'true'})
+        request.tenant = self.tenant
+        force_authenticate(request, user=self.superuser)
+        with self.settings(WEBAPI_METRIC='https://mock.api.url'):
+            response = self.view(request)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        func.assert_called_once_with(
+            'https://mock.api.url', poem_models.MetricProfiles, 'TENANT',
+            force=True
+        )
+
+    @patch('Poem.api.internal_views.metricprofiles.sync_webapi_if_stale')
     def test_get_all_metric_profiles_regular_user(self, func):
         func.side_effect = mocked_func
         request = self.factory.get(self.url)
@@ -148,7 +162,7 @@ class ListMetricProfilesAPIViewTests(TenantTestCase):
             ]
         )
 
-    @patch('Poem.api.internal_views.metricprofiles.sync_webapi')
+    @patch('Poem.api.internal_views.metricprofiles.sync_webapi_if_stale')
     def test_get_all_metric_profiles_regular_user_limited_user(self, func):
         func.side_effect = mocked_func
         request = self.factory.get(self.url)
@@ -173,7 +187,7 @@ class ListMetricProfilesAPIViewTests(TenantTestCase):
             ]
         )
 
-    @patch('Poem.api.internal_views.metricprofiles.sync_webapi')
+    @patch('Poem.api.internal_views.metricprofiles.sync_webapi_if_stale')
     def test_get_metric_profile_by_name_superuser(self, func):
         func.side_effect = mocked_func
         request = self.factory.get(self.url + 'TEST_PROFILE')
@@ -190,7 +204,7 @@ class ListMetricProfilesAPIViewTests(TenantTestCase):
             ])
         )
 
-    @patch('Poem.api.internal_views.metricprofiles.sync_webapi')
+    @patch('Poem.api.internal_views.metricprofiles.sync_webapi_if_stale')
     def test_get_metric_profile_by_name_regular_user(self, func):
         func.side_effect = mocked_func
         request = self.factory.get(self.url + 'TEST_PROFILE')
@@ -207,7 +221,7 @@ class ListMetricProfilesAPIViewTests(TenantTestCase):
             ])
         )
 
-    @patch('Poem.api.internal_views.metricprofiles.sync_webapi')
+    @patch('Poem.api.internal_views.metricprofiles.sync_webapi_if_stale')
     def test_get_metric_profile_by_name_limited_user(self, func):
         func.side_effect = mocked_func
         request = self.factory.get(self.url + 'TEST_PROFILE')
@@ -224,7 +238,7 @@ class ListMetricProfilesAPIViewTests(TenantTestCase):
             ])
         )
 
-    @patch('Poem.api.internal_views.metricprofiles.sync_webapi')
+    @patch('Poem.api.internal_views.metricprofiles.sync_webapi_if_stale')
     def test_get_metric_profile_if_wrong_name_superuser(self, func):
         func.side_effect = mocked_func
         request = self.factory.get(self.url + 'nonexisting')
@@ -233,7 +247,7 @@ class ListMetricProfilesAPIViewTests(TenantTestCase):
         response = self.view(request, 'nonexisting')
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
 
-    @patch('Poem.api.internal_views.metricprofiles.sync_webapi')
+    @patch('Poem.api.internal_views.metricprofiles.sync_webapi_if_stale')
     def test_get_metric_profile_if_wrong_name_regular_user(self, func):
         func.side_effect = mocked_func
         request = self.factory.get(self.url + 'nonexisting')
@@ -242,7 +256,7 @@ class ListMetricProfilesAPIViewTests(TenantTestCase):
         response = self.view(request, 'nonexisting')
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
 
-    @patch('Poem.api.internal_views.metricprofiles.sync_webapi')
+    @patch('Poem.api.internal_views.metricprofiles.sync_webapi_if_stale')
     def test_get_metric_profile_if_wrong_name_limited_user(self, func):
         func.side_effect = mocked_func
         request = self.factory.get(self.url + 'nonexisting')
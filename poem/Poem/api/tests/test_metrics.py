@@ -1,19 +1,25 @@
 import datetime
 import json
-from unittest.mock import patch, call
+from unittest.mock import ANY, patch, call
 
 import factory
 import requests
 from Poem.api import views_internal as views
 from Poem.api.internal_views.utils import inline_metric_for_db
 from Poem.helpers.history_helpers import serialize_metric
+from Poem.helpers.job_helpers import run_worker
+from Poem.helpers.metrics_helpers import plan_metrics_versions, \
+    apply_metrics_versions
 from Poem.poem import models as poem_models
 from Poem.poem_super_admin import models as admin_models
+from Poem.poem_super_admin.dbmodels.fields import to_text
 from Poem.tenants.models import Tenant
 from Poem.users.models import CustUser
 from django.contrib.contenttypes.models import ContentType
 from django.core import serializers
+from django.db import connection
 from django.db.models.signals import pre_save
+from django.test.utils import CaptureQueriesContext
 from django_tenants.test.cases import TenantTestCase
 from django_tenants.test.client import TenantRequestFactory
 from django_tenants.utils import get_public_schema_name, schema_context, \
@@ -698,9 +704,11 @@ class ListMetricAPIViewTests(TenantTestCase):
         self.assertEqual(metric.group.name, 'EUDAT')
         self.assertEqual(
             metric.config,
-            '["maxCheckAttempts 4", "timeout 70", '
-            '"path /usr/libexec/argo-monitoring/probes/argo", '
-            '"interval 6", "retryInterval 4"]')
+            [
+                ['maxCheckAttempts', '4'], ['timeout', '70'],
+                ['path', '/usr/libexec/argo-monitoring/probes/argo'],
+                ['interval', '6'], ['retryInterval', '4']
+            ])
         self.assertEqual(serialized_data['name'], metric.name)
         self.assertEqual(
             serialized_data['mtype'], [self.mt1_version2.mtype.name]
@@ -723,21 +731,26 @@ class ListMetricAPIViewTests(TenantTestCase):
             serialized_data['probeexecutable'],
             self.mt1_version2.probeexecutable
         )
-        self.assertEqual(serialized_data['config'], metric.config)
+        self.assertEqual(serialized_data['config'], to_text(metric.config))
         self.assertEqual(
-            serialized_data['attribute'], self.mt1_version2.attribute
+            serialized_data['attribute'], to_text(self.mt1_version2.attribute)
         )
         self.assertEqual(
             serialized_data['dependancy'],
-            self.mt1_version2.dependency
+            to_text(self.mt1_version2.dependency)
+        )
+        self.assertEqual(
+            serialized_data['flags'], to_text(self.mt1_version2.flags)
+        )
+        self.assertEqual(
+            serialized_data['files'], to_text(self.mt1_version2.files)
         )
-        self.assertEqual(serialized_data['flags'], self.mt1_version2.flags)
-        self.assertEqual(serialized_data['files'], self.mt1_version2.files)
         self.assertEqual(
-            serialized_data['parameter'], self.mt1_version2.parameter
+            serialized_data['parameter'], to_text(self.mt1_version2.parameter)
         )
         self.assertEqual(
-            serialized_data['fileparameter'], self.mt1_version2.fileparameter
+            serialized_data['fileparameter'],
+            to_text(self.mt1_version2.fileparameter)
         )
 
     @patch('Poem.api.internal_views.metrics.inline_metric_for_db')
@@ -789,9 +802,11 @@ class ListMetricAPIViewTests(TenantTestCase):
         self.assertEqual(metric.group.name, 'ARGO')
         self.assertEqual(
             metric.config,
-            '["maxCheckAttempts 4", "timeout 70", '
-            '"path /usr/libexec/argo-monitoring/probes/argo", '
-            '"interval 6", "retryInterval 4"]')
+            [
+                ['maxCheckAttempts', '4'], ['timeout', '70'],
+                ['path', '/usr/libexec/argo-monitoring/probes/argo'],
+                ['interval', '6'], ['retryInterval', '4']
+            ])
         self.assertEqual(serialized_data['name'], metric.name)
         self.assertEqual(
             serialized_data['mtype'], [self.mt1_version2.mtype.name]
@@ -814,20 +829,26 @@ class ListMetricAPIViewTests(TenantTestCase):
             serialized_data['probeexecutable'],
             self.mt1_version2.probeexecutable
         )
-        self.assertEqual(serialized_data['config'], metric.config)
+        self.assertEqual(serialized_data['config'], to_text(metric.config))
         self.assertEqual(
-            serialized_data['attribute'], self.mt1_version2.attribute
+            serialized_data['attribute'], to_text(self.mt1_version2.attribute)
         )
         self.assertEqual(
-            serialized_data['dependancy'], self.mt1_version2.dependency
+            serialized_data['dependancy'],
+            to_text(self.mt1_version2.dependency)
         )
-        self.assertEqual(serialized_data['flags'], self.mt1_version2.flags)
-        self.assertEqual(serialized_data['files'], self.mt1_version2.files)
         self.assertEqual(
-            serialized_data['parameter'], self.mt1_version2.parameter
+            serialized_data['flags'], to_text(self.mt1_version2.flags)
         )
         self.assertEqual(
-            serialized_data['fileparameter'], self.mt1_version2.fileparameter
+            serialized_data['files'], to_text(self.mt1_version2.files)
+        )
+        self.assertEqual(
+            serialized_data['parameter'], to_text(self.mt1_version2.parameter)
+        )
+        self.assertEqual(
+            serialized_data['fileparameter'],
+            to_text(self.mt1_version2.fileparameter)
         )
 
     @patch('Poem.api.internal_views.metrics.inline_metric_for_db')
@@ -883,9 +904,11 @@ class ListMetricAPIViewTests(TenantTestCase):
         self.assertEqual(metric.group.name, 'EGI')
         self.assertEqual(
             metric.config,
-            '["maxCheckAttempts 3", "timeout 60", '
-            '"path /usr/libexec/argo-monitoring/probes/argo", '
-            '"interval 5", "retryInterval 3"]')
+            [
+                ['maxCheckAttempts', '3'], ['timeout', '60'],
+                ['path', '/usr/libexec/argo-monitoring/probes/argo'],
+                ['interval', '5'], ['retryInterval', '3']
+            ])
         self.assertEqual(serialized_data['name'], metric.name)
         self.assertEqual(
             serialized_data['mtype'], [self.mt1_version1.mtype.name]
@@ -908,20 +931,26 @@ class ListMetricAPIViewTests(TenantTestCase):
             serialized_data['probeexecutable'],
             self.mt1_version1.probeexecutable
         )
-        self.assertEqual(serialized_data['config'], metric.config)
+        self.assertEqual(serialized_data['config'], to_text(metric.config))
         self.assertEqual(
-            serialized_data['attribute'], self.mt1_version1.attribute
+            serialized_data['attribute'], to_text(self.mt1_version1.attribute)
         )
         self.assertEqual(
-            serialized_data['dependancy'], self.mt1_version1.dependency
+            serialized_data['dependancy'],
+            to_text(self.mt1_version1.dependency)
         )
-        self.assertEqual(serialized_data['flags'], self.mt1_version1.flags)
-        self.assertEqual(serialized_data['files'], self.mt1_version1.files)
         self.assertEqual(
-            serialized_data['parameter'], self.mt1_version1.parameter
+            serialized_data['flags'], to_text(self.mt1_version1.flags)
         )
         self.assertEqual(
-            serialized_data['fileparameter'], self.mt1_version1.fileparameter
+            serialized_data['files'], to_text(self.mt1_version1.files)
+        )
+        self.assertEqual(
+            serialized_data['parameter'], to_text(self.mt1_version1.parameter)
+        )
+        self.assertEqual(
+            serialized_data['fileparameter'],
+            to_text(self.mt1_version1.fileparameter)
         )
 
     @patch('Poem.api.internal_views.metrics.inline_metric_for_db')
@@ -973,9 +1002,11 @@ class ListMetricAPIViewTests(TenantTestCase):
         self.assertEqual(metric.group.name, 'EUDAT')
         self.assertEqual(
             metric.config,
-            '["interval 180", "maxCheckAttempts 1", '
-            '"path /usr/libexec/argo-monitoring/probes/argo", '
-            '"retryInterval 1", "timeout 120"]',
+            [
+                ['interval', '180'], ['maxCheckAttempts', '1'],
+                ['path', '/usr/libexec/argo-monitoring/probes/argo'],
+                ['retryInterval', '1'], ['timeout', '120']
+            ],
         )
         self.assertEqual(serialized_data['name'], metric.name)
         self.assertEqual(
@@ -997,20 +1028,26 @@ class ListMetricAPIViewTests(TenantTestCase):
             serialized_data['probeexecutable'],
             self.mt2_version1.probeexecutable
         )
-        self.assertEqual(serialized_data['config'], metric.config)
+        self.assertEqual(serialized_data['config'], to_text(metric.config))
+        self.assertEqual(
+            serialized_data['attribute'], to_text(self.mt2_version1.attribute)
+        )
         self.assertEqual(
-            serialized_data['attribute'], self.mt2_version1.attribute
+            serialized_data['dependancy'],
+            to_text(self.mt2_version1.dependency)
         )
         self.assertEqual(
-            serialized_data['dependancy'], self.mt2_version1.dependency
+            serialized_data['flags'], to_text(self.mt2_version1.flags)
         )
-        self.assertEqual(serialized_data['flags'], self.mt2_version1.flags)
-        self.assertEqual(serialized_data['files'], self.mt2_version1.files)
         self.assertEqual(
-            serialized_data['parameter'], self.mt2_version1.parameter
+            serialized_data['files'], to_text(self.mt2_version1.files)
         )
         self.assertEqual(
-            serialized_data['fileparameter'], self.mt2_version1.fileparameter
+            serialized_data['parameter'], to_text(self.mt2_version1.parameter)
+        )
+        self.assertEqual(
+            serialized_data['fileparameter'],
+            to_text(self.mt2_version1.fileparameter)
         )
 
     @patch('Poem.api.internal_views.metrics.inline_metric_for_db')
@@ -1066,9 +1103,11 @@ class ListMetricAPIViewTests(TenantTestCase):
         self.assertEqual(metric.group.name, 'EGI')
         self.assertEqual(
             metric.config,
-            '["maxCheckAttempts 3", "timeout 60", '
-            '"path /usr/libexec/argo-monitoring/probes/argo", '
-            '"interval 5", "retryInterval 3"]')
+            [
+                ['maxCheckAttempts', '3'], ['timeout', '60'],
+                ['path', '/usr/libexec/argo-monitoring/probes/argo'],
+                ['interval', '5'], ['retryInterval', '3']
+            ])
         self.assertEqual(serialized_data['name'], metric.name)
         self.assertEqual(
             serialized_data['mtype'], [self.mt1_version1.mtype.name]
@@ -1091,20 +1130,26 @@ class ListMetricAPIViewTests(TenantTestCase):
             serialized_data['probeexecutable'],
             self.mt1_version1.probeexecutable
         )
-        self.assertEqual(serialized_data['config'], metric.config)
+        self.assertEqual(serialized_data['config'], to_text(metric.config))
+        self.assertEqual(
+            serialized_data['attribute'], to_text(self.mt1_version1.attribute)
+        )
+        self.assertEqual(
+            serialized_data['dependancy'],
+            to_text(self.mt1_version1.dependency)
+        )
         self.assertEqual(
-            serialized_data['attribute'], self.mt1_version1.attribute
+            serialized_data['flags'], to_text(self.mt1_version1.flags)
         )
         self.assertEqual(
-            serialized_data['dependancy'], self.mt1_version1.dependency
+            serialized_data['files'], to_text(self.mt1_version1.files)
         )
-        self.assertEqual(serialized_data['flags'], self.mt1_version1.flags)
-        self.assertEqual(serialized_data['files'], self.mt1_version1.files)
         self.assertEqual(
-            serialized_data['parameter'], self.mt1_version1.parameter
+            serialized_data['parameter'], to_text(self.mt1_version1.parameter)
         )
         self.assertEqual(
-            serialized_data['fileparameter'], self.mt1_version1.fileparameter
+            serialized_data['fileparameter'],
+            to_text(self.mt1_version1.fileparameter)
         )
 
     @patch('Poem.api.internal_views.metrics.inline_metric_for_db')
@@ -1507,7 +1552,7 @@ class ListMetricAPIViewTests(TenantTestCase):
         )[0]['fields']
         self.assertEqual(metric.probeversion, None)
         self.assertEqual(metric.group.name, 'EUDAT')
-        self.assertEqual(metric.config, '')
+        self.assertEqual(metric.config, [])
         self.assertEqual(serialized_data['name'], metric.name)
         self.assertEqual(serialized_data['mtype'], [self.mt3.mtype.name])
         self.assertEqual(serialized_data['tags'], [])
@@ -1519,14 +1564,20 @@ class ListMetricAPIViewTests(TenantTestCase):
         self.assertEqual(
             serialized_data['probeexecutable'], self.mt3.probeexecutable
         )
-        self.assertEqual(serialized_data['config'], metric.config)
-        self.assertEqual(serialized_data['attribute'], self.mt3.attribute)
-        self.assertEqual(serialized_data['dependancy'], self.mt3.dependency)
-        self.assertEqual(serialized_data['flags'], self.mt3.flags)
-        self.assertEqual(serialized_data['files'], self.mt3.files)
-        self.assertEqual(serialized_data['parameter'], self.mt3.parameter)
+        self.assertEqual(serialized_data['config'], to_text(metric.config))
         self.assertEqual(
-            serialized_data['fileparameter'], self.mt3.fileparameter
+            serialized_data['attribute'], to_text(self.mt3.attribute)
+        )
+        self.assertEqual(
+            serialized_data['dependancy'], to_text(self.mt3.dependency)
+        )
+        self.assertEqual(serialized_data['flags'], to_text(self.mt3.flags))
+        self.assertEqual(serialized_data['files'], to_text(self.mt3.files))
+        self.assertEqual(
+            serialized_data['parameter'], to_text(self.mt3.parameter)
+        )
+        self.assertEqual(
+            serialized_data['fileparameter'], to_text(self.mt3.fileparameter)
         )
 
     @patch('Poem.api.internal_views.metrics.inline_metric_for_db')
@@ -1564,7 +1615,7 @@ class ListMetricAPIViewTests(TenantTestCase):
         )[0]['fields']
         self.assertEqual(metric.probeversion, None)
         self.assertEqual(metric.group.name, 'ARGO')
-        self.assertEqual(metric.config, '')
+        self.assertEqual(metric.config, [])
         self.assertEqual(serialized_data['name'], metric.name)
         self.assertEqual(serialized_data['mtype'], [self.mt3.mtype.name])
         self.assertEqual(serialized_data['tags'], [])
@@ -1576,14 +1627,20 @@ class ListMetricAPIViewTests(TenantTestCase):
         self.assertEqual(
             serialized_data['probeexecutable'], self.mt3.probeexecutable
         )
-        self.assertEqual(serialized_data['config'], metric.config)
-        self.assertEqual(serialized_data['attribute'], self.mt3.attribute)
-        self.assertEqual(serialized_data['dependancy'], self.mt3.dependency)
-        self.assertEqual(serialized_data['flags'], self.mt3.flags)
-        self.assertEqual(serialized_data['files'], self.mt3.files)
-        self.assertEqual(serialized_data['parameter'], self.mt3.parameter)
+        self.assertEqual(serialized_data['config'], to_text(metric.config))
         self.assertEqual(
-            serialized_data['fileparameter'], self.mt3.fileparameter
+            serialized_data['attribute'], to_text(self.mt3.attribute)
+        )
+        self.assertEqual(
+            serialized_data['dependancy'], to_text(self.mt3.dependency)
+        )
+        self.assertEqual(serialized_data['flags'], to_text(self.mt3.flags))
+        self.assertEqual(serialized_data['files'], to_text(self.mt3.files))
+        self.assertEqual(
+            serialized_data['parameter'], to_text(self.mt3.parameter)
+        )
+        self.assertEqual(
+            serialized_data['fileparameter'], to_text(self.mt3.fileparameter)
         )
 
     @patch('Poem.api.internal_views.metrics.inline_metric_for_db')
@@ -1625,7 +1682,7 @@ class ListMetricAPIViewTests(TenantTestCase):
         )[0]['fields']
         self.assertEqual(metric.probeversion, None)
         self.assertEqual(metric.group.name, 'EGI')
-        self.assertEqual(metric.config, '')
+        self.assertEqual(metric.config, [])
         self.assertEqual(serialized_data['name'], metric.name)
         self.assertEqual(serialized_data['mtype'], [self.mt3.mtype.name])
         self.assertEqual(serialized_data['tags'], [])
@@ -1635,14 +1692,20 @@ class ListMetricAPIViewTests(TenantTestCase):
         self.assertEqual(
             serialized_data['probeexecutable'], self.mt3.probeexecutable
         )
-        self.assertEqual(serialized_data['config'], metric.config)
-        self.assertEqual(serialized_data['attribute'], self.mt3.attribute)
-        self.assertEqual(serialized_data['dependancy'], self.mt3.dependency)
-        self.assertEqual(serialized_data['flags'], self.mt3.flags)
-        self.assertEqual(serialized_data['files'], self.mt3.files)
-        self.assertEqual(serialized_data['parameter'], self.mt3.parameter)
+        self.assertEqual(serialized_data['config'], to_text(metric.config))
+        self.assertEqual(
+            serialized_data['attribute'], to_text(self.mt3.attribute)
+        )
+        self.assertEqual(
+            serialized_data['dependancy'], to_text(self.mt3.dependency)
+        )
+        self.assertEqual(serialized_data['flags'], to_text(self.mt3.flags))
+        self.assertEqual(serialized_data['files'], to_text(self.mt3.files))
         self.assertEqual(
-            serialized_data['fileparameter'], self.mt3.fileparameter
+            serialized_data['parameter'], to_text(self.mt3.parameter)
+        )
+        self.assertEqual(
+            serialized_data['fileparameter'], to_text(self.mt3.fileparameter)
         )
 
     @patch('Poem.api.internal_views.metrics.inline_metric_for_db')
@@ -1684,7 +1747,7 @@ class ListMetricAPIViewTests(TenantTestCase):
         )[0]['fields']
         self.assertEqual(metric.probeversion, None)
         self.assertEqual(metric.group.name, 'EGI')
-        self.assertEqual(metric.config, '')
+        self.assertEqual(metric.config, [])
         self.assertEqual(serialized_data['name'], metric.name)
         self.assertEqual(serialized_data['mtype'], [self.mt3.mtype.name])
         self.assertEqual(serialized_data['tags'], [])
@@ -1694,14 +1757,20 @@ class ListMetricAPIViewTests(TenantTestCase):
         self.assertEqual(
             serialized_data['probeexecutable'], self.mt3.probeexecutable
         )
-        self.assertEqual(serialized_data['config'], metric.config)
-        self.assertEqual(serialized_data['attribute'], self.mt3.attribute)
-        self.assertEqual(serialized_data['dependancy'], self.mt3.dependency)
-        self.assertEqual(serialized_data['flags'], self.mt3.flags)
-        self.assertEqual(serialized_data['files'], self.mt3.files)
-        self.assertEqual(serialized_data['parameter'], self.mt3.parameter)
+        self.assertEqual(serialized_data['config'], to_text(metric.config))
+        self.assertEqual(
+            serialized_data['attribute'], to_text(self.mt3.attribute)
+        )
         self.assertEqual(
-            serialized_data['fileparameter'], self.mt3.fileparameter
+            serialized_data['dependancy'], to_text(self.mt3.dependency)
+        )
+        self.assertEqual(serialized_data['flags'], to_text(self.mt3.flags))
+        self.assertEqual(serialized_data['files'], to_text(self.mt3.files))
+        self.assertEqual(
+            serialized_data['parameter'], to_text(self.mt3.parameter)
+        )
+        self.assertEqual(
+            serialized_data['fileparameter'], to_text(self.mt3.fileparameter)
         )
 
     def test_delete_metric_superuser(self):
@@ -2437,6 +2506,12 @@ class UpdateMetricsVersionsTests(TenantTestCase):
             user=self.user.username
         )
 
+    @staticmethod
+    def _plan_id(name, version):
+        return plan_metrics_versions(
+            admin_models.Package.objects.get(name=name, version=version)
+        ).id
+
     def test_permission_denied_if_not_authenticated(self):
         data = {
             'name': self.package2.name,
@@ -2449,7 +2524,7 @@ class UpdateMetricsVersionsTests(TenantTestCase):
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
 
     @patch('Poem.api.internal_views.metrics.delete_metrics_from_profile')
-    @patch('Poem.api.internal_views.metrics.update_metric_in_schema')
+    @patch('Poem.api.internal_views.metrics.apply_metrics_versions')
     def test_update_metrics_versions_when_not_superuser(
             self, mock_update, mock_delete
     ):
@@ -2471,8 +2546,49 @@ class UpdateMetricsVersionsTests(TenantTestCase):
         self.assertFalse(mock_delete.called)
 
     @patch('Poem.api.internal_views.metrics.delete_metrics_from_profile')
-    @patch('Poem.api.internal_views.metrics.update_metric_in_schema')
+    @patch('Poem.api.internal_views.metrics.apply_metrics_versions')
     def test_update_metrics_versions(self, mock_update, mock_delete):
+        mock_update.side_effect = mocked_func
+        mock_delete.side_effect = mocked_func
+        data = {
+            'name': self.package2.name,
+            'version': self.package2.version,
+            'plan': self._plan_id(self.package2.name, self.package2.version)
+        }
+        content, content_type = encode_data(data)
+        request = self.factory.put(self.url, content, content_type=content_type)
+        request.tenant = self.tenant
+        force_authenticate(request, user=self.user)
+        response = self.view(request)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(run_worker(once=True), 1)
+        step = admin_models.JobStep.objects.get(job_id=response.data['id'])
+        self.assertEqual(step.schema_name, self.tenant.schema_name)
+        self.assertEqual(step.status, admin_models.JobStep.DONE)
+        self.assertFalse(mock_delete.called)
+        mock_update.assert_called_once_with(ANY, user='testuser')
+        self.assertEqual(
+            sorted(mock_update.call_args[0][0].update), sorted([
+                ('argo.AMS-Check', self.mt1_history2.id, self.probehistory1.id),
+                (
+                    'argo.AMSPublisher-Check', self.mt2_history2.id,
+                    self.probehistory3.id
+                ),
+            ])
+        )
+        self.assertEqual(
+            step.result,
+            [
+                'Metrics argo.AMS-Check, argo.AMSPublisher-Check have been '
+                'successfully updated.'
+            ]
+        )
+
+    @patch('Poem.api.internal_views.metrics.delete_metrics_from_profile')
+    @patch('Poem.api.internal_views.metrics.apply_metrics_versions')
+    def test_update_metrics_versions_without_plan(
+            self, mock_update, mock_delete
+    ):
         mock_update.side_effect = mocked_func
         mock_delete.side_effect = mocked_func
         data = {
@@ -2484,32 +2600,112 @@ class UpdateMetricsVersionsTests(TenantTestCase):
         request.tenant = self.tenant
         force_authenticate(request, user=self.user)
         response = self.view(request)
-        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(
+            response.data['detail'],
+            'Metrics update has not been reviewed. Please review it first.'
+        )
+        self.assertFalse(admin_models.Job.objects.exists())
+        self.assertFalse(mock_update.called)
         self.assertFalse(mock_delete.called)
-        self.assertEqual(mock_update.call_count, 2)
-        mock_update.assert_has_calls([
-            call(
-                mt_id=self.mt1_history2.id, name='argo.AMS-Check',
-                pk_id=self.probehistory1.id, schema='test',
-                update_from_history=True, user='testuser'
-            ),
-            call(
-                mt_id=self.mt2_history2.id, name='argo.AMSPublisher-Check',
-                pk_id=self.probehistory3.id, schema='test',
-                update_from_history=True, user='testuser'
+
+    @patch('Poem.api.internal_views.metrics.delete_metrics_from_profile')
+    @patch('Poem.api.internal_views.metrics.apply_metrics_versions')
+    def test_update_metrics_versions_with_stale_plan(
+            self, mock_update, mock_delete
+    ):
+        mock_update.side_effect = mocked_func
+        mock_delete.side_effect = mocked_func
+        plan = self._plan_id(self.package2.name, self.package2.version)
+        poem_models.Metric.objects.get(name='argo.AMS-Check').delete()
+        data = {
+            'name': self.package2.name,
+            'version': self.package2.version,
+            'plan': plan
+        }
+        content, content_type = encode_data(data)
+        request = self.factory.put(self.url, content, content_type=content_type)
+        request.tenant = self.tenant
+        force_authenticate(request, user=self.user)
+        response = self.view(request)
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(
+            response.data['detail'],
+            'Metrics have changed since the update was reviewed. Please '
+            'review it again.'
+        )
+        self.assertFalse(mock_update.called)
+        self.assertFalse(mock_delete.called)
+
+    def test_plan_metrics_versions_in_constant_number_of_queries(self):
+        package = admin_models.Package.objects.get(
+            name=self.package2.name, version=self.package2.version
+        )
+        with self.assertNumQueries(3):
+            plan = plan_metrics_versions(package)
+        self.assertEqual(
+            sorted(name for name, _, _ in plan.update),
+            ['argo.AMS-Check', 'argo.AMSPublisher-Check']
+        )
+
+    def test_apply_metrics_versions_saves_metrics_in_bulk(self):
+        plan = plan_metrics_versions(self.package2)
+        ct = ContentType.objects.get_for_model(poem_models.Metric)
+        histories = poem_models.TenantHistory.objects.filter(
+            content_type=ct
+        ).count()
+        with CaptureQueriesContext(connection) as context:
+            updated = apply_metrics_versions(plan, user='testuser')
+        self.assertEqual(
+            sorted(met.name for met in updated),
+            ['argo.AMS-Check', 'argo.AMSPublisher-Check']
+        )
+        for model, statement, count in [
+            (poem_models.Metric, 'UPDATE', 1),
+            (poem_models.TenantHistory, 'INSERT INTO', 1),
+            (admin_models.TenantMetricUsage, 'UPDATE', 1),
+            (admin_models.TenantMetricUsage, 'DELETE FROM', 0)
+        ]:
+            self.assertEqual(
+                len([
+                    query for query in context.captured_queries
+                    if query['sql'].startswith(
+                        f'{statement} "{model._meta.db_table}"'
+                    )
+                ]), count
             )
-        ], any_order=True)
+        metric = poem_models.Metric.objects.get(name='argo.AMS-Check')
+        self.assertEqual(metric.probekey, self.probehistory1)
+        self.assertEqual(metric.probeversion, self.probehistory1.__str__())
         self.assertEqual(
-            response.data,
-            {
-                'updated': 'Metrics argo.AMS-Check, argo.AMSPublisher-Check '
-                           'have been successfully updated.'
-            }
+            poem_models.TenantHistory.objects.filter(
+                content_type=ct
+            ).count(), histories + 2
+        )
+        self.assertEqual(
+            admin_models.TenantMetricUsage.objects.get(
+                schema_name=self.tenant.schema_name, metric_id=metric.id
+            ).probekey, self.probehistory1
+        )
+        self.assertNotEqual(
+            poem_models.TenantHistory.objects.filter(
+                object_id=metric.id, content_type=ct
+            ).order_by('-date_created', '-id')[0].comment, 'Initial version.'
+        )
+        stats = admin_models.TenantStats.objects.get(
+            schema_name=self.tenant.schema_name
+        )
+        recounted = admin_models.TenantStats.objects.refresh(
+            self.tenant.schema_name
+        )
+        self.assertEqual(
+            (stats.metrics, stats.probes),
+            (recounted.metrics, recounted.probes)
         )
 
     @patch('Poem.api.internal_views.metrics.delete_metrics_from_profile')
     @patch('Poem.api.internal_views.metrics.get_metrics_in_profiles')
-    @patch('Poem.api.internal_views.metrics.update_metric_in_schema')
+    @patch('Poem.api.internal_views.metrics.apply_metrics_versions')
     def test_update_metrics_version_if_metric_template_was_renamed(
             self, mock_update, mock_get, mock_delete
     ):
@@ -2562,36 +2758,38 @@ class UpdateMetricsVersionsTests(TenantTestCase):
         mt1_history3.tags.add(self.mtag1, self.mtag2, self.mtag3)
         data = {
             'name': self.package3.name,
-            'version': self.package3.version
+            'version': self.package3.version,
+            'plan': self._plan_id(self.package3.name, self.package3.version)
         }
         content, content_type = encode_data(data)
         request = self.factory.put(self.url, content, content_type=content_type)
         request.tenant = self.tenant
         force_authenticate(request, user=self.user)
         response = self.view(request)
-        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(run_worker(once=True), 1)
+        step = admin_models.JobStep.objects.get(job_id=response.data['id'])
+        self.assertEqual(step.schema_name, self.tenant.schema_name)
+        self.assertEqual(step.status, admin_models.JobStep.DONE)
         self.assertFalse(mock_delete.called)
-        self.assertEqual(mock_update.call_count, 1)
-        mock_update.assert_has_calls([
-            call(
-                mt_id=mt1_history3.id, name='argo.AMS-Check',
-                pk_id=self.probehistory1.id, schema='test',
-                update_from_history=True, user='testuser'
-            )
-        ])
+        mock_update.assert_called_once_with(ANY, user='testuser')
         self.assertEqual(
-            response.data,
-            {
-                'deleted': 'Metric argo.AMSPublisher-Check has been deleted, '
-                           'since its probe is not part of the chosen package.',
-                'updated': 'Metric argo.AMS-Check has been successfully '
-                           'updated.'
-            }
+            sorted(mock_update.call_args[0][0].update), sorted([
+                ('argo.AMS-Check', mt1_history3.id, self.probehistory1.id),
+            ])
+        )
+        self.assertEqual(
+            step.result,
+            [
+                'Metric argo.AMS-Check has been successfully updated.',
+                'Metric argo.AMSPublisher-Check has been deleted, since its '
+                'probe is not part of the chosen package.'
+            ]
         )
 
     @patch('Poem.api.internal_views.metrics.delete_metrics_from_profile')
     @patch('Poem.api.internal_views.metrics.get_metrics_in_profiles')
-    @patch('Poem.api.internal_views.metrics.update_metric_in_schema')
+    @patch('Poem.api.internal_views.metrics.apply_metrics_versions')
     def test_metrics_deleted_if_their_probes_do_not_exist_in_new_package(
             self, mock_update, mock_get, mock_delete
     ):
@@ -2638,63 +2836,65 @@ class UpdateMetricsVersionsTests(TenantTestCase):
         mt1_history3.tags.add(self.mtag1, self.mtag2, self.mtag3)
         data = {
             'name': self.package3.name,
-            'version': self.package3.version
+            'version': self.package3.version,
+            'plan': self._plan_id(self.package3.name, self.package3.version)
         }
         content, content_type = encode_data(data)
         request = self.factory.put(self.url, content, content_type=content_type)
         request.tenant = self.tenant
         force_authenticate(request, user=self.user)
         response = self.view(request)
-        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(run_worker(once=True), 1)
+        step = admin_models.JobStep.objects.get(job_id=response.data['id'])
         self.assertEqual(
-            response.data,
-            {
-                'deleted': 'Metric argo.AMSPublisher-Check has been deleted, '
-                           'since its probe is not part of the chosen package.',
-                'updated': 'Metric argo.AMS-Check has been successfully '
-                           'updated.'
-            }
+            step.result,
+            [
+                'Metric argo.AMS-Check has been successfully updated.',
+                'Metric argo.AMSPublisher-Check has been deleted, since its '
+                'probe is not part of the chosen package.'
+            ]
         )
         mock_delete.assert_called_once_with(
             'PROFILE1', ['argo.AMSPublisher-Check'], "TENANT"
         )
-        self.assertEqual(mock_update.call_count, 1)
-        mock_update.assert_has_calls([
-            call(
-                mt_id=mt1_history3.id, name='argo.AMS-Check',
-                pk_id=self.probehistory1.id, schema='test',
-                update_from_history=True, user='testuser'
-            )
-        ])
+        mock_update.assert_called_once_with(ANY, user='testuser')
+        self.assertEqual(
+            sorted(mock_update.call_args[0][0].update), sorted([
+                ('argo.AMS-Check', mt1_history3.id, self.probehistory1.id),
+            ])
+        )
 
-    @patch('Poem.api.internal_views.metrics.update_metric_in_schema')
+    @patch('Poem.api.internal_views.metrics.apply_metrics_versions')
     def test_metrics_warning_if_metric_template_history_do_not_exist(
             self, mock_update
     ):
         mock_update.side_effect = mocked_func
         data = {
             'name': self.package4.name,
-            'version': self.package4.version
+            'version': self.package4.version,
+            'plan': self._plan_id(self.package4.name, self.package4.version)
         }
         content, content_type = encode_data(data)
         request = self.factory.put(self.url, content, content_type=content_type)
         request.tenant = self.tenant
         force_authenticate(request, user=self.user)
         response = self.view(request)
-        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(run_worker(once=True), 1)
+        step = admin_models.JobStep.objects.get(job_id=response.data['id'])
         self.assertFalse(mock_update.called)
         self.assertEqual(
-            response.data,
-            {
-                'warning': 'Metric template history instance of '
-                           'emi.unicore.Gateway has not been found. '
-                           'Please contact Administrator.'
-            }
+            step.result,
+            [
+                'Metric template history instance of emi.unicore.Gateway has '
+                'not been found. Please contact Administrator.'
+            ]
         )
 
     @patch('Poem.api.internal_views.metrics.delete_metrics_from_profile')
     @patch('Poem.api.internal_views.metrics.get_metrics_in_profiles')
-    @patch('Poem.api.internal_views.metrics.update_metric_in_schema')
+    @patch('Poem.api.internal_views.metrics.apply_metrics_versions')
     def test_metrics_with_update_warning_and_deletion(
             self,  mock_update, mock_get, mock_delete
     ):
@@ -2749,39 +2949,38 @@ class UpdateMetricsVersionsTests(TenantTestCase):
         )
         data = {
             'name': self.package3.name,
-            'version': self.package3.version
+            'version': self.package3.version,
+            'plan': self._plan_id(self.package3.name, self.package3.version)
         }
         content, content_type = encode_data(data)
         request = self.factory.put(self.url, content, content_type=content_type)
         request.tenant = self.tenant
         force_authenticate(request, user=self.user)
         response = self.view(request)
-        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(run_worker(once=True), 1)
+        step = admin_models.JobStep.objects.get(job_id=response.data['id'])
         self.assertRaises(
             poem_models.Metric.DoesNotExist,
             poem_models.Metric.objects.get,
             name='argo.AMSPublisher-Check'
         )
         self.assertEqual(
-            response.data,
-            {
-                'updated': 'Metric argo.AMS-Check has been successfully '
-                           'updated.',
-                'deleted': 'Metric argo.AMSPublisher-Check has been deleted, '
-                           'since its probe is not part of the chosen package.',
-                'warning': 'Metric template history instance of '
-                           'test.AMS-Check has not been found. '
-                           'Please contact Administrator.'
-            }
+            step.result,
+            [
+                'Metric argo.AMS-Check has been successfully updated.',
+                'Metric argo.AMSPublisher-Check has been deleted, since its '
+                'probe is not part of the chosen package.',
+                'Metric template history instance of test.AMS-Check has not '
+                'been found. Please contact Administrator.'
+            ]
+        )
+        mock_update.assert_called_once_with(ANY, user='testuser')
+        self.assertEqual(
+            sorted(mock_update.call_args[0][0].update), sorted([
+                ('argo.AMS-Check', mt1_history3.id, self.probehistory1.id),
+            ])
         )
-        self.assertEqual(mock_update.call_count, 1)
-        mock_update.assert_has_calls([
-            call(
-                mt_id=mt1_history3.id, name='argo.AMS-Check',
-                pk_id=self.probehistory1.id, schema='test',
-                update_from_history=True, user='testuser'
-            )
-        ])
         self.assertEqual(mock_delete.call_count, 2)
         mock_delete.assert_has_calls([
             call('PROFILE1', ['argo.AMSPublisher-Check'], "TENANT"),
@@ -2790,7 +2989,7 @@ class UpdateMetricsVersionsTests(TenantTestCase):
 
     @patch('Poem.api.internal_views.metrics.delete_metrics_from_profile')
     @patch('Poem.api.internal_views.metrics.get_metrics_in_profiles')
-    @patch('Poem.api.internal_views.metrics.update_metric_in_schema')
+    @patch('Poem.api.internal_views.metrics.apply_metrics_versions')
     def test_metrics_with_update_warning_and_deletion_if_api_get_exception(
             self,  mock_update, mock_get, mock_delete
     ):
@@ -2842,48 +3041,46 @@ class UpdateMetricsVersionsTests(TenantTestCase):
         )
         data = {
             'name': self.package3.name,
-            'version': self.package3.version
+            'version': self.package3.version,
+            'plan': self._plan_id(self.package3.name, self.package3.version)
         }
         content, content_type = encode_data(data)
         request = self.factory.put(self.url, content, content_type=content_type)
         request.tenant = self.tenant
         force_authenticate(request, user=self.user)
         response = self.view(request)
-        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(run_worker(once=True), 1)
+        step = admin_models.JobStep.objects.get(job_id=response.data['id'])
         self.assertRaises(
             poem_models.Metric.DoesNotExist,
             poem_models.Metric.objects.get,
             name='argo.AMSPublisher-Check'
         )
         self.assertEqual(
-            response.data,
-            {
-                'updated': 'Metric argo.AMS-Check has been successfully '
-                           'updated.',
-                'deleted': 'Metric argo.AMSPublisher-Check has been deleted, '
-                           'since its probe is not part of the chosen package. '
-                           'WARNING: Unable to get data on metrics and metric '
-                           'profiles. Please remove deleted metrics from '
-                           'metric profiles manually.',
-                'warning': 'Metric template history instance of '
-                           'test.AMS-Check has not been found. '
-                           'Please contact Administrator.'
-            }
+            step.result,
+            [
+                'Metric argo.AMS-Check has been successfully updated.',
+                'Metric argo.AMSPublisher-Check has been deleted, since its '
+                'probe is not part of the chosen package.',
+                'Metric template history instance of test.AMS-Check has not '
+                'been found. Please contact Administrator.',
+                'Unable to get data on metrics and metric profiles. Please '
+                'remove deleted metrics from metric profiles manually.'
+            ]
+        )
+        mock_update.assert_called_once_with(ANY, user='testuser')
+        self.assertEqual(
+            sorted(mock_update.call_args[0][0].update), sorted([
+                ('argo.AMS-Check', mt1_history3.id, self.probehistory1.id),
+            ])
         )
-        self.assertEqual(mock_update.call_count, 1)
-        mock_update.assert_has_calls([
-            call(
-                mt_id=mt1_history3.id, name='argo.AMS-Check',
-                pk_id=self.probehistory1.id, schema='test',
-                update_from_history=True, user='testuser'
-            )
-        ])
         mock_get.assert_called_once_with(self.tenant)
         self.assertFalse(mock_delete.called)
 
     @patch('Poem.api.internal_views.metrics.delete_metrics_from_profile')
     @patch('Poem.api.internal_views.metrics.get_metrics_in_profiles')
-    @patch('Poem.api.internal_views.metrics.update_metric_in_schema')
+    @patch('Poem.api.internal_views.metrics.apply_metrics_versions')
     def test_metrics_with_update_warning_and_deletion_if_api_put_exception(
             self,  mock_update, mock_get, mock_delete
     ):
@@ -2938,48 +3135,46 @@ class UpdateMetricsVersionsTests(TenantTestCase):
         )
         data = {
             'name': self.package3.name,
-            'version': self.package3.version
+            'version': self.package3.version,
+            'plan': self._plan_id(self.package3.name, self.package3.version)
         }
         content, content_type = encode_data(data)
         request = self.factory.put(self.url, content, content_type=content_type)
         request.tenant = self.tenant
         force_authenticate(request, user=self.user)
         response = self.view(request)
-        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(run_worker(once=True), 1)
+        step = admin_models.JobStep.objects.get(job_id=response.data['id'])
         self.assertRaises(
             poem_models.Metric.DoesNotExist,
             poem_models.Metric.objects.get,
             name='argo.AMSPublisher-Check'
         )
         self.assertEqual(
-            response.data,
-            {
-                'updated': 'Metric argo.AMS-Check has been successfully '
-                           'updated.',
-                'deleted': 'Metric argo.AMSPublisher-Check has been deleted, '
-                           'since its probe is not part of the chosen package. '
-                           'WARNING: Error trying to remove metric '
-                           'argo.AMSPublisher-Check from profile PROFILE1. '
-                           'Please remove it manually.',
-                'warning': 'Metric template history instance of '
-                           'test.AMS-Check has not been found. '
-                           'Please contact Administrator.'
-            }
+            step.result,
+            [
+                'Metric argo.AMS-Check has been successfully updated.',
+                'Metric argo.AMSPublisher-Check has been deleted, since its '
+                'probe is not part of the chosen package.',
+                'Metric template history instance of test.AMS-Check has not '
+                'been found. Please contact Administrator.',
+                'Error trying to remove metric argo.AMSPublisher-Check from '
+                'profile PROFILE1. Please remove it manually.'
+            ]
+        )
+        mock_update.assert_called_once_with(ANY, user='testuser')
+        self.assertEqual(
+            sorted(mock_update.call_args[0][0].update), sorted([
+                ('argo.AMS-Check', mt1_history3.id, self.probehistory1.id),
+            ])
         )
-        self.assertEqual(mock_update.call_count, 1)
-        mock_update.assert_has_calls([
-            call(
-                mt_id=mt1_history3.id, name='argo.AMS-Check',
-                pk_id=self.probehistory1.id, schema='test',
-                update_from_history=True, user='testuser'
-            )
-        ])
         mock_get.assert_called_once_with(self.tenant)
         mock_delete.assert_called_once_with(
             'PROFILE1', ['argo.AMSPublisher-Check'], "TENANT"
         )
 
-    @patch('Poem.api.internal_views.metrics.update_metric_in_schema')
+    @patch('Poem.api.internal_views.metrics.apply_metrics_versions')
     def test_update_metrics_if_package_not_found(self, mock_update):
         mock_update.side_effect = mocked_func
         data = {
@@ -2996,7 +3191,7 @@ class UpdateMetricsVersionsTests(TenantTestCase):
         self.assertFalse(mock_update.called)
 
     @patch('Poem.api.internal_views.metrics.get_metrics_in_profiles')
-    @patch('Poem.api.internal_views.metrics.update_metric_in_schema')
+    @patch('Poem.api.internal_views.metrics.apply_metrics_versions')
     def test_update_metrics_versions_dry_run(self, mock_update, mock_get):
         mock_update.side_effect = mocked_func
         mock_get.return_value = {
@@ -3013,13 +3208,14 @@ class UpdateMetricsVersionsTests(TenantTestCase):
         self.assertEqual(
             response.data,
             {
+                'plan': self._plan_id('nagios-plugins-argo', '0.1.8'),
                 'updated': 'Metrics argo.AMS-Check, argo.AMSPublisher-Check '
                            'will be updated.'
             }
         )
 
     @patch('Poem.api.internal_views.metrics.get_metrics_in_profiles')
-    @patch('Poem.api.internal_views.metrics.update_metric_in_schema')
+    @patch('Poem.api.internal_views.metrics.apply_metrics_versions')
     def test_update_metrics_version_if_metric_template_was_renamed_dry_run(
             self, mock_update, mock_get
     ):
@@ -3084,6 +3280,7 @@ class UpdateMetricsVersionsTests(TenantTestCase):
         self.assertEqual(
             response.data,
             {
+                'plan': self._plan_id('nagios-plugins-argo', '0.1.9'),
                 'deleted': 'Metric argo.AMSPublisher-Check will be deleted, '
                            'since its probe is not part of the chosen package. '
                            'WARNING: Metric argo.AMSPublisher-Check is part of '
@@ -3094,7 +3291,7 @@ class UpdateMetricsVersionsTests(TenantTestCase):
         )
 
     @patch('Poem.api.internal_views.metrics.get_metrics_in_profiles')
-    @patch('Poem.api.internal_views.metrics.update_metric_in_schema')
+    @patch('Poem.api.internal_views.metrics.apply_metrics_versions')
     def test_metrics_deleted_if_their_probes_do_not_exist_in_new_package_dry(
             self, mock_update, mock_get
     ):
@@ -3147,6 +3344,7 @@ class UpdateMetricsVersionsTests(TenantTestCase):
         self.assertEqual(
             response.data,
             {
+                'plan': self._plan_id('nagios-plugins-argo', '0.1.9'),
                 'deleted': 'Metric argo.AMSPublisher-Check will be deleted, '
                            'since its probe is not part of the chosen package.',
                 'updated': 'Metric argo.AMS-Check will be updated.'
@@ -3156,7 +3354,7 @@ class UpdateMetricsVersionsTests(TenantTestCase):
         mock_get.assert_called_once()
 
     @patch('Poem.api.internal_views.metrics.get_metrics_in_profiles')
-    @patch('Poem.api.internal_views.metrics.update_metric_in_schema')
+    @patch('Poem.api.internal_views.metrics.apply_metrics_versions')
     def test_metrics_warning_if_metric_template_history_do_not_exist_dry_run(
             self, mock_update, mock_get
     ):
@@ -3175,6 +3373,7 @@ class UpdateMetricsVersionsTests(TenantTestCase):
         self.assertEqual(
             response.data,
             {
+                'plan': self._plan_id('unicore-nagios-plugins', '2.5.0'),
                 'warning': 'Metric template history instance of '
                            'emi.unicore.Gateway has not been found. '
                            'Please contact Administrator.'
@@ -3182,7 +3381,7 @@ class UpdateMetricsVersionsTests(TenantTestCase):
         )
 
     @patch('Poem.api.internal_views.metrics.get_metrics_in_profiles')
-    @patch('Poem.api.internal_views.metrics.update_metric_in_schema')
+    @patch('Poem.api.internal_views.metrics.apply_metrics_versions')
     def test_metrics_with_update_warning_and_deletion_dry(
             self,  mock_update, mock_get
     ):
@@ -3244,6 +3443,7 @@ class UpdateMetricsVersionsTests(TenantTestCase):
         self.assertEqual(
             response.data,
             {
+                'plan': self._plan_id('nagios-plugins-argo', '0.1.9'),
                 'updated': 'Metric argo.AMS-Check will be updated.',
                 'deleted': 'Metric argo.AMSPublisher-Check will be deleted, '
                            'since its probe is not part of the chosen package. '
@@ -3259,7 +3459,7 @@ class UpdateMetricsVersionsTests(TenantTestCase):
         mock_get.assert_called_once()
 
     @patch('Poem.api.internal_views.metrics.get_metrics_in_profiles')
-    @patch('Poem.api.internal_views.metrics.update_metric_in_schema')
+    @patch('Poem.api.internal_views.metrics.apply_metrics_versions')
     def test_update_metrics_if_metrics_in_profiles_wrong_token_dry_run(
             self, mock_update, mock_get
     ):
@@ -3292,7 +3492,7 @@ class UpdateMetricsVersionsTests(TenantTestCase):
         self.assertFalse(mock_update.called)
 
     @patch('Poem.api.internal_views.metrics.get_metrics_in_profiles')
-    @patch('Poem.api.internal_views.metrics.update_metric_in_schema')
+    @patch('Poem.api.internal_views.metrics.apply_metrics_versions')
     def test_update_metrics_if_metrics_in_profiles_page_not_found_dry_run(
             self, mock_update, mock_get
     ):
@@ -3314,7 +3514,7 @@ class UpdateMetricsVersionsTests(TenantTestCase):
         self.assertFalse(mock_update.called)
 
     @patch('Poem.api.internal_views.metrics.get_metrics_in_profiles')
-    @patch('Poem.api.internal_views.metrics.update_metric_in_schema')
+    @patch('Poem.api.internal_views.metrics.apply_metrics_versions')
     def test_update_metrics_if_metrics_in_profiles_api_key_not_found_dry_run(
             self, mock_update, mock_get
     ):
@@ -6,6 +6,7 @@ import requests
 from Poem.api import views_internal as views
 from Poem.api.internal_views.utils import WebApiException
 from Poem.helpers.history_helpers import create_comment, serialize_metric
+from Poem.helpers.job_helpers import run_worker
 from Poem.poem import models as poem_models
 from Poem.poem_super_admin import models as admin_models
 from Poem.tenants.models import Tenant
@@ -1863,16 +1864,18 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(mt.probeexecutable, '["ams-probe"]')
         self.assertEqual(
             mt.config,
-            '["maxCheckAttempts 4", "timeout 70", '
-            '"path /usr/libexec/argo-monitoring/probes/argo", '
-            '"interval 6", "retryInterval 4"]'
-        )
-        self.assertEqual(mt.attribute, '["attr-key attr-val"]')
-        self.assertEqual(mt.dependency, '["dep-key dep-val"]')
-        self.assertEqual(mt.flags, '["flag-key flag-val"]')
-        self.assertEqual(mt.files, '["file-key file-val"]')
-        self.assertEqual(mt.parameter, '["par-key par-val"]')
-        self.assertEqual(mt.fileparameter, '["fp-key fp-val"]')
+            [
+                ['maxCheckAttempts', '4'], ['timeout', '70'],
+                ['path', '/usr/libexec/argo-monitoring/probes/argo'],
+                ['interval', '6'], ['retryInterval', '4']
+            ]
+        )
+        self.assertEqual(mt.attribute, [['attr-key', 'attr-val']])
+        self.assertEqual(mt.dependency, [['dep-key', 'dep-val']])
+        self.assertEqual(mt.flags, [['flag-key', 'flag-val']])
+        self.assertEqual(mt.files, [['file-key', 'file-val']])
+        self.assertEqual(mt.parameter, [['par-key', 'par-val']])
+        self.assertEqual(mt.fileparameter, [['fp-key', 'fp-val']])
         self.assertEqual(versions[0].name, mt.name)
         self.assertEqual(versions[0].mtype, mt.mtype)
         self.assertTrue(self.tag1 in versions[0].tags.all())
@@ -2105,16 +2108,18 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(mt.probeexecutable, '["ams-probe"]')
         self.assertEqual(
             mt.config,
-            '["maxCheckAttempts 4", "timeout 70", '
-            '"path /usr/libexec/argo-monitoring/probes/argo", '
-            '"interval 6", "retryInterval 4"]'
-        )
-        self.assertEqual(mt.attribute, '["attr-key attr-val"]')
-        self.assertEqual(mt.dependency, '["dep-key dep-val"]')
-        self.assertEqual(mt.flags, '["flag-key flag-val"]')
-        self.assertEqual(mt.files, '["file-key file-val"]')
-        self.assertEqual(mt.parameter, '["par-key par-val"]')
-        self.assertEqual(mt.fileparameter, '["fp-key fp-val"]')
+            [
+                ['maxCheckAttempts', '4'], ['timeout', '70'],
+                ['path', '/usr/libexec/argo-monitoring/probes/argo'],
+                ['interval', '6'], ['retryInterval', '4']
+            ]
+        )
+        self.assertEqual(mt.attribute, [['attr-key', 'attr-val']])
+        self.assertEqual(mt.dependency, [['dep-key', 'dep-val']])
+        self.assertEqual(mt.flags, [['flag-key', 'flag-val']])
+        self.assertEqual(mt.files, [['file-key', 'file-val']])
+        self.assertEqual(mt.parameter, [['par-key', 'par-val']])
+        self.assertEqual(mt.fileparameter, [['fp-key', 'fp-val']])
         self.assertEqual(versions[0].name, mt.name)
         self.assertEqual(versions[0].mtype, mt.mtype)
         self.assertTrue(self.tag1 in versions[0].tags.all())
@@ -2374,16 +2379,18 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(mt.probeexecutable, '["ams-probe"]')
         self.assertEqual(
             mt.config,
-            '["maxCheckAttempts 4", "timeout 70", '
-            '"path /usr/libexec/argo-monitoring/probes/argo", '
-            '"interval 6", "retryInterval 4"]'
-        )
-        self.assertEqual(mt.attribute, '["attr-key attr-val"]')
-        self.assertEqual(mt.dependency, '["dep-key dep-val"]')
-        self.assertEqual(mt.flags, '["flag-key flag-val"]')
-        self.assertEqual(mt.files, '["file-key file-val"]')
-        self.assertEqual(mt.parameter, '["par-key par-val"]')
-        self.assertEqual(mt.fileparameter, '["fp-key fp-val"]')
+            [
+                ['maxCheckAttempts', '4'], ['timeout', '70'],
+                ['path', '/usr/libexec/argo-monitoring/probes/argo'],
+                ['interval', '6'], ['retryInterval', '4']
+            ]
+        )
+        self.assertEqual(mt.attribute, [['attr-key', 'attr-val']])
+        self.assertEqual(mt.dependency, [['dep-key', 'dep-val']])
+        self.assertEqual(mt.flags, [['flag-key', 'flag-val']])
+        self.assertEqual(mt.files, [['file-key', 'file-val']])
+        self.assertEqual(mt.parameter, [['par-key', 'par-val']])
+        self.assertEqual(mt.fileparameter, [['fp-key', 'fp-val']])
         self.assertEqual(versions[0].name, mt.name)
         self.assertEqual(versions[0].mtype, mt.mtype)
         self.assertFalse(versions[0].tags.all())
@@ -2617,16 +2624,18 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(mt.probeexecutable, '["ams-probe"]')
         self.assertEqual(
             mt.config,
-            '["maxCheckAttempts 4", "timeout 70", '
-            '"path /usr/libexec/argo-monitoring/probes/argo", '
-            '"interval 6", "retryInterval 4"]'
-        )
-        self.assertEqual(mt.attribute, '["attr-key attr-val"]')
-        self.assertEqual(mt.dependency, '["dep-key dep-val"]')
-        self.assertEqual(mt.flags, '["flag-key flag-val"]')
-        self.assertEqual(mt.files, '["file-key file-val"]')
-        self.assertEqual(mt.parameter, '["par-key par-val"]')
-        self.assertEqual(mt.fileparameter, '["fp-key fp-val"]')
+            [
+                ['maxCheckAttempts', '4'], ['timeout', '70'],
+                ['path', '/usr/libexec/argo-monitoring/probes/argo'],
+                ['interval', '6'], ['retryInterval', '4']
+            ]
+        )
+        self.assertEqual(mt.attribute, [['attr-key', 'attr-val']])
+        self.assertEqual(mt.dependency, [['dep-key', 'dep-val']])
+        self.assertEqual(mt.flags, [['flag-key', 'flag-val']])
+        self.assertEqual(mt.files, [['file-key', 'file-val']])
+        self.assertEqual(mt.parameter, [['par-key', 'par-val']])
+        self.assertEqual(mt.fileparameter, [['fp-key', 'fp-val']])
         self.assertEqual(versions[0].name, mt.name)
         self.assertEqual(versions[0].mtype, mt.mtype)
         self.assertTrue(self.tag1 in versions[0].tags.all())
@@ -3486,7 +3495,7 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(admin_models.MetricTemplate.objects.all().count(), 8)
 
     @patch("Poem.api.internal_views.metrictemplates.sync_tags_webapi")
-    @patch('Poem.api.internal_views.metrictemplates.update_metrics')
+    @patch('Poem.api.internal_views.jobs.update_metric_in_schema')
     @patch('Poem.api.internal_views.metrictemplates.inline_metric_for_db')
     def test_put_metrictemplate_without_changing_probekey_sp_superuser(
             self, inline, update, mock_sync
@@ -3527,11 +3536,15 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         request.tenant = self.public_tenant
         force_authenticate(request, user=self.superuser)
         response = self.view(request)
-        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(run_worker(once=True), 1)
         mock_sync.assert_called_once()
         mt = admin_models.MetricTemplate.objects.get(id=self.metrictemplate1.id)
         update.assert_called_once()
-        update.assert_called_with(mt, 'argo.AMS-Check', self.ams_probe_11)
+        update.assert_called_with(
+            mt_id=mt.id, name='argo.AMS-Check', pk_id=self.ams_probe_11.id,
+            schema=self.tenant.schema_name, user='poem'
+        )
         versions = admin_models.MetricTemplateHistory.objects.filter(
             object_id=mt
         ).order_by('-date_created')
@@ -3577,16 +3590,18 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(mt.probeexecutable, '["ams-probe"]')
         self.assertEqual(
             mt.config,
-            '["maxCheckAttempts 4", "timeout 70", '
-            '"path /usr/libexec/argo-monitoring/probes/argo", '
-            '"interval 6", "retryInterval 4"]'
-        )
-        self.assertEqual(mt.attribute, '["argo.ams_TOKEN2 --token"]')
-        self.assertEqual(mt.dependency, '["dep-key dep-val"]')
-        self.assertEqual(mt.flags, '["flag-key flag-val"]')
-        self.assertEqual(mt.files, '["file-key file-val"]')
-        self.assertEqual(mt.parameter, '["par-key par-val"]')
-        self.assertEqual(mt.fileparameter, '["fp-key fp-val"]')
+            [
+                ['maxCheckAttempts', '4'], ['timeout', '70'],
+                ['path', '/usr/libexec/argo-monitoring/probes/argo'],
+                ['interval', '6'], ['retryInterval', '4']
+            ]
+        )
+        self.assertEqual(mt.attribute, [['argo.ams_TOKEN2', '--token']])
+        self.assertEqual(mt.dependency, [['dep-key', 'dep-val']])
+        self.assertEqual(mt.flags, [['flag-key', 'flag-val']])
+        self.assertEqual(mt.files, [['file-key', 'file-val']])
+        self.assertEqual(mt.parameter, [['par-key', 'par-val']])
+        self.assertEqual(mt.fileparameter, [['fp-key', 'fp-val']])
         self.assertEqual(versions[0].name, mt.name)
         self.assertEqual(versions[0].mtype, mt.mtype)
         self.assertEqual(set(versions[0].tags.all()), set(mt.tags.all()))
@@ -3602,7 +3617,7 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(versions[0].fileparameter, mt.fileparameter)
 
     @patch("Poem.api.internal_views.metrictemplates.sync_tags_webapi")
-    @patch('Poem.api.internal_views.metrictemplates.update_metrics')
+    @patch('Poem.api.internal_views.jobs.update_metric_in_schema')
     @patch('Poem.api.internal_views.metrictemplates.inline_metric_for_db')
     def test_put_metrictemplate_without_changing_probekey_sp_user(
             self, inline, update, mock_sync
@@ -3679,16 +3694,18 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(mt.probeexecutable, '["ams-probe"]')
         self.assertEqual(
             mt.config,
-            '["maxCheckAttempts 4", "timeout 70", '
-            '"path /usr/libexec/argo-monitoring/", '
-            '"interval 5", "retryInterval 3"]'
-        )
-        self.assertEqual(mt.attribute, '["argo.ams_TOKEN --token"]')
-        self.assertEqual(mt.dependency, '')
-        self.assertEqual(mt.flags, '["OBSESS 1"]')
-        self.assertEqual(mt.files, '')
-        self.assertEqual(mt.parameter, '["--project EGI"]')
-        self.assertEqual(mt.fileparameter, '')
+            [
+                ['maxCheckAttempts', '4'], ['timeout', '70'],
+                ['path', '/usr/libexec/argo-monitoring/'], ['interval', '5'],
+                ['retryInterval', '3']
+            ]
+        )
+        self.assertEqual(mt.attribute, [['argo.ams_TOKEN', '--token']])
+        self.assertEqual(mt.dependency, [])
+        self.assertEqual(mt.flags, [['OBSESS', '1']])
+        self.assertEqual(mt.files, [])
+        self.assertEqual(mt.parameter, [['--project', 'EGI']])
+        self.assertEqual(mt.fileparameter, [])
         self.assertEqual(versions[0].name, mt.name)
         self.assertEqual(versions[0].mtype, mt.mtype)
         self.assertEqual(set(versions[0].tags.all()), set(mt.tags.all()))
@@ -3704,7 +3721,7 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(versions[0].fileparameter, mt.fileparameter)
 
     @patch("Poem.api.internal_views.metrictemplates.sync_tags_webapi")
-    @patch('Poem.api.internal_views.metrictemplates.update_metrics')
+    @patch('Poem.api.internal_views.jobs.update_metric_in_schema')
     @patch('Poem.api.internal_views.metrictemplates.inline_metric_for_db')
     def test_put_metrictemplate_without_changing_probekey_tenant_superuser(
             self, inline, update, mock_sync
@@ -3781,16 +3798,18 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(mt.probeexecutable, '["ams-probe"]')
         self.assertEqual(
             mt.config,
-            '["maxCheckAttempts 4", "timeout 70", '
-            '"path /usr/libexec/argo-monitoring/", '
-            '"interval 5", "retryInterval 3"]'
-        )
-        self.assertEqual(mt.attribute, '["argo.ams_TOKEN --token"]')
-        self.assertEqual(mt.dependency, '')
-        self.assertEqual(mt.flags, '["OBSESS 1"]')
-        self.assertEqual(mt.files, '')
-        self.assertEqual(mt.parameter, '["--project EGI"]')
-        self.assertEqual(mt.fileparameter, '')
+            [
+                ['maxCheckAttempts', '4'], ['timeout', '70'],
+                ['path', '/usr/libexec/argo-monitoring/'], ['interval', '5'],
+                ['retryInterval', '3']
+            ]
+        )
+        self.assertEqual(mt.attribute, [['argo.ams_TOKEN', '--token']])
+        self.assertEqual(mt.dependency, [])
+        self.assertEqual(mt.flags, [['OBSESS', '1']])
+        self.assertEqual(mt.files, [])
+        self.assertEqual(mt.parameter, [['--project', 'EGI']])
+        self.assertEqual(mt.fileparameter, [])
         self.assertEqual(versions[0].name, mt.name)
         self.assertEqual(versions[0].mtype, mt.mtype)
         self.assertEqual(set(versions[0].tags.all()), set(mt.tags.all()))
@@ -3806,7 +3825,7 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(versions[0].fileparameter, mt.fileparameter)
 
     @patch("Poem.api.internal_views.metrictemplates.sync_tags_webapi")
-    @patch('Poem.api.internal_views.metrictemplates.update_metrics')
+    @patch('Poem.api.internal_views.jobs.update_metric_in_schema')
     @patch('Poem.api.internal_views.metrictemplates.inline_metric_for_db')
     def test_put_metrictemplate_without_changing_probekey_tenant_user(
             self, inline, update, mock_sync
@@ -3883,16 +3902,18 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(mt.probeexecutable, '["ams-probe"]')
         self.assertEqual(
             mt.config,
-            '["maxCheckAttempts 4", "timeout 70", '
-            '"path /usr/libexec/argo-monitoring/", '
-            '"interval 5", "retryInterval 3"]'
-        )
-        self.assertEqual(mt.attribute, '["argo.ams_TOKEN --token"]')
-        self.assertEqual(mt.dependency, '')
-        self.assertEqual(mt.flags, '["OBSESS 1"]')
-        self.assertEqual(mt.files, '')
-        self.assertEqual(mt.parameter, '["--project EGI"]')
-        self.assertEqual(mt.fileparameter, '')
+            [
+                ['maxCheckAttempts', '4'], ['timeout', '70'],
+                ['path', '/usr/libexec/argo-monitoring/'], ['interval', '5'],
+                ['retryInterval', '3']
+            ]
+        )
+        self.assertEqual(mt.attribute, [['argo.ams_TOKEN', '--token']])
+        self.assertEqual(mt.dependency, [])
+        self.assertEqual(mt.flags, [['OBSESS', '1']])
+        self.assertEqual(mt.files, [])
+        self.assertEqual(mt.parameter, [['--project', 'EGI']])
+        self.assertEqual(mt.fileparameter, [])
         self.assertEqual(versions[0].name, mt.name)
         self.assertEqual(versions[0].mtype, mt.mtype)
         self.assertEqual(set(versions[0].tags.all()), set(mt.tags.all()))
@@ -3908,7 +3929,7 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(versions[0].fileparameter, mt.fileparameter)
 
     @patch("Poem.api.internal_views.metrictemplates.sync_tags_webapi")
-    @patch('Poem.api.internal_views.metrictemplates.update_metrics')
+    @patch('Poem.api.internal_views.jobs.update_metric_in_schema')
     @patch('Poem.api.internal_views.metrictemplates.inline_metric_for_db')
     def test_put_metrictemplate_sync_error_sp_superuser(
             self, inline, update, mock_sync
@@ -3949,7 +3970,8 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         request.tenant = self.public_tenant
         force_authenticate(request, user=self.superuser)
         response = self.view(request)
-        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(run_worker(once=True), 1)
         self.assertEqual(
             response.data["detail"],
             "Error syncing metric tags: 400 BAD REQUEST"
@@ -3957,7 +3979,10 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         mock_sync.assert_called_once()
         mt = admin_models.MetricTemplate.objects.get(id=self.metrictemplate1.id)
         update.assert_called_once()
-        update.assert_called_with(mt, 'argo.AMS-Check', self.ams_probe_11)
+        update.assert_called_with(
+            mt_id=mt.id, name='argo.AMS-Check', pk_id=self.ams_probe_11.id,
+            schema=self.tenant.schema_name, user='poem'
+        )
         versions = admin_models.MetricTemplateHistory.objects.filter(
             object_id=mt
         ).order_by('-date_created')
@@ -4003,16 +4028,18 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(mt.probeexecutable, '["ams-probe"]')
         self.assertEqual(
             mt.config,
-            '["maxCheckAttempts 4", "timeout 70", '
-            '"path /usr/libexec/argo-monitoring/probes/argo", '
-            '"interval 6", "retryInterval 4"]'
-        )
-        self.assertEqual(mt.attribute, '["argo.ams_TOKEN2 --token"]')
-        self.assertEqual(mt.dependency, '["dep-key dep-val"]')
-        self.assertEqual(mt.flags, '["flag-key flag-val"]')
-        self.assertEqual(mt.files, '["file-key file-val"]')
-        self.assertEqual(mt.parameter, '["par-key par-val"]')
-        self.assertEqual(mt.fileparameter, '["fp-key fp-val"]')
+            [
+                ['maxCheckAttempts', '4'], ['timeout', '70'],
+                ['path', '/usr/libexec/argo-monitoring/probes/argo'],
+                ['interval', '6'], ['retryInterval', '4']
+            ]
+        )
+        self.assertEqual(mt.attribute, [['argo.ams_TOKEN2', '--token']])
+        self.assertEqual(mt.dependency, [['dep-key', 'dep-val']])
+        self.assertEqual(mt.flags, [['flag-key', 'flag-val']])
+        self.assertEqual(mt.files, [['file-key', 'file-val']])
+        self.assertEqual(mt.parameter, [['par-key', 'par-val']])
+        self.assertEqual(mt.fileparameter, [['fp-key', 'fp-val']])
         self.assertEqual(versions[0].name, mt.name)
         self.assertEqual(versions[0].mtype, mt.mtype)
         self.assertEqual(set(versions[0].tags.all()), set(mt.tags.all()))
@@ -4028,7 +4055,7 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(versions[0].fileparameter, mt.fileparameter)
 
     @patch("Poem.api.internal_views.metrictemplates.sync_tags_webapi")
-    @patch('Poem.api.internal_views.metrictemplates.update_metrics')
+    @patch('Poem.api.internal_views.jobs.update_metric_in_schema')
     @patch('Poem.api.internal_views.metrictemplates.inline_metric_for_db')
     def test_put_metrictemplate_sync_error_sp_user(
             self, inline, update, mock_sync
@@ -4105,16 +4132,18 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(mt.probeexecutable, '["ams-probe"]')
         self.assertEqual(
             mt.config,
-            '["maxCheckAttempts 4", "timeout 70", '
-            '"path /usr/libexec/argo-monitoring/", '
-            '"interval 5", "retryInterval 3"]'
-        )
-        self.assertEqual(mt.attribute, '["argo.ams_TOKEN --token"]')
-        self.assertEqual(mt.dependency, '')
-        self.assertEqual(mt.flags, '["OBSESS 1"]')
-        self.assertEqual(mt.files, '')
-        self.assertEqual(mt.parameter, '["--project EGI"]')
-        self.assertEqual(mt.fileparameter, '')
+            [
+                ['maxCheckAttempts', '4'], ['timeout', '70'],
+                ['path', '/usr/libexec/argo-monitoring/'], ['interval', '5'],
+                ['retryInterval', '3']
+            ]
+        )
+        self.assertEqual(mt.attribute, [['argo.ams_TOKEN', '--token']])
+        self.assertEqual(mt.dependency, [])
+        self.assertEqual(mt.flags, [['OBSESS', '1']])
+        self.assertEqual(mt.files, [])
+        self.assertEqual(mt.parameter, [['--project', 'EGI']])
+        self.assertEqual(mt.fileparameter, [])
         self.assertEqual(versions[0].name, mt.name)
         self.assertEqual(versions[0].mtype, mt.mtype)
         self.assertEqual(set(versions[0].tags.all()), set(mt.tags.all()))
@@ -4130,7 +4159,7 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(versions[0].fileparameter, mt.fileparameter)
 
     @patch("Poem.api.internal_views.metrictemplates.sync_tags_webapi")
-    @patch('Poem.api.internal_views.metrictemplates.update_metrics')
+    @patch('Poem.api.internal_views.jobs.update_metric_in_schema')
     @patch('Poem.api.internal_views.metrictemplates.inline_metric_for_db')
     def test_put_metrictemplate_sync_error_tenant_superuser(
             self, inline, update, mock_sync
@@ -4207,16 +4236,18 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(mt.probeexecutable, '["ams-probe"]')
         self.assertEqual(
             mt.config,
-            '["maxCheckAttempts 4", "timeout 70", '
-            '"path /usr/libexec/argo-monitoring/", '
-            '"interval 5", "retryInterval 3"]'
-        )
-        self.assertEqual(mt.attribute, '["argo.ams_TOKEN --token"]')
-        self.assertEqual(mt.dependency, '')
-        self.assertEqual(mt.flags, '["OBSESS 1"]')
-        self.assertEqual(mt.files, '')
-        self.assertEqual(mt.parameter, '["--project EGI"]')
-        self.assertEqual(mt.fileparameter, '')
+            [
+                ['maxCheckAttempts', '4'], ['timeout', '70'],
+                ['path', '/usr/libexec/argo-monitoring/'], ['interval', '5'],
+                ['retryInterval', '3']
+            ]
+        )
+        self.assertEqual(mt.attribute, [['argo.ams_TOKEN', '--token']])
+        self.assertEqual(mt.dependency, [])
+        self.assertEqual(mt.flags, [['OBSESS', '1']])
+        self.assertEqual(mt.files, [])
+        self.assertEqual(mt.parameter, [['--project', 'EGI']])
+        self.assertEqual(mt.fileparameter, [])
         self.assertEqual(versions[0].name, mt.name)
         self.assertEqual(versions[0].mtype, mt.mtype)
         self.assertEqual(set(versions[0].tags.all()), set(mt.tags.all()))
@@ -4232,7 +4263,7 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(versions[0].fileparameter, mt.fileparameter)
 
     @patch("Poem.api.internal_views.metrictemplates.sync_tags_webapi")
-    @patch('Poem.api.internal_views.metrictemplates.update_metrics')
+    @patch('Poem.api.internal_views.jobs.update_metric_in_schema')
     @patch('Poem.api.internal_views.metrictemplates.inline_metric_for_db')
     def test_put_metrictemplate_sync_error_tenant_user(
             self, inline, update, mock_sync
@@ -4309,16 +4340,18 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(mt.probeexecutable, '["ams-probe"]')
         self.assertEqual(
             mt.config,
-            '["maxCheckAttempts 4", "timeout 70", '
-            '"path /usr/libexec/argo-monitoring/", '
-            '"interval 5", "retryInterval 3"]'
-        )
-        self.assertEqual(mt.attribute, '["argo.ams_TOKEN --token"]')
-        self.assertEqual(mt.dependency, '')
-        self.assertEqual(mt.flags, '["OBSESS 1"]')
-        self.assertEqual(mt.files, '')
-        self.assertEqual(mt.parameter, '["--project EGI"]')
-        self.assertEqual(mt.fileparameter, '')
+            [
+                ['maxCheckAttempts', '4'], ['timeout', '70'],
+                ['path', '/usr/libexec/argo-monitoring/'], ['interval', '5'],
+                ['retryInterval', '3']
+            ]
+        )
+        self.assertEqual(mt.attribute, [['argo.ams_TOKEN', '--token']])
+        self.assertEqual(mt.dependency, [])
+        self.assertEqual(mt.flags, [['OBSESS', '1']])
+        self.assertEqual(mt.files, [])
+        self.assertEqual(mt.parameter, [['--project', 'EGI']])
+        self.assertEqual(mt.fileparameter, [])
         self.assertEqual(versions[0].name, mt.name)
         self.assertEqual(versions[0].mtype, mt.mtype)
         self.assertEqual(set(versions[0].tags.all()), set(mt.tags.all()))
@@ -4334,7 +4367,7 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(versions[0].fileparameter, mt.fileparameter)
 
     @patch("Poem.api.internal_views.metrictemplates.sync_tags_webapi")
-    @patch('Poem.api.internal_views.metrictemplates.update_metrics')
+    @patch('Poem.api.internal_views.jobs.update_metric_in_schema')
     @patch('Poem.api.internal_views.metrictemplates.inline_metric_for_db')
     def test_put_mttemplate_without_changing_prbkey_with_nonexist_tag_sp_spusr(
             self, inline, update, mock_sync
@@ -4380,12 +4413,16 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         request.tenant = self.public_tenant
         force_authenticate(request, user=self.superuser)
         response = self.view(request)
-        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(run_worker(once=True), 1)
         mock_sync.assert_called_once()
         mt = admin_models.MetricTemplate.objects.get(id=self.metrictemplate1.id)
         new_tag = admin_models.MetricTags.objects.get(name='new_tag')
         update.assert_called_once()
-        update.assert_called_with(mt, 'argo.AMS-Check', self.ams_probe_11)
+        update.assert_called_with(
+            mt_id=mt.id, name='argo.AMS-Check', pk_id=self.ams_probe_11.id,
+            schema=self.tenant.schema_name, user='poem'
+        )
         versions = admin_models.MetricTemplateHistory.objects.filter(
             object_id=mt
         ).order_by('-date_created')
@@ -4431,16 +4468,18 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(mt.probeexecutable, '["ams-probe"]')
         self.assertEqual(
             mt.config,
-            '["maxCheckAttempts 4", "timeout 70", '
-            '"path /usr/libexec/argo-monitoring/probes/argo", '
-            '"interval 6", "retryInterval 4"]'
-        )
-        self.assertEqual(mt.attribute, '["argo.ams_TOKEN2 --token"]')
-        self.assertEqual(mt.dependency, '["dep-key dep-val"]')
-        self.assertEqual(mt.flags, '["flag-key flag-val"]')
-        self.assertEqual(mt.files, '["file-key file-val"]')
-        self.assertEqual(mt.parameter, '["par-key par-val"]')
-        self.assertEqual(mt.fileparameter, '["fp-key fp-val"]')
+            [
+                ['maxCheckAttempts', '4'], ['timeout', '70'],
+                ['path', '/usr/libexec/argo-monitoring/probes/argo'],
+                ['interval', '6'], ['retryInterval', '4']
+            ]
+        )
+        self.assertEqual(mt.attribute, [['argo.ams_TOKEN2', '--token']])
+        self.assertEqual(mt.dependency, [['dep-key', 'dep-val']])
+        self.assertEqual(mt.flags, [['flag-key', 'flag-val']])
+        self.assertEqual(mt.files, [['file-key', 'file-val']])
+        self.assertEqual(mt.parameter, [['par-key', 'par-val']])
+        self.assertEqual(mt.fileparameter, [['fp-key', 'fp-val']])
         self.assertEqual(versions[0].name, mt.name)
         self.assertEqual(versions[0].mtype, mt.mtype)
         self.assertEqual(set(versions[0].tags.all()), set(mt.tags.all()))
@@ -4456,7 +4495,7 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(versions[0].fileparameter, mt.fileparameter)
 
     @patch("Poem.api.internal_views.metrictemplates.sync_tags_webapi")
-    @patch('Poem.api.internal_views.metrictemplates.update_metrics')
+    @patch('Poem.api.internal_views.jobs.update_metric_in_schema')
     @patch('Poem.api.internal_views.metrictemplates.inline_metric_for_db')
     def test_put_mttemplate_without_changing_prbkey_with_nonexist_tag_sp_user(
             self, inline, update, mock_sync
@@ -4539,16 +4578,18 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(mt.probeexecutable, '["ams-probe"]')
         self.assertEqual(
             mt.config,
-            '["maxCheckAttempts 4", "timeout 70", '
-            '"path /usr/libexec/argo-monitoring/", '
-            '"interval 5", "retryInterval 3"]'
-        )
-        self.assertEqual(mt.attribute, '["argo.ams_TOKEN --token"]')
-        self.assertEqual(mt.dependency, '')
-        self.assertEqual(mt.flags, '["OBSESS 1"]')
-        self.assertEqual(mt.files, '')
-        self.assertEqual(mt.parameter, '["--project EGI"]')
-        self.assertEqual(mt.fileparameter, '')
+            [
+                ['maxCheckAttempts', '4'], ['timeout', '70'],
+                ['path', '/usr/libexec/argo-monitoring/'], ['interval', '5'],
+                ['retryInterval', '3']
+            ]
+        )
+        self.assertEqual(mt.attribute, [['argo.ams_TOKEN', '--token']])
+        self.assertEqual(mt.dependency, [])
+        self.assertEqual(mt.flags, [['OBSESS', '1']])
+        self.assertEqual(mt.files, [])
+        self.assertEqual(mt.parameter, [['--project', 'EGI']])
+        self.assertEqual(mt.fileparameter, [])
         self.assertEqual(versions[0].name, mt.name)
         self.assertEqual(versions[0].mtype, mt.mtype)
         self.assertEqual(set(versions[0].tags.all()), set(mt.tags.all()))
@@ -4564,7 +4605,7 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(versions[0].fileparameter, mt.fileparameter)
 
     @patch("Poem.api.internal_views.metrictemplates.sync_tags_webapi")
-    @patch('Poem.api.internal_views.metrictemplates.update_metrics')
+    @patch('Poem.api.internal_views.jobs.update_metric_in_schema')
     @patch('Poem.api.internal_views.metrictemplates.inline_metric_for_db')
     def test_put_mttemplate_without_changing_prbkey_with_nonexist_tag_ten_susr(
             self, inline, update, mock_sync
@@ -4647,16 +4688,18 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(mt.probeexecutable, '["ams-probe"]')
         self.assertEqual(
             mt.config,
-            '["maxCheckAttempts 4", "timeout 70", '
-            '"path /usr/libexec/argo-monitoring/", '
-            '"interval 5", "retryInterval 3"]'
-        )
-        self.assertEqual(mt.attribute, '["argo.ams_TOKEN --token"]')
-        self.assertEqual(mt.dependency, '')
-        self.assertEqual(mt.flags, '["OBSESS 1"]')
-        self.assertEqual(mt.files, '')
-        self.assertEqual(mt.parameter, '["--project EGI"]')
-        self.assertEqual(mt.fileparameter, '')
+            [
+                ['maxCheckAttempts', '4'], ['timeout', '70'],
+                ['path', '/usr/libexec/argo-monitoring/'], ['interval', '5'],
+                ['retryInterval', '3']
+            ]
+        )
+        self.assertEqual(mt.attribute, [['argo.ams_TOKEN', '--token']])
+        self.assertEqual(mt.dependency, [])
+        self.assertEqual(mt.flags, [['OBSESS', '1']])
+        self.assertEqual(mt.files, [])
+        self.assertEqual(mt.parameter, [['--project', 'EGI']])
+        self.assertEqual(mt.fileparameter, [])
         self.assertEqual(versions[0].name, mt.name)
         self.assertEqual(versions[0].mtype, mt.mtype)
         self.assertEqual(set(versions[0].tags.all()), set(mt.tags.all()))
@@ -4672,7 +4715,7 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(versions[0].fileparameter, mt.fileparameter)
 
     @patch("Poem.api.internal_views.metrictemplates.sync_tags_webapi")
-    @patch('Poem.api.internal_views.metrictemplates.update_metrics')
+    @patch('Poem.api.internal_views.jobs.update_metric_in_schema')
     @patch('Poem.api.internal_views.metrictemplates.inline_metric_for_db')
     def test_put_mttemplate_without_changing_prbkey_with_nonexist_tag_tenn_usr(
             self, inline, update, mock_sync
@@ -4759,16 +4802,18 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(mt.probeexecutable, '["ams-probe"]')
         self.assertEqual(
             mt.config,
-            '["maxCheckAttempts 4", "timeout 70", '
-            '"path /usr/libexec/argo-monitoring/", '
-            '"interval 5", "retryInterval 3"]'
-        )
-        self.assertEqual(mt.attribute, '["argo.ams_TOKEN --token"]')
-        self.assertEqual(mt.dependency, '')
-        self.assertEqual(mt.flags, '["OBSESS 1"]')
-        self.assertEqual(mt.files, '')
-        self.assertEqual(mt.parameter, '["--project EGI"]')
-        self.assertEqual(mt.fileparameter, '')
+            [
+                ['maxCheckAttempts', '4'], ['timeout', '70'],
+                ['path', '/usr/libexec/argo-monitoring/'], ['interval', '5'],
+                ['retryInterval', '3']
+            ]
+        )
+        self.assertEqual(mt.attribute, [['argo.ams_TOKEN', '--token']])
+        self.assertEqual(mt.dependency, [])
+        self.assertEqual(mt.flags, [['OBSESS', '1']])
+        self.assertEqual(mt.files, [])
+        self.assertEqual(mt.parameter, [['--project', 'EGI']])
+        self.assertEqual(mt.fileparameter, [])
         self.assertEqual(versions[0].name, mt.name)
         self.assertEqual(versions[0].mtype, mt.mtype)
         self.assertEqual(set(versions[0].tags.all()), set(mt.tags.all()))
@@ -4784,7 +4829,7 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(versions[0].fileparameter, mt.fileparameter)
 
     @patch("Poem.api.internal_views.metrictemplates.sync_tags_webapi")
-    @patch('Poem.api.internal_views.metrictemplates.update_metrics')
+    @patch('Poem.api.internal_views.jobs.update_metric_in_schema')
     @patch('Poem.api.internal_views.metrictemplates.inline_metric_for_db')
     def test_put_metrictemplate_without_changing_probekey_with_no_tag_sp_spusr(
             self, inline, update, mock_sync
@@ -4825,11 +4870,15 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         request.tenant = self.public_tenant
         force_authenticate(request, user=self.superuser)
         response = self.view(request)
-        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(run_worker(once=True), 1)
         mock_sync.assert_called_once()
         mt = admin_models.MetricTemplate.objects.get(id=self.metrictemplate1.id)
         update.assert_called_once()
-        update.assert_called_with(mt, 'argo.AMS-Check', self.ams_probe_11)
+        update.assert_called_with(
+            mt_id=mt.id, name='argo.AMS-Check', pk_id=self.ams_probe_11.id,
+            schema=self.tenant.schema_name, user='poem'
+        )
         versions = admin_models.MetricTemplateHistory.objects.filter(
             object_id=mt
         ).order_by('-date_created')
@@ -4873,16 +4922,18 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(mt.probeexecutable, '["ams-probe"]')
         self.assertEqual(
             mt.config,
-            '["maxCheckAttempts 4", "timeout 70", '
-            '"path /usr/libexec/argo-monitoring/probes/argo", '
-            '"interval 6", "retryInterval 4"]'
-        )
-        self.assertEqual(mt.attribute, '["argo.ams_TOKEN2 --token"]')
-        self.assertEqual(mt.dependency, '["dep-key dep-val"]')
-        self.assertEqual(mt.flags, '["flag-key flag-val"]')
-        self.assertEqual(mt.files, '["file-key file-val"]')
-        self.assertEqual(mt.parameter, '["par-key par-val"]')
-        self.assertEqual(mt.fileparameter, '["fp-key fp-val"]')
+            [
+                ['maxCheckAttempts', '4'], ['timeout', '70'],
+                ['path', '/usr/libexec/argo-monitoring/probes/argo'],
+                ['interval', '6'], ['retryInterval', '4']
+            ]
+        )
+        self.assertEqual(mt.attribute, [['argo.ams_TOKEN2', '--token']])
+        self.assertEqual(mt.dependency, [['dep-key', 'dep-val']])
+        self.assertEqual(mt.flags, [['flag-key', 'flag-val']])
+        self.assertEqual(mt.files, [['file-key', 'file-val']])
+        self.assertEqual(mt.parameter, [['par-key', 'par-val']])
+        self.assertEqual(mt.fileparameter, [['fp-key', 'fp-val']])
         self.assertEqual(versions[0].name, mt.name)
         self.assertEqual(versions[0].mtype, mt.mtype)
         self.assertEqual(set(versions[0].tags.all()), set(mt.tags.all()))
@@ -4898,7 +4949,7 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(versions[0].fileparameter, mt.fileparameter)
 
     @patch("Poem.api.internal_views.metrictemplates.sync_tags_webapi")
-    @patch('Poem.api.internal_views.metrictemplates.update_metrics')
+    @patch('Poem.api.internal_views.jobs.update_metric_in_schema')
     @patch('Poem.api.internal_views.metrictemplates.inline_metric_for_db')
     def test_put_metrictemplate_without_changing_probekey_with_no_tag_sp_usr(
             self, inline, update, mock_sync
@@ -4975,16 +5026,18 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(mt.probeexecutable, '["ams-probe"]')
         self.assertEqual(
             mt.config,
-            '["maxCheckAttempts 4", "timeout 70", '
-            '"path /usr/libexec/argo-monitoring/", '
-            '"interval 5", "retryInterval 3"]'
-        )
-        self.assertEqual(mt.attribute, '["argo.ams_TOKEN --token"]')
-        self.assertEqual(mt.dependency, '')
-        self.assertEqual(mt.flags, '["OBSESS 1"]')
-        self.assertEqual(mt.files, '')
-        self.assertEqual(mt.parameter, '["--project EGI"]')
-        self.assertEqual(mt.fileparameter, '')
+            [
+                ['maxCheckAttempts', '4'], ['timeout', '70'],
+                ['path', '/usr/libexec/argo-monitoring/'], ['interval', '5'],
+                ['retryInterval', '3']
+            ]
+        )
+        self.assertEqual(mt.attribute, [['argo.ams_TOKEN', '--token']])
+        self.assertEqual(mt.dependency, [])
+        self.assertEqual(mt.flags, [['OBSESS', '1']])
+        self.assertEqual(mt.files, [])
+        self.assertEqual(mt.parameter, [['--project', 'EGI']])
+        self.assertEqual(mt.fileparameter, [])
         self.assertEqual(versions[0].name, mt.name)
         self.assertEqual(versions[0].mtype, mt.mtype)
         self.assertEqual(set(versions[0].tags.all()), set(mt.tags.all()))
@@ -5000,7 +5053,7 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(versions[0].fileparameter, mt.fileparameter)
 
     @patch("Poem.api.internal_views.metrictemplates.sync_tags_webapi")
-    @patch('Poem.api.internal_views.metrictemplates.update_metrics')
+    @patch('Poem.api.internal_views.jobs.update_metric_in_schema')
     @patch('Poem.api.internal_views.metrictemplates.inline_metric_for_db')
     def test_put_metrictemplate_without_changing_probekey_with_no_tag_tenn_sus(
             self, inline, update, mock_sync
@@ -5077,16 +5130,18 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(mt.probeexecutable, '["ams-probe"]')
         self.assertEqual(
             mt.config,
-            '["maxCheckAttempts 4", "timeout 70", '
-            '"path /usr/libexec/argo-monitoring/", '
-            '"interval 5", "retryInterval 3"]'
-        )
-        self.assertEqual(mt.attribute, '["argo.ams_TOKEN --token"]')
-        self.assertEqual(mt.dependency, '')
-        self.assertEqual(mt.flags, '["OBSESS 1"]')
-        self.assertEqual(mt.files, '')
-        self.assertEqual(mt.parameter, '["--project EGI"]')
-        self.assertEqual(mt.fileparameter, '')
+            [
+                ['maxCheckAttempts', '4'], ['timeout', '70'],
+                ['path', '/usr/libexec/argo-monitoring/'], ['interval', '5'],
+                ['retryInterval', '3']
+            ]
+        )
+        self.assertEqual(mt.attribute, [['argo.ams_TOKEN', '--token']])
+        self.assertEqual(mt.dependency, [])
+        self.assertEqual(mt.flags, [['OBSESS', '1']])
+        self.assertEqual(mt.files, [])
+        self.assertEqual(mt.parameter, [['--project', 'EGI']])
+        self.assertEqual(mt.fileparameter, [])
         self.assertEqual(versions[0].name, mt.name)
         self.assertEqual(versions[0].mtype, mt.mtype)
         self.assertEqual(set(versions[0].tags.all()), set(mt.tags.all()))
@@ -5102,7 +5157,7 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(versions[0].fileparameter, mt.fileparameter)
 
     @patch("Poem.api.internal_views.metrictemplates.sync_tags_webapi")
-    @patch('Poem.api.internal_views.metrictemplates.update_metrics')
+    @patch('Poem.api.internal_views.jobs.update_metric_in_schema')
     @patch('Poem.api.internal_views.metrictemplates.inline_metric_for_db')
     def test_put_metrictemplate_without_changing_probekey_with_no_tag_tenn_usr(
             self, inline, update, mock_sync
@@ -5176,16 +5231,18 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(mt.probeexecutable, '["ams-probe"]')
         self.assertEqual(
             mt.config,
-            '["maxCheckAttempts 4", "timeout 70", '
-            '"path /usr/libexec/argo-monitoring/", '
-            '"interval 5", "retryInterval 3"]'
-        )
-        self.assertEqual(mt.attribute, '["argo.ams_TOKEN --token"]')
-        self.assertEqual(mt.dependency, '')
-        self.assertEqual(mt.flags, '["OBSESS 1"]')
-        self.assertEqual(mt.files, '')
-        self.assertEqual(mt.parameter, '["--project EGI"]')
-        self.assertEqual(mt.fileparameter, '')
+            [
+                ['maxCheckAttempts', '4'], ['timeout', '70'],
+                ['path', '/usr/libexec/argo-monitoring/'], ['interval', '5'],
+                ['retryInterval', '3']
+            ]
+        )
+        self.assertEqual(mt.attribute, [['argo.ams_TOKEN', '--token']])
+        self.assertEqual(mt.dependency, [])
+        self.assertEqual(mt.flags, [['OBSESS', '1']])
+        self.assertEqual(mt.files, [])
+        self.assertEqual(mt.parameter, [['--project', 'EGI']])
+        self.assertEqual(mt.fileparameter, [])
         self.assertEqual(versions[0].name, mt.name)
         self.assertEqual(versions[0].mtype, mt.mtype)
         self.assertEqual(set(versions[0].tags.all()), set(mt.tags.all()))
@@ -5201,7 +5258,7 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(versions[0].fileparameter, mt.fileparameter)
 
     @patch("Poem.api.internal_views.metrictemplates.sync_tags_webapi")
-    @patch('Poem.api.internal_views.metrictemplates.update_metrics')
+    @patch('Poem.api.internal_views.jobs.update_metric_in_schema')
     @patch('Poem.api.internal_views.metrictemplates.inline_metric_for_db')
     def test_put_metrictemplate_with_new_probekey_sp_superuser(
             self, inline, update, mock_sync
@@ -5287,16 +5344,18 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(mt.parent, '["argo.AMS-Check"]')
         self.assertEqual(
             mt.config,
-            '["maxCheckAttempts 4", "timeout 70", '
-            '"path /usr/libexec/argo-monitoring/probes/argo", '
-            '"interval 6", "retryInterval 4"]'
-        )
-        self.assertEqual(mt.attribute, '["argo.ams_TOKEN2 --token"]')
-        self.assertEqual(mt.dependency, '["dep-key dep-val"]')
-        self.assertEqual(mt.flags, '["flag-key flag-val"]')
-        self.assertEqual(mt.files, '["file-key file-val"]')
-        self.assertEqual(mt.parameter, '["par-key par-val"]')
-        self.assertEqual(mt.fileparameter, '["fp-key fp-val"]')
+            [
+                ['maxCheckAttempts', '4'], ['timeout', '70'],
+                ['path', '/usr/libexec/argo-monitoring/probes/argo'],
+                ['interval', '6'], ['retryInterval', '4']
+            ]
+        )
+        self.assertEqual(mt.attribute, [['argo.ams_TOKEN2', '--token']])
+        self.assertEqual(mt.dependency, [['dep-key', 'dep-val']])
+        self.assertEqual(mt.flags, [['flag-key', 'flag-val']])
+        self.assertEqual(mt.files, [['file-key', 'file-val']])
+        self.assertEqual(mt.parameter, [['par-key', 'par-val']])
+        self.assertEqual(mt.fileparameter, [['fp-key', 'fp-val']])
         self.assertEqual(versions[0].name, mt.name)
         self.assertEqual(versions[0].mtype, mt.mtype)
         self.assertEqual(set(versions[0].tags.all()), set(mt.tags.all()))
@@ -5313,7 +5372,7 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(versions[0].fileparameter, mt.fileparameter)
 
     @patch("Poem.api.internal_views.metrictemplates.sync_tags_webapi")
-    @patch('Poem.api.internal_views.metrictemplates.update_metrics')
+    @patch('Poem.api.internal_views.jobs.update_metric_in_schema')
     @patch('Poem.api.internal_views.metrictemplates.inline_metric_for_db')
     def test_put_metrictemplate_with_new_probekey_sp_user(
             self, inline, update, mock_sync
@@ -5389,16 +5448,18 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(mt.parent, '')
         self.assertEqual(
             mt.config,
-            '["maxCheckAttempts 4", "timeout 70", '
-            '"path /usr/libexec/argo-monitoring/", '
-            '"interval 5", "retryInterval 3"]'
-        )
-        self.assertEqual(mt.attribute, '["argo.ams_TOKEN --token"]')
-        self.assertEqual(mt.dependency, '')
-        self.assertEqual(mt.flags, '["OBSESS 1"]')
-        self.assertEqual(mt.files, '')
-        self.assertEqual(mt.parameter, '["--project EGI"]')
-        self.assertEqual(mt.fileparameter, '')
+            [
+                ['maxCheckAttempts', '4'], ['timeout', '70'],
+                ['path', '/usr/libexec/argo-monitoring/'], ['interval', '5'],
+                ['retryInterval', '3']
+            ]
+        )
+        self.assertEqual(mt.attribute, [['argo.ams_TOKEN', '--token']])
+        self.assertEqual(mt.dependency, [])
+        self.assertEqual(mt.flags, [['OBSESS', '1']])
+        self.assertEqual(mt.files, [])
+        self.assertEqual(mt.parameter, [['--project', 'EGI']])
+        self.assertEqual(mt.fileparameter, [])
         self.assertEqual(versions[0].name, mt.name)
         self.assertEqual(versions[0].mtype, mt.mtype)
         self.assertEqual(set(versions[0].tags.all()), set(mt.tags.all()))
@@ -5415,7 +5476,7 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(versions[0].fileparameter, mt.fileparameter)
 
     @patch("Poem.api.internal_views.metrictemplates.sync_tags_webapi")
-    @patch('Poem.api.internal_views.metrictemplates.update_metrics')
+    @patch('Poem.api.internal_views.jobs.update_metric_in_schema')
     @patch('Poem.api.internal_views.metrictemplates.inline_metric_for_db')
     def test_put_metrictemplate_with_new_probekey_tenant_superuser(
             self, inline, update, mock_sync
@@ -5491,16 +5552,18 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(mt.parent, '')
         self.assertEqual(
             mt.config,
-            '["maxCheckAttempts 4", "timeout 70", '
-            '"path /usr/libexec/argo-monitoring/", '
-            '"interval 5", "retryInterval 3"]'
-        )
-        self.assertEqual(mt.attribute, '["argo.ams_TOKEN --token"]')
-        self.assertEqual(mt.dependency, '')
-        self.assertEqual(mt.flags, '["OBSESS 1"]')
-        self.assertEqual(mt.files, '')
-        self.assertEqual(mt.parameter, '["--project EGI"]')
-        self.assertEqual(mt.fileparameter, '')
+            [
+                ['maxCheckAttempts', '4'], ['timeout', '70'],
+                ['path', '/usr/libexec/argo-monitoring/'], ['interval', '5'],
+                ['retryInterval', '3']
+            ]
+        )
+        self.assertEqual(mt.attribute, [['argo.ams_TOKEN', '--token']])
+        self.assertEqual(mt.dependency, [])
+        self.assertEqual(mt.flags, [['OBSESS', '1']])
+        self.assertEqual(mt.files, [])
+        self.assertEqual(mt.parameter, [['--project', 'EGI']])
+        self.assertEqual(mt.fileparameter, [])
         self.assertEqual(versions[0].name, mt.name)
         self.assertEqual(versions[0].mtype, mt.mtype)
         self.assertEqual(set(versions[0].tags.all()), set(mt.tags.all()))
@@ -5517,7 +5580,7 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(versions[0].fileparameter, mt.fileparameter)
 
     @patch("Poem.api.internal_views.metrictemplates.sync_tags_webapi")
-    @patch('Poem.api.internal_views.metrictemplates.update_metrics')
+    @patch('Poem.api.internal_views.jobs.update_metric_in_schema')
     @patch('Poem.api.internal_views.metrictemplates.inline_metric_for_db')
     def test_put_metrictemplate_with_new_probekey_tenant_user(
             self, inline, update, mock_sync
@@ -5593,16 +5656,18 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(mt.parent, '')
         self.assertEqual(
             mt.config,
-            '["maxCheckAttempts 4", "timeout 70", '
-            '"path /usr/libexec/argo-monitoring/", '
-            '"interval 5", "retryInterval 3"]'
-        )
-        self.assertEqual(mt.attribute, '["argo.ams_TOKEN --token"]')
-        self.assertEqual(mt.dependency, '')
-        self.assertEqual(mt.flags, '["OBSESS 1"]')
-        self.assertEqual(mt.files, '')
-        self.assertEqual(mt.parameter, '["--project EGI"]')
-        self.assertEqual(mt.fileparameter, '')
+            [
+                ['maxCheckAttempts', '4'], ['timeout', '70'],
+                ['path', '/usr/libexec/argo-monitoring/'], ['interval', '5'],
+                ['retryInterval', '3']
+            ]
+        )
+        self.assertEqual(mt.attribute, [['argo.ams_TOKEN', '--token']])
+        self.assertEqual(mt.dependency, [])
+        self.assertEqual(mt.flags, [['OBSESS', '1']])
+        self.assertEqual(mt.files, [])
+        self.assertEqual(mt.parameter, [['--project', 'EGI']])
+        self.assertEqual(mt.fileparameter, [])
         self.assertEqual(versions[0].name, mt.name)
         self.assertEqual(versions[0].mtype, mt.mtype)
         self.assertEqual(set(versions[0].tags.all()), set(mt.tags.all()))
@@ -5619,7 +5684,7 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(versions[0].fileparameter, mt.fileparameter)
 
     @patch("Poem.api.internal_views.metrictemplates.sync_tags_webapi")
-    @patch('Poem.api.internal_views.metrictemplates.update_metrics')
+    @patch('Poem.api.internal_views.jobs.update_metric_in_schema')
     @patch('Poem.api.internal_views.metrictemplates.inline_metric_for_db')
     def test_put_metrictemplate_with_new_probekey_nonexisting_tag_sp_superusr(
             self, inline, update, mock_sync
@@ -5713,16 +5778,18 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(mt.parent, '["argo.AMS-Check"]')
         self.assertEqual(
             mt.config,
-            '["maxCheckAttempts 4", "timeout 70", '
-            '"path /usr/libexec/argo-monitoring/probes/argo", '
-            '"interval 6", "retryInterval 4"]'
-        )
-        self.assertEqual(mt.attribute, '["argo.ams_TOKEN2 --token"]')
-        self.assertEqual(mt.dependency, '["dep-key dep-val"]')
-        self.assertEqual(mt.flags, '["flag-key flag-val"]')
-        self.assertEqual(mt.files, '["file-key file-val"]')
-        self.assertEqual(mt.parameter, '["par-key par-val"]')
-        self.assertEqual(mt.fileparameter, '["fp-key fp-val"]')
+            [
+                ['maxCheckAttempts', '4'], ['timeout', '70'],
+                ['path', '/usr/libexec/argo-monitoring/probes/argo'],
+                ['interval', '6'], ['retryInterval', '4']
+            ]
+        )
+        self.assertEqual(mt.attribute, [['argo.ams_TOKEN2', '--token']])
+        self.assertEqual(mt.dependency, [['dep-key', 'dep-val']])
+        self.assertEqual(mt.flags, [['flag-key', 'flag-val']])
+        self.assertEqual(mt.files, [['file-key', 'file-val']])
+        self.assertEqual(mt.parameter, [['par-key', 'par-val']])
+        self.assertEqual(mt.fileparameter, [['fp-key', 'fp-val']])
         self.assertEqual(versions[0].name, mt.name)
         self.assertEqual(versions[0].mtype, mt.mtype)
         self.assertEqual(set(versions[0].tags.all()), set(mt.tags.all()))
@@ -5739,7 +5806,7 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(versions[0].fileparameter, mt.fileparameter)
 
     @patch("Poem.api.internal_views.metrictemplates.sync_tags_webapi")
-    @patch('Poem.api.internal_views.metrictemplates.update_metrics')
+    @patch('Poem.api.internal_views.jobs.update_metric_in_schema')
     @patch('Poem.api.internal_views.metrictemplates.inline_metric_for_db')
     def test_put_metrictemplate_with_new_probekey_nonexisting_tag_sp_user(
             self, inline, update, mock_sync
@@ -5825,16 +5892,18 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(mt.parent, '')
         self.assertEqual(
             mt.config,
-            '["maxCheckAttempts 4", "timeout 70", '
-            '"path /usr/libexec/argo-monitoring/", '
-            '"interval 5", "retryInterval 3"]'
-        )
-        self.assertEqual(mt.attribute, '["argo.ams_TOKEN --token"]')
-        self.assertEqual(mt.dependency, '')
-        self.assertEqual(mt.flags, '["OBSESS 1"]')
-        self.assertEqual(mt.files, '')
-        self.assertEqual(mt.parameter, '["--project EGI"]')
-        self.assertEqual(mt.fileparameter, '')
+            [
+                ['maxCheckAttempts', '4'], ['timeout', '70'],
+                ['path', '/usr/libexec/argo-monitoring/'], ['interval', '5'],
+                ['retryInterval', '3']
+            ]
+        )
+        self.assertEqual(mt.attribute, [['argo.ams_TOKEN', '--token']])
+        self.assertEqual(mt.dependency, [])
+        self.assertEqual(mt.flags, [['OBSESS', '1']])
+        self.assertEqual(mt.files, [])
+        self.assertEqual(mt.parameter, [['--project', 'EGI']])
+        self.assertEqual(mt.fileparameter, [])
         self.assertEqual(versions[0].name, mt.name)
         self.assertEqual(versions[0].mtype, mt.mtype)
         self.assertEqual(set(versions[0].tags.all()), set(mt.tags.all()))
@@ -5851,7 +5920,7 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(versions[0].fileparameter, mt.fileparameter)
 
     @patch("Poem.api.internal_views.metrictemplates.sync_tags_webapi")
-    @patch('Poem.api.internal_views.metrictemplates.update_metrics')
+    @patch('Poem.api.internal_views.jobs.update_metric_in_schema')
     @patch('Poem.api.internal_views.metrictemplates.inline_metric_for_db')
     def test_put_metrictemplate_with_new_probekey_nonexisting_tag_tenant_susr(
             self, inline, update, mock_sync
@@ -5937,16 +6006,18 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(mt.parent, '')
         self.assertEqual(
             mt.config,
-            '["maxCheckAttempts 4", "timeout 70", '
-            '"path /usr/libexec/argo-monitoring/", '
-            '"interval 5", "retryInterval 3"]'
-        )
-        self.assertEqual(mt.attribute, '["argo.ams_TOKEN --token"]')
-        self.assertEqual(mt.dependency, '')
-        self.assertEqual(mt.flags, '["OBSESS 1"]')
-        self.assertEqual(mt.files, '')
-        self.assertEqual(mt.parameter, '["--project EGI"]')
-        self.assertEqual(mt.fileparameter, '')
+            [
+                ['maxCheckAttempts', '4'], ['timeout', '70'],
+                ['path', '/usr/libexec/argo-monitoring/'], ['interval', '5'],
+                ['retryInterval', '3']
+            ]
+        )
+        self.assertEqual(mt.attribute, [['argo.ams_TOKEN', '--token']])
+        self.assertEqual(mt.dependency, [])
+        self.assertEqual(mt.flags, [['OBSESS', '1']])
+        self.assertEqual(mt.files, [])
+        self.assertEqual(mt.parameter, [['--project', 'EGI']])
+        self.assertEqual(mt.fileparameter, [])
         self.assertEqual(versions[0].name, mt.name)
         self.assertEqual(versions[0].mtype, mt.mtype)
         self.assertEqual(set(versions[0].tags.all()), set(mt.tags.all()))
@@ -5963,7 +6034,7 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(versions[0].fileparameter, mt.fileparameter)
 
     @patch("Poem.api.internal_views.metrictemplates.sync_tags_webapi")
-    @patch('Poem.api.internal_views.metrictemplates.update_metrics')
+    @patch('Poem.api.internal_views.jobs.update_metric_in_schema')
     @patch('Poem.api.internal_views.metrictemplates.inline_metric_for_db')
     def test_put_metrictemplate_with_new_probekey_nonexisting_tag_tenant_usr(
             self, inline, update, mock_sync
@@ -6049,16 +6120,18 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(mt.parent, '')
         self.assertEqual(
             mt.config,
-            '["maxCheckAttempts 4", "timeout 70", '
-            '"path /usr/libexec/argo-monitoring/", '
-            '"interval 5", "retryInterval 3"]'
-        )
-        self.assertEqual(mt.attribute, '["argo.ams_TOKEN --token"]')
-        self.assertEqual(mt.dependency, '')
-        self.assertEqual(mt.flags, '["OBSESS 1"]')
-        self.assertEqual(mt.files, '')
-        self.assertEqual(mt.parameter, '["--project EGI"]')
-        self.assertEqual(mt.fileparameter, '')
+            [
+                ['maxCheckAttempts', '4'], ['timeout', '70'],
+                ['path', '/usr/libexec/argo-monitoring/'], ['interval', '5'],
+                ['retryInterval', '3']
+            ]
+        )
+        self.assertEqual(mt.attribute, [['argo.ams_TOKEN', '--token']])
+        self.assertEqual(mt.dependency, [])
+        self.assertEqual(mt.flags, [['OBSESS', '1']])
+        self.assertEqual(mt.files, [])
+        self.assertEqual(mt.parameter, [['--project', 'EGI']])
+        self.assertEqual(mt.fileparameter, [])
         self.assertEqual(versions[0].name, mt.name)
         self.assertEqual(versions[0].mtype, mt.mtype)
         self.assertEqual(set(versions[0].tags.all()), set(mt.tags.all()))
@@ -6075,7 +6148,7 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(versions[0].fileparameter, mt.fileparameter)
 
     @patch("Poem.api.internal_views.metrictemplates.sync_tags_webapi")
-    @patch('Poem.api.internal_views.metrictemplates.update_metrics')
+    @patch('Poem.api.internal_views.jobs.update_metric_in_schema')
     @patch('Poem.api.internal_views.metrictemplates.inline_metric_for_db')
     def test_put_metrictemplate_with_new_probekey_no_tag_sp_superuser(
             self, inline, update, mock_sync
@@ -6161,16 +6234,18 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(mt.parent, '["argo.AMS-Check"]')
         self.assertEqual(
             mt.config,
-            '["maxCheckAttempts 4", "timeout 70", '
-            '"path /usr/libexec/argo-monitoring/probes/argo", '
-            '"interval 6", "retryInterval 4"]'
-        )
-        self.assertEqual(mt.attribute, '["argo.ams_TOKEN2 --token"]')
-        self.assertEqual(mt.dependency, '["dep-key dep-val"]')
-        self.assertEqual(mt.flags, '["flag-key flag-val"]')
-        self.assertEqual(mt.files, '["file-key file-val"]')
-        self.assertEqual(mt.parameter, '["par-key par-val"]')
-        self.assertEqual(mt.fileparameter, '["fp-key fp-val"]')
+            [
+                ['maxCheckAttempts', '4'], ['timeout', '70'],
+                ['path', '/usr/libexec/argo-monitoring/probes/argo'],
+                ['interval', '6'], ['retryInterval', '4']
+            ]
+        )
+        self.assertEqual(mt.attribute, [['argo.ams_TOKEN2', '--token']])
+        self.assertEqual(mt.dependency, [['dep-key', 'dep-val']])
+        self.assertEqual(mt.flags, [['flag-key', 'flag-val']])
+        self.assertEqual(mt.files, [['file-key', 'file-val']])
+        self.assertEqual(mt.parameter, [['par-key', 'par-val']])
+        self.assertEqual(mt.fileparameter, [['fp-key', 'fp-val']])
         self.assertEqual(versions[0].name, mt.name)
         self.assertEqual(versions[0].mtype, mt.mtype)
         self.assertEqual(set(versions[0].tags.all()), set(mt.tags.all()))
@@ -6187,7 +6262,7 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(versions[0].fileparameter, mt.fileparameter)
 
     @patch("Poem.api.internal_views.metrictemplates.sync_tags_webapi")
-    @patch('Poem.api.internal_views.metrictemplates.update_metrics')
+    @patch('Poem.api.internal_views.jobs.update_metric_in_schema')
     @patch('Poem.api.internal_views.metrictemplates.inline_metric_for_db')
     def test_put_metrictemplate_with_new_probekey_no_tag_sp_user(
             self, inline, update, mock_sync
@@ -6263,16 +6338,18 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(mt.parent, '')
         self.assertEqual(
             mt.config,
-            '["maxCheckAttempts 4", "timeout 70", '
-            '"path /usr/libexec/argo-monitoring/", '
-            '"interval 5", "retryInterval 3"]'
-        )
-        self.assertEqual(mt.attribute, '["argo.ams_TOKEN --token"]')
-        self.assertEqual(mt.dependency, '')
-        self.assertEqual(mt.flags, '["OBSESS 1"]')
-        self.assertEqual(mt.files, '')
-        self.assertEqual(mt.parameter, '["--project EGI"]')
-        self.assertEqual(mt.fileparameter, '')
+            [
+                ['maxCheckAttempts', '4'], ['timeout', '70'],
+                ['path', '/usr/libexec/argo-monitoring/'], ['interval', '5'],
+                ['retryInterval', '3']
+            ]
+        )
+        self.assertEqual(mt.attribute, [['argo.ams_TOKEN', '--token']])
+        self.assertEqual(mt.dependency, [])
+        self.assertEqual(mt.flags, [['OBSESS', '1']])
+        self.assertEqual(mt.files, [])
+        self.assertEqual(mt.parameter, [['--project', 'EGI']])
+        self.assertEqual(mt.fileparameter, [])
         self.assertEqual(versions[0].name, mt.name)
         self.assertEqual(versions[0].mtype, mt.mtype)
         self.assertEqual(set(versions[0].tags.all()), set(mt.tags.all()))
@@ -6289,7 +6366,7 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(versions[0].fileparameter, mt.fileparameter)
 
     @patch("Poem.api.internal_views.metrictemplates.sync_tags_webapi")
-    @patch('Poem.api.internal_views.metrictemplates.update_metrics')
+    @patch('Poem.api.internal_views.jobs.update_metric_in_schema')
     @patch('Poem.api.internal_views.metrictemplates.inline_metric_for_db')
     def test_put_metrictemplate_with_new_probekey_no_tag_tenant_superuser(
             self, inline, update, mock_sync
@@ -6366,16 +6443,18 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(mt.parent, '')
         self.assertEqual(
             mt.config,
-            '["maxCheckAttempts 4", "timeout 70", '
-            '"path /usr/libexec/argo-monitoring/", '
-            '"interval 5", "retryInterval 3"]'
-        )
-        self.assertEqual(mt.attribute, '["argo.ams_TOKEN --token"]')
-        self.assertEqual(mt.dependency, '')
-        self.assertEqual(mt.flags, '["OBSESS 1"]')
-        self.assertEqual(mt.files, '')
-        self.assertEqual(mt.parameter, '["--project EGI"]')
-        self.assertEqual(mt.fileparameter, '')
+            [
+                ['maxCheckAttempts', '4'], ['timeout', '70'],
+                ['path', '/usr/libexec/argo-monitoring/'], ['interval', '5'],
+                ['retryInterval', '3']
+            ]
+        )
+        self.assertEqual(mt.attribute, [['argo.ams_TOKEN', '--token']])
+        self.assertEqual(mt.dependency, [])
+        self.assertEqual(mt.flags, [['OBSESS', '1']])
+        self.assertEqual(mt.files, [])
+        self.assertEqual(mt.parameter, [['--project', 'EGI']])
+        self.assertEqual(mt.fileparameter, [])
         self.assertEqual(versions[0].name, mt.name)
         self.assertEqual(versions[0].mtype, mt.mtype)
         self.assertEqual(set(versions[0].tags.all()), set(mt.tags.all()))
@@ -6392,7 +6471,7 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(versions[0].fileparameter, mt.fileparameter)
 
     @patch("Poem.api.internal_views.metrictemplates.sync_tags_webapi")
-    @patch('Poem.api.internal_views.metrictemplates.update_metrics')
+    @patch('Poem.api.internal_views.jobs.update_metric_in_schema')
     @patch('Poem.api.internal_views.metrictemplates.inline_metric_for_db')
     def test_put_metrictemplate_with_new_probekey_no_tag_tenant_user(
             self, inline, update, mock_sync
@@ -6468,16 +6547,18 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(mt.parent, '')
         self.assertEqual(
             mt.config,
-            '["maxCheckAttempts 4", "timeout 70", '
-            '"path /usr/libexec/argo-monitoring/", '
-            '"interval 5", "retryInterval 3"]'
-        )
-        self.assertEqual(mt.attribute, '["argo.ams_TOKEN --token"]')
-        self.assertEqual(mt.dependency, '')
-        self.assertEqual(mt.flags, '["OBSESS 1"]')
-        self.assertEqual(mt.files, '')
-        self.assertEqual(mt.parameter, '["--project EGI"]')
-        self.assertEqual(mt.fileparameter, '')
+            [
+                ['maxCheckAttempts', '4'], ['timeout', '70'],
+                ['path', '/usr/libexec/argo-monitoring/'], ['interval', '5'],
+                ['retryInterval', '3']
+            ]
+        )
+        self.assertEqual(mt.attribute, [['argo.ams_TOKEN', '--token']])
+        self.assertEqual(mt.dependency, [])
+        self.assertEqual(mt.flags, [['OBSESS', '1']])
+        self.assertEqual(mt.files, [])
+        self.assertEqual(mt.parameter, [['--project', 'EGI']])
+        self.assertEqual(mt.fileparameter, [])
         self.assertEqual(versions[0].name, mt.name)
         self.assertEqual(versions[0].mtype, mt.mtype)
         self.assertEqual(set(versions[0].tags.all()), set(mt.tags.all()))
@@ -6494,7 +6575,7 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(versions[0].fileparameter, mt.fileparameter)
 
     @patch("Poem.api.internal_views.metrictemplates.sync_tags_webapi")
-    @patch('Poem.api.internal_views.metrictemplates.update_metrics')
+    @patch('Poem.api.internal_views.jobs.update_metric_in_schema')
     @patch('Poem.api.internal_views.metrictemplates.inline_metric_for_db')
     def test_put_metrictemplate_with_new_probekey_no_tag_tenant_superuser(
             self, inline, update, mock_sync
@@ -6570,16 +6651,18 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(mt.parent, '')
         self.assertEqual(
             mt.config,
-            '["maxCheckAttempts 4", "timeout 70", '
-            '"path /usr/libexec/argo-monitoring/", '
-            '"interval 5", "retryInterval 3"]'
-        )
-        self.assertEqual(mt.attribute, '["argo.ams_TOKEN --token"]')
-        self.assertEqual(mt.dependency, '')
-        self.assertEqual(mt.flags, '["OBSESS 1"]')
-        self.assertEqual(mt.files, '')
-        self.assertEqual(mt.parameter, '["--project EGI"]')
-        self.assertEqual(mt.fileparameter, '')
+            [
+                ['maxCheckAttempts', '4'], ['timeout', '70'],
+                ['path', '/usr/libexec/argo-monitoring/'], ['interval', '5'],
+                ['retryInterval', '3']
+            ]
+        )
+        self.assertEqual(mt.attribute, [['argo.ams_TOKEN', '--token']])
+        self.assertEqual(mt.dependency, [])
+        self.assertEqual(mt.flags, [['OBSESS', '1']])
+        self.assertEqual(mt.files, [])
+        self.assertEqual(mt.parameter, [['--project', 'EGI']])
+        self.assertEqual(mt.fileparameter, [])
         self.assertEqual(versions[0].name, mt.name)
         self.assertEqual(versions[0].mtype, mt.mtype)
         self.assertEqual(set(versions[0].tags.all()), set(mt.tags.all()))
@@ -6596,7 +6679,7 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(versions[0].fileparameter, mt.fileparameter)
 
     @patch("Poem.api.internal_views.metrictemplates.sync_tags_webapi")
-    @patch('Poem.api.internal_views.metrictemplates.update_metrics')
+    @patch('Poem.api.internal_views.jobs.update_metric_in_schema')
     @patch('Poem.api.internal_views.metrictemplates.inline_metric_for_db')
     def test_put_passive_metric_template_sp_superusr(
             self, inline, update, mock_sync
@@ -6626,11 +6709,15 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         request.tenant = self.public_tenant
         force_authenticate(request, user=self.superuser)
         response = self.view(request)
-        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(run_worker(once=True), 1)
         mock_sync.assert_called_once()
         mt = admin_models.MetricTemplate.objects.get(id=self.metrictemplate2.id)
         update.assert_called_once()
-        update.assert_called_with(mt, 'org.apel.APEL-Pub', None)
+        update.assert_called_with(
+            mt_id=mt.id, name='org.apel.APEL-Pub', pk_id=None,
+            schema=self.tenant.schema_name, user='poem'
+        )
         versions = admin_models.MetricTemplateHistory.objects.filter(
             object_id=mt
         )
@@ -6644,13 +6731,13 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         )
         self.assertEqual(mt.probeexecutable, '')
         self.assertEqual(mt.parent, '')
-        self.assertEqual(mt.config, '')
-        self.assertEqual(mt.attribute, '')
-        self.assertEqual(mt.dependency, '')
-        self.assertEqual(mt.flags, '["PASSIVE 1"]')
-        self.assertEqual(mt.files, '')
-        self.assertEqual(mt.parameter, '')
-        self.assertEqual(mt.fileparameter, '')
+        self.assertEqual(mt.config, [])
+        self.assertEqual(mt.attribute, [])
+        self.assertEqual(mt.dependency, [])
+        self.assertEqual(mt.flags, [['PASSIVE', '1']])
+        self.assertEqual(mt.files, [])
+        self.assertEqual(mt.parameter, [])
+        self.assertEqual(mt.fileparameter, [])
         self.assertEqual(versions[0].name, mt.name)
         self.assertEqual(versions[0].mtype, mt.mtype)
         self.assertEqual(set(versions[0].tags.all()), set(mt.tags.all()))
@@ -6667,7 +6754,7 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(versions[0].fileparameter, mt.fileparameter)
 
     @patch("Poem.api.internal_views.metrictemplates.sync_tags_webapi")
-    @patch('Poem.api.internal_views.metrictemplates.update_metrics')
+    @patch('Poem.api.internal_views.jobs.update_metric_in_schema')
     @patch('Poem.api.internal_views.metrictemplates.inline_metric_for_db')
     def test_put_passive_metric_template_sp_user(
             self, inline, update, mock_sync
@@ -6716,13 +6803,13 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(mt.description, '')
         self.assertEqual(mt.probeexecutable, '')
         self.assertEqual(mt.parent, '')
-        self.assertEqual(mt.config, '')
-        self.assertEqual(mt.attribute, '')
-        self.assertEqual(mt.dependency, '')
-        self.assertEqual(mt.flags, '["OBSESS 1", "PASSIVE 1"]')
-        self.assertEqual(mt.files, '')
-        self.assertEqual(mt.parameter, '')
-        self.assertEqual(mt.fileparameter, '')
+        self.assertEqual(mt.config, [])
+        self.assertEqual(mt.attribute, [])
+        self.assertEqual(mt.dependency, [])
+        self.assertEqual(mt.flags, [['OBSESS', '1'], ['PASSIVE', '1']])
+        self.assertEqual(mt.files, [])
+        self.assertEqual(mt.parameter, [])
+        self.assertEqual(mt.fileparameter, [])
         self.assertEqual(versions[0].name, mt.name)
         self.assertEqual(versions[0].mtype, mt.mtype)
         self.assertEqual(set(versions[0].tags.all()), set(mt.tags.all()))
@@ -6739,7 +6826,7 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(versions[0].fileparameter, mt.fileparameter)
 
     @patch("Poem.api.internal_views.metrictemplates.sync_tags_webapi")
-    @patch('Poem.api.internal_views.metrictemplates.update_metrics')
+    @patch('Poem.api.internal_views.jobs.update_metric_in_schema')
     @patch('Poem.api.internal_views.metrictemplates.inline_metric_for_db')
     def test_put_passive_metric_template_tenant_superuser(
             self, inline, update, mock_sync
@@ -6788,13 +6875,13 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(mt.description, '')
         self.assertEqual(mt.probeexecutable, '')
         self.assertEqual(mt.parent, '')
-        self.assertEqual(mt.config, '')
-        self.assertEqual(mt.attribute, '')
-        self.assertEqual(mt.dependency, '')
-        self.assertEqual(mt.flags, '["OBSESS 1", "PASSIVE 1"]')
-        self.assertEqual(mt.files, '')
-        self.assertEqual(mt.parameter, '')
-        self.assertEqual(mt.fileparameter, '')
+        self.assertEqual(mt.config, [])
+        self.assertEqual(mt.attribute, [])
+        self.assertEqual(mt.dependency, [])
+        self.assertEqual(mt.flags, [['OBSESS', '1'], ['PASSIVE', '1']])
+        self.assertEqual(mt.files, [])
+        self.assertEqual(mt.parameter, [])
+        self.assertEqual(mt.fileparameter, [])
         self.assertEqual(versions[0].name, mt.name)
         self.assertEqual(versions[0].mtype, mt.mtype)
         self.assertEqual(set(versions[0].tags.all()), set(mt.tags.all()))
@@ -6811,7 +6898,7 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(versions[0].fileparameter, mt.fileparameter)
 
     @patch("Poem.api.internal_views.metrictemplates.sync_tags_webapi")
-    @patch('Poem.api.internal_views.metrictemplates.update_metrics')
+    @patch('Poem.api.internal_views.jobs.update_metric_in_schema')
     @patch('Poem.api.internal_views.metrictemplates.inline_metric_for_db')
     def test_put_passive_metric_template_tenant_user(
             self, inline, update, mock_sync
@@ -6860,13 +6947,13 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(mt.description, '')
         self.assertEqual(mt.probeexecutable, '')
         self.assertEqual(mt.parent, '')
-        self.assertEqual(mt.config, '')
-        self.assertEqual(mt.attribute, '')
-        self.assertEqual(mt.dependency, '')
-        self.assertEqual(mt.flags, '["OBSESS 1", "PASSIVE 1"]')
-        self.assertEqual(mt.files, '')
-        self.assertEqual(mt.parameter, '')
-        self.assertEqual(mt.fileparameter, '')
+        self.assertEqual(mt.config, [])
+        self.assertEqual(mt.attribute, [])
+        self.assertEqual(mt.dependency, [])
+        self.assertEqual(mt.flags, [['OBSESS', '1'], ['PASSIVE', '1']])
+        self.assertEqual(mt.files, [])
+        self.assertEqual(mt.parameter, [])
+        self.assertEqual(mt.fileparameter, [])
         self.assertEqual(versions[0].name, mt.name)
         self.assertEqual(versions[0].mtype, mt.mtype)
         self.assertEqual(set(versions[0].tags.all()), set(mt.tags.all()))
@@ -6883,7 +6970,7 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(versions[0].fileparameter, mt.fileparameter)
 
     @patch("Poem.api.internal_views.metrictemplates.sync_tags_webapi")
-    @patch('Poem.api.internal_views.metrictemplates.update_metrics')
+    @patch('Poem.api.internal_views.jobs.update_metric_in_schema')
     @patch('Poem.api.internal_views.metrictemplates.inline_metric_for_db')
     def test_put_metrictemplate_with_existing_name_sp_superuser(
             self, inline, update, mock_sync
@@ -6933,7 +7020,7 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertFalse(mock_sync.called)
 
     @patch("Poem.api.internal_views.metrictemplates.sync_tags_webapi")
-    @patch('Poem.api.internal_views.metrictemplates.update_metrics')
+    @patch('Poem.api.internal_views.jobs.update_metric_in_schema')
     @patch('Poem.api.internal_views.metrictemplates.inline_metric_for_db')
     def test_put_metrictemplate_with_existing_name_sp_user(
             self, inline, update, mock_sync
@@ -7011,16 +7098,18 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(mt.probeexecutable, '["ams-probe"]')
         self.assertEqual(
             mt.config,
-            '["maxCheckAttempts 4", "timeout 70", '
-            '"path /usr/libexec/argo-monitoring/", '
-            '"interval 5", "retryInterval 3"]'
-        )
-        self.assertEqual(mt.attribute, '["argo.ams_TOKEN --token"]')
-        self.assertEqual(mt.dependency, '')
-        self.assertEqual(mt.flags, '["OBSESS 1"]')
-        self.assertEqual(mt.files, '')
-        self.assertEqual(mt.parameter, '["--project EGI"]')
-        self.assertEqual(mt.fileparameter, '')
+            [
+                ['maxCheckAttempts', '4'], ['timeout', '70'],
+                ['path', '/usr/libexec/argo-monitoring/'], ['interval', '5'],
+                ['retryInterval', '3']
+            ]
+        )
+        self.assertEqual(mt.attribute, [['argo.ams_TOKEN', '--token']])
+        self.assertEqual(mt.dependency, [])
+        self.assertEqual(mt.flags, [['OBSESS', '1']])
+        self.assertEqual(mt.files, [])
+        self.assertEqual(mt.parameter, [['--project', 'EGI']])
+        self.assertEqual(mt.fileparameter, [])
         self.assertEqual(versions[0].name, mt.name)
         self.assertEqual(versions[0].mtype, mt.mtype)
         self.assertEqual(set(versions[0].tags.all()), set(mt.tags.all()))
@@ -7036,7 +7125,7 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(versions[0].fileparameter, mt.fileparameter)
 
     @patch("Poem.api.internal_views.metrictemplates.sync_tags_webapi")
-    @patch('Poem.api.internal_views.metrictemplates.update_metrics')
+    @patch('Poem.api.internal_views.jobs.update_metric_in_schema')
     @patch('Poem.api.internal_views.metrictemplates.inline_metric_for_db')
     def test_put_metrictemplate_with_existing_name_tenant_superuser(
             self, inline, update, mock_sync
@@ -7114,16 +7203,18 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(mt.probeexecutable, '["ams-probe"]')
         self.assertEqual(
             mt.config,
-            '["maxCheckAttempts 4", "timeout 70", '
-            '"path /usr/libexec/argo-monitoring/", '
-            '"interval 5", "retryInterval 3"]'
-        )
-        self.assertEqual(mt.attribute, '["argo.ams_TOKEN --token"]')
-        self.assertEqual(mt.dependency, '')
-        self.assertEqual(mt.flags, '["OBSESS 1"]')
-        self.assertEqual(mt.files, '')
-        self.assertEqual(mt.parameter, '["--project EGI"]')
-        self.assertEqual(mt.fileparameter, '')
+            [
+                ['maxCheckAttempts', '4'], ['timeout', '70'],
+                ['path', '/usr/libexec/argo-monitoring/'], ['interval', '5'],
+                ['retryInterval', '3']
+            ]
+        )
+        self.assertEqual(mt.attribute, [['argo.ams_TOKEN', '--token']])
+        self.assertEqual(mt.dependency, [])
+        self.assertEqual(mt.flags, [['OBSESS', '1']])
+        self.assertEqual(mt.files, [])
+        self.assertEqual(mt.parameter, [['--project', 'EGI']])
+        self.assertEqual(mt.fileparameter, [])
         self.assertEqual(versions[0].name, mt.name)
         self.assertEqual(versions[0].mtype, mt.mtype)
         self.assertEqual(set(versions[0].tags.all()), set(mt.tags.all()))
@@ -7139,7 +7230,7 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(versions[0].fileparameter, mt.fileparameter)
 
     @patch("Poem.api.internal_views.metrictemplates.sync_tags_webapi")
-    @patch('Poem.api.internal_views.metrictemplates.update_metrics')
+    @patch('Poem.api.internal_views.jobs.update_metric_in_schema')
     @patch('Poem.api.internal_views.metrictemplates.inline_metric_for_db')
     def test_put_metrictemplate_with_existing_name_tenant_user(
             self, inline, update, mock_sync
@@ -7217,16 +7308,18 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(mt.probeexecutable, '["ams-probe"]')
         self.assertEqual(
             mt.config,
-            '["maxCheckAttempts 4", "timeout 70", '
-            '"path /usr/libexec/argo-monitoring/", '
-            '"interval 5", "retryInterval 3"]'
-        )
-        self.assertEqual(mt.attribute, '["argo.ams_TOKEN --token"]')
-        self.assertEqual(mt.dependency, '')
-        self.assertEqual(mt.flags, '["OBSESS 1"]')
-        self.assertEqual(mt.files, '')
-        self.assertEqual(mt.parameter, '["--project EGI"]')
-        self.assertEqual(mt.fileparameter, '')
+            [
+                ['maxCheckAttempts', '4'], ['timeout', '70'],
+                ['path', '/usr/libexec/argo-monitoring/'], ['interval', '5'],
+                ['retryInterval', '3']
+            ]
+        )
+        self.assertEqual(mt.attribute, [['argo.ams_TOKEN', '--token']])
+        self.assertEqual(mt.dependency, [])
+        self.assertEqual(mt.flags, [['OBSESS', '1']])
+        self.assertEqual(mt.files, [])
+        self.assertEqual(mt.parameter, [['--project', 'EGI']])
+        self.assertEqual(mt.fileparameter, [])
         self.assertEqual(versions[0].name, mt.name)
         self.assertEqual(versions[0].mtype, mt.mtype)
         self.assertEqual(set(versions[0].tags.all()), set(mt.tags.all()))
@@ -7242,7 +7335,7 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(versions[0].fileparameter, mt.fileparameter)
 
     @patch("Poem.api.internal_views.metrictemplates.sync_tags_webapi")
-    @patch('Poem.api.internal_views.metrictemplates.update_metrics')
+    @patch('Poem.api.internal_views.jobs.update_metric_in_schema')
     @patch('Poem.api.internal_views.metrictemplates.inline_metric_for_db')
     def test_put_metrictemplate_with_nonexisting_probeversion_sp_superuser(
             self, inline, update, mock_sync
@@ -7319,16 +7412,18 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(mt.probeexecutable, '["ams-probe"]')
         self.assertEqual(
             mt.config,
-            '["maxCheckAttempts 4", "timeout 70", '
-            '"path /usr/libexec/argo-monitoring/", '
-            '"interval 5", "retryInterval 3"]'
-        )
-        self.assertEqual(mt.attribute, '["argo.ams_TOKEN --token"]')
-        self.assertEqual(mt.dependency, '')
-        self.assertEqual(mt.flags, '["OBSESS 1"]')
-        self.assertEqual(mt.files, '')
-        self.assertEqual(mt.parameter, '["--project EGI"]')
-        self.assertEqual(mt.fileparameter, '')
+            [
+                ['maxCheckAttempts', '4'], ['timeout', '70'],
+                ['path', '/usr/libexec/argo-monitoring/'], ['interval', '5'],
+                ['retryInterval', '3']
+            ]
+        )
+        self.assertEqual(mt.attribute, [['argo.ams_TOKEN', '--token']])
+        self.assertEqual(mt.dependency, [])
+        self.assertEqual(mt.flags, [['OBSESS', '1']])
+        self.assertEqual(mt.files, [])
+        self.assertEqual(mt.parameter, [['--project', 'EGI']])
+        self.assertEqual(mt.fileparameter, [])
         self.assertEqual(versions[0].name, mt.name)
         self.assertEqual(versions[0].mtype, mt.mtype)
         self.assertEqual(set(versions[0].tags.all()), set(mt.tags.all()))
@@ -7344,7 +7439,7 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(versions[0].fileparameter, mt.fileparameter)
 
     @patch("Poem.api.internal_views.metrictemplates.sync_tags_webapi")
-    @patch('Poem.api.internal_views.metrictemplates.update_metrics')
+    @patch('Poem.api.internal_views.jobs.update_metric_in_schema')
     @patch('Poem.api.internal_views.metrictemplates.inline_metric_for_db')
     def test_put_metrictemplate_with_nonexisting_probeversion_sp_user(
             self, inline, update, mock_sync
@@ -7422,16 +7517,18 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(mt.probeexecutable, '["ams-probe"]')
         self.assertEqual(
             mt.config,
-            '["maxCheckAttempts 4", "timeout 70", '
-            '"path /usr/libexec/argo-monitoring/", '
-            '"interval 5", "retryInterval 3"]'
-        )
-        self.assertEqual(mt.attribute, '["argo.ams_TOKEN --token"]')
-        self.assertEqual(mt.dependency, '')
-        self.assertEqual(mt.flags, '["OBSESS 1"]')
-        self.assertEqual(mt.files, '')
-        self.assertEqual(mt.parameter, '["--project EGI"]')
-        self.assertEqual(mt.fileparameter, '')
+            [
+                ['maxCheckAttempts', '4'], ['timeout', '70'],
+                ['path', '/usr/libexec/argo-monitoring/'], ['interval', '5'],
+                ['retryInterval', '3']
+            ]
+        )
+        self.assertEqual(mt.attribute, [['argo.ams_TOKEN', '--token']])
+        self.assertEqual(mt.dependency, [])
+        self.assertEqual(mt.flags, [['OBSESS', '1']])
+        self.assertEqual(mt.files, [])
+        self.assertEqual(mt.parameter, [['--project', 'EGI']])
+        self.assertEqual(mt.fileparameter, [])
         self.assertEqual(versions[0].name, mt.name)
         self.assertEqual(versions[0].mtype, mt.mtype)
         self.assertEqual(set(versions[0].tags.all()), set(mt.tags.all()))
@@ -7447,7 +7544,7 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(versions[0].fileparameter, mt.fileparameter)
 
     @patch("Poem.api.internal_views.metrictemplates.sync_tags_webapi")
-    @patch('Poem.api.internal_views.metrictemplates.update_metrics')
+    @patch('Poem.api.internal_views.jobs.update_metric_in_schema')
     @patch('Poem.api.internal_views.metrictemplates.inline_metric_for_db')
     def test_put_metrictemplate_with_nonexisting_probeversion_tenant_superusr(
             self, inline, update, mock_sync
@@ -7525,16 +7622,18 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(mt.probeexecutable, '["ams-probe"]')
         self.assertEqual(
             mt.config,
-            '["maxCheckAttempts 4", "timeout 70", '
-            '"path /usr/libexec/argo-monitoring/", '
-            '"interval 5", "retryInterval 3"]'
-        )
-        self.assertEqual(mt.attribute, '["argo.ams_TOKEN --token"]')
-        self.assertEqual(mt.dependency, '')
-        self.assertEqual(mt.flags, '["OBSESS 1"]')
-        self.assertEqual(mt.files, '')
-        self.assertEqual(mt.parameter, '["--project EGI"]')
-        self.assertEqual(mt.fileparameter, '')
+            [
+                ['maxCheckAttempts', '4'], ['timeout', '70'],
+                ['path', '/usr/libexec/argo-monitoring/'], ['interval', '5'],
+                ['retryInterval', '3']
+            ]
+        )
+        self.assertEqual(mt.attribute, [['argo.ams_TOKEN', '--token']])
+        self.assertEqual(mt.dependency, [])
+        self.assertEqual(mt.flags, [['OBSESS', '1']])
+        self.assertEqual(mt.files, [])
+        self.assertEqual(mt.parameter, [['--project', 'EGI']])
+        self.assertEqual(mt.fileparameter, [])
         self.assertEqual(versions[0].name, mt.name)
         self.assertEqual(versions[0].mtype, mt.mtype)
         self.assertEqual(set(versions[0].tags.all()), set(mt.tags.all()))
@@ -7550,7 +7649,7 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(versions[0].fileparameter, mt.fileparameter)
 
     @patch("Poem.api.internal_views.metrictemplates.sync_tags_webapi")
-    @patch('Poem.api.internal_views.metrictemplates.update_metrics')
+    @patch('Poem.api.internal_views.jobs.update_metric_in_schema')
     @patch('Poem.api.internal_views.metrictemplates.inline_metric_for_db')
     def test_put_metrictemplate_with_nonexisting_probeversion_tenant_user(
             self, inline, update, mock_sync
@@ -7628,16 +7727,18 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(mt.probeexecutable, '["ams-probe"]')
         self.assertEqual(
             mt.config,
-            '["maxCheckAttempts 4", "timeout 70", '
-            '"path /usr/libexec/argo-monitoring/", '
-            '"interval 5", "retryInterval 3"]'
-        )
-        self.assertEqual(mt.attribute, '["argo.ams_TOKEN --token"]')
-        self.assertEqual(mt.dependency, '')
-        self.assertEqual(mt.flags, '["OBSESS 1"]')
-        self.assertEqual(mt.files, '')
-        self.assertEqual(mt.parameter, '["--project EGI"]')
-        self.assertEqual(mt.fileparameter, '')
+            [
+                ['maxCheckAttempts', '4'], ['timeout', '70'],
+                ['path', '/usr/libexec/argo-monitoring/'], ['interval', '5'],
+                ['retryInterval', '3']
+            ]
+        )
+        self.assertEqual(mt.attribute, [['argo.ams_TOKEN', '--token']])
+        self.assertEqual(mt.dependency, [])
+        self.assertEqual(mt.flags, [['OBSESS', '1']])
+        self.assertEqual(mt.files, [])
+        self.assertEqual(mt.parameter, [['--project', 'EGI']])
+        self.assertEqual(mt.fileparameter, [])
         self.assertEqual(versions[0].name, mt.name)
         self.assertEqual(versions[0].mtype, mt.mtype)
         self.assertEqual(set(versions[0].tags.all()), set(mt.tags.all()))
@@ -7653,7 +7754,7 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(versions[0].fileparameter, mt.fileparameter)
 
     @patch("Poem.api.internal_views.metrictemplates.sync_tags_webapi")
-    @patch('Poem.api.internal_views.metrictemplates.update_metrics')
+    @patch('Poem.api.internal_views.jobs.update_metric_in_schema')
     @patch('Poem.api.internal_views.metrictemplates.inline_metric_for_db')
     def test_put_metrictemplate_without_specifying_probes_version_sp_superuser(
             self, inline, update, mock_sync
@@ -7730,16 +7831,18 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(mt.probeexecutable, '["ams-probe"]')
         self.assertEqual(
             mt.config,
-            '["maxCheckAttempts 4", "timeout 70", '
-            '"path /usr/libexec/argo-monitoring/", '
-            '"interval 5", "retryInterval 3"]'
-        )
-        self.assertEqual(mt.attribute, '["argo.ams_TOKEN --token"]')
-        self.assertEqual(mt.dependency, '')
-        self.assertEqual(mt.flags, '["OBSESS 1"]')
-        self.assertEqual(mt.files, '')
-        self.assertEqual(mt.parameter, '["--project EGI"]')
-        self.assertEqual(mt.fileparameter, '')
+            [
+                ['maxCheckAttempts', '4'], ['timeout', '70'],
+                ['path', '/usr/libexec/argo-monitoring/'], ['interval', '5'],
+                ['retryInterval', '3']
+            ]
+        )
+        self.assertEqual(mt.attribute, [['argo.ams_TOKEN', '--token']])
+        self.assertEqual(mt.dependency, [])
+        self.assertEqual(mt.flags, [['OBSESS', '1']])
+        self.assertEqual(mt.files, [])
+        self.assertEqual(mt.parameter, [['--project', 'EGI']])
+        self.assertEqual(mt.fileparameter, [])
         self.assertEqual(versions[0].name, mt.name)
         self.assertEqual(versions[0].mtype, mt.mtype)
         self.assertEqual(set(versions[0].tags.all()), set(mt.tags.all()))
@@ -7755,7 +7858,7 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(versions[0].fileparameter, mt.fileparameter)
 
     @patch("Poem.api.internal_views.metrictemplates.sync_tags_webapi")
-    @patch('Poem.api.internal_views.metrictemplates.update_metrics')
+    @patch('Poem.api.internal_views.jobs.update_metric_in_schema')
     @patch('Poem.api.internal_views.metrictemplates.inline_metric_for_db')
     def test_put_metrictemplate_without_specifying_probes_version_sp_user(
             self, inline, update, mock_sync
@@ -7833,16 +7936,18 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(mt.probeexecutable, '["ams-probe"]')
         self.assertEqual(
             mt.config,
-            '["maxCheckAttempts 4", "timeout 70", '
-            '"path /usr/libexec/argo-monitoring/", '
-            '"interval 5", "retryInterval 3"]'
-        )
-        self.assertEqual(mt.attribute, '["argo.ams_TOKEN --token"]')
-        self.assertEqual(mt.dependency, '')
-        self.assertEqual(mt.flags, '["OBSESS 1"]')
-        self.assertEqual(mt.files, '')
-        self.assertEqual(mt.parameter, '["--project EGI"]')
-        self.assertEqual(mt.fileparameter, '')
+            [
+                ['maxCheckAttempts', '4'], ['timeout', '70'],
+                ['path', '/usr/libexec/argo-monitoring/'], ['interval', '5'],
+                ['retryInterval', '3']
+            ]
+        )
+        self.assertEqual(mt.attribute, [['argo.ams_TOKEN', '--token']])
+        self.assertEqual(mt.dependency, [])
+        self.assertEqual(mt.flags, [['OBSESS', '1']])
+        self.assertEqual(mt.files, [])
+        self.assertEqual(mt.parameter, [['--project', 'EGI']])
+        self.assertEqual(mt.fileparameter, [])
         self.assertEqual(versions[0].name, mt.name)
         self.assertEqual(versions[0].mtype, mt.mtype)
         self.assertEqual(set(versions[0].tags.all()), set(mt.tags.all()))
@@ -7858,7 +7963,7 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(versions[0].fileparameter, mt.fileparameter)
 
     @patch("Poem.api.internal_views.metrictemplates.sync_tags_webapi")
-    @patch('Poem.api.internal_views.metrictemplates.update_metrics')
+    @patch('Poem.api.internal_views.jobs.update_metric_in_schema')
     @patch('Poem.api.internal_views.metrictemplates.inline_metric_for_db')
     def test_put_metrictemplate_without_specifying_probes_version_tenn_suprusr(
             self, inline, update, mock_sync
@@ -7936,16 +8041,18 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(mt.probeexecutable, '["ams-probe"]')
         self.assertEqual(
             mt.config,
-            '["maxCheckAttempts 4", "timeout 70", '
-            '"path /usr/libexec/argo-monitoring/", '
-            '"interval 5", "retryInterval 3"]'
-        )
-        self.assertEqual(mt.attribute, '["argo.ams_TOKEN --token"]')
-        self.assertEqual(mt.dependency, '')
-        self.assertEqual(mt.flags, '["OBSESS 1"]')
-        self.assertEqual(mt.files, '')
-        self.assertEqual(mt.parameter, '["--project EGI"]')
-        self.assertEqual(mt.fileparameter, '')
+            [
+                ['maxCheckAttempts', '4'], ['timeout', '70'],
+                ['path', '/usr/libexec/argo-monitoring/'], ['interval', '5'],
+                ['retryInterval', '3']
+            ]
+        )
+        self.assertEqual(mt.attribute, [['argo.ams_TOKEN', '--token']])
+        self.assertEqual(mt.dependency, [])
+        self.assertEqual(mt.flags, [['OBSESS', '1']])
+        self.assertEqual(mt.files, [])
+        self.assertEqual(mt.parameter, [['--project', 'EGI']])
+        self.assertEqual(mt.fileparameter, [])
         self.assertEqual(versions[0].name, mt.name)
         self.assertEqual(versions[0].mtype, mt.mtype)
         self.assertEqual(set(versions[0].tags.all()), set(mt.tags.all()))
@@ -7961,7 +8068,7 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(versions[0].fileparameter, mt.fileparameter)
 
     @patch("Poem.api.internal_views.metrictemplates.sync_tags_webapi")
-    @patch('Poem.api.internal_views.metrictemplates.update_metrics')
+    @patch('Poem.api.internal_views.jobs.update_metric_in_schema')
     @patch('Poem.api.internal_views.metrictemplates.inline_metric_for_db')
     def test_put_metrictemplate_without_specifying_probes_version_tenn_user(
             self, inline, update, mock_sync
@@ -8039,16 +8146,18 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(mt.probeexecutable, '["ams-probe"]')
         self.assertEqual(
             mt.config,
-            '["maxCheckAttempts 4", "timeout 70", '
-            '"path /usr/libexec/argo-monitoring/", '
-            '"interval 5", "retryInterval 3"]'
-        )
-        self.assertEqual(mt.attribute, '["argo.ams_TOKEN --token"]')
-        self.assertEqual(mt.dependency, '')
-        self.assertEqual(mt.flags, '["OBSESS 1"]')
-        self.assertEqual(mt.files, '')
-        self.assertEqual(mt.parameter, '["--project EGI"]')
-        self.assertEqual(mt.fileparameter, '')
+            [
+                ['maxCheckAttempts', '4'], ['timeout', '70'],
+                ['path', '/usr/libexec/argo-monitoring/'], ['interval', '5'],
+                ['retryInterval', '3']
+            ]
+        )
+        self.assertEqual(mt.attribute, [['argo.ams_TOKEN', '--token']])
+        self.assertEqual(mt.dependency, [])
+        self.assertEqual(mt.flags, [['OBSESS', '1']])
+        self.assertEqual(mt.files, [])
+        self.assertEqual(mt.parameter, [['--project', 'EGI']])
+        self.assertEqual(mt.fileparameter, [])
         self.assertEqual(versions[0].name, mt.name)
         self.assertEqual(versions[0].mtype, mt.mtype)
         self.assertEqual(set(versions[0].tags.all()), set(mt.tags.all()))
@@ -8064,7 +8173,7 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(versions[0].fileparameter, mt.fileparameter)
 
     @patch("Poem.api.internal_views.metrictemplates.sync_tags_webapi")
-    @patch('Poem.api.internal_views.metrictemplates.update_metrics')
+    @patch('Poem.api.internal_views.jobs.update_metric_in_schema')
     @patch('Poem.api.internal_views.metrictemplates.inline_metric_for_db')
     def test_put_metrictemplates_with_update_err_msgs(
             self, inline, update, mock_sync
@@ -8110,19 +8219,24 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         request.tenant = self.public_tenant
         force_authenticate(request, user=self.superuser)
         response = self.view(request)
-        self.assertEqual(response.status_code, status.HTTP_418_IM_A_TEAPOT)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['kind'], 'update_metrics')
+        self.assertEqual(run_worker(once=True), 1)
+        step = admin_models.JobStep.objects.get(job_id=response.data['id'])
         self.assertEqual(
-            response.data,
-            {
-                'detail': 'TENANT1: Error trying to update metric in metric '
-                          'profiles.\nPlease update metric profiles manually.\n'
-                          'TENANT2: Error trying to update metric in metric '
-                          'profiles.\nPlease update metric profiles manually.'
-            }
+            step.result, [
+                'TENANT1: Error trying to update metric in metric profiles.\n'
+                'Please update metric profiles manually.',
+                'TENANT2: Error trying to update metric in metric profiles.\n'
+                'Please update metric profiles manually.'
+            ]
         )
-        self.assertFalse(mock_sync.called)
+        mock_sync.assert_called_once()
         mt = admin_models.MetricTemplate.objects.get(id=self.metrictemplate1.id)
-        update.assert_called_once_with(mt, 'argo.AMS-Check', self.ams_probe_11)
+        update.assert_called_once_with(
+            mt_id=mt.id, name='argo.AMS-Check', pk_id=self.ams_probe_11.id,
+            schema=self.tenant.schema_name, user='poem'
+        )
         versions = admin_models.MetricTemplateHistory.objects.filter(
             object_id=mt
         ).order_by('-date_created')
@@ -8166,16 +8280,18 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(mt.probeexecutable, '["ams-probe"]')
         self.assertEqual(
             mt.config,
-            '["maxCheckAttempts 4", "timeout 70", '
-            '"path /usr/libexec/argo-monitoring/probes/argo", '
-            '"interval 6", "retryInterval 4"]'
-        )
-        self.assertEqual(mt.attribute, '["argo.ams_TOKEN2 --token"]')
-        self.assertEqual(mt.dependency, '["dep-key dep-val"]')
-        self.assertEqual(mt.flags, '["flag-key flag-val"]')
-        self.assertEqual(mt.files, '["file-key file-val"]')
-        self.assertEqual(mt.parameter, '["par-key par-val"]')
-        self.assertEqual(mt.fileparameter, '["fp-key fp-val"]')
+            [
+                ['maxCheckAttempts', '4'], ['timeout', '70'],
+                ['path', '/usr/libexec/argo-monitoring/probes/argo'],
+                ['interval', '6'], ['retryInterval', '4']
+            ]
+        )
+        self.assertEqual(mt.attribute, [['argo.ams_TOKEN2', '--token']])
+        self.assertEqual(mt.dependency, [['dep-key', 'dep-val']])
+        self.assertEqual(mt.flags, [['flag-key', 'flag-val']])
+        self.assertEqual(mt.files, [['file-key', 'file-val']])
+        self.assertEqual(mt.parameter, [['par-key', 'par-val']])
+        self.assertEqual(mt.fileparameter, [['fp-key', 'fp-val']])
         self.assertEqual(versions[0].name, mt.name)
         self.assertEqual(versions[0].mtype, mt.mtype)
         self.assertEqual(set(versions[0].tags.all()), set(mt.tags.all()))
@@ -8191,7 +8307,7 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(versions[0].fileparameter, mt.fileparameter)
 
     @patch("Poem.api.internal_views.metrictemplates.sync_tags_webapi")
-    @patch('Poem.api.internal_views.metrictemplates.update_metrics')
+    @patch('Poem.api.internal_views.jobs.update_metric_in_schema')
     @patch('Poem.api.internal_views.metrictemplates.inline_metric_for_db')
     def test_put_metrictemplate_missing_data_key_sp_superuser(
             self, inline, update, mock_sync
@@ -8264,16 +8380,18 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(mt.probeexecutable, '["ams-probe"]')
         self.assertEqual(
             mt.config,
-            '["maxCheckAttempts 4", "timeout 70", '
-            '"path /usr/libexec/argo-monitoring/", '
-            '"interval 5", "retryInterval 3"]'
-        )
-        self.assertEqual(mt.attribute, '["argo.ams_TOKEN --token"]')
-        self.assertEqual(mt.dependency, '')
-        self.assertEqual(mt.flags, '["OBSESS 1"]')
-        self.assertEqual(mt.files, '')
-        self.assertEqual(mt.parameter, '["--project EGI"]')
-        self.assertEqual(mt.fileparameter, '')
+            [
+                ['maxCheckAttempts', '4'], ['timeout', '70'],
+                ['path', '/usr/libexec/argo-monitoring/'], ['interval', '5'],
+                ['retryInterval', '3']
+            ]
+        )
+        self.assertEqual(mt.attribute, [['argo.ams_TOKEN', '--token']])
+        self.assertEqual(mt.dependency, [])
+        self.assertEqual(mt.flags, [['OBSESS', '1']])
+        self.assertEqual(mt.files, [])
+        self.assertEqual(mt.parameter, [['--project', 'EGI']])
+        self.assertEqual(mt.fileparameter, [])
         self.assertEqual(versions[0].name, mt.name)
         self.assertEqual(versions[0].mtype, mt.mtype)
         self.assertEqual(set(versions[0].tags.all()), set(mt.tags.all()))
@@ -8289,7 +8407,7 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(versions[0].fileparameter, mt.fileparameter)
 
     @patch("Poem.api.internal_views.metrictemplates.sync_tags_webapi")
-    @patch('Poem.api.internal_views.metrictemplates.update_metrics')
+    @patch('Poem.api.internal_views.jobs.update_metric_in_schema')
     @patch('Poem.api.internal_views.metrictemplates.inline_metric_for_db')
     def test_put_metrictemplate_missing_data_key_sp_user(
             self, inline, update, mock_sync
@@ -8365,16 +8483,18 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(mt.probeexecutable, '["ams-probe"]')
         self.assertEqual(
             mt.config,
-            '["maxCheckAttempts 4", "timeout 70", '
-            '"path /usr/libexec/argo-monitoring/", '
-            '"interval 5", "retryInterval 3"]'
-        )
-        self.assertEqual(mt.attribute, '["argo.ams_TOKEN --token"]')
-        self.assertEqual(mt.dependency, '')
-        self.assertEqual(mt.flags, '["OBSESS 1"]')
-        self.assertEqual(mt.files, '')
-        self.assertEqual(mt.parameter, '["--project EGI"]')
-        self.assertEqual(mt.fileparameter, '')
+            [
+                ['maxCheckAttempts', '4'], ['timeout', '70'],
+                ['path', '/usr/libexec/argo-monitoring/'], ['interval', '5'],
+                ['retryInterval', '3']
+            ]
+        )
+        self.assertEqual(mt.attribute, [['argo.ams_TOKEN', '--token']])
+        self.assertEqual(mt.dependency, [])
+        self.assertEqual(mt.flags, [['OBSESS', '1']])
+        self.assertEqual(mt.files, [])
+        self.assertEqual(mt.parameter, [['--project', 'EGI']])
+        self.assertEqual(mt.fileparameter, [])
         self.assertEqual(versions[0].name, mt.name)
         self.assertEqual(versions[0].mtype, mt.mtype)
         self.assertEqual(set(versions[0].tags.all()), set(mt.tags.all()))
@@ -8390,7 +8510,7 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(versions[0].fileparameter, mt.fileparameter)
 
     @patch("Poem.api.internal_views.metrictemplates.sync_tags_webapi")
-    @patch('Poem.api.internal_views.metrictemplates.update_metrics')
+    @patch('Poem.api.internal_views.jobs.update_metric_in_schema')
     @patch('Poem.api.internal_views.metrictemplates.inline_metric_for_db')
     def test_put_metrictemplate_missing_data_key_tenant_superuser(
             self, inline, update, mock_sync
@@ -8466,16 +8586,18 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(mt.probeexecutable, '["ams-probe"]')
         self.assertEqual(
             mt.config,
-            '["maxCheckAttempts 4", "timeout 70", '
-            '"path /usr/libexec/argo-monitoring/", '
-            '"interval 5", "retryInterval 3"]'
-        )
-        self.assertEqual(mt.attribute, '["argo.ams_TOKEN --token"]')
-        self.assertEqual(mt.dependency, '')
-        self.assertEqual(mt.flags, '["OBSESS 1"]')
-        self.assertEqual(mt.files, '')
-        self.assertEqual(mt.parameter, '["--project EGI"]')
-        self.assertEqual(mt.fileparameter, '')
+            [
+                ['maxCheckAttempts', '4'], ['timeout', '70'],
+                ['path', '/usr/libexec/argo-monitoring/'], ['interval', '5'],
+                ['retryInterval', '3']
+            ]
+        )
+        self.assertEqual(mt.attribute, [['argo.ams_TOKEN', '--token']])
+        self.assertEqual(mt.dependency, [])
+        self.assertEqual(mt.flags, [['OBSESS', '1']])
+        self.assertEqual(mt.files, [])
+        self.assertEqual(mt.parameter, [['--project', 'EGI']])
+        self.assertEqual(mt.fileparameter, [])
         self.assertEqual(versions[0].name, mt.name)
         self.assertEqual(versions[0].mtype, mt.mtype)
         self.assertEqual(set(versions[0].tags.all()), set(mt.tags.all()))
@@ -8491,7 +8613,7 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(versions[0].fileparameter, mt.fileparameter)
 
     @patch("Poem.api.internal_views.metrictemplates.sync_tags_webapi")
-    @patch('Poem.api.internal_views.metrictemplates.update_metrics')
+    @patch('Poem.api.internal_views.jobs.update_metric_in_schema')
     @patch('Poem.api.internal_views.metrictemplates.inline_metric_for_db')
     def test_put_metrictemplate_missing_data_key_tenant_user(
             self, inline, update, mock_sync
@@ -8567,16 +8689,18 @@ class ListMetricTemplatesAPIViewTests(TenantTestCase):
         self.assertEqual(mt.probeexecutable, '["ams-probe"]')
         self.assertEqual(
             mt.config,
-            '["maxCheckAttempts 4", "timeout 70", '
-            '"path /usr/libexec/argo-monitoring/", '
-            '"interval 5", "retryInterval 3"]'
-        )
-        self.assertEqual(mt.attribute, '["argo.ams_TOKEN --token"]')
-        self.assertEqual(mt.dependency, '')
-        self.assertEqual(mt.flags, '["OBSESS 1"]')
-        self.assertEqual(mt.files, '')
-        self.assertEqual(mt.parameter, '["--project EGI"]')
-        self.assertEqual(mt.fileparameter, '')
+            [
+                ['maxCheckAttempts', '4'], ['timeout', '70'],
+                ['path', '/usr/libexec/argo-monitoring/'], ['interval', '5'],
+                ['retryInterval', '3']
+            ]
+        )
+        self.assertEqual(mt.attribute, [['argo.ams_TOKEN', '--token']])
+        self.assertEqual(mt.dependency, [])
+        self.assertEqual(mt.flags, [['OBSESS', '1']])
+        self.assertEqual(mt.files, [])
+        self.assertEqual(mt.parameter, [['--project', 'EGI']])
+        self.assertEqual(mt.fileparameter, [])
         self.assertEqual(versions[0].name, mt.name)
         self.assertEqual(versions[0].mtype, mt.mtype)
         self.assertEqual(set(versions[0].tags.all()), set(mt.tags.all()))
@@ -8948,7 +9072,42 @@ class BulkDeleteMetricTemplatesTests(TenantTestCase):
 
         self.metric = poem_models.Metric.objects.get(name="test.AMS-Check")
 
+    @staticmethod
+    def _step_results(job_id):
+        return dict(
+            admin_models.JobStep.objects.filter(
+                job_id=job_id
+            ).values_list('schema_name', 'result')
+        )
+
     @patch('Poem.api.internal_views.metrictemplates.sync_tags_webapi')
+    @patch('Poem.api.internal_views.metrictemplates.get_metrics_in_profiles')
+    def test_bulk_delete_metric_templates_not_used_by_tenants(
+            self, mock_get, mock_sync
+    ):
+        mock_sync.side_effect = mocked_func
+        data = {
+            'metrictemplates': ['argo.AMSPublisher-Check', 'test2.AMS-Check']
+        }
+        self.assertEqual(admin_models.MetricTemplate.objects.all().count(), 8)
+        request = self.factory.post(self.url, data, format='json')
+        request.tenant = self.sp_tenant
+        force_authenticate(request, user=self.superuser)
+        response = self.view(request)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data,
+            {
+                "info": "Metric templates argo.AMSPublisher-Check, "
+                        "test2.AMS-Check successfully deleted."
+            }
+        )
+        self.assertEqual(admin_models.MetricTemplate.objects.all().count(), 6)
+        self.assertFalse(admin_models.Job.objects.exists())
+        self.assertFalse(mock_get.called)
+        mock_sync.assert_called_once()
+
+    @patch('Poem.api.internal_views.jobs.sync_tags_webapi')
     @patch(
         'Poem.api.internal_views.metrictemplates.delete_metrics_from_profile')
     @patch('Poem.api.internal_views.metrictemplates.get_metrics_in_profiles')
@@ -8968,12 +9127,17 @@ class BulkDeleteMetricTemplatesTests(TenantTestCase):
         request.tenant = self.sp_tenant
         force_authenticate(request, user=self.superuser)
         response = self.view(request)
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
         self.assertEqual(
-            response.data,
-            {
-                "info": "Metric templates argo.AMS-Check, test.AMS-Check "
-                        "successfully deleted."
+            response.data['detail'],
+            'Metric templates argo.AMS-Check, test.AMS-Check will be '
+            'deleted once tenant metrics are deleted.'
+        )
+        self.assertEqual(run_worker(once=True), 2)
+        self.assertEqual(
+            self._step_results(response.data['id']), {
+                'test': [],
+                'public': []
             }
         )
         self.assertEqual(admin_models.MetricTemplate.objects.all().count(), 6)
@@ -9102,7 +9266,7 @@ class BulkDeleteMetricTemplatesTests(TenantTestCase):
         self.assertFalse(mock_delete.called)
         self.assertFalse(mock_sync.called)
 
-    @patch('Poem.api.internal_views.metrictemplates.sync_tags_webapi')
+    @patch('Poem.api.internal_views.jobs.sync_tags_webapi')
     @patch(
         'Poem.api.internal_views.metrictemplates.delete_metrics_from_profile')
     @patch('Poem.api.internal_views.metrictemplates.get_metrics_in_profiles')
@@ -9122,13 +9286,19 @@ class BulkDeleteMetricTemplatesTests(TenantTestCase):
         request.tenant = self.sp_tenant
         force_authenticate(request, user=self.superuser)
         response = self.view(request)
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
         self.assertEqual(
-            response.data,
-            {
-                "info": "Metric templates argo.AMS-Check, test.AMS-Check "
-                        "successfully deleted.",
-                "warning": "Error syncing metric tags: 400 BAD REQUEST"
+            response.data['detail'],
+            'Metric templates argo.AMS-Check, test.AMS-Check will be '
+            'deleted once tenant metrics are deleted.'
+        )
+        self.assertEqual(run_worker(once=True), 2)
+        self.assertEqual(
+            self._step_results(response.data['id']), {
+                'test': [],
+                'public': [
+                    'Error syncing metric tags: 400 BAD REQUEST'
+                ]
             }
         )
         self.assertEqual(admin_models.MetricTemplate.objects.all().count(), 6)
@@ -9158,7 +9328,7 @@ class BulkDeleteMetricTemplatesTests(TenantTestCase):
         ])
         mock_sync.assert_called_once()
 
-    @patch('Poem.api.internal_views.metrictemplates.sync_tags_webapi')
+    @patch('Poem.api.internal_views.jobs.sync_tags_webapi')
     @patch(
         'Poem.api.internal_views.metrictemplates.delete_metrics_from_profile')
     @patch('Poem.api.internal_views.metrictemplates.get_metrics_in_profiles')
@@ -9176,10 +9346,18 @@ class BulkDeleteMetricTemplatesTests(TenantTestCase):
         request.tenant = self.sp_tenant
         force_authenticate(request, user=self.superuser)
         response = self.view(request)
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
         self.assertEqual(
-            response.data,
-            {"info": "Metric template test.AMS-Check successfully deleted."}
+            response.data['detail'],
+            'Metric template test.AMS-Check will be deleted once tenant '
+            'metrics are deleted.'
+        )
+        self.assertEqual(run_worker(once=True), 2)
+        self.assertEqual(
+            self._step_results(response.data['id']), {
+                'test': [],
+                'public': []
+            }
         )
         self.assertEqual(admin_models.MetricTemplate.objects.all().count(), 7)
         self.assertRaises(
@@ -9296,7 +9474,7 @@ class BulkDeleteMetricTemplatesTests(TenantTestCase):
         self.assertFalse(mock_delete.called)
         self.assertFalse(mock_sync.called)
 
-    @patch('Poem.api.internal_views.metrictemplates.sync_tags_webapi')
+    @patch('Poem.api.internal_views.jobs.sync_tags_webapi')
     @patch(
         'Poem.api.internal_views.metrictemplates.delete_metrics_from_profile')
     @patch('Poem.api.internal_views.metrictemplates.get_metrics_in_profiles')
@@ -9315,17 +9493,23 @@ class BulkDeleteMetricTemplatesTests(TenantTestCase):
         request.tenant = self.sp_tenant
         force_authenticate(request, user=self.superuser)
         response = self.view(request)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
         self.assertEqual(
-            response.data,
-            {
-                "info": "Metric templates argo.AMS-Check, test.AMS-Check "
-                        "successfully deleted.",
-                "warning": "test: Metrics are not removed from metric "
-                           "profiles. Unable to get metric profiles: "
-                           "Error fetching WEB API data: API key not found"
+            response.data['detail'],
+            'Metric templates argo.AMS-Check, test.AMS-Check will be '
+            'deleted once tenant metrics are deleted.'
+        )
+        self.assertEqual(run_worker(once=True), 2)
+        self.assertEqual(
+            self._step_results(response.data['id']), {
+                'test': [
+                    'test: Metrics are not removed from metric profiles. '
+                    'Unable to get metric profiles: Error fetching WEB API '
+                    'data: API key not found'
+                ],
+                'public': []
             }
         )
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(admin_models.MetricTemplate.objects.all().count(), 6)
         metric_history = poem_models.TenantHistory.objects.filter(
             object_id=self.metric.id
@@ -9429,7 +9613,7 @@ class BulkDeleteMetricTemplatesTests(TenantTestCase):
         self.assertFalse(mock_delete.called)
         self.assertFalse(mock_sync.called)
 
-    @patch('Poem.api.internal_views.metrictemplates.sync_tags_webapi')
+    @patch('Poem.api.internal_views.jobs.sync_tags_webapi')
     @patch(
         'Poem.api.internal_views.metrictemplates.delete_metrics_from_profile')
     @patch('Poem.api.internal_views.metrictemplates.get_metrics_in_profiles')
@@ -9446,14 +9630,20 @@ class BulkDeleteMetricTemplatesTests(TenantTestCase):
         request.tenant = self.sp_tenant
         force_authenticate(request, user=self.superuser)
         response = self.view(request)
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
         self.assertEqual(
-            response.data,
-            {
-                "info": "Metric templates argo.AMS-Check, test.AMS-Check "
-                        "successfully deleted.",
-                "warning": "test: Metrics are not removed from metric profiles."
-                           " Unable to get metric profiles: Exception"
+            response.data['detail'],
+            'Metric templates argo.AMS-Check, test.AMS-Check will be '
+            'deleted once tenant metrics are deleted.'
+        )
+        self.assertEqual(run_worker(once=True), 2)
+        self.assertEqual(
+            self._step_results(response.data['id']), {
+                'test': [
+                    'test: Metrics are not removed from metric profiles. '
+                    'Unable to get metric profiles: Exception'
+                ],
+                'public': []
             }
         )
         metric_history = poem_models.TenantHistory.objects.filter(
@@ -9546,7 +9736,7 @@ class BulkDeleteMetricTemplatesTests(TenantTestCase):
         assert self.metric, metric_history
         self.assertFalse(mock_sync.called)
 
-    @patch('Poem.api.internal_views.metrictemplates.sync_tags_webapi')
+    @patch('Poem.api.internal_views.jobs.sync_tags_webapi')
     @patch(
         'Poem.api.internal_views.metrictemplates.delete_metrics_from_profile')
     @patch('Poem.api.internal_views.metrictemplates.get_metrics_in_profiles')
@@ -9566,20 +9756,26 @@ class BulkDeleteMetricTemplatesTests(TenantTestCase):
         request.tenant = self.sp_tenant
         force_authenticate(request, user=self.superuser)
         response = self.view(request)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
         self.assertEqual(
-            response.data,
-            {
-                "info": "Metric templates argo.AMS-Check, test.AMS-Check "
-                        "successfully deleted.",
-                "warning": "test: Metric test.AMS-Check not deleted "
-                           "from profile PROFILE1: Error deleting metric from "
-                           "profile: Something went wrong; "
-                           "test: Metric test.AMS-Check not deleted from "
-                           "profile PROFILE2: Error deleting metric from "
-                           "profile: Something went wrong"
+            response.data['detail'],
+            'Metric templates argo.AMS-Check, test.AMS-Check will be '
+            'deleted once tenant metrics are deleted.'
+        )
+        self.assertEqual(run_worker(once=True), 2)
+        self.assertEqual(
+            self._step_results(response.data['id']), {
+                'test': [
+                    'test: Metric test.AMS-Check not deleted from profile '
+                    'PROFILE1: Error deleting metric from profile: '
+                    'Something went wrong',
+                    'test: Metric test.AMS-Check not deleted from profile '
+                    'PROFILE2: Error deleting metric from profile: '
+                    'Something went wrong'
+                ],
+                'public': []
             }
         )
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertRaises(
             admin_models.MetricTemplate.DoesNotExist,
             admin_models.MetricTemplate.objects.get,
@@ -9606,7 +9802,7 @@ class BulkDeleteMetricTemplatesTests(TenantTestCase):
         ])
         mock_sync.assert_called_once()
 
-    @patch('Poem.api.internal_views.metrictemplates.sync_tags_webapi')
+    @patch('Poem.api.internal_views.jobs.sync_tags_webapi')
     @patch(
         'Poem.api.internal_views.metrictemplates.delete_metrics_from_profile')
     @patch('Poem.api.internal_views.metrictemplates.get_metrics_in_profiles')
@@ -9623,14 +9819,19 @@ class BulkDeleteMetricTemplatesTests(TenantTestCase):
         request.tenant = self.sp_tenant
         force_authenticate(request, user=self.superuser)
         response = self.view(request)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
         self.assertEqual(
-            response.data,
-            {
-                "info": "Metric templates argo.AMS-Check, test.AMS-Check "
-                        "successfully deleted."
+            response.data['detail'],
+            'Metric templates argo.AMS-Check, test.AMS-Check will be '
+            'deleted once tenant metrics are deleted.'
+        )
+        self.assertEqual(run_worker(once=True), 2)
+        self.assertEqual(
+            self._step_results(response.data['id']), {
+                'test': [],
+                'public': []
             }
         )
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertRaises(
             admin_models.MetricTemplate.DoesNotExist,
             admin_models.MetricTemplate.objects.get,
@@ -9653,7 +9854,7 @@ class BulkDeleteMetricTemplatesTests(TenantTestCase):
         self.assertFalse(mock_delete.called)
         mock_sync.assert_called_once()
 
-    @patch('Poem.api.internal_views.metrictemplates.sync_tags_webapi')
+    @patch('Poem.api.internal_views.jobs.sync_tags_webapi')
     @patch(
         'Poem.api.internal_views.metrictemplates.delete_metrics_from_profile')
     @patch('Poem.api.internal_views.metrictemplates.get_metrics_in_profiles')
@@ -9671,14 +9872,19 @@ class BulkDeleteMetricTemplatesTests(TenantTestCase):
         request.tenant = self.sp_tenant
         force_authenticate(request, user=self.superuser)
         response = self.view(request)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
         self.assertEqual(
-            response.data,
-            {
-                "info": "Metric templates argo.AMS-Check, test.AMS-Check "
-                        "successfully deleted."
+            response.data['detail'],
+            'Metric templates argo.AMS-Check, test.AMS-Check will be '
+            'deleted once tenant metrics are deleted.'
+        )
+        self.assertEqual(run_worker(once=True), 2)
+        self.assertEqual(
+            self._step_results(response.data['id']), {
+                'test': [],
+                'public': []
             }
         )
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertRaises(
             admin_models.MetricTemplate.DoesNotExist,
             admin_models.MetricTemplate.objects.get,
@@ -9701,7 +9907,7 @@ class BulkDeleteMetricTemplatesTests(TenantTestCase):
         self.assertFalse(mock_delete.called)
         mock_sync.assert_called_once()
 
-    @patch('Poem.api.internal_views.metrictemplates.sync_tags_webapi')
+    @patch('Poem.api.internal_views.jobs.sync_tags_webapi')
     @patch(
         'Poem.api.internal_views.metrictemplates.delete_metrics_from_profile')
     @patch('Poem.api.internal_views.metrictemplates.get_metrics_in_profiles')
@@ -9721,21 +9927,28 @@ class BulkDeleteMetricTemplatesTests(TenantTestCase):
         request.tenant = self.sp_tenant
         force_authenticate(request, user=self.superuser)
         response = self.view(request)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
         self.assertEqual(
-            response.data,
-            {
-                "info": "Metric templates argo.AMS-Check, test.AMS-Check "
-                        "successfully deleted.",
-                "warning": "test: Metric test.AMS-Check not deleted "
-                           "from profile PROFILE1: Error deleting metric from "
-                           "profile: Something went wrong; "
-                           "test: Metric test.AMS-Check not deleted from "
-                           "profile PROFILE2: Error deleting metric from "
-                           "profile: Something went wrong\n"
-                           "Error syncing metric tags: 400 BAD REQUEST"
+            response.data['detail'],
+            'Metric templates argo.AMS-Check, test.AMS-Check will be '
+            'deleted once tenant metrics are deleted.'
+        )
+        self.assertEqual(run_worker(once=True), 2)
+        self.assertEqual(
+            self._step_results(response.data['id']), {
+                'test': [
+                    'test: Metric test.AMS-Check not deleted from profile '
+                    'PROFILE1: Error deleting metric from profile: '
+                    'Something went wrong',
+                    'test: Metric test.AMS-Check not deleted from profile '
+                    'PROFILE2: Error deleting metric from profile: '
+                    'Something went wrong'
+                ],
+                'public': [
+                    'Error syncing metric tags: 400 BAD REQUEST'
+                ]
             }
         )
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertRaises(
             admin_models.MetricTemplate.DoesNotExist,
             admin_models.MetricTemplate.objects.get,
@@ -10533,7 +10746,8 @@ class MetricTagsTests(TenantTestCase):
         request.tenant = self.public_tenant
         force_authenticate(request, user=self.superuser)
         response = self.view(request)
-        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        run_worker(once=True)
         mock_sync.assert_called_once()
         self.assertEqual(admin_models.MetricTags.objects.all().count(), 5)
         tag = admin_models.MetricTags.objects.get(name="test_tag3")
@@ -10633,7 +10847,8 @@ class MetricTagsTests(TenantTestCase):
         request.tenant = self.public_tenant
         force_authenticate(request, user=self.superuser)
         response = self.view(request)
-        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        run_worker(once=True)
         self.assertEqual(
             response.data["detail"], "Metric mock.AMS-Check does not exist."
         )
@@ -10674,7 +10889,8 @@ class MetricTagsTests(TenantTestCase):
         request.tenant = self.public_tenant
         force_authenticate(request, user=self.superuser)
         response = self.view(request)
-        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        run_worker(once=True)
         self.assertEqual(
             response.data["detail"],
             "Metrics mock.AMS-Check, mock2.AMS-Check do not exist."
@@ -10782,7 +10998,8 @@ class MetricTagsTests(TenantTestCase):
         request.tenant = self.public_tenant
         force_authenticate(request, user=self.superuser)
         response = self.view(request)
-        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        run_worker(once=True)
         self.assertEqual(
             response.data["detail"],
             "Error syncing metric tags: 400 BAD REQUEST\n"
@@ -10924,7 +11141,8 @@ class MetricTagsTests(TenantTestCase):
         request.tenant = self.public_tenant
         force_authenticate(request, user=self.superuser)
         response = self.view(request)
-        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        run_worker(once=True)
         mock_sync.assert_called_once()
         self.assertEqual(admin_models.MetricTags.objects.all().count(), 4)
         self.assertEqual(
@@ -11258,7 +11476,8 @@ class MetricTagsTests(TenantTestCase):
         request.tenant = self.public_tenant
         force_authenticate(request, user=self.superuser)
         response = self.view(request)
-        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        run_worker(once=True)
         self.assertEqual(
             response.data["detail"],
             "Error syncing metric tags: 400 BAD REQUEST"
@@ -12175,7 +12394,8 @@ class MetricTagsTests(TenantTestCase):
         request.tenant = self.public_tenant
         force_authenticate(request, user=self.superuser)
         response = self.view(request)
-        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        run_worker(once=True)
         mock_sync.assert_called_once()
         self.assertEqual(admin_models.MetricTags.objects.all().count(), 4)
         self.assertEqual(
@@ -12231,6 +12451,58 @@ class MetricTagsTests(TenantTestCase):
             ["internal", "test_tag2", "test_tag3"]
         )
 
+    @patch("Poem.api.internal_views.metrictemplates.sync_tags_webapi")
+    def test_put_metric_tag_updates_tenants_in_single_job(self, mock_sync):
+        mock_sync.side_effect = mocked_func
+        data = {
+            "id": self.tag3.id,
+            "name": "test_tag4",
+            "metrics": ["argo.AMS-Check", "test.AMS-Check"]
+        }
+        content, content_type = encode_data(data)
+        request = self.factory.put(self.url, content, content_type=content_type)
+        request.tenant = self.public_tenant
+        force_authenticate(request, user=self.superuser)
+        response = self.view(request)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        mock_sync.assert_called_once()
+        job = admin_models.Job.objects.get(id=response.data["id"])
+        self.assertEqual(job.kind, "update_metrics_from_templates")
+        self.assertEqual(job.user, "poem")
+        self.assertEqual(
+            sorted(
+                admin_models.MetricTemplate.objects.filter(
+                    pk__in=job.params["metrictemplates"]
+                ).values_list("name", flat=True)
+            ), [
+                "argo.AMS-Check", "argo.EGI-Connectors-Check",
+                "test.AMS-Check"
+            ]
+        )
+        self.assertEqual(
+            list(job.steps.values_list("schema_name", flat=True)),
+            [self.tenant.schema_name]
+        )
+        self.assertEqual(
+            sorted([tag.name for tag in self.mt1.tags.all()]),
+            ["internal", "test_tag2", "test_tag4"]
+        )
+        self.assertEqual(
+            [tag.name for tag in self.mt4_version1.tags.all()], ["test_tag4"]
+        )
+        self.assertEqual([tag.name for tag in self.mt5.tags.all()], [])
+        metric1_history = json.loads(poem_models.TenantHistory.objects.filter(
+            object_id=self.metric1.id
+        ).order_by("-date_created")[0].serialized_data)[0]["fields"]
+        self.assertEqual(metric1_history, self.metric1_history)
+        self.assertEqual(run_worker(once=True), 1)
+        metric1_history = json.loads(poem_models.TenantHistory.objects.filter(
+            object_id=self.metric1.id
+        ).order_by("-date_created")[0].serialized_data)[0]["fields"]
+        self.assertEqual(
+            [tag[0] for tag in metric1_history["tags"]], ["test_tag4"]
+        )
+
     @patch("Poem.api.internal_views.metrictemplates.sync_tags_webapi")
     def test_put_metric_tag_with_metrics_admin_regular_user(self, mock_sync):
         mock_sync.side_effect = mocked_func
@@ -12648,7 +12920,8 @@ class MetricTagsTests(TenantTestCase):
         request.tenant = self.public_tenant
         force_authenticate(request, user=self.superuser)
         response = self.view(request)
-        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        run_worker(once=True)
         mock_sync.assert_called_once()
         self.assertEqual(admin_models.MetricTags.objects.all().count(), 4)
         self.assertEqual(
@@ -13127,7 +13400,8 @@ class MetricTagsTests(TenantTestCase):
         request.tenant = self.public_tenant
         force_authenticate(request, user=self.superuser)
         response = self.view(request)
-        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        run_worker(once=True)
         self.assertEqual(
             response.data["detail"], "Metric mock.AMS-Check does not exist."
         )
@@ -13246,7 +13520,8 @@ class MetricTagsTests(TenantTestCase):
         request.tenant = self.public_tenant
         force_authenticate(request, user=self.superuser)
         response = self.view(request)
-        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        run_worker(once=True)
         self.assertEqual(
             response.data["detail"],
             "Metrics mock.AMS-Check, mock2.AMS-Check do not exist."
@@ -13733,7 +14008,8 @@ class MetricTagsTests(TenantTestCase):
         request.tenant = self.public_tenant
         force_authenticate(request, user=self.superuser)
         response = self.view(request, "test_tag2")
-        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        run_worker(once=True)
         mock_sync.assert_called_once()
         self.assertEqual(admin_models.MetricTags.objects.all().count(), 3)
         self.assertEqual(
@@ -13835,7 +14111,8 @@ class MetricTagsTests(TenantTestCase):
         request.tenant = self.public_tenant
         force_authenticate(request, user=self.superuser)
         response = self.view(request, "test_tag2")
-        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        run_worker(once=True)
         self.assertEqual(
             response.data["detail"],
             "Error syncing metric tags: 400 BAD REQUEST"
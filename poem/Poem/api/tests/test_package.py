@@ -3,11 +3,15 @@ import json
 
 from Poem.api import views_internal as views
 from Poem.helpers.history_helpers import serialize_metric
+from Poem.helpers.job_helpers import run_worker
 from Poem.poem import models as poem_models
 from Poem.poem_super_admin import models as admin_models
+from Poem.poem_super_admin.dbmodels.fields import to_text
 from Poem.tenants.models import Tenant
 from Poem.users.models import CustUser
 from django.contrib.contenttypes.models import ContentType
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django_tenants.test.cases import TenantTestCase
 from django_tenants.test.client import TenantRequestFactory
 from django_tenants.utils import schema_context, get_public_schema_name, \
@@ -2656,3 +2660,187 @@ class ListPackagesVersionsTests(TenantTestCase):
         response = self.view(request, 'nonexisting-package')
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
         self.assertEqual(response.data['detail'], 'Package not found.')
+
+
+class PackageVersionPropagationTests(TenantTestCase):
+    def setUp(self):
+        with schema_context(get_public_schema_name()):
+            Tenant.objects.create(
+                name='public', schema_name=get_public_schema_name()
+            )
+
+        self.package = admin_models.Package.objects.create(
+            name='nagios-plugins-argo',
+            version='0.1.7'
+        )
+        package2 = admin_models.Package.objects.create(
+            name='nagios-plugins-fedcloud',
+            version='0.5.0'
+        )
+
+        probe1 = admin_models.Probe.objects.create(
+            name='ams-probe',
+            package=self.package,
+            description='Probe is inspecting AMS service.',
+            comment='Initial version.',
+            repository='https://github.com/ARGOeu/nagios-plugins-argo',
+            docurl='https://github.com/ARGOeu/nagios-plugins-argo/blob/master/'
+                   'README.md',
+            user='testuser',
+            datetime=datetime.datetime.now()
+        )
+        probe2 = admin_models.Probe.objects.create(
+            name='novaprobe',
+            package=package2,
+            description='Probe uses OpenStack API.',
+            comment='Initial version.',
+            repository='https://github.com/ARGOeu/nagios-plugins-fedcloud',
+            docurl='https://github.com/ARGOeu/nagios-plugins-fedcloud/blob/'
+                   'master/README.md',
+            user='testuser',
+            datetime=datetime.datetime.now()
+        )
+
+        probekeys = []
+        for probe in [probe1, probe2]:
+            probekeys.append(admin_models.ProbeHistory.objects.create(
+                object_id=probe,
+                name=probe.name,
+                package=probe.package,
+                description=probe.description,
+                comment=probe.comment,
+                repository=probe.repository,
+                docurl=probe.docurl,
+                version_comment='Initial version.',
+                version_user='testuser'
+            ))
+
+        self.ct = ContentType.objects.get_for_model(poem_models.Metric)
+        group = poem_models.GroupOfMetrics.objects.create(name='TEST')
+
+        for i in range(200):
+            metric = poem_models.Metric.objects.create(
+                name=f'argo.AMS-Check-{i}',
+                group=group,
+                probeversion=probekeys[0].__str__(),
+                config='["maxCheckAttempts 3", "timeout 60", '
+                       '"path /usr/libexec/argo-monitoring/probes/argo", '
+                       '"interval 5", "retryInterval 3"]'
+            )
+            poem_models.TenantHistory.objects.create(
+                object_id=metric.id,
+                serialized_data=self._serialize(
+                    metric, ['ams-probe', '0.1.7']
+                ),
+                object_repr=metric.__str__(),
+                content_type=self.ct,
+                comment='Initial version.',
+                user='testuser'
+            )
+
+        self.metric = poem_models.Metric.objects.create(
+            name='eu.egi.cloud.OpenStack-VM',
+            group=group,
+            probeversion=probekeys[1].__str__(),
+            config='["maxCheckAttempts 3", "timeout 60", '
+                   '"path /usr/libexec/argo-monitoring/probes/fedcloud", '
+                   '"interval 5", "retryInterval 3"]'
+        )
+        poem_models.TenantHistory.objects.create(
+            object_id=self.metric.id,
+            serialized_data=self._serialize(
+                self.metric, ['novaprobe', '0.5.0']
+            ),
+            object_repr=self.metric.__str__(),
+            content_type=self.ct,
+            comment='Initial version.',
+            user='testuser'
+        )
+
+    @staticmethod
+    def _serialize(metric, probekey):
+        return json.dumps([{
+            'model': 'poem.metric',
+            'fields': {
+                'name': metric.name,
+                'group': [metric.group.name],
+                'probekey': probekey,
+                'config': to_text(metric.config)
+            }
+        }])
+
+    def test_new_package_version_propagated_to_metrics(self):
+        poem_models.MetricChange.objects.all().delete()
+        self.package.version = '0.1.8'
+
+        self.package.save()
+        self.assertEqual(self.package.job.kind, 'update_package_version')
+        self.assertEqual(
+            self.package.job.params, {
+                'package': self.package.id, 'probes': ['ams-probe'],
+                'old_version': '0.1.7', 'version': '0.1.8'
+            }
+        )
+        self.assertEqual(
+            poem_models.Metric.objects.filter(
+                probeversion='ams-probe (0.1.7)'
+            ).count(), 200
+        )
+
+        with CaptureQueriesContext(connection) as context:
+            self.assertEqual(run_worker(once=True), 1)
+
+        self.assertLess(len(context.captured_queries), 20)
+        self.assertEqual(
+            poem_models.Metric.objects.filter(
+                probeversion='ams-probe (0.1.8)'
+            ).count(), 200
+        )
+        self.assertFalse(
+            poem_models.Metric.objects.filter(
+                probeversion='ams-probe (0.1.7)'
+            ).exists()
+        )
+        self.assertEqual(
+            poem_models.Metric.objects.get(id=self.metric.id).probeversion,
+            'novaprobe (0.5.0)'
+        )
+        self.assertEqual(
+            set(
+                poem_models.MetricChange.objects.values_list(
+                    'action', flat=True
+                )
+            ), {poem_models.MetricChange.UPDATED}
+        )
+        self.assertEqual(poem_models.MetricChange.objects.count(), 200)
+        for history in poem_models.TenantHistory.objects.filter(
+                content_type=self.ct
+        ):
+            serialized_data = json.loads(history.serialized_data)[0]
+            if history.object_id == self.metric.id:
+                self.assertEqual(
+                    serialized_data['fields']['probekey'],
+                    ['novaprobe', '0.5.0']
+                )
+
+            else:
+                self.assertEqual(
+                    serialized_data['fields']['probekey'],
+                    ['ams-probe', '0.1.8']
+                )
+                self.assertEqual(
+                    serialized_data['fields']['group'], ['TEST']
+                )
+
+    def test_package_saved_without_version_change(self):
+        poem_models.MetricChange.objects.all().delete()
+        self.package.name = 'nagios-plugins-argo2'
+        self.package.save()
+        self.assertFalse(hasattr(self.package, 'job'))
+        self.assertEqual(run_worker(once=True), 0)
+        self.assertEqual(
+            poem_models.Metric.objects.filter(
+                probeversion='ams-probe (0.1.7)'
+            ).count(), 200
+        )
+        self.assertFalse(poem_models.MetricChange.objects.exists())
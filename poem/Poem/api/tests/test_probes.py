@@ -3,8 +3,10 @@ import json
 
 from Poem.api import views_internal as views
 from Poem.helpers.history_helpers import serialize_metric
+from Poem.helpers.job_helpers import run_worker
 from Poem.poem import models as poem_models
 from Poem.poem_super_admin import models as admin_models
+from Poem.poem_super_admin.dbmodels.fields import to_text
 from Poem.tenants.models import Tenant
 from Poem.users.models import CustUser
 from django.contrib.contenttypes.models import ContentType
@@ -1442,7 +1444,9 @@ class ListProbesAPIViewTests(TenantTestCase):
         request.tenant = self.super_tenant
         force_authenticate(request, user=self.superuser)
         response = self.view(request)
-        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['kind'], 'rename_probe')
+        run_worker(once=True)
         probe = admin_models.Probe.objects.get(id=self.probe1.id)
         version = admin_models.ProbeHistory.objects.get(
             object_id=probe, package__version=probe.package.version
@@ -1482,9 +1486,11 @@ class ListProbesAPIViewTests(TenantTestCase):
         self.assertEqual(metric.probeversion, version.__str__())
         self.assertEqual(
             metric.config,
-            '["maxCheckAttempts 3", "timeout 60", '
-            '"path /usr/libexec/argo-monitoring/probes/argo", '
-            '"interval 5", "retryInterval 3"]'
+            [
+                ['maxCheckAttempts', '3'], ['timeout', '60'],
+                ['path', '/usr/libexec/argo-monitoring/probes/argo'],
+                ['interval', '5'], ['retryInterval', '3']
+            ]
         )
         mt_history = poem_models.TenantHistory.objects.filter(
             object_repr='argo.AMS-Check'
@@ -1500,7 +1506,7 @@ class ListProbesAPIViewTests(TenantTestCase):
         self.assertEqual(serialized_data['group'], ['TEST'])
         self.assertEqual(serialized_data['parent'], "")
         self.assertEqual(serialized_data['probeexecutable'], '["ams-probe"]')
-        self.assertEqual(serialized_data['config'], metric.config)
+        self.assertEqual(serialized_data['config'], to_text(metric.config))
         self.assertEqual(
             serialized_data['attribute'], '["argo.ams_TOKEN --token"]'
         )
@@ -1571,9 +1577,11 @@ class ListProbesAPIViewTests(TenantTestCase):
         self.assertEqual(metric.probeversion, version.__str__())
         self.assertEqual(
             metric.config,
-            '["maxCheckAttempts 3", "timeout 60", '
-            '"path /usr/libexec/argo-monitoring/probes/argo", '
-            '"interval 5", "retryInterval 3"]'
+            [
+                ['maxCheckAttempts', '3'], ['timeout', '60'],
+                ['path', '/usr/libexec/argo-monitoring/probes/argo'],
+                ['interval', '5'], ['retryInterval', '3']
+            ]
         )
         mt_history = poem_models.TenantHistory.objects.filter(
             object_repr='argo.AMS-Check'
@@ -1587,7 +1595,7 @@ class ListProbesAPIViewTests(TenantTestCase):
         self.assertEqual(serialized_data['group'], ['TEST'])
         self.assertEqual(serialized_data['parent'], "")
         self.assertEqual(serialized_data['probeexecutable'], '["ams-probe"]')
-        self.assertEqual(serialized_data['config'], metric.config)
+        self.assertEqual(serialized_data['config'], to_text(metric.config))
         self.assertEqual(
             serialized_data['attribute'], '["argo.ams_TOKEN --token"]'
         )
@@ -1658,9 +1666,11 @@ class ListProbesAPIViewTests(TenantTestCase):
         self.assertEqual(metric.probeversion, version.__str__())
         self.assertEqual(
             metric.config,
-            '["maxCheckAttempts 3", "timeout 60", '
-            '"path /usr/libexec/argo-monitoring/probes/argo", '
-            '"interval 5", "retryInterval 3"]'
+            [
+                ['maxCheckAttempts', '3'], ['timeout', '60'],
+                ['path', '/usr/libexec/argo-monitoring/probes/argo'],
+                ['interval', '5'], ['retryInterval', '3']
+            ]
         )
         mt_history = poem_models.TenantHistory.objects.filter(
             object_repr='argo.AMS-Check'
@@ -1674,7 +1684,7 @@ class ListProbesAPIViewTests(TenantTestCase):
         self.assertEqual(serialized_data['group'], ['TEST'])
         self.assertEqual(serialized_data['parent'], "")
         self.assertEqual(serialized_data['probeexecutable'], '["ams-probe"]')
-        self.assertEqual(serialized_data['config'], metric.config)
+        self.assertEqual(serialized_data['config'], to_text(metric.config))
         self.assertEqual(
             serialized_data['attribute'], '["argo.ams_TOKEN --token"]'
         )
@@ -1745,9 +1755,11 @@ class ListProbesAPIViewTests(TenantTestCase):
         self.assertEqual(metric.probeversion, version.__str__())
         self.assertEqual(
             metric.config,
-            '["maxCheckAttempts 3", "timeout 60", '
-            '"path /usr/libexec/argo-monitoring/probes/argo", '
-            '"interval 5", "retryInterval 3"]'
+            [
+                ['maxCheckAttempts', '3'], ['timeout', '60'],
+                ['path', '/usr/libexec/argo-monitoring/probes/argo'],
+                ['interval', '5'], ['retryInterval', '3']
+            ]
         )
         mt_history = poem_models.TenantHistory.objects.filter(
             object_repr='argo.AMS-Check'
@@ -1761,7 +1773,7 @@ class ListProbesAPIViewTests(TenantTestCase):
         self.assertEqual(serialized_data['group'], ['TEST'])
         self.assertEqual(serialized_data['parent'], "")
         self.assertEqual(serialized_data['probeexecutable'], '["ams-probe"]')
-        self.assertEqual(serialized_data['config'], metric.config)
+        self.assertEqual(serialized_data['config'], to_text(metric.config))
         self.assertEqual(
             serialized_data['attribute'], '["argo.ams_TOKEN --token"]'
         )
@@ -1831,9 +1843,11 @@ class ListProbesAPIViewTests(TenantTestCase):
         self.assertEqual(metric.probeversion, version.__str__())
         self.assertEqual(
             metric.config,
-            '["maxCheckAttempts 3", "timeout 60", '
-            '"path /usr/libexec/argo-monitoring/probes/argo", '
-            '"interval 5", "retryInterval 3"]'
+            [
+                ['maxCheckAttempts', '3'], ['timeout', '60'],
+                ['path', '/usr/libexec/argo-monitoring/probes/argo'],
+                ['interval', '5'], ['retryInterval', '3']
+            ]
         )
         mt_history = poem_models.TenantHistory.objects.filter(
             object_repr='argo.AMS-Check'
@@ -1847,7 +1861,7 @@ class ListProbesAPIViewTests(TenantTestCase):
         self.assertEqual(serialized_data['group'], ['TEST'])
         self.assertEqual(serialized_data['parent'], "")
         self.assertEqual(serialized_data['probeexecutable'], '["ams-probe"]')
-        self.assertEqual(serialized_data['config'], metric.config)
+        self.assertEqual(serialized_data['config'], to_text(metric.config))
         self.assertEqual(
             serialized_data['attribute'], '["argo.ams_TOKEN --token"]'
         )
@@ -1920,9 +1934,11 @@ class ListProbesAPIViewTests(TenantTestCase):
         self.assertEqual(metric.probeversion, version.__str__())
         self.assertEqual(
             metric.config,
-            '["maxCheckAttempts 3", "timeout 60", '
-            '"path /usr/libexec/argo-monitoring/probes/argo", '
-            '"interval 5", "retryInterval 3"]'
+            [
+                ['maxCheckAttempts', '3'], ['timeout', '60'],
+                ['path', '/usr/libexec/argo-monitoring/probes/argo'],
+                ['interval', '5'], ['retryInterval', '3']
+            ]
         )
         mt_history = poem_models.TenantHistory.objects.filter(
             object_repr='argo.AMS-Check'
@@ -1936,7 +1952,7 @@ class ListProbesAPIViewTests(TenantTestCase):
         self.assertEqual(serialized_data['group'], ['TEST'])
         self.assertEqual(serialized_data['parent'], "")
         self.assertEqual(serialized_data['probeexecutable'], '["ams-probe"]')
-        self.assertEqual(serialized_data['config'], metric.config)
+        self.assertEqual(serialized_data['config'], to_text(metric.config))
         self.assertEqual(
             serialized_data['attribute'], '["argo.ams_TOKEN --token"]'
         )
@@ -2009,9 +2025,11 @@ class ListProbesAPIViewTests(TenantTestCase):
         self.assertEqual(metric.probeversion, version.__str__())
         self.assertEqual(
             metric.config,
-            '["maxCheckAttempts 3", "timeout 60", '
-            '"path /usr/libexec/argo-monitoring/probes/argo", '
-            '"interval 5", "retryInterval 3"]'
+            [
+                ['maxCheckAttempts', '3'], ['timeout', '60'],
+                ['path', '/usr/libexec/argo-monitoring/probes/argo'],
+                ['interval', '5'], ['retryInterval', '3']
+            ]
         )
         mt_history = poem_models.TenantHistory.objects.filter(
             object_repr='argo.AMS-Check'
@@ -2027,7 +2045,7 @@ class ListProbesAPIViewTests(TenantTestCase):
         self.assertEqual(serialized_data['group'], ['TEST'])
         self.assertEqual(serialized_data['parent'], "")
         self.assertEqual(serialized_data['probeexecutable'], '["ams-probe"]')
-        self.assertEqual(serialized_data['config'], metric.config)
+        self.assertEqual(serialized_data['config'], to_text(metric.config))
         self.assertEqual(
             serialized_data['attribute'], '["argo.ams_TOKEN --token"]'
         )
@@ -2100,9 +2118,11 @@ class ListProbesAPIViewTests(TenantTestCase):
         self.assertEqual(metric.probeversion, version.__str__())
         self.assertEqual(
             metric.config,
-            '["maxCheckAttempts 3", "timeout 60", '
-            '"path /usr/libexec/argo-monitoring/probes/argo", '
-            '"interval 5", "retryInterval 3"]'
+            [
+                ['maxCheckAttempts', '3'], ['timeout', '60'],
+                ['path', '/usr/libexec/argo-monitoring/probes/argo'],
+                ['interval', '5'], ['retryInterval', '3']
+            ]
         )
         mt_history = poem_models.TenantHistory.objects.filter(
             object_repr='argo.AMS-Check'
@@ -2116,7 +2136,7 @@ class ListProbesAPIViewTests(TenantTestCase):
         self.assertEqual(serialized_data['group'], ['TEST'])
         self.assertEqual(serialized_data['parent'], "")
         self.assertEqual(serialized_data['probeexecutable'], '["ams-probe"]')
-        self.assertEqual(serialized_data['config'], metric.config)
+        self.assertEqual(serialized_data['config'], to_text(metric.config))
         self.assertEqual(
             serialized_data['attribute'], '["argo.ams_TOKEN --token"]'
         )
@@ -2199,9 +2219,11 @@ class ListProbesAPIViewTests(TenantTestCase):
         )
         self.assertEqual(
             metric.config,
-            '["maxCheckAttempts 3", "timeout 120", '
-            '"path /usr/libexec/argo-monitoring/probes/argo", '
-            '"interval 5", "retryInterval 3"]'
+            [
+                ['maxCheckAttempts', '3'], ['timeout', '120'],
+                ['path', '/usr/libexec/argo-monitoring/probes/argo'],
+                ['interval', '5'], ['retryInterval', '3']
+            ]
         )
         mt_history = poem_models.TenantHistory.objects.filter(
             object_repr='argo.API-Check'
@@ -2215,7 +2237,7 @@ class ListProbesAPIViewTests(TenantTestCase):
         self.assertEqual(serialized_data['group'], ['TEST'])
         self.assertEqual(serialized_data['parent'], "")
         self.assertEqual(serialized_data['probeexecutable'], '["web-api"]')
-        self.assertEqual(serialized_data['config'], metric.config)
+        self.assertEqual(serialized_data['config'], to_text(metric.config))
         self.assertEqual(
             serialized_data['attribute'], '["argo.api_TOKEN --token"]'
         )
@@ -2288,9 +2310,11 @@ class ListProbesAPIViewTests(TenantTestCase):
         self.assertEqual(metric.probeversion, version.__str__())
         self.assertEqual(
             metric.config,
-            '["maxCheckAttempts 3", "timeout 120", '
-            '"path /usr/libexec/argo-monitoring/probes/argo", '
-            '"interval 5", "retryInterval 3"]'
+            [
+                ['maxCheckAttempts', '3'], ['timeout', '120'],
+                ['path', '/usr/libexec/argo-monitoring/probes/argo'],
+                ['interval', '5'], ['retryInterval', '3']
+            ]
         )
         mt_history = poem_models.TenantHistory.objects.filter(
             object_repr='argo.API-Check'
@@ -2304,7 +2328,7 @@ class ListProbesAPIViewTests(TenantTestCase):
         self.assertEqual(serialized_data['group'], ['TEST'])
         self.assertEqual(serialized_data['parent'], "")
         self.assertEqual(serialized_data['probeexecutable'], '["web-api"]')
-        self.assertEqual(serialized_data['config'], metric.config)
+        self.assertEqual(serialized_data['config'], to_text(metric.config))
         self.assertEqual(
             serialized_data['attribute'], '["argo.api_TOKEN --token"]'
         )
@@ -2377,9 +2401,11 @@ class ListProbesAPIViewTests(TenantTestCase):
         self.assertEqual(metric.probeversion, version.__str__())
         self.assertEqual(
             metric.config,
-            '["maxCheckAttempts 3", "timeout 120", '
-            '"path /usr/libexec/argo-monitoring/probes/argo", '
-            '"interval 5", "retryInterval 3"]'
+            [
+                ['maxCheckAttempts', '3'], ['timeout', '120'],
+                ['path', '/usr/libexec/argo-monitoring/probes/argo'],
+                ['interval', '5'], ['retryInterval', '3']
+            ]
         )
         mt_history = poem_models.TenantHistory.objects.filter(
             object_repr='argo.API-Check'
@@ -2393,7 +2419,7 @@ class ListProbesAPIViewTests(TenantTestCase):
         self.assertEqual(serialized_data['group'], ['TEST'])
         self.assertEqual(serialized_data['parent'], "")
         self.assertEqual(serialized_data['probeexecutable'], '["web-api"]')
-        self.assertEqual(serialized_data['config'], metric.config)
+        self.assertEqual(serialized_data['config'], to_text(metric.config))
         self.assertEqual(
             serialized_data['attribute'], '["argo.api_TOKEN --token"]'
         )
@@ -2466,9 +2492,11 @@ class ListProbesAPIViewTests(TenantTestCase):
         self.assertEqual(metric.probeversion, version.__str__())
         self.assertEqual(
             metric.config,
-            '["maxCheckAttempts 3", "timeout 120", '
-            '"path /usr/libexec/argo-monitoring/probes/argo", '
-            '"interval 5", "retryInterval 3"]'
+            [
+                ['maxCheckAttempts', '3'], ['timeout', '120'],
+                ['path', '/usr/libexec/argo-monitoring/probes/argo'],
+                ['interval', '5'], ['retryInterval', '3']
+            ]
         )
         mt_history = poem_models.TenantHistory.objects.filter(
             object_repr='argo.API-Check'
@@ -2482,7 +2510,7 @@ class ListProbesAPIViewTests(TenantTestCase):
         self.assertEqual(serialized_data['group'], ['TEST'])
         self.assertEqual(serialized_data['parent'], "")
         self.assertEqual(serialized_data['probeexecutable'], '["web-api"]')
-        self.assertEqual(serialized_data['config'], metric.config)
+        self.assertEqual(serialized_data['config'], to_text(metric.config))
         self.assertEqual(
             serialized_data['attribute'], '["argo.api_TOKEN --token"]'
         )
@@ -2550,9 +2578,11 @@ class ListProbesAPIViewTests(TenantTestCase):
         self.assertEqual(metric.probeversion, versions[1].__str__())
         self.assertEqual(
             metric.config,
-            '["maxCheckAttempts 3", "timeout 120", '
-            '"path /usr/libexec/argo-monitoring/probes/argo", '
-            '"interval 5", "retryInterval 3"]'
+            [
+                ['maxCheckAttempts', '3'], ['timeout', '120'],
+                ['path', '/usr/libexec/argo-monitoring/probes/argo'],
+                ['interval', '5'], ['retryInterval', '3']
+            ]
         )
         mt_history = poem_models.TenantHistory.objects.filter(
             object_repr='argo.API-Check'
@@ -2566,7 +2596,7 @@ class ListProbesAPIViewTests(TenantTestCase):
         self.assertEqual(serialized_data['group'], ['TEST'])
         self.assertEqual(serialized_data['parent'], "")
         self.assertEqual(serialized_data['probeexecutable'], '["web-api"]')
-        self.assertEqual(serialized_data['config'], metric.config)
+        self.assertEqual(serialized_data['config'], to_text(metric.config))
         self.assertEqual(
             serialized_data['attribute'], '["argo.api_TOKEN --token"]'
         )
@@ -2639,9 +2669,11 @@ class ListProbesAPIViewTests(TenantTestCase):
         self.assertEqual(metric.probeversion, versions[0].__str__())
         self.assertEqual(
             metric.config,
-            '["maxCheckAttempts 3", "timeout 120", '
-            '"path /usr/libexec/argo-monitoring/probes/argo", '
-            '"interval 5", "retryInterval 3"]'
+            [
+                ['maxCheckAttempts', '3'], ['timeout', '120'],
+                ['path', '/usr/libexec/argo-monitoring/probes/argo'],
+                ['interval', '5'], ['retryInterval', '3']
+            ]
         )
         mt_history = poem_models.TenantHistory.objects.filter(
             object_repr='argo.API-Check'
@@ -2655,7 +2687,7 @@ class ListProbesAPIViewTests(TenantTestCase):
         self.assertEqual(serialized_data['group'], ['TEST'])
         self.assertEqual(serialized_data['parent'], "")
         self.assertEqual(serialized_data['probeexecutable'], '["web-api"]')
-        self.assertEqual(serialized_data['config'], metric.config)
+        self.assertEqual(serialized_data['config'], to_text(metric.config))
         self.assertEqual(
             serialized_data['attribute'], '["argo.api_TOKEN --token"]'
         )
@@ -2728,9 +2760,11 @@ class ListProbesAPIViewTests(TenantTestCase):
         self.assertEqual(metric.probeversion, versions[0].__str__())
         self.assertEqual(
             metric.config,
-            '["maxCheckAttempts 3", "timeout 120", '
-            '"path /usr/libexec/argo-monitoring/probes/argo", '
-            '"interval 5", "retryInterval 3"]'
+            [
+                ['maxCheckAttempts', '3'], ['timeout', '120'],
+                ['path', '/usr/libexec/argo-monitoring/probes/argo'],
+                ['interval', '5'], ['retryInterval', '3']
+            ]
         )
         mt_history = poem_models.TenantHistory.objects.filter(
             object_repr='argo.API-Check'
@@ -2744,7 +2778,7 @@ class ListProbesAPIViewTests(TenantTestCase):
         self.assertEqual(serialized_data['group'], ['TEST'])
         self.assertEqual(serialized_data['parent'], "")
         self.assertEqual(serialized_data['probeexecutable'], '["web-api"]')
-        self.assertEqual(serialized_data['config'], metric.config)
+        self.assertEqual(serialized_data['config'], to_text(metric.config))
         self.assertEqual(
             serialized_data['attribute'], '["argo.api_TOKEN --token"]'
         )
@@ -2817,9 +2851,11 @@ class ListProbesAPIViewTests(TenantTestCase):
         self.assertEqual(metric.probeversion, versions[0].__str__())
         self.assertEqual(
             metric.config,
-            '["maxCheckAttempts 3", "timeout 120", '
-            '"path /usr/libexec/argo-monitoring/probes/argo", '
-            '"interval 5", "retryInterval 3"]'
+            [
+                ['maxCheckAttempts', '3'], ['timeout', '120'],
+                ['path', '/usr/libexec/argo-monitoring/probes/argo'],
+                ['interval', '5'], ['retryInterval', '3']
+            ]
         )
         mt_history = poem_models.TenantHistory.objects.filter(
             object_repr='argo.API-Check'
@@ -2833,7 +2869,7 @@ class ListProbesAPIViewTests(TenantTestCase):
         self.assertEqual(serialized_data['group'], ['TEST'])
         self.assertEqual(serialized_data['parent'], "")
         self.assertEqual(serialized_data['probeexecutable'], '["web-api"]')
-        self.assertEqual(serialized_data['config'], metric.config)
+        self.assertEqual(serialized_data['config'], to_text(metric.config))
         self.assertEqual(
             serialized_data['attribute'], '["argo.api_TOKEN --token"]'
         )
@@ -2998,9 +3034,11 @@ class ListProbesAPIViewTests(TenantTestCase):
         self.assertEqual(metric.probeversion, version.__str__())
         self.assertEqual(
             metric.config,
-            '["maxCheckAttempts 3", "timeout 60", '
-            '"path /usr/libexec/argo-monitoring/probes/argo", '
-            '"interval 5", "retryInterval 3"]'
+            [
+                ['maxCheckAttempts', '3'], ['timeout', '60'],
+                ['path', '/usr/libexec/argo-monitoring/probes/argo'],
+                ['interval', '5'], ['retryInterval', '3']
+            ]
         )
         mt_history = poem_models.TenantHistory.objects.filter(
             object_repr='argo.AMS-Check'
@@ -3016,7 +3054,7 @@ class ListProbesAPIViewTests(TenantTestCase):
         self.assertEqual(serialized_data['group'], ['TEST'])
         self.assertEqual(serialized_data['parent'], "")
         self.assertEqual(serialized_data['probeexecutable'], '["ams-probe"]')
-        self.assertEqual(serialized_data['config'], metric.config)
+        self.assertEqual(serialized_data['config'], to_text(metric.config))
         self.assertEqual(
             serialized_data['attribute'], '["argo.ams_TOKEN --token"]'
         )
@@ -3085,9 +3123,11 @@ class ListProbesAPIViewTests(TenantTestCase):
         self.assertEqual(metric.probeversion, version.__str__())
         self.assertEqual(
             metric.config,
-            '["maxCheckAttempts 3", "timeout 60", '
-            '"path /usr/libexec/argo-monitoring/probes/argo", '
-            '"interval 5", "retryInterval 3"]'
+            [
+                ['maxCheckAttempts', '3'], ['timeout', '60'],
+                ['path', '/usr/libexec/argo-monitoring/probes/argo'],
+                ['interval', '5'], ['retryInterval', '3']
+            ]
         )
         mt_history = poem_models.TenantHistory.objects.filter(
             object_repr='argo.AMS-Check'
@@ -3103,7 +3143,7 @@ class ListProbesAPIViewTests(TenantTestCase):
         self.assertEqual(serialized_data['group'], ['TEST'])
         self.assertEqual(serialized_data['parent'], "")
         self.assertEqual(serialized_data['probeexecutable'], '["ams-probe"]')
-        self.assertEqual(serialized_data['config'], metric.config)
+        self.assertEqual(serialized_data['config'], to_text(metric.config))
         self.assertEqual(
             serialized_data['attribute'], '["argo.ams_TOKEN --token"]'
         )
@@ -3172,9 +3212,11 @@ class ListProbesAPIViewTests(TenantTestCase):
         self.assertEqual(metric.probeversion, version.__str__())
         self.assertEqual(
             metric.config,
-            '["maxCheckAttempts 3", "timeout 60", '
-            '"path /usr/libexec/argo-monitoring/probes/argo", '
-            '"interval 5", "retryInterval 3"]'
+            [
+                ['maxCheckAttempts', '3'], ['timeout', '60'],
+                ['path', '/usr/libexec/argo-monitoring/probes/argo'],
+                ['interval', '5'], ['retryInterval', '3']
+            ]
         )
         mt_history = poem_models.TenantHistory.objects.filter(
             object_repr='argo.AMS-Check'
@@ -3190,7 +3232,7 @@ class ListProbesAPIViewTests(TenantTestCase):
         self.assertEqual(serialized_data['group'], ['TEST'])
         self.assertEqual(serialized_data['parent'], "")
         self.assertEqual(serialized_data['probeexecutable'], '["ams-probe"]')
-        self.assertEqual(serialized_data['config'], metric.config)
+        self.assertEqual(serialized_data['config'], to_text(metric.config))
         self.assertEqual(
             serialized_data['attribute'], '["argo.ams_TOKEN --token"]'
         )
@@ -3259,9 +3301,11 @@ class ListProbesAPIViewTests(TenantTestCase):
         self.assertEqual(metric.probeversion, version.__str__())
         self.assertEqual(
             metric.config,
-            '["maxCheckAttempts 3", "timeout 60", '
-            '"path /usr/libexec/argo-monitoring/probes/argo", '
-            '"interval 5", "retryInterval 3"]'
+            [
+                ['maxCheckAttempts', '3'], ['timeout', '60'],
+                ['path', '/usr/libexec/argo-monitoring/probes/argo'],
+                ['interval', '5'], ['retryInterval', '3']
+            ]
         )
         mt_history = poem_models.TenantHistory.objects.filter(
             object_repr='argo.AMS-Check'
@@ -3275,7 +3319,7 @@ class ListProbesAPIViewTests(TenantTestCase):
         self.assertEqual(serialized_data['group'], ['TEST'])
         self.assertEqual(serialized_data['parent'], "")
         self.assertEqual(serialized_data['probeexecutable'], '["ams-probe"]')
-        self.assertEqual(serialized_data['config'], metric.config)
+        self.assertEqual(serialized_data['config'], to_text(metric.config))
         self.assertEqual(
             serialized_data['attribute'], '["argo.ams_TOKEN --token"]'
         )
@@ -4052,6 +4096,34 @@ class ListProbesAPIViewTests(TenantTestCase):
             ).count(), 0
         )
 
+    def test_delete_probe_clears_probekey_of_tenant_metrics(self):
+        probekey = admin_models.ProbeHistory.objects.get(
+            object_id=self.probe3
+        )
+        metric = poem_models.Metric.objects.create(
+            name='argo.AMSPublisher-Check',
+            group=poem_models.GroupOfMetrics.objects.get(name='TEST'),
+            probeversion=probekey.__str__(),
+            config='["maxCheckAttempts 1", "timeout 120", '
+                   '"path /usr/libexec/argo-monitoring/probes/argo", '
+                   '"interval 180", "retryInterval 1"]'
+        )
+        self.assertEqual(metric.probekey, probekey)
+        request = self.factory.delete(self.url + 'ams-publisher-probe')
+        request.tenant = self.super_tenant
+        force_authenticate(request, user=self.superuser)
+        response = self.view(request, 'ams-publisher-probe')
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        metric = poem_models.Metric.objects.get(id=metric.id)
+        self.assertIsNone(metric.probekey)
+        self.assertIsNone(metric.probeversion)
+        self.assertTrue(
+            poem_models.MetricChange.objects.filter(
+                name='argo.AMSPublisher-Check',
+                action=poem_models.MetricChange.UPDATED
+            ).exists()
+        )
+
     def test_delete_probe_sp_user(self):
         self.assertEqual(admin_models.Probe.objects.all().count(), 3)
         request = self.factory.delete(self.url + 'ams-publisher-probe')
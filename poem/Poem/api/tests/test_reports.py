@@ -45,7 +45,7 @@ class ListReportsAPIViewTests(TenantTestCase):
         poem_models.UserProfile.objects.create(user=self.limited_user)
         poem_models.UserProfile.objects.create(user=self.superuser)
 
-    @patch('Poem.api.internal_views.reports.sync_webapi')
+    @patch('Poem.api.internal_views.reports.sync_webapi_if_stale')
     def test_get_all_reports_superuser(self, func):
         func.side_effect = mocked_func
         request = self.factory.get(self.url)
@@ -70,7 +70,7 @@ class ListReportsAPIViewTests(TenantTestCase):
             ]
         )
 
-    @patch('Poem.api.internal_views.reports.sync_webapi')
+    @patch('Poem.api.internal_views.reports.sync_webapi_if_stale')
     def test_get_all_reports_regular_user(self, func):
         func.side_effect = mocked_func
         request = self.factory.get(self.url)
@@ -95,7 +95,7 @@ class ListReportsAPIViewTests(TenantTestCase):
             ]
         )
 
-    @patch('Poem.api.internal_views.reports.sync_webapi')
+    @patch('Poem.api.internal_views.reports.sync_webapi_if_stale')
     def test_get_all_reports_limited_user(self, func):
         func.side_effect = mocked_func
         request = self.factory.get(self.url)
@@ -120,7 +120,7 @@ class ListReportsAPIViewTests(TenantTestCase):
             ]
         )
 
-    @patch('Poem.api.internal_views.reports.sync_webapi')
+    @patch('Poem.api.internal_views.reports.sync_webapi_if_stale')
     def test_get_report_by_name_superuser(self, func):
         func.side_effect = mocked_func
         request = self.factory.get(self.url + 'Critical')
@@ -137,7 +137,7 @@ class ListReportsAPIViewTests(TenantTestCase):
             ])
         )
 
-    @patch('Poem.api.internal_views.reports.sync_webapi')
+    @patch('Poem.api.internal_views.reports.sync_webapi_if_stale')
     def test_get_report_by_name_regular_user(self, func):
         func.side_effect = mocked_func
         request = self.factory.get(self.url + 'Critical')
@@ -154,7 +154,7 @@ class ListReportsAPIViewTests(TenantTestCase):
             ])
         )
 
-    @patch('Poem.api.internal_views.reports.sync_webapi')
+    @patch('Poem.api.internal_views.reports.sync_webapi_if_stale')
     def test_get_report_by_name_limited_user(self, func):
         func.side_effect = mocked_func
         request = self.factory.get(self.url + 'Critical')
@@ -171,7 +171,7 @@ class ListReportsAPIViewTests(TenantTestCase):
             ])
         )
 
-    @patch('Poem.api.internal_views.reports.sync_webapi')
+    @patch('Poem.api.internal_views.reports.sync_webapi_if_stale')
     def test_get_report_if_wrong_name_superuser(self, func):
         func.side_effect = mocked_func
         request = self.factory.get(self.url + 'nonexisting')
@@ -180,7 +180,7 @@ class ListReportsAPIViewTests(TenantTestCase):
         response = self.view(request, 'nonexisting')
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
 
-    @patch('Poem.api.internal_views.reports.sync_webapi')
+    @patch('Poem.api.internal_views.reports.sync_webapi_if_stale')
     def test_get_report_if_wrong_name_regular_user(self, func):
         func.side_effect = mocked_func
         request = self.factory.get(self.url + 'nonexisting')
@@ -189,7 +189,7 @@ class ListReportsAPIViewTests(TenantTestCase):
         response = self.view(request, 'nonexisting')
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
 
-    @patch('Poem.api.internal_views.reports.sync_webapi')
+    @patch('Poem.api.internal_views.reports.sync_webapi_if_stale')
     def test_get_report_if_wrong_name_limited_user(self, func):
         func.side_effect = mocked_func
         request = self.factory.get(self.url + 'nonexisting')
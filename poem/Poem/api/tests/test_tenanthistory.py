@@ -2,13 +2,16 @@ import datetime
 import json
 
 from Poem.api import views_internal as views
-from Poem.helpers.history_helpers import create_comment, serialize_metric
+from Poem.helpers.history_helpers import create_comment, serialize_metric, \
+    create_profile_history
 from Poem.poem import models as poem_models
 from Poem.poem_super_admin import models as admin_models
 from Poem.tenants.models import Tenant
 from Poem.users.models import CustUser
 from django.contrib.contenttypes.models import ContentType
 from django.core import serializers
+from django.db import connection
+from django.test.utils import override_settings
 from django_tenants.test.cases import TenantTestCase
 from django_tenants.test.client import TenantRequestFactory
 from django_tenants.utils import schema_context, get_public_schema_name, \
@@ -653,6 +656,49 @@ class ListTenantVersionsAPIViewTests(TenantTestCase):
             ]
         )
 
+    def test_versions_stored_as_jsonb(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT pg_typeof(object_id)::text, '
+                'pg_typeof(serialized_data)::text, '
+                'serialized_data #>> \'{0,fields,name}\' '
+                'FROM poem_tenanthistory WHERE id = %s', [self.ver2.id]
+            )
+            self.assertEqual(
+                cursor.fetchone(), ('integer', 'jsonb', 'argo.AMS-Check-new')
+            )
+        ver = poem_models.TenantHistory.objects.get(id=self.ver2.id)
+        self.assertEqual(ver.object_id, self.metric1.id)
+        self.assertEqual(
+            json.loads(ver.serialized_data),
+            json.loads(
+                serialize_metric(
+                    self.metric1, tags=[self.mtag1, self.mtag2, self.mtag3]
+                )
+            )
+        )
+
+    def test_get_versions_of_metrics_in_constant_number_of_queries(self):
+        for i in range(10):
+            poem_models.TenantHistory.objects.create(
+                object_id=self.metric1.id,
+                serialized_data=self.ver2.serialized_data,
+                object_repr=self.metric1.__str__(),
+                content_type=self.ver2.content_type,
+                comment=self.ver2.comment,
+                user=self.user.username
+            )
+        ContentType.objects.get_for_model(poem_models.Metric)
+        request = self.factory.get(self.url + 'metric/argo.AMS-Check-new')
+        force_authenticate(request, user=self.user)
+        with self.assertNumQueries(2):
+            response = self.view(request, 'metric', 'argo.AMS-Check-new')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 12)
+        self.assertEqual(
+            response.data[0]['fields']['probeversion'], 'ams-probe (0.1.11)'
+        )
+
     def test_get_passive_metric_version(self):
         request = self.factory.get(self.url + 'metric/org.apel.APEL-Pub')
         force_authenticate(request, user=self.user)
@@ -772,6 +818,73 @@ class ListTenantVersionsAPIViewTests(TenantTestCase):
             ]
         )
 
+    @override_settings(HISTORY_SNAPSHOT_INTERVAL=2)
+    def test_get_metric_profile_versions_stored_as_patches(self):
+        mp = poem_models.MetricProfiles.objects.create(
+            name='DELTA_PROFILE',
+            apiid='10000000-oooo-kkkk-aaaa-aaeekkccnnee',
+            groupname='EGI'
+        )
+        instances = [{'service': 'AMGA', 'metric': 'org.nagios.SAML-SP'}]
+        expected = []
+        for service in ['APEL', 'ARC-CE', 'argo.api']:
+            instances.append({'service': service, 'metric': 'metric'})
+            create_profile_history(
+                mp, instances, 'testuser', f'With {service}.'
+            )
+            expected.append((f'With {service}.', list(instances)))
+        self.assertEqual(
+            list(
+                poem_models.TenantHistory.objects.filter(
+                    object_id=mp.id,
+                    content_type=ContentType.objects.get_for_model(mp)
+                ).order_by('id').values_list('delta', flat=True)
+            ), [False, True, False]
+        )
+        request = self.factory.get(self.url + 'metricprofile/DELTA_PROFILE')
+        force_authenticate(request, user=self.user)
+        response = self.view(request, 'metricprofile', 'DELTA_PROFILE')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [
+                (
+                    version['fields']['description'],
+                    version['fields']['metricinstances']
+                ) for version in response.data
+            ], list(reversed(expected))
+        )
+
+    def test_get_metric_profile_versions_created_at_the_same_time(self):
+        mp = poem_models.MetricProfiles.objects.create(
+            name='DELTA_PROFILE',
+            apiid='10000000-oooo-kkkk-aaaa-aaeekkccnnee',
+            groupname='EGI'
+        )
+        instances = []
+        for service in ['APEL', 'ARC-CE', 'argo.api']:
+            instances.append({'service': service, 'metric': 'metric'})
+            create_profile_history(
+                mp, instances, 'testuser', f'With {service}.'
+            )
+        versions = poem_models.TenantHistory.objects.filter(
+            object_id=mp.id, content_type=ContentType.objects.get_for_model(mp)
+        )
+        versions.update(date_created=versions.latest('id').date_created)
+        request = self.factory.get(self.url + 'metricprofile/DELTA_PROFILE')
+        force_authenticate(request, user=self.user)
+        response = self.view(request, 'metricprofile', 'DELTA_PROFILE')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [version['id'] for version in response.data],
+            list(versions.order_by('-id').values_list('id', flat=True))
+        )
+        self.assertEqual(
+            [
+                len(version['fields']['metricinstances'])
+                for version in response.data
+            ], [3, 2, 1]
+        )
+
     def test_get_nonexisting_metricprofile(self):
         request = self.factory.get(self.url + 'metricprofile/nonexisting')
         force_authenticate(request, user=self.user)
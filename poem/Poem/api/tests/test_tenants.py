@@ -2,9 +2,11 @@ import datetime
 from unittest.mock import patch
 
 from Poem.api import views_internal as views
+from Poem.poem_super_admin import models as admin_models
 from Poem.tenants.models import Tenant
 from Poem.users.models import CustUser
 from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django_tenants.test.cases import TenantTestCase
 from django_tenants.test.client import TenantRequestFactory
 from django_tenants.utils import schema_context, get_public_schema_name, \
@@ -13,23 +15,30 @@ from rest_framework import status
 from rest_framework.test import force_authenticate
 
 
-def mock_tenant_resources(*args, **kwargs):
-    if args[0] == 'public':
+def mock_tenant_resources(schema_name):
+    if schema_name == 'public':
         return {'metric_templates': 354, 'probes': 111}
 
-    elif args[0] == 'test1':
+    elif schema_name == 'test1':
         return {'metrics': 30, 'probes': 10}
 
-    elif args[0] == 'test2':
+    elif schema_name == 'test2':
         return {'metrics': 50, 'probes': 30}
 
-    elif args[0] == "combined":
+    elif schema_name == "combined":
         return { "metrics": 6, "probes": 6 }
 
     else:
         return {'metrics': 24, 'probes': 15}
 
 
+def mock_tenants_resources(*args, **kwargs):
+    return dict(
+        (schema_name, mock_tenant_resources(schema_name))
+        for schema_name in args[0]
+    )
+
+
 class ListTenantsTests(TenantTestCase):
     def setUp(self) -> None:
         self.factory = TenantRequestFactory(self.tenant)
@@ -84,14 +93,19 @@ class ListTenantsTests(TenantTestCase):
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
 
     @patch("Poem.api.internal_views.tenants.CombinedTenant.tenants")
-    @patch('Poem.api.internal_views.tenants.get_tenant_resources')
+    @patch('Poem.api.internal_views.tenants.get_tenants_resources')
     def test_get_all_tenants(self, mock_resources, mock_tenants):
-        mock_resources.side_effect = mock_tenant_resources
+        mock_resources.side_effect = mock_tenants_resources
         mock_tenants.return_value = ["TEST1", "TEST2"]
         request = self.factory.get(self.url)
         force_authenticate(request, user=self.user)
         response = self.view(request)
-        self.assertEqual(mock_resources.call_count, 5)
+        mock_resources.assert_called_once()
+        self.assertEqual(
+            sorted(mock_resources.call_args[0][0]),
+            sorted(['combined', get_public_schema_name(), 'test', 'test1',
+                    'test2'])
+        )
         self.assertEqual(
             response.data,
             [
@@ -104,6 +118,7 @@ class ListTenantsTests(TenantTestCase):
                     ),
                     'nr_metrics': 24,
                     'nr_probes': 15,
+                    'last_change': None,
                     "combined": False
                 },
                 {
@@ -115,6 +130,7 @@ class ListTenantsTests(TenantTestCase):
                     ),
                     "nr_metrics": 6,
                     "nr_probes": 6,
+                    "last_change": None,
                     "combined": True,
                     "combined_from": ["TEST1", "TEST2"]
                 },
@@ -127,6 +143,7 @@ class ListTenantsTests(TenantTestCase):
                     ),
                     'nr_metrics': 354,
                     'nr_probes': 111,
+                    'last_change': None,
                     "combined": False
                 },
                 {
@@ -138,6 +155,7 @@ class ListTenantsTests(TenantTestCase):
                     ),
                     'nr_metrics': 30,
                     'nr_probes': 10,
+                    'last_change': None,
                     "combined": False
                 },
                 {
@@ -149,14 +167,17 @@ class ListTenantsTests(TenantTestCase):
                     ),
                     'nr_metrics': 50,
                     'nr_probes': 30,
+                    'last_change': None,
                     "combined": False
                 }
             ]
         )
 
-    @patch('Poem.api.internal_views.tenants.get_tenant_resources')
+    @patch('Poem.api.internal_views.tenants.get_tenants_resources')
     def test_get_tenant_by_name(self, mock_resources):
-        mock_resources.return_value = {'metrics': 24, 'probes': 15}
+        mock_resources.return_value = {
+            'test1': {'metrics': 24, 'probes': 15}
+        }
         request = self.factory.get(self.url + 'TEST1')
         force_authenticate(request, user=self.user)
         response = self.view(request, 'TEST1')
@@ -171,14 +192,17 @@ class ListTenantsTests(TenantTestCase):
                 ),
                 'nr_metrics': 24,
                 'nr_probes': 15,
+                'last_change': None,
                 "combined": False
             }
         )
-        mock_resources.assert_called_once_with('test1')
+        mock_resources.assert_called_once_with(['test1'])
 
-    @patch('Poem.api.internal_views.tenants.get_tenant_resources')
+    @patch('Poem.api.internal_views.tenants.get_tenants_resources')
     def test_get_public_schema_tenant_by_name(self, mock_resources):
-        mock_resources.return_value = {'metric_templates': 354, 'probes': 112}
+        mock_resources.return_value = {
+            get_public_schema_name(): {'metric_templates': 354, 'probes': 112}
+        }
         request = self.factory.get(self.url + 'SuperPOEM_Tenant')
         force_authenticate(request, user=self.user)
         response = self.view(request, 'SuperPOEM_Tenant')
@@ -193,12 +217,13 @@ class ListTenantsTests(TenantTestCase):
                 ),
                 'nr_metrics': 354,
                 'nr_probes': 112,
+                'last_change': None,
                 "combined": False
             }
         )
-        mock_resources.assert_called_once_with(get_public_schema_name())
+        mock_resources.assert_called_once_with([get_public_schema_name()])
 
-    @patch('Poem.api.internal_views.tenants.get_tenant_resources')
+    @patch('Poem.api.internal_views.tenants.get_tenants_resources')
     def test_get_tenant_by_nonexisting_name(self, mock_resources):
         request = self.factory.get(self.url + 'nonexisting')
         force_authenticate(request, user=self.user)
@@ -207,6 +232,55 @@ class ListTenantsTests(TenantTestCase):
         self.assertEqual(response.data['detail'], 'Tenant not found.')
         self.assertFalse(mock_resources.called)
 
+    @patch("Poem.api.internal_views.tenants.CombinedTenant.tenants")
+    def test_get_all_tenants_from_stats(self, mock_tenants):
+        mock_tenants.return_value = ["TEST1", "TEST2"]
+        admin_models.TenantStats.objects.create(
+            schema_name='test1', metrics=30, probes=10
+        )
+        admin_models.TenantStats.objects.create(
+            schema_name='test2', metrics=50, probes=30
+        )
+        request = self.factory.get(self.url)
+        force_authenticate(request, user=self.user)
+        with CaptureQueriesContext(connection) as context:
+            response = self.view(request)
+        num_queries = len(context.captured_queries)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = dict((item['schema_name'], item) for item in response.data)
+        self.assertEqual(data['test1']['nr_metrics'], 30)
+        self.assertEqual(data['test1']['nr_probes'], 10)
+        self.assertEqual(
+            data['test1']['last_change'],
+            datetime.datetime.strftime(
+                admin_models.TenantStats.objects.get(
+                    schema_name='test1'
+                ).last_change, '%Y-%m-%d %H:%M:%S'
+            )
+        )
+        self.assertEqual(data['test2']['nr_metrics'], 50)
+        self.assertEqual(data['test2']['nr_probes'], 30)
+        self.assertEqual(data['combined']['nr_metrics'], 0)
+        self.assertEqual(data['combined']['nr_probes'], 0)
+        self.assertIsNone(data['combined']['last_change'])
+        self.assertEqual(data['combined']['combined_from'], ["TEST1", "TEST2"])
+        self.assertEqual(data[get_public_schema_name()]['nr_metrics'], 0)
+
+        with schema_context(get_public_schema_name()):
+            tenant5 = Tenant(name='TEST5', schema_name='test5')
+            tenant5.auto_create_schema = False
+            tenant5.save()
+            get_tenant_domain_model().objects.create(
+                domain='test5.domain.url', tenant=tenant5, is_primary=True
+            )
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.view(request)
+
+        self.assertEqual(len(response.data), 6)
+        self.assertEqual(len(context.captured_queries), num_queries)
+
     def test_delete_tenant(self):
         self.assertEqual(Tenant.objects.all().count(), 5)
         request = self.factory.delete(self.url + 'TEST1')
@@ -269,3 +343,105 @@ class ListTenantsTests(TenantTestCase):
         self.assertEqual(Tenant.objects.all().count(), 5)
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
         self.assertEqual(response.data['detail'], 'Tenant not found.')
+
+
+class ListAdoptionTests(TenantTestCase):
+    def setUp(self) -> None:
+        self.factory = TenantRequestFactory(self.tenant)
+        self.view = views.ListAdoption.as_view()
+        self.url = '/api/v2/internal/adoption/'
+        self.user = CustUser.objects.create_user(username='testuser')
+
+        with schema_context(get_public_schema_name()):
+            self.public_tenant = Tenant(
+                name='all', schema_name=get_public_schema_name()
+            )
+            self.public_tenant.auto_create_schema = False
+            self.public_tenant.save()
+
+            tenant1 = Tenant(name='TEST1', schema_name='test1')
+            tenant1.auto_create_schema = False
+            tenant1.save()
+
+    def test_get_adoption_no_auth(self):
+        request = self.factory.get(self.url + 'metrics')
+        request.tenant = self.public_tenant
+        response = self.view(request, 'metrics')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    @patch('Poem.api.internal_views.tenants.metric_adoption')
+    def test_get_metric_adoption(self, mock_adoption):
+        mock_adoption.return_value = iter([
+            ('argo.AMS-Check', 'ams-probe (0.1.12)', ['test', 'test1']),
+            ('org.apel.APEL-Pub', None, ['test1'])
+        ])
+        request = self.factory.get(self.url + 'metrics')
+        request.tenant = self.public_tenant
+        force_authenticate(request, user=self.user)
+        response = self.view(request, 'metrics')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data,
+            [
+                {
+                    'name': 'argo.AMS-Check',
+                    'probeversion': 'ams-probe (0.1.12)',
+                    'tenants': [self.tenant.name, 'TEST1']
+                },
+                {
+                    'name': 'org.apel.APEL-Pub',
+                    'probeversion': '',
+                    'tenants': ['TEST1']
+                }
+            ]
+        )
+        mock_adoption.assert_called_once_with(None)
+
+    @patch('Poem.api.internal_views.tenants.probe_adoption')
+    def test_get_probe_adoption_for_given_names(self, mock_adoption):
+        mock_adoption.return_value = iter([
+            ('ams-probe (0.1.12)', 3, ['test', 'test1'])
+        ])
+        request = self.factory.get(
+            self.url + 'probes', {'name': ['ams-probe', 'novaprobe']}
+        )
+        request.tenant = self.public_tenant
+        force_authenticate(request, user=self.user)
+        response = self.view(request, 'probes')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data,
+            [
+                {
+                    'probeversion': 'ams-probe (0.1.12)',
+                    'nr_metrics': 3,
+                    'tenants': [self.tenant.name, 'TEST1']
+                }
+            ]
+        )
+        mock_adoption.assert_called_once_with(['ams-probe', 'novaprobe'])
+
+    @patch('Poem.api.internal_views.tenants.metric_adoption')
+    def test_get_adoption_of_wrong_object(self, mock_adoption):
+        request = self.factory.get(self.url + 'packages')
+        request.tenant = self.public_tenant
+        force_authenticate(request, user=self.user)
+        response = self.view(request, 'packages')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.data['detail'],
+            'Adoption can be listed only for metrics or probes.'
+        )
+        self.assertFalse(mock_adoption.called)
+
+    @patch('Poem.api.internal_views.tenants.metric_adoption')
+    def test_get_adoption_in_tenant_schema(self, mock_adoption):
+        request = self.factory.get(self.url + 'metrics')
+        force_authenticate(request, user=self.user)
+        response = self.view(request, 'metrics')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(
+            response.data['detail'],
+            'Adoption across tenants is available only in SuperPOEM.'
+        )
+        self.assertFalse(mock_adoption.called)
@@ -142,7 +142,7 @@ class ListThresholdsProfilesAPIViewTests(TenantTestCase):
             content_type=self.ct
         )
 
-    @patch('Poem.api.internal_views.thresholdsprofiles.sync_webapi')
+    @patch('Poem.api.internal_views.thresholdsprofiles.sync_webapi_if_stale')
     def test_get_all_thresholds_profiles_superuser(self, func):
         func.side_effect = mocked_func
         request = self.factory.get(self.url)
@@ -173,7 +173,7 @@ class ListThresholdsProfilesAPIViewTests(TenantTestCase):
             ]
         )
 
-    @patch('Poem.api.internal_views.thresholdsprofiles.sync_webapi')
+    @patch('Poem.api.internal_views.thresholdsprofiles.sync_webapi_if_stale')
     def test_get_all_thresholds_profiles_user(self, func):
         func.side_effect = mocked_func
         request = self.factory.get(self.url)
@@ -204,7 +204,7 @@ class ListThresholdsProfilesAPIViewTests(TenantTestCase):
             ]
         )
 
-    @patch('Poem.api.internal_views.thresholdsprofiles.sync_webapi')
+    @patch('Poem.api.internal_views.thresholdsprofiles.sync_webapi_if_stale')
     def test_get_all_thresholds_profiles_limited_user(self, func):
         func.side_effect = mocked_func
         request = self.factory.get(self.url)
@@ -235,7 +235,7 @@ class ListThresholdsProfilesAPIViewTests(TenantTestCase):
             ]
         )
 
-    @patch('Poem.api.internal_views.thresholdsprofiles.sync_webapi')
+    @patch('Poem.api.internal_views.thresholdsprofiles.sync_webapi_if_stale')
     def test_get_thresholds_profiles_if_no_authentication(self, func):
         func.side_effect = mocked_func
         request = self.factory.get(self.url)
@@ -243,7 +243,7 @@ class ListThresholdsProfilesAPIViewTests(TenantTestCase):
         response = self.view(request)
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
 
-    @patch('Poem.api.internal_views.thresholdsprofiles.sync_webapi')
+    @patch('Poem.api.internal_views.thresholdsprofiles.sync_webapi_if_stale')
     def test_get_thresholds_profile_by_name_superuser(self, func):
         func.side_effect = mocked_func
         request = self.factory.get(self.url + 'TEST_PROFILE')
@@ -260,7 +260,7 @@ class ListThresholdsProfilesAPIViewTests(TenantTestCase):
             ])
         )
 
-    @patch('Poem.api.internal_views.thresholdsprofiles.sync_webapi')
+    @patch('Poem.api.internal_views.thresholdsprofiles.sync_webapi_if_stale')
     def test_get_thresholds_profile_by_name_user(self, func):
         func.side_effect = mocked_func
         request = self.factory.get(self.url + 'TEST_PROFILE')
@@ -277,7 +277,7 @@ class ListThresholdsProfilesAPIViewTests(TenantTestCase):
             ])
         )
 
-    @patch('Poem.api.internal_views.thresholdsprofiles.sync_webapi')
+    @patch('Poem.api.internal_views.thresholdsprofiles.sync_webapi_if_stale')
     def test_get_thresholds_profile_by_name_limited_user(self, func):
         func.side_effect = mocked_func
         request = self.factory.get(self.url + 'TEST_PROFILE')
@@ -294,7 +294,7 @@ class ListThresholdsProfilesAPIViewTests(TenantTestCase):
             ])
         )
 
-    @patch('Poem.api.internal_views.thresholdsprofiles.sync_webapi')
+    @patch('Poem.api.internal_views.thresholdsprofiles.sync_webapi_if_stale')
     def test_get_thresholds_profile_by_nonexisting_name_superuser(self, func):
         func.side_effect = mocked_func
         request = self.factory.get(self.url + 'nonexisting')
@@ -306,7 +306,7 @@ class ListThresholdsProfilesAPIViewTests(TenantTestCase):
             response.data['detail'], 'Thresholds profile does not exist.'
         )
 
-    @patch('Poem.api.internal_views.thresholdsprofiles.sync_webapi')
+    @patch('Poem.api.internal_views.thresholdsprofiles.sync_webapi_if_stale')
     def test_get_thresholds_profile_by_nonexisting_name_user(self, func):
         func.side_effect = mocked_func
         request = self.factory.get(self.url + 'nonexisting')
@@ -318,7 +318,7 @@ class ListThresholdsProfilesAPIViewTests(TenantTestCase):
             response.data['detail'], 'Thresholds profile does not exist.'
         )
 
-    @patch('Poem.api.internal_views.thresholdsprofiles.sync_webapi')
+    @patch('Poem.api.internal_views.thresholdsprofiles.sync_webapi_if_stale')
     def test_get_thresholds_profile_by_nonexisting_name_limited_usr(self, func):
         func.side_effect = mocked_func
         request = self.factory.get(self.url + 'nonexisting')
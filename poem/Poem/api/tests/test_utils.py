@@ -1,10 +1,13 @@
 import datetime
 import json
+import time
 from unittest.mock import patch
 
 import factory.django
 from Poem.api.internal_views.utils import sync_webapi, \
-    get_tenant_resources, sync_tags_webapi, WebApiException
+    get_tenant_resources, sync_tags_webapi, WebApiException, \
+    sync_webapi_if_stale, sync_webapi_in_background, webapi_sync_ttl, \
+    two_value_inline, two_value_inline_dict
 from Poem.helpers.history_helpers import create_comment
 from Poem.helpers.history_helpers import serialize_metric
 from Poem.poem import models as poem_models
@@ -13,12 +16,15 @@ from Poem.poem_super_admin.models import WebAPIKey
 from Poem.users.models import CustUser
 from django.contrib.contenttypes.models import ContentType
 from django.core import serializers
+from django.core.cache import cache
+from django.db import connection
 from django.db.models.signals import pre_save
+from django.test.utils import CaptureQueriesContext
 from django_tenants.test.cases import TenantTestCase
 from django_tenants.utils import get_public_schema_name
 
 from .test_views import mock_db_for_metrics_tests
-from .utils_test import mocked_web_api_request, MockResponse
+from .utils_test import mocked_web_api_request, MockResponse, FakeWebApi
 
 
 def mocked_put_response(*args, **kwargs):
@@ -151,7 +157,7 @@ class SyncWebApiTests(TenantTestCase):
             groupname='EGI'
         )
 
-    @patch('requests.get')
+    @patch('Poem.api.internal_views.utils.webapi_get')
     def test_sync_webapi_metricprofiles(self, func):
         func.side_effect = mocked_web_api_request
         self.assertEqual(poem_models.MetricProfiles.objects.all().count(), 2)
@@ -189,7 +195,7 @@ class SyncWebApiTests(TenantTestCase):
             [['dg.3GBridge', 'eu.egi.cloud.Swift-CRUD']]
         )
 
-    @patch('requests.get')
+    @patch('Poem.api.internal_views.utils.webapi_get')
     def test_sync_webapi_aggregationprofiles(self, func):
         func.side_effect = mocked_web_api_request
         self.assertEqual(poem_models.Aggregation.objects.all().count(), 2)
@@ -205,7 +211,7 @@ class SyncWebApiTests(TenantTestCase):
         )
         self.assertTrue(poem_models.Aggregation.objects.get(name='NEW_PROFILE'))
 
-    @patch('requests.get')
+    @patch('Poem.api.internal_views.utils.webapi_get')
     def test_sync_webapi_thresholdsprofile(self, func):
         func.side_effect = mocked_web_api_request
         self.assertEqual(
@@ -228,6 +234,202 @@ class SyncWebApiTests(TenantTestCase):
         )
 
 
+    def test_sync_webapi_against_fake_webapi(self):
+        profiles = [
+            {
+                'id': f'profile-{i}',
+                'name': f'PROFILE-{i}',
+                'description': f'Profile number {i}',
+                'services': [
+                    {
+                        'service': 'argo.webui',
+                        'metrics': ['org.nagios.WebCheck']
+                    }
+                ]
+            } for i in range(2000)
+        ]
+        with FakeWebApi() as webapi:
+            webapi.resources['/metric_profiles'] = profiles
+            url = webapi.url('/metric_profiles')
+
+            start = time.monotonic()
+            sync_webapi(url, poem_models.MetricProfiles, 'TENANT')
+            initial_time = time.monotonic() - start
+            self.assertEqual(
+                poem_models.MetricProfiles.objects.all().count(), 2000
+            )
+            self.assertFalse(
+                poem_models.MetricProfiles.objects.filter(
+                    apiid__in=[self.mp1.apiid, self.mp2.apiid]
+                ).exists()
+            )
+
+            for profile in profiles[0:500]:
+                profile['description'] = 'Changed description'
+            webapi.resources['/metric_profiles'] = profiles[100:]
+
+            with CaptureQueriesContext(connection) as context:
+                start = time.monotonic()
+                sync_webapi(url, poem_models.MetricProfiles, 'TENANT')
+                resync_time = time.monotonic() - start
+
+            num_queries = len(context.captured_queries)
+
+            webapi.resources['/metric_profiles'] = profiles[100:1000]
+            with CaptureQueriesContext(connection) as context:
+                sync_webapi(url, poem_models.MetricProfiles, 'TENANT')
+
+        self.assertLess(resync_time, initial_time)
+        self.assertEqual(len(context.captured_queries), num_queries)
+        self.assertEqual(
+            poem_models.MetricProfiles.objects.all().count(), 900
+        )
+        self.assertEqual(
+            poem_models.MetricProfiles.objects.filter(
+                description='Changed description'
+            ).count(), 400
+        )
+        self.assertEqual(
+            poem_models.TenantHistory.objects.filter(
+                content_type=ContentType.objects.get_for_model(
+                    poem_models.MetricProfiles
+                )
+            ).count(), 900
+        )
+
+
+class SyncWebApiIfStaleTests(TenantTestCase):
+    def setUp(self):
+        self.key = 'webapi:sync:TENANT:metricprofiles'
+        cache.delete(self.key)
+        cache.delete(self.key + ':running')
+
+    def tearDown(self):
+        cache.delete(self.key)
+        cache.delete(self.key + ':running')
+
+    def create_profile(self):
+        poem_models.MetricProfiles.objects.create(
+            name='TEST_PROFILE',
+            apiid='00000000-oooo-kkkk-aaaa-aaeekkccnnee',
+            groupname='EGI'
+        )
+
+    @patch('Poem.api.internal_views.utils.sync_webapi_in_background')
+    @patch('Poem.api.internal_views.utils.sync_webapi')
+    def test_sync_if_never_synced_without_local_data(
+            self, mock_sync, mock_background
+    ):
+        sync_webapi_if_stale(
+            'metric_profiles', poem_models.MetricProfiles, 'TENANT'
+        )
+        mock_sync.assert_called_once_with(
+            'metric_profiles', poem_models.MetricProfiles, 'TENANT'
+        )
+        self.assertFalse(mock_background.called)
+        self.assertIsNotNone(cache.get(self.key))
+
+    @patch('Poem.api.internal_views.utils.sync_webapi_in_background')
+    @patch('Poem.api.internal_views.utils.sync_webapi')
+    def test_no_sync_if_fresh(self, mock_sync, mock_background):
+        self.create_profile()
+        cache.set(self.key, time.time(), None)
+        sync_webapi_if_stale(
+            'metric_profiles', poem_models.MetricProfiles, 'TENANT'
+        )
+        self.assertFalse(mock_sync.called)
+        self.assertFalse(mock_background.called)
+
+    @patch('Poem.api.internal_views.utils.sync_webapi_in_background')
+    @patch('Poem.api.internal_views.utils.sync_webapi')
+    def test_background_sync_if_stale(self, mock_sync, mock_background):
+        self.create_profile()
+        cache.set(self.key, time.time() - 100, None)
+        with self.settings(WEBAPI_SYNC_TTL={'default': {'ttl': 60}}):
+            sync_webapi_if_stale(
+                'metric_profiles', poem_models.MetricProfiles, 'TENANT'
+            )
+        self.assertFalse(mock_sync.called)
+        mock_background.assert_called_once_with(
+            'metric_profiles', poem_models.MetricProfiles, 'TENANT'
+        )
+
+    @patch('Poem.api.internal_views.utils.sync_webapi_in_background')
+    @patch('Poem.api.internal_views.utils.sync_webapi')
+    def test_sync_if_never_synced(self, mock_sync, mock_background):
+        self.create_profile()
+        sync_webapi_if_stale(
+            'metric_profiles', poem_models.MetricProfiles, 'TENANT'
+        )
+        mock_sync.assert_called_once_with(
+            'metric_profiles', poem_models.MetricProfiles, 'TENANT'
+        )
+        self.assertFalse(mock_background.called)
+        self.assertIsNotNone(cache.get(self.key))
+
+    @patch('Poem.api.internal_views.utils.sync_webapi_in_background')
+    @patch('Poem.api.internal_views.utils.sync_webapi')
+    def test_no_sync_if_fresh_without_local_data(
+            self, mock_sync, mock_background
+    ):
+        cache.set(self.key, time.time(), None)
+        sync_webapi_if_stale(
+            'metric_profiles', poem_models.MetricProfiles, 'TENANT'
+        )
+        self.assertFalse(mock_sync.called)
+        self.assertFalse(mock_background.called)
+
+    @patch('Poem.api.internal_views.utils.sync_webapi_in_background')
+    @patch('Poem.api.internal_views.utils.sync_webapi')
+    def test_sync_if_forced(self, mock_sync, mock_background):
+        self.create_profile()
+        cache.set(self.key, time.time(), None)
+        sync_webapi_if_stale(
+            'metric_profiles', poem_models.MetricProfiles, 'TENANT',
+            force=True
+        )
+        mock_sync.assert_called_once_with(
+            'metric_profiles', poem_models.MetricProfiles, 'TENANT'
+        )
+        self.assertFalse(mock_background.called)
+
+    @patch('Poem.api.internal_views.utils.threading.Thread')
+    def test_background_sync_not_started_twice(self, mock_thread):
+        sync_webapi_in_background(
+            'metric_profiles', poem_models.MetricProfiles, 'TENANT'
+        )
+        sync_webapi_in_background(
+            'metric_profiles', poem_models.MetricProfiles, 'TENANT'
+        )
+        mock_thread.assert_called_once()
+        mock_thread.return_value.start.assert_called_once()
+
+    def test_sync_ttl(self):
+        with self.settings(
+                WEBAPI_SYNC_TTL={
+                    'default': {'ttl': 300, 'reports': 600},
+                    'tenant': {'ttl': 60, 'metricprofiles': 30}
+                }
+        ):
+            self.assertEqual(
+                webapi_sync_ttl(poem_models.MetricProfiles, 'TENANT'), 30
+            )
+            self.assertEqual(
+                webapi_sync_ttl(poem_models.Reports, 'TENANT'), 60
+            )
+            self.assertEqual(
+                webapi_sync_ttl(poem_models.Reports, 'OTHER'), 600
+            )
+            self.assertEqual(
+                webapi_sync_ttl(poem_models.Aggregation, 'OTHER'), 300
+            )
+
+        with self.settings(WEBAPI_SYNC_TTL={'default': {}}):
+            self.assertEqual(
+                webapi_sync_ttl(poem_models.Aggregation, 'OTHER'), 300
+            )
+
+
 class SyncWebApiTagsTests(TenantTestCase):
     def setUp(self) -> None:
         self.tenant.name = "TENANT"
@@ -240,7 +442,7 @@ class SyncWebApiTagsTests(TenantTestCase):
             token='mocked_token'
         )
 
-    @patch("requests.put")
+    @patch("Poem.api.internal_views.utils.webapi_put")
     def test_sync_tags(self, mock_put):
         with self.settings(
             WEBAPI_METRICSTAGS="https://metric.tags.com"
@@ -287,7 +489,7 @@ class SyncWebApiTagsTests(TenantTestCase):
                 ])
             )
 
-    @patch("requests.put")
+    @patch("Poem.api.internal_views.utils.webapi_put")
     def test_sync_tags_with_error(self, mock_put):
         with self.settings(
             WEBAPI_METRICSTAGS="https://metric.tags.com"
@@ -341,7 +543,7 @@ class SyncWebApiTagsTests(TenantTestCase):
                 "There has been an error"
             )
 
-    @patch("requests.put")
+    @patch("Poem.api.internal_views.utils.webapi_put")
     def test_sync_tags_with_error_without_msg(self, mock_put):
         with self.settings(
             WEBAPI_METRICSTAGS="https://metric.tags.com"
@@ -665,8 +867,133 @@ class BasicResourceInfoTests(TenantTestCase):
 
     def test_get_resource_info(self):
         data = get_tenant_resources('test')
-        self.assertEqual(data, {'metrics': 2, 'probes': 1})
+        self.assertEqual(
+            data, {
+                'metrics': 2, 'probes': 1,
+                'last_change': admin_models.TenantStats.objects.get(
+                    schema_name='test'
+                ).last_change
+            }
+        )
+        self.assertIsNotNone(data['last_change'])
 
     def test_get_resourece_info_for_super_poem_tenant(self):
         data = get_tenant_resources(get_public_schema_name())
         self.assertEqual(data, {'metric_templates': 3, 'probes': 2})
+
+
+class InlineFieldTests(TenantTestCase):
+    def setUp(self):
+        mtype = admin_models.MetricTemplateType.objects.create(name='Active')
+        self.mt1 = admin_models.MetricTemplate.objects.create(
+            name='argo.AMS-Check',
+            mtype=mtype,
+            config='["maxCheckAttempts 3", "timeout 60", '
+                   '"path /usr/libexec/argo-monitoring/probes/argo", '
+                   '"interval 5", "retryInterval 3"]',
+            flags='["OBSESS 1", "NOPUBLISH 1"]',
+            attribute='["argo.ams_TOKEN --token"]',
+            parameter='["--project EGI", "--note some  spaced value"]'
+        )
+        self.mt2 = admin_models.MetricTemplate.objects.create(
+            name='org.apel.APEL-Pub',
+            mtype=mtype,
+            flags='["OBSESS 1", "PASSIVE 1"]',
+            attribute='["NOPUBLISH 1"]'
+        )
+
+    def test_values_read_as_pairs(self):
+        mt = admin_models.MetricTemplate.objects.get(id=self.mt1.id)
+        self.assertEqual(
+            mt.config,
+            [
+                ['maxCheckAttempts', '3'], ['timeout', '60'],
+                ['path', '/usr/libexec/argo-monitoring/probes/argo'],
+                ['interval', '5'], ['retryInterval', '3']
+            ]
+        )
+        self.assertEqual(mt.flags, [['OBSESS', '1'], ['NOPUBLISH', '1']])
+        self.assertEqual(
+            mt.parameter,
+            [['--project', 'EGI'], ['--note', 'some  spaced value']]
+        )
+        self.assertEqual(mt.dependency, [])
+        self.assertEqual(
+            list(
+                admin_models.MetricTemplate.objects.filter(
+                    id=self.mt2.id
+                ).values_list('flags', 'files')
+            ),
+            [([['OBSESS', '1'], ['PASSIVE', '1']], [])]
+        )
+
+    def test_values_serialized_as_text(self):
+        mt = admin_models.MetricTemplate.objects.get(id=self.mt2.id)
+        fields = json.loads(
+            serializers.serialize(
+                'json', [mt], fields=('flags', 'attribute', 'files')
+            )
+        )[0]['fields']
+        self.assertEqual(
+            fields, {
+                'flags': '["OBSESS 1", "PASSIVE 1"]',
+                'attribute': '["NOPUBLISH 1"]',
+                'files': ''
+            }
+        )
+
+    def test_values_stored_as_pairs(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT flags, files FROM poem_super_admin_metrictemplate '
+                'WHERE id = %s', [self.mt1.id]
+            )
+            flags, files = cursor.fetchone()
+        self.assertEqual(
+            json.loads(flags), [['OBSESS', '1'], ['NOPUBLISH', '1']]
+        )
+        self.assertIsNone(files)
+
+    def test_inline_helpers_use_parsed_pairs(self):
+        mt = admin_models.MetricTemplate.objects.get(id=self.mt1.id)
+        self.assertEqual(
+            two_value_inline(mt.parameter), [
+                {'key': '--project', 'value': 'EGI'},
+                {'key': '--note', 'value': 'some  spaced value'}
+            ]
+        )
+        self.assertEqual(
+            two_value_inline(mt.parameter),
+            two_value_inline(self.mt1.parameter)
+        )
+        self.assertEqual(
+            two_value_inline_dict(mt.flags),
+            two_value_inline_dict(self.mt1.flags)
+        )
+        self.assertEqual(
+            two_value_inline_dict(mt.flags), {'OBSESS': '1', 'NOPUBLISH': '1'}
+        )
+        self.assertEqual(two_value_inline(mt.dependency), [])
+
+    def test_filter_by_key(self):
+        self.assertEqual(
+            list(
+                admin_models.MetricTemplate.objects.filter(
+                    flags__has_inline_key='NOPUBLISH'
+                ).values_list('name', flat=True)
+            ),
+            ['argo.AMS-Check']
+        )
+        self.assertEqual(
+            sorted(
+                admin_models.MetricTemplate.objects.filter(
+                    flags__has_inline_key='OBSESS'
+                ).values_list('name', flat=True)
+            ),
+            ['argo.AMS-Check', 'org.apel.APEL-Pub']
+        )
+        self.assertFalse(
+            admin_models.MetricTemplate.objects.filter(
+                flags__has_inline_key='1'
+            ).exists()
+        )
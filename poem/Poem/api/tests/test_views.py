@@ -1,42 +1,44 @@
 import datetime
+import io
 import json
-from unittest.mock import patch, call
+from unittest.mock import patch
 
 import factory
 from Poem.api import views
 from Poem.api.models import MyAPIKey
+from Poem.helpers.snapshot_helpers import snapshot_stats, \
+    reset_snapshot_stats
 from Poem.poem import models as poem_models
 from Poem.poem_super_admin import models as admin_models
+from Poem.poem_super_admin.models import WebAPIKey
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
 from django.db.models.signals import post_save, pre_save
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 from django_tenants.test.cases import TenantTestCase
 from django_tenants.test.client import TenantRequestFactory
 from rest_framework import status
 
+from .utils_test import mocked_web_api_metric_profiles, \
+    mocked_web_api_metric_profiles_empty
 
-def mock_function(*args):
-    if args[0] == 'ARGO-MON':
-        return {'argo.AMS-Check'}
 
-    if args[0] == 'MON-TEST':
-        return {
-            'argo.AMS-Check', 'eu.seadatanet.org.downloadmanager-check',
-            'eu.seadatanet.org.nvs2-check'
-        }
-
-    if args[0] == 'MON-PASSIVE':
-        return {
-            'argo.AMS-Check', 'eu.seadatanet.org.downloadmanager-check',
-            'eu.seadatanet.org.nvs2-check', 'org.apel.APEL-Pub'
-        }
-
-    if args[0] == 'EMPTY':
-        return set()
-
-    if args[0] == 'TEST-NONEXISTING':
-        return {'nonexisting.metric'}
-
-    if args[0] == 'TEST_PROMOO':
-        return {'eu.egi.cloud.OCCI-Categories'}
+mock_metric_profiles = {
+    'ARGO-MON': ['argo.AMS-Check'],
+    'MON-TEST': [
+        'argo.AMS-Check', 'eu.seadatanet.org.downloadmanager-check',
+        'eu.seadatanet.org.nvs2-check'
+    ],
+    'MON-PASSIVE': [
+        'argo.AMS-Check', 'eu.seadatanet.org.downloadmanager-check',
+        'eu.seadatanet.org.nvs2-check', 'org.apel.APEL-Pub'
+    ],
+    'EMPTY': [],
+    'TEST-NONEXISTING': ['nonexisting.metric'],
+    'TEST_PROMOO': ['eu.egi.cloud.OCCI-Categories']
+}
 
 
 @factory.django.mute_signals(pre_save, post_save)
@@ -911,6 +913,191 @@ class ListMetricsAPIViewTests(TenantTestCase):
             ]
         )
 
+    def test_list_metrics_number_of_queries_constant(self):
+        with CaptureQueriesContext(connection) as context:
+            views.build_metricconfigs()
+        nr_queries = len(context.captured_queries)
+
+        group = poem_models.GroupOfMetrics.objects.get(name='EOSC')
+        probekey = admin_models.ProbeHistory.objects.get(
+            name='ams-probe', package__version='0.1.12'
+        )
+        mtype = admin_models.MetricTemplateType.objects.get(name='Active')
+        tag = admin_models.MetricTags.objects.get(name='test_tag1')
+        for i in range(50):
+            mt = admin_models.MetricTemplate.objects.create(
+                name=f'test.AMS-Check-{i}',
+                mtype=mtype,
+                probekey=probekey,
+                probeexecutable='["ams-probe"]',
+                config='["maxCheckAttempts 3", "timeout 60"]'
+            )
+            mt.tags.add(tag)
+            history = admin_models.MetricTemplateHistory.objects.create(
+                object_id=mt,
+                name=mt.name,
+                mtype=mt.mtype,
+                probekey=mt.probekey,
+                probeexecutable=mt.probeexecutable,
+                config=mt.config,
+                version_user='poem',
+                version_comment='Initial version.'
+            )
+            history.tags.add(tag)
+            poem_models.Metric.objects.create(
+                name=mt.name,
+                group=group,
+                probeversion=probekey.__str__(),
+                config=mt.config
+            )
+            passive = admin_models.MetricTemplate.objects.create(
+                name=f'test.passive-{i}',
+                mtype=mtype,
+                flags='["PASSIVE 1"]'
+            )
+            passive.tags.add(tag)
+            poem_models.Metric.objects.create(name=passive.name, group=group)
+
+        with CaptureQueriesContext(connection) as context:
+            data = views.build_metricconfigs()
+
+        self.assertEqual(len(data), 105)
+        self.assertEqual(len(context.captured_queries), nr_queries)
+        self.assertEqual(
+            [item for item in data if 'test.AMS-Check-0' in item][0],
+            {
+                'test.AMS-Check-0': {
+                    'probe': 'ams-probe',
+                    'tags': ['test_tag1'],
+                    'config': {'maxCheckAttempts': '3', 'timeout': '60'},
+                    'flags': {},
+                    'dependency': {},
+                    'attribute': {},
+                    'parameter': {},
+                    'file_parameter': {},
+                    'file_attribute': {},
+                    'parent': '',
+                    'docurl':
+                        'https://github.com/ARGOeu/nagios-plugins-argo'
+                        '/blob/master/README.md'
+                }
+            }
+        )
+
+    def test_list_metrics_generation_headers(self):
+        generation = admin_models.ConfigGeneration.objects.current(
+            connection.schema_name
+        )
+        request = self.factory.get(self.url, **{'HTTP_X_API_KEY': self.token})
+        response = self.view(request)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response['X-Public-Config-Generation'], str(generation[0])
+        )
+        self.assertEqual(response['X-Config-Generation'], str(generation[1]))
+
+    def test_list_metrics_not_modified(self):
+        request = self.factory.get(self.url, **{'HTTP_X_API_KEY': self.token})
+        response = self.view(request)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response['ETag']
+
+        request = self.factory.get(
+            self.url,
+            **{'HTTP_X_API_KEY': self.token, 'HTTP_IF_NONE_MATCH': etag}
+        )
+        with patch('Poem.api.views.build_metricconfigs') as mock_build:
+            response = self.view(request)
+            self.assertFalse(mock_build.called)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_list_metrics_modified_after_metric_change(self):
+        request = self.factory.get(self.url, **{'HTTP_X_API_KEY': self.token})
+        etag = self.view(request)['ETag']
+
+        metric = poem_models.Metric.objects.get(name='test.AMS-Check')
+        metric.config = '["maxCheckAttempts 4", "timeout 60", ' \
+                        '"path /usr/libexec/argo-monitoring/probes/argo", ' \
+                        '"interval 5", "retryInterval 3"]'
+        metric.save()
+
+        request = self.factory.get(
+            self.url,
+            **{'HTTP_X_API_KEY': self.token, 'HTTP_IF_NONE_MATCH': etag}
+        )
+        response = self.view(request)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(
+            [
+                item for item in response.data if 'test.AMS-Check' in item
+            ][0]['test.AMS-Check']['config']['maxCheckAttempts'],
+            '4'
+        )
+
+    def test_list_metrics_modified_after_metric_template_change(self):
+        request = self.factory.get(self.url, **{'HTTP_X_API_KEY': self.token})
+        etag = self.view(request)['ETag']
+
+        mt = admin_models.MetricTemplate.objects.get(name='test.AMS-Check')
+        mt.description = 'New description.'
+        mt.save()
+
+        request = self.factory.get(
+            self.url,
+            **{'HTTP_X_API_KEY': self.token, 'HTTP_IF_NONE_MATCH': etag}
+        )
+        response = self.view(request)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_list_metrics_snapshot(self):
+        mt = admin_models.MetricTemplate.objects.get(name='test.AMS-Check')
+        mt.description = 'New description.'
+        mt.save()
+        metric = poem_models.Metric.objects.get(name='test.AMS-Check')
+        metric.save()
+        reset_snapshot_stats()
+
+        request = self.factory.get(self.url, **{'HTTP_X_API_KEY': self.token})
+        response1 = self.view(request)
+        self.assertEqual(snapshot_stats(), {'hits': 0, 'misses': 1})
+
+        request = self.factory.get(self.url, **{'HTTP_X_API_KEY': self.token})
+        with patch('Poem.api.views.build_metricconfigs') as mock_build:
+            response2 = self.view(request)
+            self.assertFalse(mock_build.called)
+        self.assertEqual(snapshot_stats(), {'hits': 1, 'misses': 1})
+        self.assertEqual(response1.data, response2.data)
+
+        metric.config = '["maxCheckAttempts 4", "timeout 60", ' \
+                        '"path /usr/libexec/argo-monitoring/probes/argo", ' \
+                        '"interval 5", "retryInterval 3"]'
+        metric.save()
+
+        request = self.factory.get(self.url, **{'HTTP_X_API_KEY': self.token})
+        response = self.view(request)
+        self.assertEqual(snapshot_stats(), {'hits': 1, 'misses': 2})
+        self.assertEqual(
+            [
+                item for item in response.data if 'test.AMS-Check' in item
+            ][0]['test.AMS-Check']['config']['maxCheckAttempts'],
+            '4'
+        )
+
+    def test_tagged_metrics_etag_differs_from_all_metrics_etag(self):
+        request = self.factory.get(self.url, **{'HTTP_X_API_KEY': self.token})
+        etag = self.view(request)['ETag']
+
+        request = self.factory.get(
+            self.url + '/internal',
+            **{'HTTP_X_API_KEY': self.token, 'HTTP_IF_NONE_MATCH': etag}
+        )
+        response = self.view(request, 'internal')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
     def test_get_internal_metrics(self):
         request = self.factory.get(
             self.url + '/internal', **{'HTTP_X_API_KEY': self.token}
@@ -937,6 +1124,168 @@ class ListMetricsAPIViewTests(TenantTestCase):
         self.assertEqual(response.data, {'detail': 'Requested tag not found.'})
 
 
+class ListMetricChangesAPIViewTests(TenantTestCase):
+    def setUp(self):
+        self.token = create_credentials()
+        self.view = views.ListMetricChanges.as_view()
+        self.factory = TenantRequestFactory(self.tenant)
+        self.url = '/api/v2/metrics/changes'
+
+        mock_db_for_metrics_tests()
+
+        self.public_generation, self.generation = \
+            admin_models.ConfigGeneration.objects.current(
+                connection.schema_name
+            )
+
+    def test_list_changes_if_wrong_token(self):
+        request = self.factory.get(
+            self.url, {'since': self.generation},
+            **{'HTTP_X_API_KEY': 'wrong_token'}
+        )
+        response = self.view(request)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_list_changes_without_since(self):
+        request = self.factory.get(self.url, **{'HTTP_X_API_KEY': self.token})
+        response = self.view(request)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.data, {'detail': 'Parameter since is required.'}
+        )
+
+    def test_list_changes_if_since_not_integer(self):
+        request = self.factory.get(
+            self.url, {'since': 'abc'}, **{'HTTP_X_API_KEY': self.token}
+        )
+        response = self.view(request)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.data, {'detail': 'Parameter since must be an integer.'}
+        )
+
+    def test_list_changes_if_no_changes(self):
+        request = self.factory.get(
+            self.url, {'since': self.generation},
+            **{'HTTP_X_API_KEY': self.token}
+        )
+        response = self.view(request)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data,
+            {
+                'generation': self.generation,
+                'public_generation': self.public_generation,
+                'added': [],
+                'updated': [],
+                'deleted': []
+            }
+        )
+
+    def test_list_changes(self):
+        metric = poem_models.Metric.objects.get(name='test.AMS-Check')
+        metric.config = '["maxCheckAttempts 4", "timeout 60", ' \
+                        '"path /usr/libexec/argo-monitoring/probes/argo", ' \
+                        '"interval 5", "retryInterval 3"]'
+        metric.save()
+        poem_models.Metric.objects.get(name='argo.AMSPublisher-Check').delete()
+        poem_models.Metric.objects.get(name='org.apel.APEL-Pub').delete()
+        poem_models.Metric.objects.create(name='org.apel.APEL-Pub')
+        poem_models.Metric.objects.create(name='test.EMPTY-metric')
+        request = self.factory.get(
+            self.url, {'since': self.generation},
+            **{'HTTP_X_API_KEY': self.token}
+        )
+        response = self.view(request)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['generation'], self.generation + 5)
+        self.assertEqual(
+            [list(item.keys())[0] for item in response.data['added']],
+            ['test.EMPTY-metric']
+        )
+        self.assertEqual(
+            [list(item.keys())[0] for item in response.data['updated']],
+            ['org.apel.APEL-Pub', 'test.AMS-Check']
+        )
+        self.assertEqual(
+            response.data['updated'][1]['test.AMS-Check']['config'][
+                'maxCheckAttempts'
+            ],
+            '4'
+        )
+        self.assertEqual(
+            response.data['deleted'], ['argo.AMSPublisher-Check']
+        )
+
+        request = self.factory.get(
+            self.url, {'since': response.data['generation']},
+            **{'HTTP_X_API_KEY': self.token}
+        )
+        response = self.view(request)
+        self.assertEqual(
+            response.data,
+            {
+                'generation': self.generation + 5,
+                'public_generation': self.public_generation,
+                'added': [],
+                'updated': [],
+                'deleted': []
+            }
+        )
+
+    def test_list_changes_after_old_changes_are_cleared(self):
+        poem_models.MetricChange.objects.update(
+            date=timezone.now() - datetime.timedelta(days=60)
+        )
+        metric = poem_models.Metric.objects.get(name='test.AMS-Check')
+        metric.save()
+        out = io.StringIO()
+        call_command(
+            'poem_clear_metric_changes', schema=[connection.schema_name],
+            days=30, stdout=out
+        )
+        self.assertEqual(
+            list(
+                poem_models.MetricChange.objects.values_list('name', 'action')
+            ), [('test.AMS-Check', poem_models.MetricChange.UPDATED)]
+        )
+
+        request = self.factory.get(
+            self.url, {'since': self.generation},
+            **{'HTTP_X_API_KEY': self.token}
+        )
+        response = self.view(request)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [list(item.keys())[0] for item in response.data['updated']],
+            ['test.AMS-Check']
+        )
+
+        request = self.factory.get(
+            self.url, {'since': self.generation - 1},
+            **{'HTTP_X_API_KEY': self.token}
+        )
+        response = self.view(request)
+        self.assertEqual(response.status_code, status.HTTP_410_GONE)
+
+    def test_list_changes_if_generation_too_old(self):
+        poem_models.MetricChange.objects.all().delete()
+        metric = poem_models.Metric.objects.get(name='test.AMS-Check')
+        metric.save()
+        request = self.factory.get(
+            self.url, {'since': 0}, **{'HTTP_X_API_KEY': self.token}
+        )
+        response = self.view(request)
+        self.assertEqual(response.status_code, status.HTTP_410_GONE)
+        self.assertEqual(
+            response.data,
+            {
+                'detail': 'Changes since requested generation are not '
+                          'available; full configuration should be fetched.'
+            }
+        )
+
+
 class ListReposAPIViewTests(TenantTestCase):
     def setUp(self):
         self.tenant.name = "TENANT"
@@ -948,6 +1297,46 @@ class ListReposAPIViewTests(TenantTestCase):
 
         mock_db_for_repos_tests()
 
+    def test_get_repos_for_metrics_number_of_queries_constant(self):
+        ostag = admin_models.OSTag.objects.get(name='CentOS 7')
+        probeversions = [
+            probe.__str__() for probe in
+            admin_models.ProbeHistory.objects.all().order_by('name')
+        ]
+        names = [metric.name for metric in poem_models.Metric.objects.all()]
+
+        with CaptureQueriesContext(connection) as context:
+            data, missing = views.get_repos_for_metrics(names, ostag)
+        num_queries = len(context.captured_queries)
+
+        poem_models.Metric.objects.bulk_create([
+            poem_models.Metric(
+                name=f'test.bulk-metric-{i}',
+                probeversion=probeversions[i % len(probeversions)],
+                config='[]'
+            ) for i in range(1200)
+        ])
+        names.extend([f'test.bulk-metric-{i}' for i in range(1200)])
+
+        with CaptureQueriesContext(connection) as context:
+            bulk_data, bulk_missing = views.get_repos_for_metrics(
+                names, ostag
+            )
+        self.assertEqual(len(context.captured_queries), num_queries)
+        self.assertLessEqual(num_queries, 4)
+
+        all_data, all_missing = views.get_repos_for_metrics(
+            [f'test.bulk-metric-{i}' for i in range(len(probeversions))],
+            ostag
+        )
+        self.assertEqual(bulk_data, all_data)
+        self.assertEqual(bulk_missing, all_missing)
+        for repo in bulk_data.values():
+            self.assertEqual(
+                repo['packages'],
+                sorted(repo['packages'], key=lambda p: p['name'])
+            )
+
     def test_list_repos_if_wrong_token(self):
         request = self.factory.get(
             self.url + '/centos7',
@@ -958,9 +1347,9 @@ class ListReposAPIViewTests(TenantTestCase):
         response = self.view(request, 'centos7')
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
 
-    @patch('Poem.api.views.get_metrics_from_profile')
+    @patch('Poem.api.views.get_metric_profiles')
     def test_list_repos(self, mock_get_metrics):
-        mock_get_metrics.side_effect = mock_function
+        mock_get_metrics.return_value = mock_metric_profiles
         request = self.factory.get(
             self.url + '/centos7',
             **{'HTTP_X_API_KEY': self.token,
@@ -972,10 +1361,7 @@ class ListReposAPIViewTests(TenantTestCase):
         test_data['data']['repo-1']['packages'] = sorted(
             test_data['data']['repo-1']['packages'], key=lambda k: k['name']
         )
-        self.assertEqual(mock_get_metrics.call_count, 2)
-        mock_get_metrics.assert_has_calls([
-            call('ARGO-MON', "TENANT"), call('MON-TEST', "TENANT")
-        ])
+        mock_get_metrics.assert_called_once_with("TENANT")
         self.assertEqual(
             test_data,
             {
@@ -1037,9 +1423,9 @@ class ListReposAPIViewTests(TenantTestCase):
             {'detail': 'You must define profile!'}
         )
 
-    @patch('Poem.api.views.get_metrics_from_profile')
+    @patch('Poem.api.views.get_metric_profiles')
     def test_list_repos_if_passive_metric_present(self, mock_get_metrics):
-        mock_get_metrics.side_effect = mock_function
+        mock_get_metrics.return_value = mock_metric_profiles
         request = self.factory.get(
             self.url + '/centos6',
             **{'HTTP_X_API_KEY': self.token,
@@ -1047,10 +1433,7 @@ class ListReposAPIViewTests(TenantTestCase):
         )
         request.tenant = self.tenant
         response = self.view(request, 'centos6')
-        self.assertEqual(mock_get_metrics.call_count, 2)
-        mock_get_metrics.assert_has_calls(
-            [call('ARGO-MON', "TENANT"), call('MON-PASSIVE', "TENANT")]
-        )
+        mock_get_metrics.assert_called_once_with("TENANT")
         self.assertEqual(
             response.data,
             {
@@ -1081,9 +1464,9 @@ class ListReposAPIViewTests(TenantTestCase):
             }
         )
 
-    @patch('Poem.api.views.get_metrics_from_profile')
+    @patch('Poem.api.views.get_metric_profiles')
     def test_empty_repo_list(self, mock_get_metrics):
-        mock_get_metrics.side_effect = mock_function
+        mock_get_metrics.return_value = mock_metric_profiles
         request = self.factory.get(
             self.url + '/centos6',
             **{'HTTP_X_API_KEY': self.token,
@@ -1091,8 +1474,7 @@ class ListReposAPIViewTests(TenantTestCase):
         )
         request.tenant = self.tenant
         response = self.view(request, 'centos6')
-        mock_get_metrics.assert_called_once()
-        mock_get_metrics.assert_called_with('EMPTY', "TENANT")
+        mock_get_metrics.assert_called_once_with("TENANT")
         self.assertEqual(
             response.data,
             {
@@ -1111,9 +1493,9 @@ class ListReposAPIViewTests(TenantTestCase):
             }
         )
 
-    @patch('Poem.api.views.get_metrics_from_profile')
+    @patch('Poem.api.views.get_metric_profiles')
     def test_list_repos_if_nonexisting_tag(self, mock_get_metrics):
-        mock_get_metrics.side_effect = mock_function
+        mock_get_metrics.return_value = mock_metric_profiles
         request = self.factory.get(
             self.url + '/nonexisting',
             **{'HTTP_X_API_KEY': self.token,
@@ -1121,21 +1503,18 @@ class ListReposAPIViewTests(TenantTestCase):
         )
         request.tenant = self.tenant
         response = self.view(request, 'nonexisting')
-        self.assertEqual(mock_get_metrics.call_count, 2)
-        mock_get_metrics.assert_has_calls([
-            call('ARGO-MON', "TENANT"), call('MON-TEST', "TENANT")
-        ])
+        mock_get_metrics.assert_called_once_with("TENANT")
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
         self.assertEqual(
             response.data,
             {'detail': 'YUM repo tag not found.'}
         )
 
-    @patch('Poem.api.views.get_metrics_from_profile')
+    @patch('Poem.api.views.get_metric_profiles')
     def test_list_repos_if_function_return_metric_does_not_exist(
             self, mock_get_metrics
     ):
-        mock_get_metrics.side_effect = mock_function
+        mock_get_metrics.return_value = mock_metric_profiles
         request = self.factory.get(
             self.url + '/centos6',
             **{'HTTP_X_API_KEY': self.token,
@@ -1143,12 +1522,7 @@ class ListReposAPIViewTests(TenantTestCase):
         )
         request.tenant = self.tenant
         response = self.view(request, 'centos6')
-        self.assertEqual(mock_get_metrics.call_count, 3)
-        mock_get_metrics.assert_has_calls([
-            call('ARGO-MON', "TENANT"),
-            call('MON-TEST', "TENANT"),
-            call('TEST-NONEXISTING', "TENANT")
-        ])
+        mock_get_metrics.assert_called_once_with("TENANT")
         self.assertEqual(
             response.data,
             {
@@ -1179,9 +1553,9 @@ class ListReposAPIViewTests(TenantTestCase):
             }
         )
 
-    @patch('Poem.api.views.get_metrics_from_profile')
+    @patch('Poem.api.views.get_metric_profiles')
     def test_list_repos_if_version_is_the_right_os(self, mock_get_metrics):
-        mock_get_metrics.side_effect = mock_function
+        mock_get_metrics.return_value = mock_metric_profiles
         request = self.factory.get(
             self.url + '/centos6',
             **{'HTTP_X_API_KEY': self.token,
@@ -1189,8 +1563,7 @@ class ListReposAPIViewTests(TenantTestCase):
         )
         request.tenant = self.tenant
         response = self.view(request, 'centos6')
-        mock_get_metrics.assert_called_once()
-        mock_get_metrics.assert_called_with('TEST_PROMOO', "TENANT")
+        mock_get_metrics.assert_called_once_with("TENANT")
         self.assertEqual(
             response.data,
             {
@@ -1218,9 +1591,9 @@ class ListReposAPIViewTests(TenantTestCase):
             }
         )
 
-    @patch('Poem.api.views.get_metrics_from_profile')
+    @patch('Poem.api.views.get_metric_profiles')
     def test_list_repos_if_version_is_wrong_os(self, mock_get_metrics):
-        mock_get_metrics.side_effect = mock_function
+        mock_get_metrics.return_value = mock_metric_profiles
         request = self.factory.get(
             self.url + '/centos6',
             **{'HTTP_X_API_KEY': self.token,
@@ -1228,8 +1601,7 @@ class ListReposAPIViewTests(TenantTestCase):
         )
         request.tenant = self.tenant
         response = self.view(request, 'centos7')
-        mock_get_metrics.assert_called_once()
-        mock_get_metrics.assert_called_with('TEST_PROMOO', "TENANT")
+        mock_get_metrics.assert_called_once_with("TENANT")
         self.assertEqual(
             response.data,
             {
@@ -1253,6 +1625,98 @@ class ListReposAPIViewTests(TenantTestCase):
         )
 
 
+class GetMetricProfilesTests(TenantTestCase):
+    def setUp(self):
+        cache.delete('webapi:metricprofiles:TENANT')
+
+    def tearDown(self):
+        cache.delete('webapi:metricprofiles:TENANT')
+
+    @patch('Poem.api.views.webapi_get')
+    @patch('Poem.api.views.WebAPIKey.objects.get')
+    def test_get_metric_profiles(self, mock_key, mock_get):
+        mock_key.return_value = WebAPIKey(
+            name='WEB-API-TENANT-RO', token='mock_key'
+        )
+        mock_get.side_effect = mocked_web_api_metric_profiles
+        with self.settings(WEBAPI_METRIC='https://mock.api.url'):
+            profiles1 = views.get_metric_profiles('TENANT')
+            profiles2 = views.get_metric_profiles('TENANT')
+        mock_key.assert_called_once_with(name='WEB-API-TENANT-RO')
+        mock_get.assert_called_once_with(
+            'https://mock.api.url',
+            headers={'Accept': 'application/json', 'x-api-key': 'mock_key'}
+        )
+        self.assertEqual(
+            profiles1,
+            {
+                'PROFILE1': ['metric1', 'metric2', 'metric3', 'metric4'],
+                'PROFILE2': ['metric2', 'metric3', 'metric5', 'metric7']
+            }
+        )
+        self.assertEqual(profiles1, profiles2)
+
+    @patch('Poem.api.views.webapi_get')
+    @patch('Poem.api.views.WebAPIKey.objects.get')
+    def test_get_metric_profiles_if_empty(self, mock_key, mock_get):
+        mock_key.return_value = WebAPIKey(
+            name='WEB-API-TENANT-RO', token='mock_key'
+        )
+        mock_get.side_effect = mocked_web_api_metric_profiles_empty
+        with self.settings(WEBAPI_METRIC='https://mock.api.url'):
+            self.assertEqual(views.get_metric_profiles('TENANT'), {})
+            self.assertEqual(views.get_metric_profiles('TENANT'), {})
+        mock_get.assert_called_once()
+
+    @patch('Poem.api.views._fetch_metric_profiles')
+    def test_get_metric_profiles_not_blocked_by_other_tenant(
+            self, mock_fetch
+    ):
+        mock_fetch.return_value = {'PROFILE1': ['metric1']}
+        self.assertIs(
+            views._metric_profiles_lock('TENANT'),
+            views._metric_profiles_lock('TENANT')
+        )
+        with views._metric_profiles_lock('OTHER'):
+            self.assertEqual(
+                views.get_metric_profiles('TENANT'),
+                {'PROFILE1': ['metric1']}
+            )
+        mock_fetch.assert_called_once_with('TENANT')
+
+    @patch('Poem.api.views.get_metric_profiles')
+    def test_get_metrics_from_profiles(self, mock_profiles):
+        mock_profiles.return_value = mock_metric_profiles
+        self.assertEqual(
+            views.get_metrics_from_profiles(
+                ['ARGO-MON', 'MON-PASSIVE'], 'TENANT'
+            ),
+            {
+                'argo.AMS-Check', 'eu.seadatanet.org.downloadmanager-check',
+                'eu.seadatanet.org.nvs2-check', 'org.apel.APEL-Pub'
+            }
+        )
+        mock_profiles.assert_called_once_with('TENANT')
+
+    @patch('Poem.api.views.get_metric_profiles')
+    def test_get_metrics_from_profiles_if_missing_profile(
+            self, mock_profiles
+    ):
+        mock_profiles.return_value = mock_metric_profiles
+        with self.assertRaises(views.NotFound) as context:
+            views.get_metrics_from_profiles(['ARGO-MON', 'MISSING'], 'TENANT')
+        self.assertEqual(
+            context.exception.detail, 'Metric profile MISSING not found.'
+        )
+
+    @patch('Poem.api.views.get_metric_profiles')
+    def test_get_metrics_from_profiles_if_no_profiles(self, mock_profiles):
+        mock_profiles.return_value = {}
+        self.assertEqual(
+            views.get_metrics_from_profiles(['ARGO-MON'], 'TENANT'), set()
+        )
+
+
 class ListMetricTemplateAPIViewTests(TenantTestCase):
     def setUp(self):
         self.token = create_credentials()
@@ -1429,6 +1893,50 @@ class ListMetricTemplateAPIViewTests(TenantTestCase):
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
         self.assertEqual(response.data, {'detail': 'Requested tag not found.'})
 
+    def test_list_metric_templates_modified_after_tag_rename(self):
+        request = self.factory.get(self.url, **{'HTTP_X_API_KEY': self.token})
+        etag = self.view(request)['ETag']
+
+        tag = admin_models.MetricTags.objects.get(name='test_tag1')
+        tag.name = 'test_tag1_new'
+        tag.save()
+
+        request = self.factory.get(
+            self.url,
+            **{'HTTP_X_API_KEY': self.token, 'HTTP_IF_NONE_MATCH': etag}
+        )
+        response = self.view(request)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(
+            [
+                item for item in response.data
+                if 'argo.AMSPublisher-Check' in item
+            ][0]['argo.AMSPublisher-Check']['tags'],
+            ['internal', 'test_tag1_new']
+        )
+
+    def test_list_metric_templates_modified_after_tag_delete(self):
+        request = self.factory.get(self.url, **{'HTTP_X_API_KEY': self.token})
+        etag = self.view(request)['ETag']
+
+        admin_models.MetricTags.objects.get(name='test_tag1').delete()
+
+        request = self.factory.get(
+            self.url,
+            **{'HTTP_X_API_KEY': self.token, 'HTTP_IF_NONE_MATCH': etag}
+        )
+        response = self.view(request)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(
+            [
+                item for item in response.data
+                if 'argo.AMSPublisher-Check' in item
+            ][0]['argo.AMSPublisher-Check']['tags'],
+            ['internal']
+        )
+
 
 class ListMetricConfigurationAPIViewTests(TenantTestCase):
     def setUp(self):
@@ -1538,6 +2046,24 @@ class ListDefaultPortsTests(TenantTestCase):
             }
         )
 
+    def test_list_default_ports_not_modified(self):
+        request = self.factory.get(self.url, **{'HTTP_X_API_KEY': self.token})
+        etag = self.view(request)['ETag']
+
+        request = self.factory.get(
+            self.url,
+            **{'HTTP_X_API_KEY': self.token, 'HTTP_IF_NONE_MATCH': etag}
+        )
+        response = self.view(request)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        admin_models.DefaultPort.objects.create(name="FTP_PORT", value="21")
+
+        response = self.view(request)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.data["FTP_PORT"], "21")
+
 
 class ProbeCandidateAPITests(TenantTestCase):
     def setUp(self) -> None:
@@ -1,13 +1,131 @@
 import json
+import socketserver
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
 
 import requests
+from django.db import connection
 from django.test.client import encode_multipart
 
 
+class ThreadingHTTPServer(socketserver.ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
 def mocked_func(*args, **kwargs):
     pass
 
 
+class FakeWebApi:
+    """
+    WEB-API stand-in served over HTTP on localhost, for tests exercising the
+    whole client stack. Resources are lists of entries keyed by path; GET of
+    <path>/<id> returns a single entry, and PUT to it replaces the entry.
+    Resources of a single tenant can be set in tenant_resources under its
+    API key. Each response is delayed by delay seconds, to simulate latency.
+    Received requests are recorded as (method, path, data) tuples.
+    """
+    def __init__(self, delay=0):
+        self.resources = dict()
+        self.tenant_resources = dict()
+        self.delay = delay
+        self.requests = []
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    def url(self, path):
+        return 'http://{}:{}{}'.format(*self._server.server_address, path)
+
+    def _find(self, path, token=None):
+        resources = self.tenant_resources.get(token, self.resources)
+        if path in resources:
+            return resources[path], None
+
+        resource, _, apiid = path.rpartition('/')
+        if resource in resources:
+            for entry in resources[resource]:
+                if entry['id'] == apiid:
+                    return resources[resource], entry
+
+        return None, None
+
+    def _record(self, method, path, data=None):
+        with self._lock:
+            self.requests.append((method, path, data))
+
+        if self.delay:
+            time.sleep(self.delay)
+
+    def _handler(self):
+        webapi = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def _respond(self, code, data):
+                body = json.dumps(data).encode()
+                self.send_response(code)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                webapi._record('GET', self.path)
+                entries, entry = webapi._find(
+                    self.path, self.headers.get('x-api-key')
+                )
+
+                if entries is None:
+                    self._respond(404, {'status': {'code': '404'}})
+
+                else:
+                    self._respond(
+                        200, {
+                            'status': {'message': 'Success', 'code': '200'},
+                            'data': [entry] if entry else entries
+                        }
+                    )
+
+            def do_PUT(self):
+                length = int(self.headers.get('Content-Length', 0))
+                data = json.loads(self.rfile.read(length) or 'null')
+                webapi._record('PUT', self.path, data)
+                entries, entry = webapi._find(
+                    self.path, self.headers.get('x-api-key')
+                )
+
+                if entry is None:
+                    self._respond(404, {'status': {'code': '404'}})
+
+                else:
+                    entries[entries.index(entry)] = data
+                    self._respond(
+                        200, {'status': {'message': 'Success', 'code': '200'}}
+                    )
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def __enter__(self):
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, daemon=True
+        )
+        self._thread.start()
+
+        return self
+
+    def __exit__(self, *args):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+
 def encode_data(data):
     content = encode_multipart('BoUnDaRyStRiNg', data)
     content_type = 'multipart/form-data; boundary=BoUnDaRyStRiNg'
@@ -15,6 +133,32 @@ def encode_data(data):
     return content, content_type
 
 
+def sequential_scans(queryset):
+    """
+    Runs EXPLAIN on the query of the given queryset in the current schema and
+    returns names of tables its plan scans sequentially. Tables should be
+    ANALYZEd first, so that the planner knows how large they are.
+    """
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+
+    tables = []
+    nodes = [plan[0]['Plan']]
+    while nodes:
+        node = nodes.pop()
+        if node['Node Type'] == 'Seq Scan':
+            tables.append(node['Relation Name'])
+
+        nodes.extend(node.get('Plans', []))
+
+    return tables
+
+
 def mocked_inline_metric_for_db(data):
     data = json.loads(data)
 
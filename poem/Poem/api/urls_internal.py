@@ -21,6 +21,8 @@ urlpatterns = [
     path('importmetrics/', views_internal.ImportMetrics.as_view(), name='import'),
     path('updatemetricsversions/', views_internal.UpdateMetricsVersions.as_view(), name='updatemetricsversions'),
     path('updatemetricsversions/<str:pkg>', views_internal.UpdateMetricsVersions.as_view(), name='updatemetricsversions'),
+    path('jobs/', views_internal.ListJobs.as_view(), name='jobs'),
+    path('jobs/<int:job_id>', views_internal.ListJobs.as_view(), name='jobs'),
     path('istenantschema/', views_internal.GetIsTenantSchema.as_view(), name='istenantschema'),
     path('metric/', views_internal.ListMetric.as_view(), name='metric'),
     path('public_metric/', views_internal.ListPublicMetric.as_view(), name='metric'),
@@ -81,6 +83,7 @@ urlpatterns = [
     path('tenants/', views_internal.ListTenants.as_view(), name='tenants'),
     path('public_tenants/', views_internal.ListPublicTenants.as_view(), name='tenants'),
     path('tenants/<str:name>', views_internal.ListTenants.as_view(), name='tenants'),
+    path('adoption/<str:obj>', views_internal.ListAdoption.as_view(), name='adoption'),
     path('metrictags/', views_internal.ListMetricTags.as_view(), name='metrictags'),
     path('metrictags/<str:name>', views_internal.ListMetricTags.as_view(), name='metrictags'),
     path('public_metrictags/', views_internal.ListPublicMetricTags.as_view(), name='metrictags'),
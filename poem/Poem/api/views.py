@@ -1,22 +1,33 @@
+import hashlib
 import json
+import threading
 
-import requests
 from Poem.api.internal_views.utils import error_response
 from Poem.api.internal_views.utils import one_value_inline, \
     two_value_inline_dict
 from Poem.api.permissions import MyHasAPIKey
+from Poem.helpers.snapshot_helpers import get_snapshot
+from Poem.helpers.webapi_helpers import webapi_get
 from Poem.poem import models
 from Poem.poem_super_admin import models as admin_models
 from Poem.poem_super_admin.models import WebAPIKey
 from django.conf import settings
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
 from django.core.validators import URLValidator, EmailValidator
+from django.db import connection
+from django.utils.http import parse_etags, quote_etag
+from django_tenants.utils import get_public_schema_name
 from rest_framework import status
 from rest_framework.exceptions import APIException
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
 
+_metric_profiles_locks = dict()
+_metric_profiles_locks_guard = threading.Lock()
+
+
 class NotFound(APIException):
     def __init__(self, status, detail, code=None):
         self.status_code = status
@@ -24,147 +35,213 @@ class NotFound(APIException):
         self.code = code if code else detail
 
 
-def build_metricconfigs(templates=False):
+def config_etag(request, *args, generation=None):
+    """
+    ETag derived from configuration generations of public schema and of the
+    tenant's schema; additional arguments are the request parameters the
+    response depends on. Generation can be passed if already fetched.
+    """
+    if generation is None:
+        generation = admin_models.ConfigGeneration.objects.current(
+            request.tenant.schema_name
+        )
+    public_generation, tenant_generation = generation
+    etag = f"{public_generation}.{tenant_generation}"
+
+    if args:
+        digest = hashlib.sha1(
+            json.dumps(args, sort_keys=True).encode()
+        ).hexdigest()[0:16]
+        etag = f"{etag}.{digest}"
+
+    return quote_etag(etag)
+
+
+def conditional_response(request, etag, build_response):
+    """
+    Returns 304 without calling build_response if the ETag sent in
+    If-None-Match header is still valid.
+    """
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if if_none_match:
+        etags = [
+            e[2:] if e.startswith('W/') else e
+            for e in parse_etags(if_none_match)
+        ]
+        if '*' in etags or etag in etags:
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+            response['ETag'] = etag
+            return response
+
+    response = build_response()
+    if response.status_code == status.HTTP_200_OK:
+        response['ETag'] = etag
+
+    return response
+
+
+def _metric_config_entry(name, mt, config, tags):
+    parent = one_value_inline(mt.parent)
+    probeexecutable = one_value_inline(mt.probeexecutable)
+    attribute = two_value_inline_dict(mt.attribute)
+    dependency = two_value_inline_dict(mt.dependency)
+    flags = two_value_inline_dict(mt.flags)
+    files = two_value_inline_dict(mt.files)
+    parameter = two_value_inline_dict(mt.parameter)
+    fileparameter = two_value_inline_dict(mt.fileparameter)
+    docurl = mt.probekey.docurl if mt.probekey else ""
+
+    return {
+        name: {
+            "tags": tags,
+            "probe": probeexecutable if probeexecutable else "",
+            "config": config if config else dict(),
+            "flags": flags if flags else dict(),
+            "dependency": dependency if dependency else dict(),
+            "attribute": attribute if attribute else dict(),
+            "parameter": parameter if parameter else dict(),
+            "file_parameter": fileparameter if fileparameter else dict(),
+            "file_attribute": files if files else dict(),
+            "parent": parent if parent else "",
+            "docurl": docurl if docurl else ""
+        }
+    }
+
+
+def build_metricconfigs(templates=False, names=None):
+    """
+    Builds configuration of all the metrics (or metric templates) with a
+    constant number of queries: metric template (history) entries matching
+    the metrics' probe keys are resolved in a single batched lookup, and
+    tags and probe keys are prefetched together with them. If names are
+    given, only configuration of metrics with those names is built.
+    """
     ret = []
 
     if templates:
-        metricsobjs = admin_models.MetricTemplate.objects.all().order_by('name')
-
-    else:
-        metricsobjs = models.Metric.objects.all().order_by('name')
-
-    for m in metricsobjs:
-        mdict = dict()
-        mdict.update({m.name: dict()})
-
-        config = two_value_inline_dict(m.config)
-
-        if templates:
-            parent = one_value_inline(m.parent)
-            probeexecutable = one_value_inline(m.probeexecutable)
-            attribute = two_value_inline_dict(m.attribute)
-            dependency = two_value_inline_dict(m.dependency)
-            flags = two_value_inline_dict(m.flags)
-            files = two_value_inline_dict(m.files)
-            parameter = two_value_inline_dict(m.parameter)
-            fileparameter = two_value_inline_dict(m.fileparameter)
-
-            tags = sorted([tag.name for tag in m.tags.all()])
-
-            docurl = m.probekey.docurl if m.probekey else ""
+        metrictemplates = admin_models.MetricTemplate.objects.select_related(
+            "probekey"
+        ).prefetch_related("tags").order_by("name")
+
+        for mt in metrictemplates:
+            ret.append(_metric_config_entry(
+                name=mt.name, mt=mt,
+                config=two_value_inline_dict(mt.config),
+                tags=sorted([tag.name for tag in mt.tags.all()])
+            ))
+
+        return ret
+
+    metrics = models.Metric.objects.all()
+    if names is not None:
+        metrics = metrics.filter(name__in=names)
+
+    metrics = list(metrics.order_by("name"))
+
+    history = dict()
+    probekeys = set(metric.probekey_id for metric in metrics) - {None}
+    if probekeys:
+        mt_history = admin_models.MetricTemplateHistory.objects.filter(
+            name__in=[metric.name for metric in metrics],
+            probekey__in=probekeys
+        ).select_related("probekey").prefetch_related("tags")
+
+        for mt in mt_history:
+            history[(mt.name, mt.probekey_id)] = mt
+
+    passive_names = [
+        metric.name for metric in metrics if not metric.probeversion
+    ]
+    passive = dict()
+    if passive_names:
+        passive = dict(
+            (mt.name, mt) for mt in
+            admin_models.MetricTemplate.objects.filter(
+                name__in=passive_names
+            ).select_related("probekey").prefetch_related("tags")
+        )
+
+    for metric in metrics:
+        if metric.probeversion:
+            mt = history.get((metric.name, metric.probekey_id), None)
 
         else:
-            try:
-                if m.probeversion:
-                    probeversion = m.probeversion.split("(")
-                    probe_name = probeversion[0].strip()
-                    probe_version = probeversion[1][:-1].strip()
-                    probe = admin_models.ProbeHistory.objects.get(
-                        name=probe_name, package__version=probe_version
-                    )
-                    mt = admin_models.MetricTemplateHistory.objects.get(
-                        name=m.name, probekey=probe
-                    )
-
-                else:
-                    mt = admin_models.MetricTemplate.objects.get(name=m.name)
-
-                parent = one_value_inline(mt.parent)
-                probeexecutable = one_value_inline(mt.probeexecutable)
-                attribute = two_value_inline_dict(mt.attribute)
-                dependency = two_value_inline_dict(mt.dependency)
-                flags = two_value_inline_dict(mt.flags)
-                files = two_value_inline_dict(mt.files)
-                parameter = two_value_inline_dict(mt.parameter)
-                fileparameter = two_value_inline_dict(mt.fileparameter)
+            mt = passive.get(metric.name, None)
 
-                tags = sorted([tag.name for tag in mt.tags.all()])
+        if not mt:
+            continue
 
-                docurl = mt.probekey.docurl if mt.probekey else ""
+        ret.append(_metric_config_entry(
+            name=metric.name, mt=mt,
+            config=two_value_inline_dict(metric.config),
+            tags=sorted([tag.name for tag in mt.tags.all()])
+        ))
 
-            except admin_models.MetricTemplateHistory.DoesNotExist:
-                continue
-
-        mdict[m.name].update({"tags": tags})
+    return ret
 
-        if probeexecutable:
-            mdict[m.name].update({'probe': probeexecutable})
-        else:
-            mdict[m.name].update({'probe': ''})
 
-        if config:
-            mdict[m.name].update({'config': config})
-        else:
-            mdict[m.name].update({'config': dict()})
-
-        if flags:
-            mdict[m.name].update({'flags': flags})
-        else:
-            mdict[m.name].update({'flags': dict()})
+def _fetch_metric_profiles(tenant):
+    token = WebAPIKey.objects.get(name=f"WEB-API-{tenant}-RO")
 
-        if dependency:
-            mdict[m.name].update({'dependency': dependency})
-        else:
-            mdict[m.name].update({'dependency': dict()})
+    headers = {'Accept': 'application/json', 'x-api-key': token.token}
+    response = webapi_get(settings.WEBAPI_METRIC, headers=headers)
+    response.raise_for_status()
+    data = response.json()['data']
 
-        if attribute:
-            mdict[m.name].update({'attribute': attribute})
-        else:
-            mdict[m.name].update({'attribute': dict()})
+    profiles = dict()
+    if data:
+        for p in data:
+            metrics = set()
+            for s in p['services']:
+                for m in s['metrics']:
+                    metrics.add(m)
 
-        if parameter:
-            mdict[m.name].update({'parameter': parameter})
-        else:
-            mdict[m.name].update({'parameter': dict()})
+            profiles[p['name']] = sorted(metrics)
 
-        if fileparameter:
-            mdict[m.name].update({'file_parameter': fileparameter})
-        else:
-            mdict[m.name].update({'file_parameter': dict()})
+    return profiles
 
-        if files:
-            mdict[m.name].update({'file_attribute': files})
-        else:
-            mdict[m.name].update({'file_attribute': dict()})
 
-        if parent:
-            mdict[m.name].update({'parent': parent})
-        else:
-            mdict[m.name].update({'parent': ''})
+def _metric_profiles_lock(tenant):
+    with _metric_profiles_locks_guard:
+        return _metric_profiles_locks.setdefault(tenant, threading.Lock())
 
-        if docurl:
-            mdict[m.name].update({'docurl': docurl})
-        else:
-            mdict[m.name].update({'docurl': ''})
 
-        ret.append(mdict)
+def get_metric_profiles(tenant):
+    """
+    Returns dict with names of tenant's metric profiles as keys and sorted
+    lists of metrics in them as values. WEB-API metric profiles document is
+    kept in cache for CACHE_WEBAPI_TIMEOUT seconds, so burst of requests
+    results in a single WEB-API call per tenant; a slow fetch for one tenant
+    does not block requests of the others.
+    """
+    key = f'webapi:metricprofiles:{tenant}'
+    profiles = cache.get(key)
 
-    return ret
+    if profiles is None:
+        with _metric_profiles_lock(tenant):
+            # requests waiting on the lock use the document fetched by the
+            # one holding it
+            profiles = cache.get(key)
+            if profiles is None:
+                profiles = _fetch_metric_profiles(tenant)
+                cache.set(key, profiles, settings.CACHE_WEBAPI_TIMEOUT)
 
+    return profiles
 
-def get_metrics_from_profile(profile, tenant):
-    token = WebAPIKey.objects.get(name=f"WEB-API-{tenant}-RO")
 
-    headers = {'Accept': 'application/json', 'x-api-key': token.token}
-    response = requests.get(
-        settings.WEBAPI_METRIC, headers=headers, timeout=180
-    )
-    response.raise_for_status()
-    data = response.json()['data']
+def get_metrics_from_profiles(profiles, tenant):
+    metric_profiles = get_metric_profiles(tenant)
 
     metrics = set()
-    if data:
-        if profile not in [p['name'] for p in data]:
-            raise NotFound(
-                status=404,
-                detail='Metric profile {} not found.'.format(profile))
+    if metric_profiles:
+        for profile in profiles:
+            if profile not in metric_profiles:
+                raise NotFound(
+                    status=404,
+                    detail='Metric profile {} not found.'.format(profile)
+                )
 
-        else:
-            for p in data:
-                if p['name'] == profile:
-                    for s in p['services']:
-                        for m in s['metrics']:
-                            metrics.add(m)
+            metrics.update(metric_profiles[profile])
 
     return metrics
 
@@ -172,7 +249,8 @@ def get_metrics_from_profile(profile, tenant):
 class ListMetrics(APIView):
     permission_classes = (MyHasAPIKey,)
 
-    def get(self, request, tag=None):
+    @staticmethod
+    def _build_response(tag=None, generation=None):
         if tag:
             try:
                 admin_models.MetricTags.objects.get(name=tag)
@@ -195,12 +273,169 @@ class ListMetrics(APIView):
                 )
 
         else:
-            return Response(build_metricconfigs())
+            return Response(
+                get_snapshot(
+                    'metricconfigs', connection.schema_name, generation,
+                    build_metricconfigs
+                )
+            )
+
+    def get(self, request, tag=None):
+        generation = admin_models.ConfigGeneration.objects.current(
+            request.tenant.schema_name
+        )
+        response = conditional_response(
+            request,
+            config_etag(request, 'metrics', tag, generation=generation),
+            lambda: self._build_response(tag, generation)
+        )
+        # generations the configuration was built from; tenant's one is to
+        # be passed as since parameter to /api/v2/metrics/changes
+        response['X-Public-Config-Generation'] = str(generation[0])
+        response['X-Config-Generation'] = str(generation[1])
+
+        return response
+
+
+class ListMetricChanges(APIView):
+    """
+    Configuration of metrics added or updated, and names of metrics deleted,
+    since the given generation of the tenant's configuration. Changes are
+    recorded when metrics in the tenant's schema are saved or deleted, so
+    changes of metric templates and probes are included only once they are
+    propagated to the tenant's metrics. Changes of shared configuration
+    which are not propagated (e.g. a metric template saved directly) are
+    not recorded; they bump public generation, returned together with the
+    changes, and full configuration should be fetched when it differs from
+    the one returned with the last full configuration.
+    """
+    permission_classes = (MyHasAPIKey,)
+
+    def get(self, request):
+        try:
+            since = int(request.query_params['since'])
+
+        except KeyError:
+            return Response(
+                {'detail': 'Parameter since is required.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        except ValueError:
+            return Response(
+                {'detail': 'Parameter since must be an integer.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        public_generation, generation = \
+            admin_models.ConfigGeneration.objects.current(
+                request.tenant.schema_name
+            )
+
+        changes = models.MetricChange.objects.all()
+        oldest = changes.order_by('generation').first()
+        if since < generation and (
+                not oldest or since < oldest.generation - 1
+        ):
+            return Response(
+                {
+                    'detail':
+                        'Changes since requested generation are not '
+                        'available; full configuration should be fetched.'
+                },
+                status=status.HTTP_410_GONE
+            )
+
+        first = dict()
+        last = dict()
+        for change in changes.filter(
+                generation__gt=since, generation__lte=generation
+        ).order_by('generation'):
+            first.setdefault(change.name, change.action)
+            last[change.name] = change.action
+
+        deleted = sorted([
+            name for name, action in last.items() if
+            action == models.MetricChange.DELETED
+        ])
+        added = set([
+            name for name, action in first.items() if
+            action == models.MetricChange.ADDED and name not in deleted
+        ])
+        updated = set(last.keys()).difference(added).difference(deleted)
+
+        configs = build_metricconfigs(names=added.union(updated))
+
+        return Response({
+            'generation': generation,
+            'public_generation': public_generation,
+            'added': [
+                entry for entry in configs if list(entry.keys())[0] in added
+            ],
+            'updated': [
+                entry for entry in configs if list(entry.keys())[0] in updated
+            ],
+            'deleted': deleted
+        })
+
+
+def get_repos_for_metrics(metrics, ostag):
+    """
+    Resolves packages of probes used by the metrics with the given names, and
+    groups them by YUM repo with the given OS tag. Number of queries does not
+    depend on the number of metrics. Returns tuple of dict with repo names as
+    keys and repo content and sorted packages as values, and sorted list of
+    packages which have no repo with the given tag.
+    """
+    package_ids = set(
+        models.Metric.objects.filter(
+            name__in=metrics, probekey__isnull=False
+        ).values_list("probekey__package", flat=True)
+    )
+
+    packages = sorted(
+        admin_models.Package.objects.filter(id__in=package_ids),
+        key=lambda p: (p.name, p.version)
+    )
+
+    repos = dict()
+    for package_repo in admin_models.Package.repos.through.objects.filter(
+            package_id__in=package_ids, yumrepo__tag=ostag
+    ).select_related("yumrepo").order_by("yumrepo__name"):
+        repos.setdefault(package_repo.package_id, package_repo.yumrepo)
+
+    data = dict()
+    missing_packages = []
+    for package in packages:
+        if package.id not in repos:
+            missing_packages.append(package.__str__())
+            continue
+
+        repo = repos[package.id]
+        if repo.name not in data:
+            data[repo.name] = {'content': repo.content, 'packages': []}
+
+        data[repo.name]['packages'].append({
+            'name': package.name,
+            'version': 'present' if package.use_present_version else
+            package.version
+        })
+
+    return data, sorted(missing_packages)
 
 
 class ListRepos(APIView):
     permission_classes = (MyHasAPIKey,)
 
+    @staticmethod
+    def _build_response(metrics, ostag):
+        data, missing_packages = get_repos_for_metrics(metrics, ostag)
+
+        return Response({
+            'data': data,
+            'missing_packages': missing_packages
+        })
+
     def get(self, request, tag=None):
         if not tag:
             return Response(
@@ -216,11 +451,7 @@ class ListRepos(APIView):
 
         else:
             profiles = dict(request.META)['HTTP_PROFILES'][1:-1].split(', ')
-            metrics = set()
-            for profile in profiles:
-                metrics = metrics.union(
-                    get_metrics_from_profile(profile, request.tenant.name)
-                )
+            metrics = get_metrics_from_profiles(profiles, request.tenant.name)
 
             internal_mt = [
                 mt.name for mt in
@@ -241,78 +472,19 @@ class ListRepos(APIView):
             else:
                 raise NotFound(status=404, detail='YUM repo tag not found.')
 
-            packages = set()
-            for metric in metrics:
-                try:
-                    m = models.Metric.objects.get(name=metric)
-                    if m.probeversion:
-                        probeversion = m.probeversion.split("(")
-                        probe_name = probeversion[0].strip()
-                        probe_version = probeversion[1][:-1].strip()
-                        probe = admin_models.ProbeHistory.objects.get(
-                            name=probe_name, package__version=probe_version
-                        )
-                        packages.add(probe.package)
-
-                except models.Metric.DoesNotExist:
-                    pass
-
-            data = dict()
-            packagedict = dict()
-            missing_packages = []
-            for package in packages:
-                try:
-                    repo = package.repos.get(tag=ostag)
-
-                except admin_models.YumRepo.DoesNotExist:
-                    missing_packages.append(package.__str__())
-                    continue
-
-                else:
-                    packagedict.update({package: repo})
-
-            for key, value in packagedict.items():
-                if value.name not in data:
-                    if key.use_present_version:
-                        version = 'present'
-                    else:
-                        version = key.version
-                    data.update(
-                        {
-                            value.name: {
-                                'content': value.content,
-                                'packages': [
-                                    {
-                                        'name': key.name,
-                                        'version': version
-                                    }
-                                ]
-                            }
-                        }
-                    )
-
-                else:
-                    data[value.name]['packages'].append(
-                        {
-                            'name': key.name,
-                            'version': key.version
-                        }
-                    )
-
-                data[value.name]['packages'] = sorted(
-                    data[value.name]['packages'], key=lambda i: i['name']
-                )
-
-        return Response({
-            'data': data,
-            'missing_packages': sorted(missing_packages)
-        })
+            # metric profiles are kept in WEB-API, so the resolved set of
+            # metrics is part of the ETag
+            return conditional_response(
+                request, config_etag(request, 'repos', tag, sorted(metrics)),
+                lambda: self._build_response(metrics, ostag)
+            )
 
 
 class ListMetricTemplates(APIView):
     permission_classes = (MyHasAPIKey,)
 
-    def get(self, request, tag=None):
+    @staticmethod
+    def _build_response(tag=None, generation=None):
         if tag:
             try:
                 admin_models.MetricTags.objects.get(name=tag)
@@ -327,7 +499,25 @@ class ListMetricTemplates(APIView):
                 )
 
         else:
-            return Response(build_metricconfigs(templates=True))
+            return Response(
+                get_snapshot(
+                    'metrictemplates', get_public_schema_name(),
+                    generation[0:1],
+                    lambda: build_metricconfigs(templates=True)
+                )
+            )
+
+    def get(self, request, tag=None):
+        generation = admin_models.ConfigGeneration.objects.current(
+            request.tenant.schema_name
+        )
+        return conditional_response(
+            request,
+            config_etag(
+                request, 'metrictemplates', tag, generation=generation
+            ),
+            lambda: self._build_response(tag, generation)
+        )
 
 
 class ListMetricOverrides(APIView):
@@ -398,6 +588,12 @@ class ListMetricOverrides(APIView):
         return results
 
     def get(self, request):
+        return conditional_response(
+            request, config_etag(request, 'metricoverrides'),
+            self._build_response
+        )
+
+    def _build_response(self):
         data = models.MetricConfiguration.objects.all()
 
         overrides = dict()
@@ -423,6 +619,13 @@ class ListDefaultPorts(APIView):
     permission_classes = (MyHasAPIKey,)
 
     def get(self, request):
+        return conditional_response(
+            request, config_etag(request, 'default_ports'),
+            self._build_response
+        )
+
+    @staticmethod
+    def _build_response():
         data = admin_models.DefaultPort.objects.all()
 
         results = dict()
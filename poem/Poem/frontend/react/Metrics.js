@@ -384,6 +384,9 @@ export const ListOfMetrics = (props) => {
         if ('info' in data)
           NotifyOk({ msg: data.info, title: 'Deleted' })
 
+        if ('detail' in data)
+          NotifyOk({ msg: data.detail, title: 'Deleting' })
+
         if ('warning' in data)
           NotifyWarn({ msg: data.warning, title: 'Deleted' })
 
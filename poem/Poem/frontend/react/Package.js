@@ -195,6 +195,7 @@ const PackageForm = ({
   const [modalFlag, setModalFlag] = useState(undefined);
   const [modalTitle, setModalTitle] = useState(undefined);
   const [modalMsg, setModalMsg] = useState(undefined);
+  const [updatePlan, setUpdatePlan] = useState(undefined);
 
   function toggleAreYouSure() {
     setAreYouSureModal(!areYouSureModal);
@@ -248,6 +249,8 @@ const PackageForm = ({
 
       msgs.push('ARE YOU SURE you want to update metrics?')
 
+      setUpdatePlan(json['plan'])
+
       setModalMsg(<div>{msgs.map((msg, i) => <p key={i}>{msg}</p>)}</div>)
       setModalTitle(title)
       setModalFlag('update')
@@ -262,7 +265,8 @@ const PackageForm = ({
 
     const sendValues = new Object({
       name: formValues.name,
-      version: formValues.version
+      version: formValues.version,
+      plan: updatePlan
     })
     updateMetricsMutation.mutate(sendValues, {
       onSuccess: async (data) => {
@@ -176,10 +176,12 @@ const mockPackageVersions = [
 ]
 
 const mockUpdateOk = {
+  'plan': '0a1b2c3d4e5f60718293a4b5c6d7e8f9',
   'updated': 'Metrics argo.AMS-Check and argo.AMSPublisher-Check will be updated.'
 }
 
 const mockUpdateWithWarn = {
+  plan: 'f9e8d7c6b5a4938271605f4e3d2c1b0a',
   updated: 'Metric argo.AMS-Check will be updated.',
   deleted: 'Metric argo.AMSPublisher-Check will be deleted, since its probe is not part of the chosen package.',
   warning: 'Metric template history instance of test.AMS-Check has not been found.'
@@ -1080,7 +1082,8 @@ describe('Tests for package changeview on tenant POEM', () => {
         '/api/v2/internal/updatemetricsversions/',
         {
           name: 'nagios-plugins-argo-new',
-          version: '0.1.12'
+          version: '0.1.12',
+          plan: '0a1b2c3d4e5f60718293a4b5c6d7e8f9'
         }
       )
     })
@@ -1158,7 +1161,8 @@ describe('Tests for package changeview on tenant POEM', () => {
         '/api/v2/internal/updatemetricsversions/',
         {
           name: 'nagios-plugins-argo-new',
-          version: '0.1.12'
+          version: '0.1.12',
+          plan: 'f9e8d7c6b5a4938271605f4e3d2c1b0a'
         }
       )
     })
@@ -0,0 +1,219 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from Poem.tenants.models import Tenant
+from django.conf import settings
+from django.db import connection, transaction
+from django_tenants.utils import schema_context, get_public_schema_name
+
+logger = logging.getLogger('POEM')
+
+
+class FanOutResult:
+    """
+    Results of function run in multiple tenant schemas: values returned by
+    the function and exceptions raised by it, both keyed by schema name.
+    """
+    def __init__(self):
+        self.results = dict()
+        self.errors = dict()
+
+    def __bool__(self):
+        return not self.errors
+
+    def __repr__(self):
+        return '<FanOutResult results={} errors={}>'.format(
+            sorted(self.results), sorted(self.errors)
+        )
+
+
+def tenant_schemas():
+    """
+    Returns names of all the tenant schemas, public schema excluded.
+    """
+    return list(
+        Tenant.objects.exclude(
+            schema_name=get_public_schema_name()
+        ).order_by('schema_name').values_list('schema_name', flat=True)
+    )
+
+
+def _name(func):
+    return getattr(func, '__name__', repr(func))
+
+
+def _record_error(result, func, schema, error):
+    logger.error(
+        'Error running %s in schema %s: %s', _name(func), schema, error,
+        exc_info=error
+    )
+    result.errors[schema] = error
+
+
+def _run_in_schema(func, schema, args, kwargs):
+    with schema_context(schema):
+        with transaction.atomic():
+            return func(*args, **kwargs)
+
+
+def _run_in_thread(func, schema, args, kwargs):
+    try:
+        return _run_in_schema(func, schema, args, kwargs)
+
+    finally:
+        # each worker thread has its own connection, which is not
+        # reused once pool is shut down
+        connection.close()
+
+
+def fan_out(func, *args, schemas=None, workers=None, **kwargs):
+    """
+    Runs func with the given arguments in each of the given schemas (all
+    tenant schemas by default), each run in its own transaction. Inputs
+    shared by all the schemas (e.g. data from public schema) should be
+    loaded beforehand and passed as arguments, so they are not fetched once
+    per schema.
+
+    Schemas are handled concurrently on at most workers (FANOUT_WORKERS
+    setting by default) database connections. If called inside of atomic
+    block, schemas are handled one by one on the current connection, since
+    other connections would not see its uncommitted changes.
+
+    Exception raised in one schema does not stop the others; all of them
+    are collected in returned FanOutResult.
+    """
+    if schemas is None:
+        schemas = tenant_schemas()
+
+    if workers is None:
+        workers = settings.FANOUT_WORKERS
+
+    result = FanOutResult()
+
+    if workers <= 1 or len(schemas) <= 1 or connection.in_atomic_block:
+        for schema in schemas:
+            try:
+                result.results[schema] = _run_in_schema(
+                    func, schema, args, kwargs
+                )
+
+            except Exception as error:
+                _record_error(result, func, schema, error)
+
+        return result
+
+    with ThreadPoolExecutor(
+            max_workers=min(workers, len(schemas)),
+            thread_name_prefix='poem-fanout'
+    ) as executor:
+        futures = dict(
+            (schema, executor.submit(
+                _run_in_thread, func, schema, args, kwargs
+            )) for schema in schemas
+        )
+
+    for schema, future in futures.items():
+        try:
+            result.results[schema] = future.result()
+
+        except Exception as error:
+            _record_error(result, func, schema, error)
+
+    return result
+
+
+def union_all(table, columns, schemas=None):
+    """
+    Returns SQL and its parameters selecting schema name together with the
+    given columns from the table of the given name in each of the given
+    schemas (all tenant schemas by default), combined with UNION ALL into a
+    single query. Returns None if there are no schemas.
+    """
+    if schemas is None:
+        schemas = tenant_schemas()
+
+    if not schemas:
+        return None
+
+    qn = connection.ops.quote_name
+    select = ', '.join(qn(column) for column in columns)
+
+    return ' UNION ALL '.join(
+        f'SELECT %s AS schema_name, {select} FROM {qn(schema)}.{qn(table)}'
+        for schema in schemas
+    ), list(schemas)
+
+
+def iter_query(sql, params, chunk_size=1000):
+    """
+    Executes the given query on server side cursor, yielding rows as they
+    are fetched in chunks, so that results across all the tenants are never
+    loaded into memory at once.
+    """
+    with connection.chunked_cursor() as cursor:
+        cursor.execute(sql, params)
+
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+
+            if not rows:
+                break
+
+            yield from rows
+
+
+def metric_adoption(names=None, schemas=None):
+    """
+    Yields (metric name, probe version, schemas) tuples telling which tenant
+    schemas use each metric in each of the probe versions, answered with a
+    single query over all the schemas. Optionally limited to metrics with
+    the given names.
+    """
+    union = union_all('poem_metric', ['name', 'probeversion'], schemas)
+    if not union:
+        return
+
+    sql, params = union
+    where = ''
+    if names is not None:
+        where = 'WHERE name = ANY(%s)'
+        params.append(list(names))
+
+    yield from iter_query(
+        f"""
+        SELECT name, probeversion,
+            array_agg(schema_name ORDER BY schema_name)
+        FROM ({sql}) AS metrics {where}
+        GROUP BY name, probeversion
+        ORDER BY name, probeversion
+        """, params
+    )
+
+
+def probe_adoption(names=None, schemas=None):
+    """
+    Yields (probe version, number of metrics, schemas) tuples telling how
+    many metrics in which tenant schemas use each probe version, answered
+    with a single query over all the schemas. Optionally limited to probes
+    with the given names.
+    """
+    union = union_all('poem_metric', ['probeversion'], schemas)
+    if not union:
+        return
+
+    sql, params = union
+    where = ''
+    if names is not None:
+        where = "AND split_part(probeversion, ' (', 1) = ANY(%s)"
+        params.append(list(names))
+
+    yield from iter_query(
+        f"""
+        SELECT probeversion, count(*),
+            array_agg(DISTINCT schema_name ORDER BY schema_name)
+        FROM ({sql}) AS metrics
+        WHERE probeversion IS NOT NULL {where}
+        GROUP BY probeversion
+        ORDER BY probeversion
+        """, params
+    )
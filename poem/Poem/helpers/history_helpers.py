@@ -1,11 +1,16 @@
 import json
+from difflib import SequenceMatcher
 
 from Poem.poem import models as poem_models
 from Poem.poem_super_admin import models as admin_models
+from Poem.poem_super_admin.dbmodels.fields import to_text
 from Poem.users.models import CustUser
 from deepdiff import DeepDiff
+from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
 from django.core import serializers
+from django.db.models import Q, Subquery
+from django.db.models.fields.json import KeyTransform
 
 
 def to_dict(instance):
@@ -21,6 +26,173 @@ def serialized_data_to_dict(data):
     return json.loads(data)[0]['fields']
 
 
+def history_patch(old, new):
+    """
+    Returns compact patch turning JSON value old into new, or None if they
+    are equal. ['=', value] replaces the value, ['{', changed, removed]
+    patches values of changed keys of dict and removes removed keys, and
+    ['[', [[start, end, items], ...]] replaces slices of list.
+    """
+    if old == new:
+        return None
+
+    if isinstance(old, dict) and isinstance(new, dict):
+        changed = dict()
+        for key, value in new.items():
+            if key in old:
+                patch = history_patch(old[key], value)
+                if patch is not None:
+                    changed[key] = patch
+
+            else:
+                changed[key] = ['=', value]
+
+        return ['{', changed, [key for key in old if key not in new]]
+
+    if isinstance(old, list) and isinstance(new, list):
+        # items (e.g. metric instances) are lists, so they are compared as
+        # JSON strings
+        matcher = SequenceMatcher(
+            None, [json.dumps(item, sort_keys=True) for item in old],
+            [json.dumps(item, sort_keys=True) for item in new],
+            autojunk=False
+        )
+        patch = ['[', [
+            [i1, i2, new[j1:j2]]
+            for tag, i1, i2, j1, j2 in matcher.get_opcodes() if tag != 'equal'
+        ]]
+
+        if len(json.dumps(patch)) < len(json.dumps(new)):
+            return patch
+
+    return ['=', new]
+
+
+def apply_history_patch(value, patch):
+    """
+    Applies patch created by history_patch to JSON value, returning new
+    value; the given one is not changed.
+    """
+    if patch[0] == '{':
+        value = dict(value)
+        for key, item in patch[1].items():
+            value[key] = apply_history_patch(value.get(key), item)
+
+        for key in patch[2]:
+            del value[key]
+
+        return value
+
+    if patch[0] == '[':
+        value = list(value)
+        for start, end, items in reversed(patch[1]):
+            value[start:end] = items
+
+        return value
+
+    return patch[1]
+
+
+def history_fields(versions):
+    """
+    Takes (delta, fields) pairs of tenant history entries of an object in
+    order they were created, and returns full fields of each version.
+    Fields of delta entries are patches to fields of the preceding version.
+    """
+    result = []
+    fields = None
+    for delta, data in versions:
+        fields = apply_history_patch(fields, data) if delta else data
+        result.append(fields)
+
+    return result
+
+
+def latest_history_fields(instance, ct):
+    """
+    Returns fields of the latest tenant history entry of instance (None if
+    there is no history), and the number of entries stored as patches since
+    the last snapshot.
+    """
+    history = poem_models.TenantHistory.objects.filter(
+        object_id=instance.id, content_type=ct
+    )
+    snapshot = Subquery(
+        history.filter(delta=False).order_by(
+            '-date_created', '-id'
+        ).values('id')[:1]
+    )
+    versions = list(
+        history.filter(
+            Q(id=snapshot) | Q(delta=True, id__gt=snapshot)
+        ).order_by('id').values_list(
+            'delta',
+            KeyTransform('fields', KeyTransform('0', 'serialized_data'))
+        )
+    )
+
+    if not versions:
+        return None, 0
+
+    return history_fields(versions)[-1], len(versions) - 1
+
+
+def encode_history(interval):
+    """
+    Stores tenant history of profiles in the current schema with a snapshot
+    every interval versions and patches to the preceding version in between
+    (interval 1 stores snapshots only). Metric history, which is rewritten
+    in SQL, is always kept as snapshots. Returns number of converted entries.
+    """
+    entries = poem_models.TenantHistory.objects.exclude(
+        content_type=ContentType.objects.get_for_model(poem_models.Metric)
+    ).order_by('content_type', 'object_id', 'id')
+
+    converted = []
+    count = 0
+    obj = None
+    for entry in entries.iterator():
+        if obj != (entry.content_type_id, entry.object_id):
+            obj = (entry.content_type_id, entry.object_id)
+            position = 0
+            fields = None
+
+        stored = json.loads(entry.serialized_data)
+        previous = fields
+        if entry.delta:
+            fields = apply_history_patch(previous, stored[0]['fields'])
+
+        else:
+            fields = stored[0]['fields']
+
+        delta = position % interval != 0
+        position += 1
+
+        data = [dict(stored[0], fields=fields)]
+        if delta:
+            data[0]['fields'] = history_patch(previous, fields) or \
+                ['{', {}, []]
+
+        if delta != entry.delta or data != stored:
+            entry.delta = delta
+            entry.serialized_data = json.dumps(data)
+            converted.append(entry)
+
+        if len(converted) == 500:
+            count += _save_history(converted)
+            converted = []
+
+    return count + _save_history(converted)
+
+
+def _save_history(entries):
+    poem_models.TenantHistory.objects.bulk_update(
+        entries, ['delta', 'serialized_data']
+    )
+
+    return len(entries)
+
+
 def inline_models_to_dicts(data):
     new_data = {}
 
@@ -40,20 +212,18 @@ def inline_one_to_dict(data):
         return ''
 
 
-def serialize_metric(metric_instance, tags=None):
-    if metric_instance.probeversion:
-        instance_probe = metric_instance.probeversion.split("(")
-        probe_name = instance_probe[0].strip()
-        probe_version = instance_probe[1][:-1].strip()
-        mt_instance = admin_models.MetricTemplateHistory.objects.get(
-            name=metric_instance.name, probekey__name=probe_name,
-            probekey__package__version=probe_version
-        )
+def serialize_metric(metric_instance, tags=None, mt_instance=None):
+    if mt_instance is None:
+        if metric_instance.probeversion:
+            mt_instance = admin_models.MetricTemplateHistory.objects.get(
+                name=metric_instance.name,
+                probekey_id=metric_instance.probekey_id
+            )
 
-    else:
-        mt_instance = admin_models.MetricTemplateHistory.objects.get(
-            name=metric_instance.name
-        )
+        else:
+            mt_instance = admin_models.MetricTemplateHistory.objects.get(
+                name=metric_instance.name
+            )
 
     serialized_data = serializers.serialize(
         "json", [metric_instance],
@@ -86,12 +256,12 @@ def serialize_metric(metric_instance, tags=None):
         "parent": mt_instance.parent,
         "probekey": probekey,
         "probeexecutable": mt_instance.probeexecutable,
-        "attribute": mt_instance.attribute,
-        "dependancy": mt_instance.dependency,
-        "flags": mt_instance.flags,
-        "files": mt_instance.files,
-        "parameter": mt_instance.parameter,
-        "fileparameter": mt_instance.fileparameter
+        "attribute": to_text(mt_instance.attribute),
+        "dependancy": to_text(mt_instance.dependency),
+        "flags": to_text(mt_instance.flags),
+        "files": to_text(mt_instance.files),
+        "parameter": to_text(mt_instance.parameter),
+        "fileparameter": to_text(mt_instance.fileparameter)
     })
 
     return json.dumps([unserialized])
@@ -161,6 +331,50 @@ def create_history(instance, user, comment=None, tags=None):
     create_history_entry(instance, user, comment, tags)
 
 
+def create_metrics_history(metrics, user):
+    """
+    Creates tenant history entries of the given (metric, metric template
+    history) pairs with a constant number of queries, each commented with
+    its differences from the latest version of the metric. Metric template
+    histories are expected to have their mtype, probekey package and tags
+    already loaded.
+    """
+    if not metrics:
+        return []
+
+    ct = ContentType.objects.get_for_model(poem_models.Metric)
+    latest = dict(
+        poem_models.TenantHistory.objects.filter(
+            object_id__in=[met.id for met, history in metrics],
+            content_type=ct
+        ).order_by('object_id', '-date_created', '-id').distinct(
+            'object_id'
+        ).values_list(
+            'object_id',
+            KeyTransform('fields', KeyTransform('0', 'serialized_data'))
+        )
+    )
+
+    entries = []
+    for met, history in metrics:
+        serialized_data = serialize_metric(
+            met, tags=list(history.tags.all()), mt_instance=history
+        )
+        entries.append(poem_models.TenantHistory(
+            object_id=met.id,
+            serialized_data=serialized_data,
+            object_repr=met.__str__(),
+            content_type=ct,
+            comment=analyze_differences(
+                latest.get(met.id) or '',
+                serialized_data_to_dict(serialized_data)
+            ),
+            user=user
+        ))
+
+    return poem_models.TenantHistory.objects.bulk_create(entries)
+
+
 def analyze_differences(old_data, new_data):
     inlines = ['config', 'attribute', 'dependency', 'flags', 'files',
                'parameter', 'fileparameter', 'dependancy']
@@ -392,19 +606,18 @@ def create_comment(instance, ct=None, new_serialized_data=None):
             del new_data['user'], new_data['datetime']
 
     else:
-        history = poem_models.TenantHistory.objects.filter(
-            object_id=instance.id,
-            content_type=ct
-        ).order_by('-date_created')
+        fields, _ = latest_history_fields(instance, ct)
+        history = [] if fields is None else [fields]
         new_data = serialized_data_to_dict(new_serialized_data)
 
     if len(history) > 0:
         if isinstance(
                 instance,
                 (poem_models.Metric, poem_models.MetricProfiles,
-                 poem_models.Aggregation, poem_models.ThresholdsProfiles)
+                 poem_models.Aggregation, poem_models.ThresholdsProfiles,
+                 poem_models.Reports)
         ):
-            old_data = serialized_data_to_dict(history[0].serialized_data)
+            old_data = history[0]
         else:
             old_data = to_dict(history[0])
             del old_data['object_id'], old_data['version_comment'], \
@@ -478,7 +691,19 @@ def create_profile_history(instance, data, user, description=None):
     ):
         serialized_data[0]['fields'].update(**data)
 
-    comment = create_comment(instance, ct, json.dumps(serialized_data))
+    fields = serialized_data_to_dict(json.dumps(serialized_data))
+    previous, deltas = latest_history_fields(instance, ct)
+    comment = analyze_differences(
+        '' if previous is None else previous, fields
+    )
+
+    # snapshot is stored every HISTORY_SNAPSHOT_INTERVAL versions, patches
+    # to the preceding version in between
+    delta = previous is not None and \
+        deltas + 1 < settings.HISTORY_SNAPSHOT_INTERVAL
+    if delta:
+        serialized_data[0]['fields'] = history_patch(previous, fields) or \
+            ['{', {}, []]
 
     poem_models.TenantHistory.objects.create(
         object_id=instance.id,
@@ -486,5 +711,6 @@ def create_profile_history(instance, data, user, description=None):
         object_repr=instance.__str__(),
         comment=comment,
         user=username,
-        content_type=ct
+        content_type=ct,
+        delta=delta
     )
@@ -0,0 +1,234 @@
+import datetime
+import logging
+import threading
+import time
+
+from Poem.poem_super_admin.models import Job, JobStep
+from Poem.tenants.models import Tenant
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django_tenants.utils import schema_context, get_public_schema_name
+
+logger = logging.getLogger('POEM')
+
+_kinds = dict()
+_step = threading.local()
+
+
+class JobKind:
+    """
+    Operation which can be run in the background. run(schema, **params) is
+    called in each schema returned by schemas(**params); if finish is
+    given, finish(**params) is called in public schema once the steps in
+    all the tenant schemas are done.
+    """
+    def __init__(self, name, run, schemas, finish=None):
+        self.name = name
+        self.run = run
+        self.schemas = schemas
+        self.finish = finish
+
+
+def register_job(name, run, schemas, finish=None):
+    _kinds[name] = JobKind(name, run, schemas, finish=finish)
+
+
+def job_kinds():
+    return sorted(_kinds)
+
+
+def enqueue_job(name, params, user='', key=None):
+    """
+    Enqueues job of the registered kind with the given name, with a step
+    for each of the schemas it affects. Raises KeyError for unknown kind.
+    """
+    kind = _kinds[name]
+    schemas = [(schema, 0) for schema in kind.schemas(**params)]
+
+    if kind.finish:
+        schemas.append((get_public_schema_name(), 1))
+
+    return Job.objects.enqueue(name, params, schemas, user=user, key=key)
+
+
+def after_step(func, *args, **kwargs):
+    """
+    Calls func (e.g. request to WEB-API) once the transaction of the job
+    step being run is committed, so that the step does not hold its
+    database locks while waiting for remote services. Messages returned by
+    func, or its error, are added to the step result. Outside of job steps
+    func is called right away and its messages are returned.
+    """
+    calls = getattr(_step, 'calls', None)
+    if calls is None:
+        return func(*args, **kwargs) or []
+
+    calls.append((func, args, kwargs))
+
+    return []
+
+
+def _run_after_step(calls):
+    messages = []
+    for func, args, kwargs in calls:
+        try:
+            messages.extend(func(*args, **kwargs) or [])
+
+        except Exception as error:
+            logger.exception('Error running %s after job step', func.__name__)
+            messages.append(str(error))
+
+    return messages
+
+
+def _claim_step():
+    return JobStep.objects.runnable().select_related('job').select_for_update(
+        skip_locked=True, of=('self',)
+    ).first()
+
+
+def _run_step(step):
+    kind = _kinds[step.job.kind]
+
+    with schema_context(step.schema_name):
+        if step.stage == 0:
+            return kind.run(step.schema_name, **step.job.params)
+
+        return kind.finish(**step.job.params)
+
+
+def run_next_step():
+    """
+    Runs a single runnable job step. The step is claimed with SELECT ... FOR
+    UPDATE SKIP LOCKED, so that concurrent workers never pick the same
+    step, and its work is committed in the same transaction in which it is
+    marked as done. If worker dies in the middle of the step, the
+    transaction is rolled back and the step is picked up again. Failed
+    steps are retried after JOB_RETRY_DELAY seconds (increasing with each
+    attempt) until JOB_MAX_ATTEMPTS are made. Returns the step, or None if
+    there was nothing to run. Calls deferred with after_step are made
+    once the step is committed.
+    """
+    with transaction.atomic():
+        step = _claim_step()
+
+        if step is None:
+            return None
+
+        started = timezone.now()
+        step.attempts += 1
+        _step.calls = []
+        try:
+            with transaction.atomic():
+                step.result = _run_step(step)
+
+            step.status = JobStep.DONE
+            step.error = ''
+            step.finished = timezone.now()
+
+        except Exception as error:
+            _step.calls = []
+            logger.exception(
+                'Error running job %s step in schema %s', step.job.kind,
+                step.schema_name
+            )
+            step.error = str(error)
+            if step.attempts >= settings.JOB_MAX_ATTEMPTS:
+                step.status = JobStep.FAILED
+                step.finished = timezone.now()
+
+            else:
+                step.run_after = timezone.now() + datetime.timedelta(
+                    seconds=settings.JOB_RETRY_DELAY * step.attempts
+                )
+
+        finally:
+            calls, _step.calls = _step.calls, None
+
+        step.save()
+
+    messages = _run_after_step(calls)
+    if messages:
+        step.result = list(step.result or []) + messages
+        JobStep.objects.filter(pk=step.pk).update(result=step.result)
+
+    # job row is updated only after the step is committed, so that workers
+    # running steps of the same job do not wait for each other
+    Job.objects.filter(pk=step.job_id, started__isnull=True).update(
+        status=Job.RUNNING, started=started
+    )
+    Job.objects.finish(step.job_id)
+
+    return step
+
+
+def run_worker(once=False, poll_interval=None):
+    """
+    Runs job steps until there are none left if once is set, or forever,
+    polling for new steps every poll_interval seconds (JOB_POLL_INTERVAL
+    setting by default). Returns number of steps run.
+    """
+    if poll_interval is None:
+        poll_interval = settings.JOB_POLL_INTERVAL
+
+    count = 0
+    while True:
+        if run_next_step():
+            count += 1
+            continue
+
+        if once:
+            return count
+
+        time.sleep(poll_interval)
+
+
+def job_data(job, steps=False):
+    """
+    Returns job as served by the jobs API, with its progress, and with its
+    per-tenant steps if steps is set.
+    """
+    data = dict(
+        id=job.id,
+        kind=job.kind,
+        params=job.params,
+        status=job.status,
+        user=job.user,
+        created=job.created,
+        started=job.started,
+        finished=job.finished,
+        progress=job_progress(job)
+    )
+
+    if steps:
+        tenants = dict(
+            Tenant.objects.all().values_list('schema_name', 'name')
+        )
+        data['steps'] = [
+            dict(
+                tenant=tenants.get(step.schema_name, step.schema_name),
+                stage=step.stage,
+                status=step.status,
+                attempts=step.attempts,
+                result=step.result,
+                error=step.error,
+                finished=step.finished
+            ) for step in job.steps.all().order_by('stage', 'schema_name')
+        ]
+
+    return data
+
+
+def job_progress(job):
+    """
+    Returns number of steps of the job in each of the statuses, together
+    with their total number.
+    """
+    progress = dict((status, 0) for status, _ in JobStep.STATUSES)
+    for status in job.steps.values_list('status', flat=True):
+        progress[status] += 1
+
+    progress['total'] = sum(progress.values())
+
+    return progress
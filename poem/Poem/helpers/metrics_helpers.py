@@ -1,106 +1,189 @@
+import hashlib
 import json
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 import requests
-from Poem.helpers.history_helpers import create_history, serialize_metric
+from Poem.helpers.fanout_helpers import fan_out
+from Poem.helpers.history_helpers import create_history, serialize_metric, \
+    create_metrics_history
+from Poem.helpers.job_helpers import after_step
+from Poem.helpers.webapi_helpers import webapi_get, webapi_put
 from Poem.poem import models as poem_models
 from Poem.poem_super_admin import models as admin_models
+from Poem.poem_super_admin.dbmodels.fields import to_pairs
 from Poem.poem_super_admin.models import WebAPIKey
 from Poem.tenants.models import Tenant
 from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
-from django.db import IntegrityError
+from django.db import connection, transaction
 from django_tenants.utils import schema_context, get_public_schema_name
 
 
+def _tenant_packages():
+    """
+    Returns dict mapping package name to list of versions of that package
+    used by metrics in the current schema, in the order of metrics.
+    """
+    package_ids = list(dict.fromkeys(
+        poem_models.Metric.objects.filter(
+            probekey__isnull=False
+        ).order_by('id').values_list('probekey__package', flat=True)
+    ))
+    versions = admin_models.Package.objects.in_bulk(package_ids)
+
+    packages = dict()
+    for package_id in package_ids:
+        package = versions[package_id]
+        packages.setdefault(package.name, []).append(package)
+
+    return packages
+
+
 def import_metrics(metrictemplates, tenant, user):
+    """
+    Imports metrics from metric templates with the given names into the
+    current schema of the given tenant. If tenant already uses package of
+    template's probe in another version, metric is imported from the
+    template history entry for that version.
+
+    Packages used by the tenant, templates and their history entries are
+    loaded with a constant number of queries, and metrics are created
+    together with their history in bulk, in a single transaction.
+
+    Returns lists of names of metrics imported, imported in different
+    version, not imported because they already exist, and unavailable in
+    the version of package used by the tenant.
+    """
     imported = []
     warn_imported = []
     not_imported = []
     unavailable = []
-    for template in metrictemplates:
-        imported_different_version = False
-        try:
-            mt = admin_models.MetricTemplate.objects.get(name=template)
-
-        except admin_models.MetricTemplate.DoesNotExist:
-            continue
 
-        gr = poem_models.GroupOfMetrics.objects.get(
-            name=tenant.name.upper()
+    templates = dict(
+        (mt.name, mt) for mt in admin_models.MetricTemplate.objects.filter(
+            name__in=metrictemplates
+        ).select_related('probekey__package', 'mtype').prefetch_related(
+            'tags'
         )
+    )
+    if not templates:
+        return imported, warn_imported, not_imported, unavailable
 
-        packages = []
-        for m in poem_models.Metric.objects.all():
-            if m.probeversion:
-                metric_probe = m.probeversion.split(" (")
-                probe_name = metric_probe[0].strip()
-                probe_version = metric_probe[1][:-1].strip()
-                probe = admin_models.ProbeHistory.objects.get(
-                    name=probe_name,
-                    package__version=probe_version
-                )
-                packages.append(probe.package)
+    gr = poem_models.GroupOfMetrics.objects.get(name=tenant.name.upper())
 
-        package_names = [package.name for package in packages]
+    existing = set(
+        poem_models.Metric.objects.filter(
+            name__in=templates.keys()
+        ).values_list('name', flat=True)
+    )
+    packages = _tenant_packages()
 
-        try:
-            if mt.probekey:
-                if mt.probekey.package.name in package_names and \
-                        mt.probekey.package not in packages:
-                    package_version = [
-                        package for package in packages
-                        if package.name == mt.probekey.package.name
-                    ][0]
-                    try:
-                        ver = admin_models.ProbeHistory.objects.get(
-                            name=mt.probekey.name,
-                            package=package_version
-                        )
-
-                        mt = admin_models.MetricTemplateHistory.objects.get(
-                            name=mt.name, probekey=ver
-                        )
-                        imported_different_version = True
-
-                    except admin_models.ProbeHistory.DoesNotExist:
-                        unavailable.append(mt.name)
-                        continue
-
-                    except admin_models.MetricTemplateHistory.DoesNotExist:
-                        unavailable.append(mt.name)
-                        continue
-
-                else:
-                    ver = mt.probekey
-
-                metric = poem_models.Metric.objects.create(
-                    name=mt.name,
-                    probeversion=f"{ver.name} ({ver.package.version})",
-                    group=gr,
-                    config=mt.config
-                )
+    # (template, package version used by tenant or None) in order of import
+    planned = []
+    for template in metrictemplates:
+        mt = templates.get(template)
+        if not mt:
+            continue
 
-            else:
-                metric = poem_models.Metric.objects.create(
-                    name=mt.name,
-                    group=gr
-                )
+        if mt.name in existing:
+            not_imported.append(mt.name)
+            continue
+
+        existing.add(mt.name)
+        package = None
+        if mt.probekey:
+            versions = packages.get(mt.probekey.package.name)
+            if versions and mt.probekey.package not in versions:
+                package = versions[0]
+
+            elif not versions:
+                packages[mt.probekey.package.name] = [mt.probekey.package]
+
+        planned.append((mt, package))
+
+    other_versions = [(mt, package) for mt, package in planned if package]
+    probes = dict()
+    histories = dict()
+    if other_versions:
+        probes = dict(
+            ((probe.name, probe.package_id), probe)
+            for probe in admin_models.ProbeHistory.objects.filter(
+                name__in=set(mt.probekey.name for mt, _ in other_versions),
+                package__in=set(package for _, package in other_versions)
+            ).select_related('package')
+        )
 
-            new_tags = [tag for tag in mt.tags.all()]
+    history_probes = set(
+        probe.id for probe in probes.values()
+    ).union(mt.probekey_id for mt, package in planned if not package)
+    for history in admin_models.MetricTemplateHistory.objects.filter(
+        name__in=set(mt.name for mt, _ in planned)
+    ).select_related('probekey__package', 'mtype').prefetch_related(
+        'tags'
+    ).order_by('id'):
+        if history.probekey_id in history_probes:
+            histories[(history.name, history.probekey_id)] = history
+
+    metrics = []
+    sources = []
+    for mt, package in planned:
+        if package:
+            ver = probes.get((mt.probekey.name, package.id))
+            source = histories.get((mt.name, ver.id)) if ver else None
+            if not source:
+                unavailable.append(mt.name)
+                continue
+
+            warn_imported.append(mt.name)
 
-            create_history(
-                metric, user.username, comment='Initial version.', tags=new_tags
+        else:
+            ver = mt.probekey
+            source = mt
+            imported.append(mt.name)
+
+        if ver:
+            metric = poem_models.Metric(
+                name=mt.name,
+                probekey=ver,
+                probeversion=f"{ver.name} ({ver.package.version})",
+                group=gr,
+                config=source.config
             )
 
-            if imported_different_version:
-                warn_imported.append(mt.name)
+        else:
+            metric = poem_models.Metric(name=mt.name, group=gr)
 
-            else:
-                imported.append(mt.name)
+        metrics.append(metric)
+        sources.append(
+            (source, histories.get((mt.name, ver.id if ver else None)))
+        )
 
-        except IntegrityError:
-            not_imported.append(mt.name)
-            continue
+    if not metrics:
+        return imported, warn_imported, not_imported, unavailable
+
+    content_type = ContentType.objects.get_for_model(poem_models.Metric)
+    with transaction.atomic():
+        metrics = poem_models.Metric.objects.bulk_create(metrics)
+        poem_models.MetricChange.objects.log_many(
+            [metric.name for metric in metrics],
+            poem_models.MetricChange.ADDED
+        )
+        admin_models.TenantMetricUsage.objects.record_many(
+            connection.schema_name, metrics
+        )
+        poem_models.TenantHistory.objects.bulk_create([
+            poem_models.TenantHistory(
+                object_id=metric.id,
+                serialized_data=serialize_metric(
+                    metric, tags=list(source.tags.all()), mt_instance=history
+                ),
+                object_repr=metric.__str__(),
+                content_type=content_type,
+                comment='Initial version.',
+                user=user.username
+            ) for metric, (source, history) in zip(metrics, sources)
+        ])
 
     return imported, warn_imported, not_imported, unavailable
 
@@ -113,9 +196,7 @@ def get_metrics_in_profiles(tenant):
                 'Accept': 'application/json', 'x-api-key': token.token
             }
 
-            response = requests.get(
-                settings.WEBAPI_METRIC, headers=headers, timeout=180
-            )
+            response = webapi_get(settings.WEBAPI_METRIC, headers=headers)
             response.raise_for_status()
 
             data = response.json()['data']
@@ -144,9 +225,89 @@ def get_metrics_in_profiles(tenant):
             raise Exception('Error fetching WEB API data: API key not found.')
 
 
+def update_metric(
+        metrictemplate, name, probekey, tags, update_from_history=False,
+        user=''
+):
+    """
+    Updates metric with the given name in the current schema from the given
+    metric template. Public schema inputs (template, its tags and probekey
+    the metric was using) are passed in, so they are fetched only once when
+    the metric is updated in multiple schemas. Returns updated metric, or
+    None if there is no such metric in the schema.
+    """
+    try:
+        if probekey:
+            met = poem_models.Metric.objects.get(name=name, probekey=probekey)
+
+        else:
+            met = poem_models.Metric.objects.get(name=name)
+
+        met.name = metrictemplate.name
+        met.probekey = metrictemplate.probekey
+        if metrictemplate.probekey:
+            met.probeversion = metrictemplate.probekey.__str__()
+
+        else:
+            met.probeversion = None
+
+        if metrictemplate.config:
+            if update_from_history:
+                met.config = metrictemplate.config
+
+            else:
+                for pair in to_pairs(metrictemplate.config):
+                    if pair[0] == 'path':
+                        objpath = pair
+
+                metconfig = []
+                for pair in to_pairs(met.config or []):
+                    if pair[0] == 'path':
+                        metconfig.append(objpath)
+                    else:
+                        metconfig.append(pair)
+
+                met.config = metconfig
+
+        met.save()
+
+        if name != met.name:
+            poem_models.MetricChange.objects.log(
+                name, poem_models.MetricChange.DELETED
+            )
+
+        if update_from_history or (
+                probekey and met.probekey_id != probekey.id
+        ):
+            create_history(met, user, tags=tags)
+
+        else:
+            history = poem_models.TenantHistory.objects.filter(
+                object_id=met.id,
+                content_type=ContentType.objects.get_for_model(
+                    poem_models.Metric
+                )
+            )[0]
+            history.serialized_data = serialize_metric(met, tags=tags)
+            history.object_repr = met.__str__()
+            history.save()
+
+        return met
+
+    except poem_models.Metric.DoesNotExist:
+        return None
+
+
 def update_metric_in_schema(
         mt_id, name, pk_id, schema, update_from_history=False, user=''
 ):
+    """
+    Updates metric with the given name in the given schema from metric
+    template (or its version if update_from_history is set) with the given
+    id, run by update_metrics job. If metric is renamed, it is renamed in
+    WEB-API metric profiles of the tenant once the job step is committed.
+    Returns list of error messages.
+    """
     if update_from_history:
         mt_model = admin_models.MetricTemplateHistory
 
@@ -161,170 +322,372 @@ def update_metric_in_schema(
     else:
         probekey = None
 
-    msgs = ''
+    tags = [tag for tag in metrictemplate.tags.all()]
+
     with schema_context(schema):
-        try:
-            if probekey:
-                met = poem_models.Metric.objects.get(
-                    name=name, probeversion=probekey.__str__()
-                )
+        met = update_metric(
+            metrictemplate, name, probekey, tags,
+            update_from_history=update_from_history, user=user
+        )
 
-            else:
-                met = poem_models.Metric.objects.get(name=name)
+    if met and name != met.name:
+        return after_step(
+            update_metrics_in_profiles, name, met.name, schemas=[schema]
+        )
 
-            met.name = metrictemplate.name
-            if metrictemplate.probekey:
-                met.probeversion = metrictemplate.probekey.__str__()
+    return []
 
-            else:
-                met.probeversion = None
 
-            if metrictemplate.config:
-                if update_from_history:
-                    met.config = metrictemplate.config
+def update_metrics(metrictemplate, name, probekey, user=''):
+    """
+    Updates metric with the given name in all the tenant schemas using it
+    from the given metric template. If metric is renamed, it is renamed in
+    WEB-API metric profiles of those tenants too, outside of database
+    transactions. Returns list of error messages.
+    """
+    metrictemplate = admin_models.MetricTemplate.objects.select_related(
+        'probekey__package'
+    ).get(pk=metrictemplate.id)
+    tags = [tag for tag in metrictemplate.tags.all()]
+
+    result = fan_out(
+        update_metric, metrictemplate, name, probekey, tags, user=user,
+        schemas=admin_models.TenantMetricUsage.objects.schemas_using_metrics(
+            [name]
+        )
+    )
 
-                else:
-                    for item in json.loads(metrictemplate.config):
-                        if item.split(' ')[0] == 'path':
-                            objpath = item
+    msgs = []
+    if name != metrictemplate.name:
+        renamed = [
+            schema for schema, met in result.results.items()
+            if met and met.name != name
+        ]
+        if renamed:
+            msgs.extend(update_metrics_in_profiles(
+                name, metrictemplate.name, schemas=renamed
+            ))
+
+    for schema in sorted(result.errors):
+        msgs.append(
+            f'Error updating metric {name} in schema {schema}: '
+            f'{str(result.errors[schema])}'
+        )
 
-                    metconfig = []
-                    for item in json.loads(met.config):
-                        if item.split(' ')[0] == 'path':
-                            metconfig.append(objpath)
-                        else:
-                            metconfig.append(item)
+    return msgs
 
-                    met.config = json.dumps(metconfig)
 
-            met.save()
+def update_metrics_from_templates(metrictemplates, user=''):
+    """
+    Updates metrics in the current schema from metric templates with the
+    given ids, which have not been renamed (e.g. only their tags have
+    changed). Run in each of the tenant schemas using any of the metric
+    templates by update_metrics_from_templates job.
+    """
+    metrictemplates = list(
+        admin_models.MetricTemplate.objects.filter(
+            pk__in=metrictemplates
+        ).select_related('probekey__package').prefetch_related('tags')
+    )
+    existing = set(
+        poem_models.Metric.objects.filter(
+            name__in=[mt.name for mt in metrictemplates]
+        ).values_list('name', flat=True)
+    )
 
-            tags = [tag for tag in metrictemplate.tags.all()]
+    for metrictemplate in metrictemplates:
+        if metrictemplate.name in existing:
+            update_metric(
+                metrictemplate, metrictemplate.name, metrictemplate.probekey,
+                [tag for tag in metrictemplate.tags.all()], user=user
+            )
 
-            if update_from_history or (
-                    probekey and met.probeversion != probekey.__str__()
-            ):
-                create_history(met, user, tags=tags)
 
-            else:
-                history = poem_models.TenantHistory.objects.filter(
-                    object_id=met.id,
-                    content_type=ContentType.objects.get_for_model(
-                        poem_models.Metric
-                    )
-                )[0]
-                history.serialized_data = serialize_metric(met, tags=tags)
-                history.object_repr = met.__str__()
-                history.save()
-
-            if name != met.name:
-                msgs = update_metrics_in_profiles(name, met.name)
-
-        except poem_models.Metric.DoesNotExist:
-            pass
+class MetricsVersionsPlan:
+    """
+    Changes of metrics in the current schema needed to switch tenant to
+    the given version of package: metrics to be updated, as (name, metric
+    template history id, probe history id) tuples; metrics to be deleted,
+    as (name, id) tuples; and names of metrics without template history in
+    the package. Plan id is derived from the plan and the state of metrics
+    it was built from, so the same id means the same plan.
+    """
+    def __init__(self, package, metrics, update, delete, warning):
+        self.package = package
+        self.update = update
+        self.delete = delete
+        self.warning = warning
+        self.id = hashlib.sha256(
+            json.dumps(
+                [package.id, metrics, update, delete, warning]
+            ).encode()
+        ).hexdigest()[:32]
+
+    def __repr__(self):
+        return f'<MetricsVersionsPlan {self.id}>'
+
+
+def plan_metrics_versions(package):
+    """
+    Builds plan of changes of metrics in the current schema needed to
+    switch tenant to the given version of package, with a constant number
+    of queries regardless of number of metrics.
+    """
+    candidates = list(
+        poem_models.Metric.objects.filter(
+            probekey__package__name=package.name
+        ).order_by('id').values_list('id', 'name', 'probekey')
+    )
 
-    return msgs
+    object_ids = dict()
+    for name, object_id in admin_models.MetricTemplateHistory.objects.filter(
+        name__in=set(metric[1] for metric in candidates),
+        probekey__package__name=package.name
+    ).order_by('id').values_list('name', 'object_id'):
+        object_ids.setdefault(name, object_id)
+
+    targets = dict()
+    for object_id, pk in admin_models.MetricTemplateHistory.objects.filter(
+        object_id__in=set(object_ids.values()), probekey__package=package
+    ).order_by('id').values_list('object_id', 'id'):
+        targets.setdefault(object_id, pk)
+
+    update = []
+    delete = []
+    warning = []
+    for pk, name, probekey in candidates:
+        if name not in object_ids:
+            warning.append(name)
+
+        elif object_ids[name] in targets:
+            update.append((name, targets[object_ids[name]], probekey))
 
+        else:
+            delete.append((name, pk))
+
+    return MetricsVersionsPlan(package, candidates, update, delete, warning)
+
+
+def apply_metrics_versions(plan, user=''):
+    """
+    Applies updates of the given plan to metrics in the current schema.
+    Metric template and probe history rows the metrics are switched to are
+    loaded in bulk, the metrics are saved with a single UPDATE, and their
+    history entries with a single INSERT. Renamed metrics are renamed in
+    WEB-API metric profiles of the tenant once the changes are committed.
+    Returns list of updated metrics.
+    """
+    histories = admin_models.MetricTemplateHistory.objects.filter(
+        pk__in=set(metric[1] for metric in plan.update)
+    ).select_related(
+        'mtype', 'probekey__package'
+    ).prefetch_related('tags').in_bulk()
+    metrics = dict(
+        ((metric.name, metric.probekey_id), metric)
+        for metric in poem_models.Metric.objects.filter(
+            name__in=set(metric[0] for metric in plan.update)
+        ).select_related('group')
+    )
 
-def update_metrics(metrictemplate, name, probekey, user=''):
-    schemas = list(Tenant.objects.all().values_list('schema_name', flat=True))
-    schemas.remove(get_public_schema_name())
+    updated = []
+    renamed = []
+    for name, mt_id, pk_id in plan.update:
+        met = metrics.get((name, pk_id))
+        if met is None:
+            continue
 
-    msgs = []
-    for schema in schemas:
-        if probekey:
-            msg = update_metric_in_schema(
-                mt_id=metrictemplate.id, name=name, pk_id=probekey.id,
-                schema=schema, user=user
-            )
+        history = histories[mt_id]
+        met.name = history.name
+        met.probekey = history.probekey
+        met.probeversion = history.probekey.__str__() \
+            if history.probekey else None
+        if history.config:
+            met.config = history.config
 
-        else:
-            msg = update_metric_in_schema(
-                mt_id=metrictemplate.id, name=name, pk_id=None,
-                schema=schema, user=user
+        updated.append((met, history))
+        if name != met.name:
+            renamed.append((name, met.name))
+
+    if not updated:
+        return []
+
+    poem_models.Metric.objects.bulk_update(
+        [met for met, history in updated],
+        ['name', 'probekey', 'probeversion', 'config']
+    )
+
+    # bulk_update does not send post_save, so usage index and changes of
+    # metrics are recorded here
+    schema = connection.schema_name
+    admin_models.TenantMetricUsage.objects.record_updates(
+        schema, [met for met, history in updated]
+    )
+    if renamed:
+        poem_models.MetricChange.objects.log_many(
+            [old_name for old_name, new_name in renamed],
+            poem_models.MetricChange.DELETED
+        )
+    poem_models.MetricChange.objects.log_many(
+        [met.name for met, history in updated],
+        poem_models.MetricChange.UPDATED
+    )
+
+    create_metrics_history(updated, user)
+
+    for old_name, new_name in renamed:
+        after_step(
+            update_metrics_in_profiles, old_name, new_name, schemas=[schema]
+        )
+
+    return [met for met, history in updated]
+
+
+def _remaining(deadline, timeout, updated):
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise TimeoutError(
+            f'Timed out after {timeout} seconds; updated profiles: '
+            f'{", ".join(updated) if updated else "none"}'
+        )
+
+    return remaining
+
+
+def _rename_metric_in_tenant_profiles(headers, old_name, new_name, timeout):
+    """
+    Renames metric in all WEB-API metric profiles of a single tenant. Runs
+    in worker thread, so it must not touch the database. Each request is
+    given only the time left until the tenant's timeout runs out. Returns
+    names of updated profiles.
+    """
+    deadline = time.monotonic() + timeout
+    updated = []
+
+    response = webapi_get(
+        settings.WEBAPI_METRIC, headers=headers,
+        timeout=_remaining(deadline, timeout, updated)
+    )
+    response.raise_for_status()
+
+    data = response.json()['data']
+
+    for profile in data:
+        flag = 0
+        new_services = []
+        for service in profile['services']:
+            new_metrics = []
+            if 'metrics' in service:
+                for metric in service['metrics']:
+                    if metric == old_name:
+                        flag += 1
+                        new_metrics.append(new_name)
+                    else:
+                        new_metrics.append(metric)
+            new_services.append({
+                'service': service['service'],
+                'metrics': new_metrics
+            })
+
+        if flag > 0:
+            new_data = {
+                'id': profile['id'],
+                'name': profile['name'],
+                'description': profile['description'],
+                'services': new_services
+            }
+            response = webapi_put(
+                settings.WEBAPI_METRIC + '/' + profile['id'],
+                headers=headers,
+                data=json.dumps(new_data),
+                timeout=_remaining(deadline, timeout, updated)
             )
+            response.raise_for_status()
+            updated.append(profile['name'])
 
-        if msg:
-            msgs.append(msg)
+    return updated
 
-    return msgs
 
+def rename_metric_in_profiles(
+        old_name, new_name, schemas=None, workers=None, timeout=None
+):
+    """
+    Renames metric in WEB-API metric profiles of tenants with the given
+    schemas (all tenants by default). Tenants are handled concurrently by
+    at most workers threads (WEBAPI_WORKERS setting by default), each of
+    them given timeout seconds (WEBAPI_TENANT_TIMEOUT setting by default).
+
+    Returns dict mapping schema name to dict with tenant name, names of
+    updated profiles and error message (None if there was no error).
+    """
+    if workers is None:
+        workers = settings.WEBAPI_WORKERS
+
+    if timeout is None:
+        timeout = settings.WEBAPI_TENANT_TIMEOUT
+
+    tenants = Tenant.objects.exclude(schema_name=get_public_schema_name())
+    if schemas is not None:
+        tenants = tenants.filter(schema_name__in=schemas)
+
+    results = dict()
+    headers = dict()
+    for tenant in tenants:
+        results[tenant.schema_name] = {
+            'tenant': tenant.name, 'updated': [], 'error': None
+        }
+        try:
+            token = WebAPIKey.objects.get(name=f"WEB-API-{tenant.name}")
+            headers[tenant.schema_name] = {
+                'Accept': 'application/json', 'x-api-key': token.token
+            }
+
+        except WebAPIKey.DoesNotExist:
+            results[tenant.schema_name]['error'] = \
+                'No "WEB-API" key in the DB!'
+
+    if not headers:
+        return results
+
+    with ThreadPoolExecutor(
+            max_workers=min(workers, len(headers)),
+            thread_name_prefix='poem-webapi'
+    ) as executor:
+        futures = dict(
+            (schema, executor.submit(
+                _rename_metric_in_tenant_profiles, headers[schema], old_name,
+                new_name, timeout
+            )) for schema in headers
+        )
+
+    for schema, future in futures.items():
+        try:
+            results[schema]['updated'] = future.result()
 
-def update_metrics_in_profiles(old_name, new_name):
+        except (requests.exceptions.RequestException, TimeoutError) as e:
+            results[schema]['error'] = \
+                f'Error trying to update metric in metric profiles: {e}.'
+
+    return results
+
+
+def update_metrics_in_profiles(old_name, new_name, schemas=None):
+    """
+    Renames metric in WEB-API metric profiles of tenants with the given
+    schemas (all tenants by default). Returns list of error messages.
+    """
     error_msgs = []
     if old_name == new_name:
-        pass
+        return error_msgs
 
-    else:
-        tenants = Tenant.objects.all()
-        tenants = [
-            tenant for tenant in tenants if
-            tenant.schema_name != get_public_schema_name()
-        ]
+    results = rename_metric_in_profiles(old_name, new_name, schemas=schemas)
 
-        for tenant in tenants:
-            with schema_context(tenant.schema_name):
-                try:
-                    token = WebAPIKey.objects.get(name=f"WEB-API-{tenant.name}")
-                    headers = {
-                        'Accept': 'application/json', 'x-api-key': token.token
-                    }
-
-                    response = requests.get(
-                        settings.WEBAPI_METRIC, headers=headers, timeout=180
-                    )
-                    response.raise_for_status()
-
-                    data = response.json()['data']
-
-                    for profile in data:
-                        flag = 0
-                        new_services = []
-                        for service in profile['services']:
-                            new_metrics = []
-                            if 'metrics' in service:
-                                for metric in service['metrics']:
-                                    if metric == old_name:
-                                        flag += 1
-                                        new_metrics.append(new_name)
-                                    else:
-                                        new_metrics.append(metric)
-                            new_services.append({
-                                'service': service['service'],
-                                'metrics': new_metrics
-                            })
-
-                        if flag > 0:
-                            new_data = {
-                                'id': profile['id'],
-                                'name': profile['name'],
-                                'description': profile['description'],
-                                'services': new_services
-                            }
-                            response = requests.put(
-                                settings.WEBAPI_METRIC + '/' + profile['id'],
-                                headers=headers,
-                                data=json.dumps(new_data)
-                            )
-                            response.raise_for_status()
-
-                except requests.exceptions.HTTPError as e:
-                    error_msgs.append(
-                        '{}: Error trying to update metric in metric profiles: '
-                        '{}.\nPlease update metric profiles manually.'.format(
-                            tenant.schema_name.upper(), e
-                        )
-                    )
-                    continue
-
-                except WebAPIKey.DoesNotExist:
-                    error_msgs.append(
-                        '{}: No "WEB-API" key in the DB!'
-                        '\nPlease update metric profiles manually.'.format(
-                            tenant.schema_name.upper()
-                        )
-                    )
-                    continue
+    for schema in sorted(results):
+        if results[schema]['error']:
+            error_msgs.append(
+                '{}: {}\nPlease update metric profiles manually.'.format(
+                    schema.upper(), results[schema]['error']
+                )
+            )
 
     return error_msgs
 
@@ -342,7 +705,7 @@ def delete_metrics_from_profile(profile, metrics, tenant):
         else:
             url = settings.WEBAPI_METRIC + '/' + profile_id
 
-        response = requests.get(url, headers=headers, timeout=180)
+        response = webapi_get(url, headers=headers)
         response.raise_for_status()
 
         data = response.json()['data'][0]
@@ -362,7 +725,7 @@ def delete_metrics_from_profile(profile, metrics, tenant):
             'services': data['services']
         }
 
-        response = requests.put(
+        response = webapi_put(
             url, headers=headers, data=json.dumps(send_data)
         )
         response.raise_for_status()
@@ -0,0 +1,65 @@
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+
+_lock = threading.Lock()
+_counters = {'hits': 0, 'misses': 0}
+
+
+def _count(counter):
+    with _lock:
+        _counters[counter] += 1
+
+
+def snapshot_stats():
+    """
+    Returns number of snapshot cache hits and misses in this process.
+    """
+    with _lock:
+        return dict(_counters)
+
+
+def reset_snapshot_stats():
+    with _lock:
+        for key in _counters:
+            _counters[key] = 0
+
+
+def snapshot_key(name, schema_name):
+    return f'snapshot:{name}:{schema_name}'
+
+
+def get_snapshot(name, schema_name, generation, build):
+    """
+    Returns data stored in snapshot with the given name for the given schema.
+    Snapshot is stored together with configuration generation it was built
+    for. Since generations are increased by post_save/post_delete signals of
+    the models the snapshot is built from, snapshot is lazily rebuilt by
+    calling build on the first read after the change.
+    """
+    if not all(generation):
+        # generation of schema not tracked yet (no changes since it was
+        # introduced), it cannot tell two different states apart
+        _count('misses')
+        return build()
+
+    key = snapshot_key(name, schema_name)
+    snapshot = cache.get(key)
+
+    if snapshot and snapshot['generation'] == list(generation):
+        _count('hits')
+        return snapshot['data']
+
+    _count('misses')
+    data = build()
+    cache.set(
+        key, {'generation': list(generation), 'data': data},
+        settings.CACHE_SNAPSHOT_TIMEOUT
+    )
+
+    return data
+
+
+def delete_snapshot(name, schema_name):
+    cache.delete(snapshot_key(name, schema_name))
@@ -1,6 +1,8 @@
 import requests
+from Poem.helpers.webapi_helpers import webapi_get
 from Poem.poem_super_admin.models import WebAPIKey
 from django.conf import settings
+from django.core.cache import cache
 
 
 class CombinedTenant:
@@ -13,7 +15,7 @@ class CombinedTenant:
         return token.token
 
     def _fetch_data_feed(self):
-        response = requests.get(
+        response = webapi_get(
             settings.WEBAPI_DATAFEEDS,
             headers={
                 "Accept": "application/json",
@@ -27,8 +29,21 @@ class CombinedTenant:
         return response.json()["data"]
 
     def tenants(self):
+        """
+        Returns names of tenants combined tenant is made of. Membership is
+        cached, since it is needed on every tenant list and rarely changes.
+        """
+        key = f"webapi:combined:{self.tenant.name}"
+        tenants = cache.get(key)
+
+        if tenants is not None:
+            return tenants
+
         try:
-            return self._fetch_data_feed()[0]["tenants"]
+            tenants = self._fetch_data_feed()[0]["tenants"]
+            cache.set(key, tenants, settings.CACHE_WEBAPI_TIMEOUT)
+
+            return tenants
 
         except (
             requests.exceptions.HTTPError,
@@ -0,0 +1,129 @@
+import logging
+import threading
+import time
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger('POEM')
+
+_lock = threading.Lock()
+_session = None
+_stats = dict()
+
+
+def _create_session():
+    retry = Retry(
+        total=settings.WEBAPI_RETRIES,
+        connect=settings.WEBAPI_RETRIES,
+        read=settings.WEBAPI_RETRIES,
+        status=settings.WEBAPI_RETRIES,
+        backoff_factor=settings.WEBAPI_RETRY_BACKOFF,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset(['GET', 'PUT']),
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(
+        pool_connections=settings.WEBAPI_POOL_SIZE,
+        pool_maxsize=settings.WEBAPI_POOL_SIZE,
+        max_retries=retry
+    )
+
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+
+    return session
+
+
+def get_session():
+    """
+    Returns session shared by all WEB-API calls made by the process, so that
+    connections to WEB-API are pooled and kept alive.
+    """
+    global _session
+
+    if _session is None:
+        with _lock:
+            if _session is None:
+                _session = _create_session()
+
+    return _session
+
+
+def reset_session():
+    global _session
+
+    with _lock:
+        if _session is not None:
+            _session.close()
+
+        _session = None
+
+
+def _record(method, seconds, failed):
+    with _lock:
+        stats = _stats.setdefault(
+            method, {'calls': 0, 'failed': 0, 'total': 0.0, 'max': 0.0}
+        )
+        stats['calls'] += 1
+        stats['total'] += seconds
+        stats['max'] = max(stats['max'], seconds)
+        if failed:
+            stats['failed'] += 1
+
+
+def webapi_stats():
+    """
+    Returns number of calls, failed calls, and total and maximum duration in
+    seconds of WEB-API calls made by the process, per HTTP method.
+    """
+    with _lock:
+        return dict((key, dict(value)) for key, value in _stats.items())
+
+
+def reset_webapi_stats():
+    with _lock:
+        _stats.clear()
+
+
+def webapi_request(method, url, headers=None, data=None, timeout=None):
+    """
+    Sends request to WEB-API using the shared session. If timeout is not
+    given, connect and read timeouts from configuration are used.
+    """
+    if timeout is None:
+        timeout = (
+            settings.WEBAPI_CONNECT_TIMEOUT, settings.WEBAPI_READ_TIMEOUT
+        )
+
+    start = time.monotonic()
+    failed = True
+    try:
+        response = get_session().request(
+            method, url, headers=headers, data=data, timeout=timeout
+        )
+        failed = not response.ok
+
+        return response
+
+    finally:
+        duration = time.monotonic() - start
+        _record(method, duration, failed)
+        logger.debug(
+            'WEB-API %s %s took %.3f s%s' % (
+                method, url, duration, ' (failed)' if failed else ''
+            )
+        )
+
+
+def webapi_get(url, headers=None, timeout=None):
+    return webapi_request('GET', url, headers=headers, timeout=timeout)
+
+
+def webapi_put(url, headers=None, data=None, timeout=None):
+    return webapi_request(
+        'PUT', url, headers=headers, data=data, timeout=timeout
+    )
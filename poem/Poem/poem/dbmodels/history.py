@@ -1,13 +1,13 @@
 import json
 
-from Poem.poem.models import Metric
+from Poem.helpers.job_helpers import register_job, enqueue_job
+from Poem.poem.dbmodels.metricstags import Metric, update_probeversions
 from Poem.poem_super_admin import models as admin_models
-from Poem.tenants.models import Tenant
+from Poem.poem_super_admin.dbmodels.fields import SerializedDataField
 from django.contrib.contenttypes.models import ContentType
-from django.db import models
+from django.db import models, connection
 from django.db.models.signals import post_save
 from django.dispatch import receiver
-from django_tenants.utils import schema_context, get_public_schema_name
 
 
 class TenantHistoryManager(models.Manager):
@@ -21,8 +21,10 @@ class TenantHistory(models.Model):
     models; unlike History model which stores versions in public Postgres
     schema.
     """
-    object_id = models.CharField(max_length=191)
-    serialized_data = models.TextField()
+    object_id = models.IntegerField()
+    serialized_data = SerializedDataField()
+    # serialized fields are patch to fields of the preceding version
+    delta = models.BooleanField(default=False)
     object_repr = models.TextField()
     content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
     date_created = models.DateTimeField(auto_now_add=True)
@@ -33,36 +35,121 @@ class TenantHistory(models.Model):
 
     class Meta:
         app_label = 'poem'
+        indexes = [
+            models.Index(
+                fields=['content_type', 'object_id', 'date_created'],
+                name='tenanthistory_object_idx'
+            )
+        ]
 
     def natural_key(self):
         return (self.object_repr,)
 
 
+def update_history_probekeys(probes, version):
+    """
+    Sets probekey of all the history entries of metrics using one of the
+    given probes in the given version to [probe, version], rewriting the
+    serialized data in database with a single UPDATE in the current schema.
+    Returns number of updated history entries.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            UPDATE {TenantHistory._meta.db_table} AS history
+            SET serialized_data = jsonb_set(
+                history.serialized_data, '{{0,fields,probekey}}',
+                jsonb_build_array(probe.name, %(version)s::text)
+            )
+            FROM {Metric._meta.db_table} AS metric
+            JOIN unnest(%(probes)s::text[]) AS probe(name) ON
+                metric.probeversion = probe.name || ' (' || %(version)s || ')'
+            WHERE history.content_type_id = %(content_type)s
+                AND history.object_id = metric.id
+                AND history.serialized_data #> '{{0,fields,probekey}}'
+                    IS DISTINCT FROM
+                    jsonb_build_array(probe.name, %(version)s::text)
+            """,
+            {
+                'probes': list(probes),
+                'version': version,
+                'content_type': ContentType.objects.get_for_model(Metric).id
+            }
+        )
+
+        return cursor.rowcount
+
+
+def set_history_probekey(metrics, probekey):
+    """
+    Sets probekey of all the history entries of the given metrics to the
+    given [probe, version] pair with a single UPDATE in the current schema.
+    Returns number of updated history entries.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            UPDATE {TenantHistory._meta.db_table}
+            SET serialized_data = jsonb_set(
+                serialized_data, '{{0,fields,probekey}}', %(probekey)s::jsonb
+            )
+            WHERE content_type_id = %(content_type)s
+                AND object_id = ANY(%(metrics)s)
+            """,
+            {
+                'probekey': json.dumps(list(probekey)),
+                'content_type': ContentType.objects.get_for_model(Metric).id,
+                'metrics': [metric.id for metric in metrics]
+            }
+        )
+
+        return cursor.rowcount
+
+
+def _schemas_using_package(package, **kwargs):
+    return admin_models.TenantMetricUsage.objects.schemas_using_probekeys(
+        admin_models.ProbeHistory.objects.filter(package_id=package)
+    )
+
+
+def update_package_version(schema, package, probes, old_version, version):
+    """
+    Switches metrics in the current schema using the given probes from old
+    to new version of their package, together with their history. Run in
+    each of the tenant schemas using the package by update_package_version
+    job.
+    """
+    update_probeversions(dict(
+        (f'{name} ({old_version})', f'{name} ({version})') for name in probes
+    ))
+    update_history_probekeys(probes, version)
+
+    return []
+
+
+register_job(
+    'update_package_version', update_package_version, _schemas_using_package
+)
+
+
 @receiver(post_save, sender=admin_models.Package)
 def update_metric_history(sender, instance, created, **kwargs):
-    if not created:
-        schemas = list(
-            Tenant.objects.all().values_list('schema_name', flat=True)
-        )
-        schemas.remove(get_public_schema_name())
-        probes = admin_models.ProbeHistory.objects.filter(
+    old_version = getattr(instance, 'saved_version', None)
+    if created or old_version is None or old_version == instance.version:
+        return
+
+    probes = sorted(
+        admin_models.ProbeHistory.objects.filter(
             package=instance
+        ).values_list('name', flat=True).distinct()
+    )
+
+    if probes:
+        # metrics of the tenants are updated in the background, the job is
+        # left on the package for the caller to report
+        instance.job = enqueue_job(
+            'update_package_version', dict(
+                package=instance.id, probes=probes, old_version=old_version,
+                version=instance.version
+            )
         )
-        for schema in schemas:
-            with schema_context(schema):
-                for probe in probes:
-                    metrics = Metric.objects.filter(
-                        probeversion=f"{probe.name} ({probe.package.version})"
-                    )
-                    for metric in metrics:
-                        vers = TenantHistory.objects.filter(
-                            object_id=metric.id
-                        ).order_by('-date_created')
-
-                        for ver in vers:
-                            serialized_data = json.loads(ver.serialized_data)
-                            serialized_data[0]['fields']['probekey'] = [
-                                probe.name, probe.package.version
-                            ]
-                            ver.serialized_data = json.dumps(serialized_data)
-                            ver.save()
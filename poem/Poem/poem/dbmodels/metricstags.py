@@ -1,11 +1,13 @@
+import datetime
+
 from Poem.poem_super_admin import models as admin_models
-from Poem.tenants.models import Tenant
+from Poem.poem_super_admin.dbmodels.fields import InlineField
 from django.contrib.auth.models import GroupManager, Permission
-from django.db import models
-from django.db.models.signals import pre_save
+from django.db import models, connection
+from django.db.models.signals import pre_save, post_save, post_delete
 from django.dispatch import receiver
+from django.utils import timezone
 from django.utils.translation import ugettext_lazy as _
-from django_tenants.utils import schema_context, get_public_schema_name
 
 
 class GroupOfMetrics(models.Model):
@@ -30,19 +32,46 @@ class GroupOfMetrics(models.Model):
 class Metric(models.Model):
     id = models.AutoField(primary_key=True)
     name = models.CharField(max_length=128, unique=True)
+    # probe history lives in public schema, which has no metrics table to
+    # cascade deletions to; keys are cleared explicitly when probe is deleted
+    probekey = models.ForeignKey(
+        admin_models.ProbeHistory, null=True, blank=True,
+        on_delete=models.DO_NOTHING, db_constraint=False
+    )
     probeversion = models.CharField(max_length=1024, null=True, blank=True)
     group = models.ForeignKey(GroupOfMetrics, null=True,
                               on_delete=models.SET_NULL)
-    config = models.CharField(max_length=1024)
+    config = InlineField()
 
     class Meta:
         permissions = (('metricsown', 'Read/Write/Modify'),)
         app_label = 'poem'
         verbose_name = 'Metric'
+        indexes = [
+            models.Index(
+                fields=['probeversion'], name='metric_probeversion_idx'
+            )
+        ]
 
     def __str__(self):
         return u'%s' % self.name
 
+    def save(self, *args, **kwargs):
+        """
+        Keeps probe version string, which is only displayed, derived from
+        probekey. Metrics given only the string get the matching probekey.
+        """
+        if self.probekey_id:
+            self.probeversion = self.probekey.__str__()
+
+        elif self.probeversion:
+            probe = admin_models.parse_probeversion(self.probeversion)
+            self.probekey = admin_models.ProbeHistory.objects.filter(
+                name=probe[0], package__version=probe[1]
+            ).order_by('id').first()
+
+        super().save(*args, **kwargs)
+
 
 class MetricConfiguration(models.Model):
     id = models.AutoField(primary_key=True)
@@ -58,6 +87,68 @@ class MetricConfiguration(models.Model):
         return u"%s" % self.name
 
 
+class MetricChangeManager(models.Manager):
+    def log(self, name, action):
+        """
+        Bumps configuration generation of the current schema and records
+        the change of metric with the given name under the new generation.
+        """
+        generation = admin_models.ConfigGeneration.objects.bump(
+            connection.schema_name
+        )
+
+        return self.create(name=name, action=action, generation=generation)
+
+    def log_many(self, names, action):
+        """
+        Records the same change of multiple metrics under a single new
+        generation of the current schema.
+        """
+        generation = admin_models.ConfigGeneration.objects.bump(
+            connection.schema_name
+        )
+
+        return self.bulk_create([
+            self.model(name=name, action=action, generation=generation)
+            for name in names
+        ])
+
+    def trim(self, days):
+        """
+        Deletes changes recorded more than the given number of days ago.
+        Changes since generations older than the remaining ones are then
+        no longer available. Returns number of deleted changes.
+        """
+        return self.filter(
+            date__lt=timezone.now() - datetime.timedelta(days=days)
+        ).delete()[0]
+
+
+class MetricChange(models.Model):
+    ADDED = 'added'
+    UPDATED = 'updated'
+    DELETED = 'deleted'
+    ACTIONS = (
+        (ADDED, 'Added'),
+        (UPDATED, 'Updated'),
+        (DELETED, 'Deleted')
+    )
+
+    id = models.AutoField(primary_key=True)
+    name = models.CharField(max_length=128)
+    action = models.CharField(max_length=16, choices=ACTIONS)
+    generation = models.BigIntegerField(db_index=True)
+    date = models.DateTimeField(auto_now_add=True)
+
+    objects = MetricChangeManager()
+
+    class Meta:
+        app_label = 'poem'
+
+    def __str__(self):
+        return u'%s %s (%s)' % (self.name, self.action, self.generation)
+
+
 class ProbeCandidateStatus(models.Model):
     id = models.AutoField(primary_key=True)
     name = models.CharField(max_length=128, unique=True)
@@ -89,20 +180,58 @@ class ProbeCandidate(models.Model):
         return u"%s" % self.name
 
 
+def update_probeversions(probeversions):
+    """
+    Replaces probe versions of metrics in the current schema with a single
+    UPDATE, probeversions being dict mapping old probe version to new one.
+    Returns number of updated metrics.
+    """
+    metrics = Metric.objects.filter(probeversion__in=list(probeversions))
+    names = list(metrics.values_list('name', flat=True))
+
+    if names:
+        metrics.update(
+            probeversion=models.Case(
+                *[
+                    models.When(probeversion=old, then=models.Value(new))
+                    for old, new in probeversions.items()
+                ],
+                output_field=models.CharField()
+            )
+        )
+        MetricChange.objects.log_many(names, MetricChange.UPDATED)
+
+    return len(names)
+
+
 @receiver(pre_save, sender=admin_models.Package)
-def update_metrics(sender, instance, **kwargs):
-    schemas = list(
-        Tenant.objects.all().values_list('schema_name', flat=True)
+def remember_package_version(sender, instance, **kwargs):
+    # version the package had before it is saved, so that metrics of the
+    # tenants can be switched from it once the package is saved
+    instance.saved_version = admin_models.Package.objects.filter(
+        pk=instance.pk
+    ).values_list('version', flat=True).first() if instance.pk else None
+
+
+@receiver(post_save, sender=Metric)
+def log_metric_save(sender, instance, created, **kwargs):
+    MetricChange.objects.log(
+        instance.name, MetricChange.ADDED if created else MetricChange.UPDATED
     )
-    schemas.remove(get_public_schema_name())
-    probes = admin_models.ProbeHistory.objects.filter(package=instance)
-
-    for schema in schemas:
-        with schema_context(schema):
-            for probe in probes:
-                metrics = Metric.objects.filter(
-                    probeversion=f"{probe.name} ({probe.package.version})"
-                )
-                for metric in metrics:
-                    metric.probeversion = f"{probe.name} ({instance.version})"
-                    metric.save()
+    admin_models.TenantMetricUsage.objects.record(
+        connection.schema_name, instance
+    )
+
+
+@receiver(post_delete, sender=Metric)
+def log_metric_delete(sender, instance, **kwargs):
+    MetricChange.objects.log(instance.name, MetricChange.DELETED)
+    admin_models.TenantMetricUsage.objects.forget(
+        connection.schema_name, instance.id
+    )
+
+
+@receiver(post_save, sender=MetricConfiguration)
+@receiver(post_delete, sender=MetricConfiguration)
+def bump_config_generation(sender, **kwargs):
+    admin_models.ConfigGeneration.objects.bump(connection.schema_name)
@@ -0,0 +1,36 @@
+from Poem.helpers.fanout_helpers import tenant_schemas
+from Poem.poem.models import MetricChange
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django_tenants.utils import schema_context
+
+
+class Command(BaseCommand):
+    help = """Delete changes of metrics in tenant schemas older than
+    MetricChangesRetention days. Clients asking for changes since generation
+    older than the remaining ones have to fetch full configuration."""
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--schema', type=str, nargs='*',
+            help='Delete changes only in the given tenant schemas'
+        )
+        parser.add_argument(
+            '--days', type=int,
+            help='Number of days changes are kept for, if different from '
+                 'the configured one'
+        )
+
+    def handle(self, *args, **kwargs):
+        days = kwargs['days']
+        if days is None:
+            days = settings.METRIC_CHANGES_RETENTION
+
+        if days < 0:
+            raise CommandError('Number of days should not be negative.')
+
+        for schema in kwargs['schema'] or tenant_schemas():
+            with schema_context(schema):
+                deleted = MetricChange.objects.trim(days)
+
+            self.stdout.write(f'{schema}: {deleted} changes deleted')
@@ -0,0 +1,34 @@
+from Poem.helpers.fanout_helpers import tenant_schemas
+from Poem.helpers.history_helpers import encode_history
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django_tenants.utils import schema_context
+
+
+class Command(BaseCommand):
+    help = """Convert existing history of profiles in tenant schemas to keep
+    full copy of every HistorySnapshotInterval-th version and only changes to
+    the preceding version in between. No version is lost; interval 1 converts
+    history back to full copies."""
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--schema', type=str, nargs='*',
+            help='Convert history only in the given tenant schemas'
+        )
+        parser.add_argument(
+            '--interval', type=int,
+            help='Snapshot interval, if different from the configured one'
+        )
+
+    def handle(self, *args, **kwargs):
+        interval = kwargs['interval'] or settings.HISTORY_SNAPSHOT_INTERVAL
+        if interval < 1:
+            raise CommandError('Snapshot interval should be positive.')
+
+        for schema in kwargs['schema'] or tenant_schemas():
+            with schema_context(schema), transaction.atomic():
+                converted = encode_history(interval)
+
+            self.stdout.write(f'{schema}: {converted} history entries')
@@ -0,0 +1,34 @@
+from Poem.helpers.fanout_helpers import tenant_schemas
+from Poem.poem.models import Metric
+from Poem.poem_super_admin.models import TenantMetricUsage
+from django.core.management.base import BaseCommand
+from django_tenants.utils import schema_context
+
+
+class Command(BaseCommand):
+    help = """Rebuild index of metrics used by tenants, and tenant stats
+    derived from it, from the metrics in tenant schemas."""
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--schema', type=str, nargs='*',
+            help='Rebuild index only for the given tenant schemas'
+        )
+
+    def handle(self, *args, **kwargs):
+        schemas = kwargs['schema']
+
+        if not schemas:
+            schemas = tenant_schemas()
+            TenantMetricUsage.objects.exclude(
+                schema_name__in=schemas
+            ).delete()
+
+        for schema in schemas:
+            with schema_context(schema):
+                entries = TenantMetricUsage.objects.rebuild(
+                    schema,
+                    Metric.objects.values_list('id', 'name', 'probekey')
+                )
+
+            self.stdout.write(f'{schema}: {len(entries)} metrics')
@@ -0,0 +1,25 @@
+import Poem.api.views_internal  # noqa: F401 (registers job kinds)
+from Poem.helpers.job_helpers import run_worker
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = """Run background jobs enqueued through the jobs API. Multiple
+    workers can be run at the same time, each step is picked up by only one
+    of them."""
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Exit once there are no steps left to run'
+        )
+        parser.add_argument(
+            '--poll-interval', type=int, default=None,
+            help='Seconds to wait between checks for new jobs'
+        )
+
+    def handle(self, *args, **kwargs):
+        count = run_worker(
+            once=kwargs['once'], poll_interval=kwargs['poll_interval']
+        )
+        self.stdout.write(f'{count} job steps run')
@@ -0,0 +1,23 @@
+# Generated by Django 3.2.19 on 2026-10-18 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('poem', '0030_alter_probecandidate_status'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MetricChange',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=128)),
+                ('action', models.CharField(choices=[('added', 'Added'), ('updated', 'Updated'), ('deleted', 'Deleted')], max_length=16)),
+                ('generation', models.BigIntegerField(db_index=True)),
+                ('date', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
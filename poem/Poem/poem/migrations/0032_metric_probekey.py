@@ -0,0 +1,35 @@
+# Generated by Django 3.2.19 on 2026-10-18 14:05
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('poem_super_admin', '0031_job_jobstep'),
+        ('poem', '0031_metricchange'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='metric',
+            name='probekey',
+            field=models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, to='poem_super_admin.probehistory'),
+        ),
+        # run in each tenant schema; probe history is found in public schema
+        migrations.RunSQL(
+            """
+            UPDATE poem_metric SET probekey_id = (
+                SELECT min(probe.id)
+                FROM poem_super_admin_probehistory AS probe
+                JOIN poem_super_admin_package AS package
+                    ON package.id = probe.package_id
+                WHERE poem_metric.probeversion =
+                    probe.name || ' (' || package.version || ')'
+            )
+            WHERE probeversion IS NOT NULL AND probeversion <> ''
+            """,
+            migrations.RunSQL.noop
+        ),
+    ]
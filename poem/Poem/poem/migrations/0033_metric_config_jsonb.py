@@ -0,0 +1,34 @@
+# Generated by Django 3.2.19 on 2026-10-18 15:20
+
+import Poem.poem_super_admin.dbmodels.fields
+from django.db import migrations
+
+from Poem.poem_super_admin.dbmodels.fields import INLINE_FUNCTIONS, \
+    DROP_INLINE_FUNCTIONS, inline_columns_sql
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('poem_super_admin', '0032_inline_fields_jsonb'),
+        ('poem', '0032_metric_probekey'),
+    ]
+
+    operations = [
+        migrations.RunSQL(INLINE_FUNCTIONS, DROP_INLINE_FUNCTIONS),
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(
+                    *inline_columns_sql('poem_metric', ['config'])
+                ),
+            ],
+            state_operations=[
+                migrations.AlterField(
+                    model_name='metric',
+                    name='config',
+                    field=Poem.poem_super_admin.dbmodels.fields.InlineField(blank=True, default='', null=True),
+                ),
+            ],
+        ),
+        migrations.RunSQL(DROP_INLINE_FUNCTIONS, INLINE_FUNCTIONS),
+    ]
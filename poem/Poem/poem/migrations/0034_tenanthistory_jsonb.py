@@ -0,0 +1,31 @@
+# Generated by Django 3.2.19 on 2026-10-18 16:10
+
+import Poem.poem_super_admin.dbmodels.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('poem', '0033_metric_config_jsonb'),
+    ]
+
+    operations = [
+        # columns are converted with USING object_id::integer and
+        # USING serialized_data::jsonb
+        migrations.AlterField(
+            model_name='tenanthistory',
+            name='object_id',
+            field=models.IntegerField(),
+        ),
+        migrations.AlterField(
+            model_name='tenanthistory',
+            name='serialized_data',
+            field=Poem.poem_super_admin.dbmodels.fields.SerializedDataField(),
+        ),
+        migrations.AddIndex(
+            model_name='tenanthistory',
+            index=models.Index(fields=['content_type', 'object_id', 'date_created'], name='tenanthistory_object_idx'),
+        ),
+    ]
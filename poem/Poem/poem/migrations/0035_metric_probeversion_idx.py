@@ -0,0 +1,17 @@
+# Generated by Django 3.2.19 on 2026-10-18 17:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('poem', '0034_tenanthistory_jsonb'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='metric',
+            index=models.Index(fields=['probeversion'], name='metric_probeversion_idx'),
+        ),
+    ]
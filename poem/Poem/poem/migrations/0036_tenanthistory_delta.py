@@ -0,0 +1,18 @@
+# Generated by Django 3.2.19 on 2026-10-18 18:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('poem', '0035_metric_probeversion_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tenanthistory',
+            name='delta',
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 3.2.19 on 2026-10-18 20:00
+
+import Poem.poem_super_admin.dbmodels.fields
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('poem_super_admin', '0033_inline_fields_default'),
+        ('poem', '0036_tenanthistory_delta'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='metric',
+            name='config',
+            field=Poem.poem_super_admin.dbmodels.fields.InlineField(blank=True, default=list, null=True),
+        ),
+    ]
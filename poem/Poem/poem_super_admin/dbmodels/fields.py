@@ -0,0 +1,180 @@
+import json
+
+from django.db import models
+from django.db.models.fields.json import KeyTransform
+
+
+def to_pairs(value):
+    """
+    Converts value of inline field (list of [key, value] pairs, or JSON
+    encoded or decoded list of "key value" strings, the format the field
+    was stored in before) to list of pairs.
+    """
+    if not value:
+        return []
+
+    if isinstance(value, str):
+        value = json.loads(value)
+
+    return [
+        item.split(' ', 1) if isinstance(item, str) else list(item)
+        for item in value
+    ]
+
+
+def to_text(value):
+    """
+    Converts value of inline field to JSON encoded list of "key value"
+    strings, the format the field was stored in before, or empty string if
+    there are no items.
+    """
+    pairs = to_pairs(value)
+    if not pairs:
+        return ''
+
+    return json.dumps([' '.join(pair) for pair in pairs])
+
+
+class InlineField(models.JSONField):
+    """
+    List of "key value" items of metric (config, attribute, flags, ...),
+    stored as jsonb array of [key, value] pairs so it can be indexed and
+    queried, e.g. flags__has_inline_key='NOPUBLISH'. Python code gets list
+    of [key, value] pairs (empty list if there are no items), and can also
+    assign JSON encoded list of "key value" strings. Serialized objects
+    (e.g. in history) keep the JSON encoded string format, so that their
+    versions can be compared with the older ones. Empty value is stored as
+    NULL.
+    """
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('null', True)
+        kwargs.setdefault('blank', True)
+        kwargs.setdefault('default', list)
+        super().__init__(*args, **kwargs)
+
+    def from_db_value(self, value, expression, connection):
+        value = super().from_db_value(value, expression, connection)
+
+        if isinstance(expression, KeyTransform):
+            return value
+
+        if value is None:
+            return []
+
+        return value
+
+    def get_prep_value(self, value):
+        if value is None:
+            return value
+
+        pairs = to_pairs(value)
+        if not pairs:
+            return None
+
+        return super().get_prep_value(pairs)
+
+    def value_to_string(self, obj):
+        return to_text(self.value_from_object(obj))
+
+
+class SerializedDataField(models.JSONField):
+    """
+    Version of object serialized by Django serializer, stored as jsonb so
+    that history can be read and rewritten in SQL. Python code keeps getting
+    JSON encoded string it was getting when the field was TextField, key
+    transforms (e.g. KeyTransform('0', 'serialized_data')) return decoded
+    values.
+    """
+    def from_db_value(self, value, expression, connection):
+        if isinstance(expression, KeyTransform):
+            return super().from_db_value(value, expression, connection)
+
+        if value is None or isinstance(value, str):
+            return value
+
+        return json.dumps(value)
+
+    def get_prep_value(self, value):
+        if isinstance(value, str):
+            value = json.loads(value)
+
+        return super().get_prep_value(value)
+
+
+@InlineField.register_lookup
+class HasInlineKey(models.Lookup):
+    lookup_name = 'has_inline_key'
+    prepare_rhs = False
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+
+        # containment is answered by GIN index, but it also matches values
+        # equal to the key, so keys of candidate rows are checked too
+        return (
+            f'{lhs} @> %s::jsonb AND EXISTS ('
+            f'SELECT 1 FROM jsonb_array_elements({lhs}) AS pair '
+            f'WHERE pair->>0 = %s)',
+            lhs_params + [json.dumps([[self.rhs]])] + lhs_params + [self.rhs]
+        )
+
+
+INLINE_FUNCTIONS = """
+CREATE OR REPLACE FUNCTION poem_inline_to_jsonb(value text)
+RETURNS jsonb AS $$
+    SELECT CASE WHEN value = '' THEN NULL ELSE (
+        SELECT coalesce(jsonb_agg(
+            CASE WHEN position(' ' IN item) > 0 THEN jsonb_build_array(
+                split_part(item, ' ', 1),
+                substr(item, position(' ' IN item) + 1)
+            ) ELSE jsonb_build_array(item) END ORDER BY nr
+        ), '[]'::jsonb)
+        FROM jsonb_array_elements_text(value::jsonb)
+            WITH ORDINALITY AS items(item, nr)
+    ) END
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION poem_inline_to_text(value jsonb)
+RETURNS text AS $$
+    SELECT CASE WHEN value IS NULL THEN '' ELSE (
+        SELECT coalesce(json_agg((
+            SELECT string_agg(part, ' ' ORDER BY i)
+            FROM jsonb_array_elements_text(pair)
+                WITH ORDINALITY AS parts(part, i)
+        ) ORDER BY nr)::text, '[]')
+        FROM jsonb_array_elements(value) WITH ORDINALITY AS pairs(pair, nr)
+    ) END
+$$ LANGUAGE sql IMMUTABLE;
+"""
+
+DROP_INLINE_FUNCTIONS = """
+DROP FUNCTION IF EXISTS poem_inline_to_jsonb(text);
+DROP FUNCTION IF EXISTS poem_inline_to_text(jsonb);
+"""
+
+
+def inline_columns_sql(table, columns):
+    """
+    Returns SQL converting the given varchar columns of the table holding
+    JSON encoded lists of "key value" strings to jsonb arrays of pairs, and
+    SQL reverting it. Needs functions created by INLINE_FUNCTIONS.
+    """
+    nullable = ', '.join(
+        f'ALTER COLUMN {column} DROP NOT NULL' for column in columns
+    )
+    to_jsonb = ', '.join(
+        f'ALTER COLUMN {column} TYPE jsonb '
+        f'USING poem_inline_to_jsonb({column})' for column in columns
+    )
+    to_text = ', '.join(
+        f'ALTER COLUMN {column} TYPE varchar(1024) '
+        f'USING poem_inline_to_text({column})' for column in columns
+    )
+    not_null = ', '.join(
+        f'ALTER COLUMN {column} SET NOT NULL' for column in columns
+    )
+
+    return (
+        f'ALTER TABLE {table} {nullable}; ALTER TABLE {table} {to_jsonb};',
+        f'ALTER TABLE {table} {to_text}; ALTER TABLE {table} {not_null};'
+    )
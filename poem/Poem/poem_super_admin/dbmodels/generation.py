@@ -0,0 +1,105 @@
+import time
+
+from django.db import models, transaction, IntegrityError
+from django.db.models import F
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django_tenants.utils import get_public_schema_name
+
+
+class ConfigGenerationManager(models.Manager):
+    def bump(self, schema_name):
+        """
+        Increases configuration generation of the given schema. Row is
+        created on first bump of the schema, starting from current timestamp
+        in milliseconds, so that generations are never reused if the row is
+        ever recreated (e.g. tenant with the same schema name). Returns the
+        new generation.
+        """
+        updated = self.filter(schema_name=schema_name).update(
+            generation=F('generation') + 1
+        )
+
+        if not updated:
+            try:
+                with transaction.atomic():
+                    self.create(
+                        schema_name=schema_name,
+                        generation=int(time.time() * 1000)
+                    )
+
+            except IntegrityError:
+                self.filter(schema_name=schema_name).update(
+                    generation=F('generation') + 1
+                )
+
+        return self.filter(schema_name=schema_name).values_list(
+            'generation', flat=True
+        ).get()
+
+    def current(self, schema_name):
+        """
+        Returns tuple of public schema generation and generation of the given
+        schema fetched in a single query.
+        """
+        public_schema = get_public_schema_name()
+        generations = dict(
+            self.filter(
+                schema_name__in=[public_schema, schema_name]
+            ).values_list('schema_name', 'generation')
+        )
+
+        return (
+            generations.get(public_schema, 0),
+            generations.get(schema_name, 0)
+        )
+
+
+class ConfigGeneration(models.Model):
+    """
+    Counter increased on every write to the models the configuration served
+    to the monitoring boxes is built from. Tenant specific models bump the
+    generation of their schema, while shared models bump the one of the
+    public schema.
+    """
+    schema_name = models.CharField(max_length=63, unique=True)
+    generation = models.BigIntegerField(default=0)
+
+    objects = ConfigGenerationManager()
+
+    class Meta:
+        app_label = 'poem_super_admin'
+
+    def __str__(self):
+        return u'%s (%s)' % (self.schema_name, self.generation)
+
+
+def bump_public_generation(sender, **kwargs):
+    ConfigGeneration.objects.bump(get_public_schema_name())
+
+
+for model in [
+    'MetricTemplate', 'MetricTemplateHistory', 'MetricTags', 'ProbeHistory',
+    'DefaultPort', 'Package', 'YumRepo'
+]:
+    post_save.connect(
+        bump_public_generation, sender=f'poem_super_admin.{model}',
+        dispatch_uid=f'config_generation_save_{model}'
+    )
+    post_delete.connect(
+        bump_public_generation, sender=f'poem_super_admin.{model}',
+        dispatch_uid=f'config_generation_delete_{model}'
+    )
+
+
+def bump_public_generation_m2m(sender, action, **kwargs):
+    if action in ['post_add', 'post_remove', 'post_clear']:
+        ConfigGeneration.objects.bump(get_public_schema_name())
+
+
+for through in [
+    'MetricTemplate_tags', 'MetricTemplateHistory_tags', 'Package_repos'
+]:
+    m2m_changed.connect(
+        bump_public_generation_m2m, sender=f'poem_super_admin.{through}',
+        dispatch_uid=f'config_generation_m2m_{through}'
+    )
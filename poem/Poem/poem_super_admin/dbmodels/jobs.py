@@ -0,0 +1,189 @@
+from django.db import models, transaction, IntegrityError
+from django.db.models import Exists, Min, OuterRef, Q
+from django.utils import timezone
+
+
+class JobManager(models.Manager):
+    def enqueue(self, kind, params, schemas, user='', key=None):
+        """
+        Creates job of the given kind with one step for each of the given
+        schemas. Schemas are either names, or (name, stage) tuples; steps of
+        a stage are run only once all the steps of earlier stages are done.
+        If key is given and job with the same key is still queued or
+        running, that job is returned instead of creating a new one, so that
+        the same request submitted twice is run only once.
+        """
+        for attempt in range(3):
+            try:
+                with transaction.atomic():
+                    job = self.create(
+                        kind=kind, params=params, user=user, key=key
+                    )
+                    JobStep.objects.bulk_create([
+                        JobStep(
+                            job=job, schema_name=schema[0], stage=schema[1]
+                        ) if isinstance(schema, (tuple, list)) else
+                        JobStep(job=job, schema_name=schema)
+                        for schema in schemas
+                    ])
+
+                break
+
+            except IntegrityError:
+                if key is None or attempt == 2:
+                    raise
+
+                # the active job may have finished after the failed insert,
+                # in which case the insert is tried again
+                job = self.filter(
+                    key=key, status__in=[Job.QUEUED, Job.RUNNING]
+                ).first()
+                if job is not None:
+                    return job
+
+        if not schemas:
+            self.finish(job.id)
+            job.refresh_from_db()
+
+        return job
+
+    def finish(self, job_id):
+        """
+        Marks job as done (or failed, if any of its steps failed) once none
+        of its steps can be run anymore. Steps of stages after the failed
+        step are not run until the job is retried.
+        """
+        with transaction.atomic():
+            job = self.select_for_update().get(pk=job_id)
+            failed = job.steps.filter(status=JobStep.FAILED).aggregate(
+                stage=Min('stage')
+            )['stage']
+
+            queued = job.steps.filter(status=JobStep.QUEUED)
+            if failed is not None:
+                queued = queued.filter(stage__lte=failed)
+
+            if queued.exists():
+                return job
+
+            job.status = Job.DONE if failed is None else Job.FAILED
+            job.finished = timezone.now()
+            job.save(update_fields=['status', 'finished'])
+
+        return job
+
+    def retry(self, job_id):
+        """
+        Queues failed steps of the job again. Steps which are done are never
+        run again, since their work is committed in the same transaction
+        which marks them as done.
+        """
+        with transaction.atomic():
+            job = self.select_for_update().get(pk=job_id)
+            retried = job.steps.filter(status=JobStep.FAILED).update(
+                status=JobStep.QUEUED, attempts=0, error='',
+                run_after=timezone.now()
+            )
+
+            if retried:
+                job.status = Job.QUEUED if job.started is None else \
+                    Job.RUNNING
+                job.finished = None
+                job.save(update_fields=['status', 'finished'])
+
+        return retried
+
+
+class Job(models.Model):
+    """
+    Long running operation spanning multiple tenant schemas, run in the
+    background by poem_worker command, one step per schema.
+    """
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUSES = (
+        (QUEUED, 'Queued'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed')
+    )
+
+    kind = models.CharField(max_length=64)
+    params = models.JSONField(default=dict)
+    key = models.CharField(max_length=255, null=True, blank=True)
+    status = models.CharField(
+        max_length=16, choices=STATUSES, default=QUEUED, db_index=True
+    )
+    user = models.CharField(max_length=32, blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+    started = models.DateTimeField(null=True, blank=True)
+    finished = models.DateTimeField(null=True, blank=True)
+
+    objects = JobManager()
+
+    class Meta:
+        app_label = 'poem_super_admin'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['key'],
+                condition=Q(status__in=['queued', 'running']),
+                name='unique_active_job_key'
+            )
+        ]
+
+    def __str__(self):
+        return u'%s (%s)' % (self.kind, self.status)
+
+
+class JobStepManager(models.Manager):
+    def runnable(self):
+        """
+        Returns steps which can be run now: queued, not postponed after
+        failure, and not waiting for steps of earlier stages of their job.
+        """
+        pending = self.filter(
+            job=OuterRef('job'), stage__lt=OuterRef('stage')
+        ).exclude(status=JobStep.DONE)
+
+        return self.filter(
+            status=JobStep.QUEUED, run_after__lte=timezone.now()
+        ).filter(~Exists(pending)).order_by('job_id', 'stage', 'id')
+
+
+class JobStep(models.Model):
+    QUEUED = 'queued'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUSES = (
+        (QUEUED, 'Queued'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed')
+    )
+
+    job = models.ForeignKey(
+        Job, related_name='steps', on_delete=models.CASCADE
+    )
+    schema_name = models.CharField(max_length=63)
+    stage = models.PositiveSmallIntegerField(default=0)
+    status = models.CharField(max_length=16, choices=STATUSES, default=QUEUED)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    run_after = models.DateTimeField(default=timezone.now)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    finished = models.DateTimeField(null=True, blank=True)
+
+    objects = JobStepManager()
+
+    class Meta:
+        app_label = 'poem_super_admin'
+        unique_together = [['job', 'schema_name', 'stage']]
+        indexes = [
+            models.Index(
+                fields=['status', 'run_after'], name='jobstep_runnable_idx'
+            )
+        ]
+
+    def __str__(self):
+        return u'%s %s (%s)' % (self.job, self.schema_name, self.status)
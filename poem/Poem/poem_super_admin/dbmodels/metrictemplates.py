@@ -1,5 +1,7 @@
+from django.contrib.postgres.indexes import GinIndex
 from django.db import models
 
+from Poem.poem_super_admin.dbmodels.fields import InlineField
 from Poem.poem_super_admin.models import ProbeHistory
 
 
@@ -50,19 +52,25 @@ class MetricTemplate(models.Model):
     description = models.TextField(default='')
     parent = models.CharField(max_length=128)
     probeexecutable = models.CharField(max_length=128)
-    config = models.CharField(max_length=1024)
-    attribute = models.CharField(max_length=1024)
-    dependency = models.CharField(max_length=1024)
-    flags = models.CharField(max_length=1024)
-    files = models.CharField(max_length=1024)
-    parameter = models.CharField(max_length=1024)
-    fileparameter = models.CharField(max_length=1024)
+    config = InlineField()
+    attribute = InlineField()
+    dependency = InlineField()
+    flags = InlineField()
+    files = InlineField()
+    parameter = InlineField()
+    fileparameter = InlineField()
 
     objects = MetricTemplateManager()
 
     class Meta:
         app_label = 'poem_super_admin'
         verbose_name = 'Metric template'
+        indexes = [
+            GinIndex(
+                fields=['flags'], opclasses=['jsonb_path_ops'],
+                name='metrictemplate_flags_gin'
+            )
+        ]
 
     def __str__(self):
         return u'%s' % self.name
@@ -81,13 +89,13 @@ class MetricTemplateHistory(models.Model):
     description = models.TextField(default='')
     parent = models.CharField(max_length=128)
     probeexecutable = models.CharField(max_length=128)
-    config = models.CharField(max_length=1024)
-    attribute = models.CharField(max_length=1024)
-    dependency = models.CharField(max_length=1024)
-    flags = models.CharField(max_length=1024)
-    files = models.CharField(max_length=1024)
-    parameter = models.CharField(max_length=1024)
-    fileparameter = models.CharField(max_length=1024)
+    config = InlineField()
+    attribute = InlineField()
+    dependency = InlineField()
+    flags = InlineField()
+    files = InlineField()
+    parameter = InlineField()
+    fileparameter = InlineField()
     date_created = models.DateTimeField(auto_now_add=True)
     version_comment = models.TextField(blank=True)
     version_user = models.CharField(max_length=32)
@@ -95,6 +103,12 @@ class MetricTemplateHistory(models.Model):
     class Meta:
         app_label = 'poem_super_admin'
         unique_together = [['name', 'probekey']]
+        indexes = [
+            GinIndex(
+                fields=['flags'], opclasses=['jsonb_path_ops'],
+                name='mthistory_flags_gin'
+            )
+        ]
 
     def __str__(self):
         if self.probekey:
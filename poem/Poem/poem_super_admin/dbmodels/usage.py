@@ -0,0 +1,268 @@
+from django.db import IntegrityError, models, transaction
+from django.db.models import Count, F
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from Poem.poem_super_admin.models import ProbeHistory
+from Poem.tenants.models import Tenant
+
+
+def parse_probeversion(probeversion):
+    """
+    Splits probe version string of metric ("<probe> (<version>)") into probe
+    name and package version. Returns None for metrics without probe.
+    """
+    if not probeversion:
+        return None
+
+    name, _, version = probeversion.rpartition(' (')
+
+    return name, version[:-1]
+
+
+class TenantMetricUsageManager(models.Manager):
+    def _probes_delta(self, schema_name, added, removed):
+        """
+        Returns change of the number of distinct probes of tenant with the
+        given schema after one of its metrics has stopped using probekey
+        removed and started using probekey added (either can be None).
+        """
+        if added == removed:
+            return 0
+
+        entries = self.filter(schema_name=schema_name)
+        delta = 0
+        if added is not None and \
+                entries.filter(probekey_id=added).count() == 1:
+            delta += 1
+
+        if removed is not None and \
+                not entries.filter(probekey_id=removed).exists():
+            delta -= 1
+
+        return delta
+
+    def record(self, schema_name, metric):
+        """
+        Records that the given metric is used by tenant with the given schema.
+        """
+        previous = list(
+            self.filter(
+                schema_name=schema_name, metric_id=metric.id
+            ).values_list('probekey', flat=True)
+        )
+
+        usage = self.update_or_create(
+            schema_name=schema_name, metric_id=metric.id,
+            defaults={'name': metric.name, 'probekey_id': metric.probekey_id}
+        )
+        TenantStats.objects.add(
+            schema_name, metrics=0 if previous else 1,
+            probes=self._probes_delta(
+                schema_name, metric.probekey_id,
+                previous[0] if previous else None
+            )
+        )
+
+        return usage
+
+    def record_many(self, schema_name, metrics):
+        """
+        Records that the given newly created metrics are used by tenant with
+        the given schema.
+        """
+        probekeys = set(
+            metric.probekey_id for metric in metrics
+            if metric.probekey_id is not None
+        )
+        used = set(
+            self.filter(
+                schema_name=schema_name, probekey__in=probekeys
+            ).values_list('probekey', flat=True)
+        )
+        entries = self.bulk_create([
+            self.model(
+                schema_name=schema_name, metric_id=metric.id,
+                name=metric.name, probekey_id=metric.probekey_id
+            ) for metric in metrics
+        ])
+        TenantStats.objects.add(
+            schema_name, metrics=len(entries),
+            probes=len(probekeys - used)
+        )
+
+        return entries
+
+    def record_updates(self, schema_name, metrics):
+        """
+        Updates entries of the given metrics of tenant with the given schema
+        after they have been changed in bulk (bulk_update does not send
+        post_save), with a constant number of queries.
+        """
+        metrics = dict((metric.id, metric) for metric in metrics)
+        entries = list(
+            self.filter(schema_name=schema_name, metric_id__in=metrics)
+        )
+        old = set(entry.probekey_id for entry in entries)
+        new = set(metric.probekey_id for metric in metrics.values())
+        old.discard(None)
+        new.discard(None)
+        others = set(
+            self.filter(
+                schema_name=schema_name, probekey__in=old | new
+            ).exclude(metric_id__in=metrics).values_list(
+                'probekey', flat=True
+            )
+        )
+
+        for entry in entries:
+            entry.name = metrics[entry.metric_id].name
+            entry.probekey_id = metrics[entry.metric_id].probekey_id
+
+        self.bulk_update(entries, ['name', 'probekey'])
+        TenantStats.objects.add(
+            schema_name, probes=len(new | others) - len(old | others)
+        )
+
+        return entries
+
+    def forget(self, schema_name, metric_id):
+        entries = self.filter(schema_name=schema_name, metric_id=metric_id)
+        probekeys = list(entries.values_list('probekey', flat=True))
+
+        if probekeys:
+            entries.delete()
+            TenantStats.objects.add(
+                schema_name, metrics=-1,
+                probes=self._probes_delta(schema_name, None, probekeys[0])
+            )
+
+    def rebuild(self, schema_name, metrics):
+        """
+        Replaces all the entries of the given schema with ones created from
+        the given (id, name, probekey id) tuples of its metrics.
+        """
+        with transaction.atomic():
+            self.filter(schema_name=schema_name).delete()
+
+            entries = self.bulk_create([
+                self.model(
+                    schema_name=schema_name, metric_id=pk, name=name,
+                    probekey_id=probekey
+                ) for pk, name, probekey in metrics
+            ])
+            TenantStats.objects.refresh(schema_name)
+
+        return entries
+
+    def schemas_using_metrics(self, names):
+        """
+        Returns sorted list of schemas of tenants having metrics with any of
+        the given names.
+        """
+        return sorted(set(
+            self.filter(name__in=names).values_list('schema_name', flat=True)
+        ))
+
+    def schemas_using_probekeys(self, probekeys):
+        """
+        Returns sorted list of schemas of tenants having metrics using any of
+        the given probe history entries.
+        """
+        return sorted(set(
+            self.filter(probekey__in=probekeys).values_list(
+                'schema_name', flat=True
+            )
+        ))
+
+
+class TenantMetricUsage(models.Model):
+    """
+    Reverse index of metrics used by tenants, kept in public schema so that
+    changes of shared models (probes, packages, metric templates) are
+    applied only to the schemas of tenants which use them.
+    """
+    schema_name = models.CharField(max_length=63)
+    metric_id = models.IntegerField()
+    name = models.CharField(max_length=128, db_index=True)
+    probekey = models.ForeignKey(
+        ProbeHistory, null=True, on_delete=models.SET_NULL
+    )
+
+    objects = TenantMetricUsageManager()
+
+    class Meta:
+        app_label = 'poem_super_admin'
+        unique_together = [['schema_name', 'metric_id']]
+
+    def __str__(self):
+        return u'%s (%s)' % (self.name, self.schema_name)
+
+
+class TenantStatsManager(models.Manager):
+    def add(self, schema_name, metrics=0, probes=0):
+        """
+        Changes numbers of metrics and probes of tenant with the given schema
+        by the given deltas and marks the time of the change, in a single
+        UPDATE.
+        """
+        stats = self.filter(schema_name=schema_name)
+        deltas = dict(
+            metrics=F('metrics') + metrics, probes=F('probes') + probes,
+            last_change=timezone.now()
+        )
+        if stats.update(**deltas):
+            return
+
+        try:
+            with transaction.atomic():
+                self.create(
+                    schema_name=schema_name, metrics=max(metrics, 0),
+                    probes=max(probes, 0)
+                )
+
+        except IntegrityError:
+            stats.update(**deltas)
+
+    def refresh(self, schema_name):
+        """
+        Recounts metrics and distinct probes of tenant with the given schema
+        from its entries in metric usage index.
+        """
+        stats = TenantMetricUsage.objects.filter(
+            schema_name=schema_name
+        ).aggregate(
+            metrics=Count('id'), probes=Count('probekey', distinct=True)
+        )
+
+        return self.update_or_create(
+            schema_name=schema_name, defaults=stats
+        )[0]
+
+
+class TenantStats(models.Model):
+    """
+    Number of metrics and probes of each tenant, updated by deltas on every
+    metric write, so that tenant list is served without entering tenant
+    schemas.
+    """
+    schema_name = models.CharField(max_length=63, unique=True)
+    metrics = models.PositiveIntegerField(default=0)
+    probes = models.PositiveIntegerField(default=0)
+    last_change = models.DateTimeField(auto_now=True)
+
+    objects = TenantStatsManager()
+
+    class Meta:
+        app_label = 'poem_super_admin'
+        verbose_name_plural = 'Tenant stats'
+
+    def __str__(self):
+        return u'%s (%s)' % (self.schema_name, self.metrics)
+
+
+@receiver(post_delete, sender=Tenant)
+def delete_tenant_metric_usage(sender, instance, **kwargs):
+    TenantMetricUsage.objects.filter(schema_name=instance.schema_name).delete()
+    TenantStats.objects.filter(schema_name=instance.schema_name).delete()
@@ -0,0 +1,21 @@
+# Generated by Django 3.2.18 on 2023-07-20 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('poem_super_admin', '0027_webapikey'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ConfigGeneration',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('schema_name', models.CharField(max_length=63, unique=True)),
+                ('generation', models.BigIntegerField(default=0)),
+            ],
+        ),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 3.2.19 on 2026-10-18 14:05
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django_tenants.utils import get_public_schema_name
+
+
+def build_usage(apps, schema_editor):
+    """
+    Builds the index from metrics in existing tenant schemas, so that
+    changes of shared models keep reaching them after the upgrade.
+    """
+    Tenant = apps.get_model('tenants', 'Tenant')
+    schemas = Tenant.objects.exclude(
+        schema_name=get_public_schema_name()
+    ).values_list('schema_name', flat=True)
+
+    with schema_editor.connection.cursor() as cursor:
+        for schema in schemas:
+            cursor.execute(
+                'SELECT to_regclass(%s)', [f'"{schema}".poem_metric']
+            )
+            if cursor.fetchone()[0] is None:
+                continue
+
+            cursor.execute(
+                f"""
+                INSERT INTO poem_super_admin_tenantmetricusage
+                    (schema_name, metric_id, name, probekey_id)
+                SELECT %s, metric.id, metric.name, (
+                    SELECT min(probe.id)
+                    FROM poem_super_admin_probehistory AS probe
+                    JOIN poem_super_admin_package AS package
+                        ON package.id = probe.package_id
+                    WHERE metric.probeversion =
+                        probe.name || ' (' || package.version || ')'
+                )
+                FROM "{schema}".poem_metric AS metric
+                """,
+                [schema]
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('poem_super_admin', '0028_configgeneration'),
+        ('tenants', '0003_tenant_combined'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TenantMetricUsage',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('schema_name', models.CharField(max_length=63)),
+                ('metric_id', models.IntegerField()),
+                ('name', models.CharField(db_index=True, max_length=128)),
+                ('probekey', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to='poem_super_admin.probehistory')),
+            ],
+            options={
+                'unique_together': {('schema_name', 'metric_id')},
+            },
+        ),
+        migrations.RunPython(build_usage, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 3.2.19 on 2026-10-18 15:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('poem_super_admin', '0029_tenantmetricusage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TenantStats',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('schema_name', models.CharField(max_length=63, unique=True)),
+                ('metrics', models.PositiveIntegerField(default=0)),
+                ('probes', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name_plural': 'Tenant stats',
+            },
+        ),
+        # stats of existing tenants, from metric usage index built in 0029
+        migrations.RunSQL(
+            """
+            INSERT INTO poem_super_admin_tenantstats
+                (schema_name, metrics, probes)
+            SELECT schema_name, count(*), count(DISTINCT probekey_id)
+            FROM poem_super_admin_tenantmetricusage
+            GROUP BY schema_name
+            """,
+            migrations.RunSQL.noop
+        ),
+    ]
@@ -0,0 +1,115 @@
+# Generated by Django 3.2.19 on 2026-10-18 15:20
+
+import Poem.poem_super_admin.dbmodels.fields
+import django.contrib.postgres.indexes
+from django.db import migrations
+
+from Poem.poem_super_admin.dbmodels.fields import INLINE_FUNCTIONS, \
+    DROP_INLINE_FUNCTIONS, inline_columns_sql
+
+INLINE_FIELDS = [
+    'config', 'attribute', 'dependency', 'flags', 'files', 'parameter',
+    'fileparameter'
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('poem_super_admin', '0031_job_jobstep'),
+    ]
+
+    operations = [
+        migrations.RunSQL(INLINE_FUNCTIONS, DROP_INLINE_FUNCTIONS),
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(*inline_columns_sql(
+                    'poem_super_admin_metrictemplate', INLINE_FIELDS
+                )),
+                migrations.RunSQL(*inline_columns_sql(
+                    'poem_super_admin_metrictemplatehistory', INLINE_FIELDS
+                )),
+            ],
+            state_operations=[
+                migrations.AlterField(
+                    model_name='metrictemplate',
+                    name='config',
+                    field=Poem.poem_super_admin.dbmodels.fields.InlineField(blank=True, default='', null=True),
+                ),
+                migrations.AlterField(
+                    model_name='metrictemplate',
+                    name='attribute',
+                    field=Poem.poem_super_admin.dbmodels.fields.InlineField(blank=True, default='', null=True),
+                ),
+                migrations.AlterField(
+                    model_name='metrictemplate',
+                    name='dependency',
+                    field=Poem.poem_super_admin.dbmodels.fields.InlineField(blank=True, default='', null=True),
+                ),
+                migrations.AlterField(
+                    model_name='metrictemplate',
+                    name='flags',
+                    field=Poem.poem_super_admin.dbmodels.fields.InlineField(blank=True, default='', null=True),
+                ),
+                migrations.AlterField(
+                    model_name='metrictemplate',
+                    name='files',
+                    field=Poem.poem_super_admin.dbmodels.fields.InlineField(blank=True, default='', null=True),
+                ),
+                migrations.AlterField(
+                    model_name='metrictemplate',
+                    name='parameter',
+                    field=Poem.poem_super_admin.dbmodels.fields.InlineField(blank=True, default='', null=True),
+                ),
+                migrations.AlterField(
+                    model_name='metrictemplate',
+                    name='fileparameter',
+                    field=Poem.poem_super_admin.dbmodels.fields.InlineField(blank=True, default='', null=True),
+                ),
+                migrations.AlterField(
+                    model_name='metrictemplatehistory',
+                    name='config',
+                    field=Poem.poem_super_admin.dbmodels.fields.InlineField(blank=True, default='', null=True),
+                ),
+                migrations.AlterField(
+                    model_name='metrictemplatehistory',
+                    name='attribute',
+                    field=Poem.poem_super_admin.dbmodels.fields.InlineField(blank=True, default='', null=True),
+                ),
+                migrations.AlterField(
+                    model_name='metrictemplatehistory',
+                    name='dependency',
+                    field=Poem.poem_super_admin.dbmodels.fields.InlineField(blank=True, default='', null=True),
+                ),
+                migrations.AlterField(
+                    model_name='metrictemplatehistory',
+                    name='flags',
+                    field=Poem.poem_super_admin.dbmodels.fields.InlineField(blank=True, default='', null=True),
+                ),
+                migrations.AlterField(
+                    model_name='metrictemplatehistory',
+                    name='files',
+                    field=Poem.poem_super_admin.dbmodels.fields.InlineField(blank=True, default='', null=True),
+                ),
+                migrations.AlterField(
+                    model_name='metrictemplatehistory',
+                    name='parameter',
+                    field=Poem.poem_super_admin.dbmodels.fields.InlineField(blank=True, default='', null=True),
+                ),
+                migrations.AlterField(
+                    model_name='metrictemplatehistory',
+                    name='fileparameter',
+                    field=Poem.poem_super_admin.dbmodels.fields.InlineField(blank=True, default='', null=True),
+                ),
+            ],
+        ),
+        migrations.RunSQL(DROP_INLINE_FUNCTIONS, INLINE_FUNCTIONS),
+        migrations.AddIndex(
+            model_name='metrictemplate',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['flags'], name='metrictemplate_flags_gin', opclasses=['jsonb_path_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='metrictemplatehistory',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['flags'], name='mthistory_flags_gin', opclasses=['jsonb_path_ops']),
+        ),
+    ]
@@ -0,0 +1,84 @@
+# Generated by Django 3.2.19 on 2026-10-18 20:00
+
+import Poem.poem_super_admin.dbmodels.fields
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('poem_super_admin', '0032_inline_fields_jsonb'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='metrictemplate',
+            name='config',
+            field=Poem.poem_super_admin.dbmodels.fields.InlineField(blank=True, default=list, null=True),
+        ),
+        migrations.AlterField(
+            model_name='metrictemplate',
+            name='attribute',
+            field=Poem.poem_super_admin.dbmodels.fields.InlineField(blank=True, default=list, null=True),
+        ),
+        migrations.AlterField(
+            model_name='metrictemplate',
+            name='dependency',
+            field=Poem.poem_super_admin.dbmodels.fields.InlineField(blank=True, default=list, null=True),
+        ),
+        migrations.AlterField(
+            model_name='metrictemplate',
+            name='flags',
+            field=Poem.poem_super_admin.dbmodels.fields.InlineField(blank=True, default=list, null=True),
+        ),
+        migrations.AlterField(
+            model_name='metrictemplate',
+            name='files',
+            field=Poem.poem_super_admin.dbmodels.fields.InlineField(blank=True, default=list, null=True),
+        ),
+        migrations.AlterField(
+            model_name='metrictemplate',
+            name='parameter',
+            field=Poem.poem_super_admin.dbmodels.fields.InlineField(blank=True, default=list, null=True),
+        ),
+        migrations.AlterField(
+            model_name='metrictemplate',
+            name='fileparameter',
+            field=Poem.poem_super_admin.dbmodels.fields.InlineField(blank=True, default=list, null=True),
+        ),
+        migrations.AlterField(
+            model_name='metrictemplatehistory',
+            name='config',
+            field=Poem.poem_super_admin.dbmodels.fields.InlineField(blank=True, default=list, null=True),
+        ),
+        migrations.AlterField(
+            model_name='metrictemplatehistory',
+            name='attribute',
+            field=Poem.poem_super_admin.dbmodels.fields.InlineField(blank=True, default=list, null=True),
+        ),
+        migrations.AlterField(
+            model_name='metrictemplatehistory',
+            name='dependency',
+            field=Poem.poem_super_admin.dbmodels.fields.InlineField(blank=True, default=list, null=True),
+        ),
+        migrations.AlterField(
+            model_name='metrictemplatehistory',
+            name='flags',
+            field=Poem.poem_super_admin.dbmodels.fields.InlineField(blank=True, default=list, null=True),
+        ),
+        migrations.AlterField(
+            model_name='metrictemplatehistory',
+            name='files',
+            field=Poem.poem_super_admin.dbmodels.fields.InlineField(blank=True, default=list, null=True),
+        ),
+        migrations.AlterField(
+            model_name='metrictemplatehistory',
+            name='parameter',
+            field=Poem.poem_super_admin.dbmodels.fields.InlineField(blank=True, default=list, null=True),
+        ),
+        migrations.AlterField(
+            model_name='metrictemplatehistory',
+            name='fileparameter',
+            field=Poem.poem_super_admin.dbmodels.fields.InlineField(blank=True, default=list, null=True),
+        ),
+    ]
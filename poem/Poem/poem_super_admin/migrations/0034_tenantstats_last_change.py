@@ -0,0 +1,20 @@
+# Generated by Django 3.2.19 on 2026-10-18 21:10
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('poem_super_admin', '0033_inline_fields_default'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tenantstats',
+            name='last_change',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+    ]
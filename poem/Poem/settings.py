@@ -40,6 +40,19 @@ try:
 
     DATABASE_ROUTERS = ('django_tenants.routers.TenantSyncRouter',)
 
+    FANOUT_WORKERS = config.getint('DATABASE', 'FanOutWorkers', fallback=4)
+    JOB_MAX_ATTEMPTS = config.getint('DATABASE', 'JobMaxAttempts', fallback=3)
+    JOB_RETRY_DELAY = config.getint('DATABASE', 'JobRetryDelay', fallback=60)
+    JOB_POLL_INTERVAL = config.getint(
+        'DATABASE', 'JobPollInterval', fallback=5
+    )
+    HISTORY_SNAPSHOT_INTERVAL = config.getint(
+        'DATABASE', 'HistorySnapshotInterval', fallback=1
+    )
+    METRIC_CHANGES_RETENTION = config.getint(
+        'DATABASE', 'MetricChangesRetention', fallback=30
+    )
+
     ALLOWED_HOSTS = config.get('SECURITY', 'AllowedHosts')
     HOST_CERT = config.get('SECURITY', 'HostCert')
     HOST_KEY = config.get('SECURITY', 'HostKey')
@@ -55,10 +68,50 @@ try:
     WEBAPI_METRICSTAGS = config.get("WEBAPI", "Metrics")
     WEBAPI_SERVICETYPES = config.get("WEBAPI", "ServiceTypes")
     WEBAPI_DATAFEEDS = config.get("WEBAPI", "DataFeeds")
+    WEBAPI_CONNECT_TIMEOUT = config.getfloat(
+        'WEBAPI', 'ConnectTimeout', fallback=10
+    )
+    WEBAPI_READ_TIMEOUT = config.getfloat('WEBAPI', 'ReadTimeout', fallback=180)
+    WEBAPI_RETRIES = config.getint('WEBAPI', 'Retries', fallback=3)
+    WEBAPI_RETRY_BACKOFF = config.getfloat(
+        'WEBAPI', 'RetryBackoff', fallback=0.5
+    )
+    WEBAPI_POOL_SIZE = config.getint('WEBAPI', 'PoolSize', fallback=10)
+    WEBAPI_WORKERS = config.getint('WEBAPI', 'Workers', fallback=10)
+    WEBAPI_TENANT_TIMEOUT = config.getint(
+        'WEBAPI', 'TenantTimeout', fallback=60
+    )
+
+    CACHE_BACKEND = config.get(
+        'CACHE', 'Backend',
+        fallback='django.core.cache.backends.locmem.LocMemCache'
+    )
+    CACHE_LOCATION = config.get('CACHE', 'Location', fallback='poem')
+    CACHE_SNAPSHOT_TIMEOUT = config.getint(
+        'CACHE', 'SnapshotTimeout', fallback=86400
+    )
+    CACHE_WEBAPI_TIMEOUT = config.getint(
+        'CACHE', 'WebApiTimeout', fallback=60
+    )
+    APIKEY_CACHE_TIMEOUT = config.getint(
+        'CACHE', 'ApiKeyTimeout', fallback=300
+    )
+    APIKEY_CACHE_SIZE = config.getint('CACHE', 'ApiKeySize', fallback=1024)
 
     LINKS_TERMS_PRIVACY = dict()
+    WEBAPI_SYNC_TTL = {'default': dict()}
     all_sections = config.sections()
     for section in all_sections:
+        if section == 'SYNC' or section.startswith('SYNC_'):
+            if section == 'SYNC':
+                sync_name = 'default'
+            else:
+                sync_name = section.split('_', 1)[1].lower()
+            WEBAPI_SYNC_TTL[sync_name] = dict(
+                (option, config.getint(section, option))
+                for option in config.options(section)
+                if option not in config.defaults()
+            )
         if section.startswith('GENERAL_'):
             tenant_name = section.split('_')[1]
             LINKS_TERMS_PRIVACY[tenant_name.lower()] = dict()
@@ -191,6 +244,17 @@ USE_L10N = True
 URL_DEBUG = True
 TEMPLATE_DEBUG = DEBUG
 
+# Cache is tenant aware: keys are prefixed with the schema name of the
+# current connection
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKEND,
+        'LOCATION': CACHE_LOCATION,
+        'KEY_FUNCTION': 'django_tenants.cache.make_key',
+        'REVERSE_KEY_FUNCTION': 'django_tenants.cache.reverse_key',
+    }
+}
+
 # Django REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
@@ -48,7 +48,10 @@ setup(name=NAME,
                'bin/poem-token', 'bin/poem-tenant', 'bin/poem-clearsessions'],
       data_files=[
           ('etc/poem', ['etc/poem.conf.template', 'etc/poem_logging.conf']),
-          ('etc/cron.d/', ['cron/poem-clearsessions', 'cron/poem-db_backup']),
+          ('etc/cron.d/', [
+              'cron/poem-clearsessions', 'cron/poem-clearmetricchanges',
+              'cron/poem-db_backup'
+          ]),
           ('etc/logrotate.d/', ['logrotate.d/poem-db_backup']),
           ('etc/httpd/conf.d', ['poem/apache/poem.conf']),
           ('usr/share/poem/apache', ['poem/apache/poem.wsgi']),